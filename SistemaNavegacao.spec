@@ -1,7 +1,7 @@
 # -*- mode: python ; coding: utf-8 -*-
 from PyInstaller.utils.hooks import collect_all
 
-datas = [('perimetro-mapa.png', '.'), ('pins.json', '.'), ('assets', 'assets'), ('backend/router.dll', 'backend')]
+datas = [('perimetro-mapa.png', '.'), ('pins.json', '.'), ('grafo.json', '.'), ('assets', 'assets'), ('backend/router.dll', 'backend')]
 binaries = []
 hiddenimports = ['PIL._tkinter_finder']
 tmp_ret = collect_all('customtkinter')
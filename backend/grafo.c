@@ -1,7 +1,22 @@
+#ifndef _WIN32
+    #define _POSIX_C_SOURCE 200112L  // mmap/fstat com -std=c99
+#endif
+
 #include "grafo.h"
+#include "grafo_log.h"
 #include <stdlib.h>
 #include <string.h>
 #include <stdio.h>
+#include <math.h>
+
+#ifdef _WIN32
+    #include <windows.h>
+#else
+    #include <fcntl.h>
+    #include <sys/mman.h>
+    #include <sys/stat.h>
+    #include <unistd.h>
+#endif
 
 /* Cria um novo grafo vazio */
 Grafo* criar_grafo() {
@@ -12,114 +27,344 @@ Grafo* criar_grafo() {
     
     g->num_vertices = 0;     // Inicializa vazio
     g->vertices = NULL;      // Arrays serão alocados dinamicamente
-    g->lista_adj = NULL;
+    g->capacidade_vertices = 0;
+    g->num_arestas = 0;
+    g->adj_inicio = NULL;    // Adjacências CSR montadas por construir_adjacencias()
+    g->adj_destino = NULL;
+    g->adj_peso = NULL;
+    g->rev_inicio = NULL;    // CSR reverso montado junto com o direto
+    g->rev_origem = NULL;
+    g->rev_peso = NULL;
+    g->indice_por_id = NULL;
+    g->tamanho_indice = 0;
+    g->versao = 0;
+    g->escala_heuristica = 0.0;
+    g->textos = NULL;        // Tabela de textos cresce a cada vértice adicionado
+    g->tamanho_textos = 0;
+    g->capacidade_textos = 0;
+    g->pinos = NULL;
+    g->num_pinos = 0;
+    g->mapa = NULL;          // Preenchido apenas por carregar_grafo_binario()
+    g->tamanho_mapa = 0;
     
     return g;
 }
 
+/* Função interna: Garante que a tabela ID → índice comporte o ID informado */
+static int garantir_indice(Grafo* g, int id) {
+    int novo_tamanho, i;
+    int* nova_tabela;
+    
+    if (id < g->tamanho_indice) {
+        return 1;
+    }
+    
+    /* Cresce em potências de 2 para amortizar realocações (IDs densos: 0..N-1) */
+    novo_tamanho = g->tamanho_indice > 0 ? g->tamanho_indice : 64;
+    while (novo_tamanho <= id) {
+        novo_tamanho *= 2;
+    }
+    
+    nova_tabela = (int*)realloc(g->indice_por_id, novo_tamanho * sizeof(int));
+    if (nova_tabela == NULL) {
+        return 0;
+    }
+    
+    for (i = g->tamanho_indice; i < novo_tamanho; i++) {
+        nova_tabela[i] = -1;  // Posições novas: ID ainda não existe
+    }
+    g->indice_por_id = nova_tabela;
+    g->tamanho_indice = novo_tamanho;
+    
+    return 1;
+}
+
+/* Função interna: Copia texto para a tabela do grafo e retorna seu deslocamento (-1 = erro) */
+static int adicionar_texto(Grafo* g, const char* texto) {
+    int len = (int)strlen(texto) + 1;  // Inclui o terminador
+    int deslocamento;
+    
+    if (g->tamanho_textos + len > g->capacidade_textos) {
+        int nova = g->capacidade_textos > 0 ? g->capacidade_textos : 4096;
+        char* tabela;
+        while (nova < g->tamanho_textos + len) {
+            nova *= 2;
+        }
+        tabela = (char*)realloc(g->textos, nova);
+        if (tabela == NULL) {
+            return -1;
+        }
+        g->textos = tabela;
+        g->capacidade_textos = nova;
+    }
+    
+    deslocamento = g->tamanho_textos;
+    memcpy(g->textos + deslocamento, texto, len);
+    g->tamanho_textos += len;
+    return deslocamento;
+}
+
 /* Adiciona um vértice ao grafo */
 void adicionar_vertice(Grafo* g, int id, const char* nome, const char* categoria, const char* rua, int tipo, int x, int y) {
     if (g == NULL) {
         return;
     }
     
-    /* Realoca arrays para comportar mais um vértice */
-    g->vertices = (Vertice*)realloc(g->vertices, (g->num_vertices + 1) * sizeof(Vertice));
-    g->lista_adj = (Aresta**)realloc(g->lista_adj, (g->num_vertices + 1) * sizeof(Aresta*));
+    if (g->mapa != NULL) {
+        LOG(LOG_ERRO, "Grafo mapeado de arquivo e somente leitura\n");
+        return;
+    }
     
-    if (g->vertices == NULL || g->lista_adj == NULL) {
-        printf("Erro ao alocar memória para vértice\n");
+    if (id < 0 || !garantir_indice(g, id)) {
+        LOG(LOG_ERRO, "Erro ao indexar vértice %d\n", id);
         return;
     }
     
+    /* Realoca array (em dobro, para importações grandes não serem quadráticas) */
+    if (g->num_vertices == g->capacidade_vertices) {
+        int nova = g->capacidade_vertices > 0 ? 2 * g->capacidade_vertices : 64;
+        Vertice* novos = (Vertice*)realloc(g->vertices, nova * sizeof(Vertice));
+        if (novos == NULL) {
+            LOG(LOG_ERRO, "Erro ao alocar memória para vértice\n");
+            return;
+        }
+        g->vertices = novos;
+        g->capacidade_vertices = nova;
+    }
+    
     /* Preenche dados do vértice */
     Vertice* v = &g->vertices[g->num_vertices];
     v->id = id;
-    strncpy(v->nome, nome, MAX_NOME - 1);
-    v->nome[MAX_NOME - 1] = '\0';  // Garante terminação
-    strncpy(v->categoria, categoria, MAX_CATEGORIA - 1);
-    v->categoria[MAX_CATEGORIA - 1] = '\0';
-    strncpy(v->rua, rua, MAX_RUA - 1);
-    v->rua[MAX_RUA - 1] = '\0';
+    v->nome = adicionar_texto(g, nome);  // Textos vão para a tabela compartilhada
+    v->categoria = adicionar_texto(g, categoria);
+    v->rua = adicionar_texto(g, rua);
+    if (v->nome < 0 || v->categoria < 0 || v->rua < 0) {
+        LOG(LOG_ERRO, "Erro ao alocar memória para textos do vértice\n");
+        return;
+    }
     v->tipo = tipo;
     v->x = x;  // Coordenadas da calçada para cálculo de rotas
     v->y = y;
     
-    /* Inicializa lista de adjacência vazia para este vértice */
-    g->lista_adj[g->num_vertices] = NULL;
+    /* Registra na tabela ID → índice (mantém a primeira ocorrência de IDs repetidos) */
+    if (g->indice_por_id[id] == -1) {
+        g->indice_por_id[id] = g->num_vertices;
+    }
     
     g->num_vertices++;
 }
 
-/* Encontra o índice de um vértice pelo ID (busca linear O(n)) */
+/* Encontra o índice de um vértice pelo ID (consulta direta na tabela, O(1)) */
 int encontrar_indice_vertice(Grafo* g, int id) {
+    if (id < 0 || id >= g->tamanho_indice) {
+        return -1;  // Fora da faixa de IDs conhecidos
+    }
+    return g->indice_por_id[id];  // -1 se não encontrado
+}
+
+/* Função interna: Acumula um inteiro no hash FNV-1a (byte a byte) */
+static unsigned int fnv_inteiro(unsigned int hash, int valor) {
+    int b;
+    unsigned int v = (unsigned int)valor;
+    for (b = 0; b < 4; b++) {
+        hash ^= (v >> (8 * b)) & 0xFFu;
+        hash *= 16777619u;
+    }
+    return hash;
+}
+
+/* Função interna: Acumula uma string no hash FNV-1a */
+static unsigned int fnv_texto(unsigned int hash, const char* texto) {
+    while (*texto) {
+        hash ^= (unsigned char)*texto++;
+        hash *= 16777619u;
+    }
+    return fnv_inteiro(hash, 0);  // Separador entre campos
+}
+
+/* Calcula checksum dos dados do grafo (vértices + adjacências), usado como versão */
+unsigned int calcular_versao_grafo(const Grafo* g) {
     int i;
+    unsigned int hash = 2166136261u;  // Base FNV-1a 32 bits
+    
+    if (g == NULL) {
+        return 0;
+    }
+    
     for (i = 0; i < g->num_vertices; i++) {
-        if (g->vertices[i].id == id) {
-            return i;
+        const Vertice* v = &g->vertices[i];
+        hash = fnv_inteiro(hash, v->id);
+        hash = fnv_inteiro(hash, v->tipo);
+        hash = fnv_inteiro(hash, v->x);
+        hash = fnv_inteiro(hash, v->y);
+        hash = fnv_texto(hash, vertice_nome(g, i));
+        hash = fnv_texto(hash, vertice_categoria(g, i));
+        hash = fnv_texto(hash, vertice_rua(g, i));
+    }
+    
+    if (g->adj_inicio != NULL) {
+        for (i = 0; i <= g->num_vertices; i++) {
+            hash = fnv_inteiro(hash, g->adj_inicio[i]);
+        }
+        for (i = 0; i < g->num_arestas; i++) {
+            hash = fnv_inteiro(hash, g->adj_destino[i]);
+            hash = fnv_inteiro(hash, g->adj_peso[i]);
         }
     }
-    return -1;  // Não encontrado
+    
+    return hash;
 }
 
-/* Adiciona uma aresta (conexão) entre dois vértices */
-void adicionar_aresta(Grafo* g, int origem, int destino, int distancia) {
-    if (g == NULL) {
+/* Calibra a escala pixel → metro do A* com a menor razão peso / distância em pixels
+ * entre todas as arestas. Assim escala * distância_euclidiana nunca excede o peso real
+ * de uma aresta, e a heurística é admissível (e consistente) para qualquer caminho. */
+void calcular_escala_heuristica(Grafo* g) {
+    int u, k;
+    double escala = -1.0;
+    
+    if (g == NULL || g->adj_inicio == NULL) {
         return;
     }
     
-    int idx_origem = encontrar_indice_vertice(g, origem);
-    
-    if (idx_origem == -1) {
-        return;  // Origem não existe, ignora aresta
+    for (u = 0; u < g->num_vertices; u++) {
+        for (k = g->adj_inicio[u]; k < g->adj_inicio[u + 1]; k++) {
+            const Vertice* a = &g->vertices[u];
+            const Vertice* b = &g->vertices[g->adj_destino[k]];
+            double dx = (double)(a->x - b->x);
+            double dy = (double)(a->y - b->y);
+            double pixels = sqrt(dx * dx + dy * dy);
+            
+            if (pixels > 0.0) {
+                double razao = g->adj_peso[k] / pixels;
+                if (escala < 0.0 || razao < escala) {
+                    escala = razao;
+                }
+            }
+        }
     }
     
-    /* Verifica se o vértice de destino existe */
-    if (encontrar_indice_vertice(g, destino) == -1) {
-        return;  // Destino não existe, ignora aresta
+    /* Sem arestas com comprimento em pixels: heurística nula (A* equivale ao Dijkstra) */
+    g->escala_heuristica = (escala > 0.0) ? escala * (1.0 - 1e-9) : 0.0;
+}
+
+/* Limite inferior (em metros) da distância entre os vértices de índices u e v */
+int heuristica_distancia(const Grafo* g, int u, int v) {
+    double dx = (double)(g->vertices[u].x - g->vertices[v].x);
+    double dy = (double)(g->vertices[u].y - g->vertices[v].y);
+    return (int)(g->escala_heuristica * sqrt(dx * dx + dy * dy));  // Truncamento mantém o limite inferior
+}
+
+/* Textos do vértice de índice 'indice' (apontam para a tabela do grafo, não liberar) */
+const char* vertice_nome(const Grafo* g, int indice) {
+    return g->textos + g->vertices[indice].nome;
+}
+
+const char* vertice_categoria(const Grafo* g, int indice) {
+    return g->textos + g->vertices[indice].categoria;
+}
+
+const char* vertice_rua(const Grafo* g, int indice) {
+    return g->textos + g->vertices[indice].rua;
+}
+
+/* Mapeia arquivo inteiro em memória, somente leitura (páginas carregadas sob demanda pelo SO) */
+void* mapear_arquivo(const char* caminho, size_t* tamanho_out) {
+#ifdef _WIN32
+    HANDLE arquivo, mapeamento;
+    LARGE_INTEGER tamanho;
+    void* mapa;
+    
+    arquivo = CreateFileA(caminho, GENERIC_READ, FILE_SHARE_READ, NULL, OPEN_EXISTING,
+                          FILE_ATTRIBUTE_NORMAL, NULL);
+    if (arquivo == INVALID_HANDLE_VALUE) {
+        return NULL;
     }
+    if (!GetFileSizeEx(arquivo, &tamanho) || tamanho.QuadPart == 0) {
+        CloseHandle(arquivo);
+        return NULL;
+    }
+    mapeamento = CreateFileMappingA(arquivo, NULL, PAGE_READONLY, 0, 0, NULL);
+    CloseHandle(arquivo);
+    if (mapeamento == NULL) {
+        return NULL;
+    }
+    mapa = MapViewOfFile(mapeamento, FILE_MAP_READ, 0, 0, 0);
+    CloseHandle(mapeamento);  // A visão continua válida até UnmapViewOfFile
+    if (mapa == NULL) {
+        return NULL;
+    }
+    *tamanho_out = (size_t)tamanho.QuadPart;
+    return mapa;
+#else
+    struct stat info;
+    void* mapa;
+    int fd = open(caminho, O_RDONLY);
     
-    /* Cria nova aresta */
-    Aresta* nova = (Aresta*)malloc(sizeof(Aresta));
-    if (nova == NULL) {
-        printf("Erro ao alocar memória para aresta\n");
+    if (fd < 0) {
+        return NULL;
+    }
+    if (fstat(fd, &info) != 0 || info.st_size == 0) {
+        close(fd);
+        return NULL;
+    }
+    mapa = mmap(NULL, (size_t)info.st_size, PROT_READ, MAP_PRIVATE, fd, 0);
+    close(fd);  // O mapeamento continua válido até munmap
+    if (mapa == MAP_FAILED) {
+        return NULL;
+    }
+    *tamanho_out = (size_t)info.st_size;
+    return mapa;
+#endif
+}
+
+/* Desfaz mapeamento criado por mapear_arquivo() */
+void desmapear_arquivo(void* mapa, size_t tamanho) {
+    if (mapa == NULL) {
         return;
     }
-    
-    nova->destino_id = destino;
-    nova->distancia = distancia;
-    nova->prox = g->lista_adj[idx_origem];  // Insere no início da lista (O(1))
-    g->lista_adj[idx_origem] = nova;
+#ifdef _WIN32
+    (void)tamanho;
+    UnmapViewOfFile(mapa);
+#else
+    munmap(mapa, tamanho);
+#endif
 }
 
 /* Libera toda memória do grafo */
 void destruir_grafo(Grafo* g) {
-    int i;
-    Aresta* atual;
-    Aresta* prox;
-    
     if (g == NULL) {
         return;
     }
     
-    /* Libera todas as listas de adjacência */
-    if (g->lista_adj != NULL) {
-        for (i = 0; i < g->num_vertices; i++) {
-            atual = g->lista_adj[i];
-            while (atual != NULL) {  // Percorre lista encadeada
-                prox = atual->prox;
-                free(atual);
-                atual = prox;
-            }
-        }
-        free(g->lista_adj);
+    /* Grafo mapeado: todos os arrays apontam para dentro do arquivo */
+    if (g->mapa != NULL) {
+        desmapear_arquivo(g->mapa, g->tamanho_mapa);
+        free(g);
+        return;
     }
     
+    /* Libera arrays CSR de adjacência */
+    free(g->adj_inicio);
+    free(g->adj_destino);
+    free(g->adj_peso);
+    free(g->rev_inicio);
+    free(g->rev_origem);
+    free(g->rev_peso);
+    
     /* Libera array de vértices */
     if (g->vertices != NULL) {
         free(g->vertices);
     }
     
+    /* Libera tabela ID → índice */
+    if (g->indice_por_id != NULL) {
+        free(g->indice_por_id);
+    }
+    
+    /* Libera tabela de textos e pinos */
+    free(g->textos);
+    free(g->pinos);
+    
     /* Libera estrutura principal do grafo */
     free(g);
 }
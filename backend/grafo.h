@@ -1,38 +1,64 @@
 #ifndef GRAFO_H
 #define GRAFO_H
 
-#define MAX_NOME 100       // Tamanho máximo nome do local
-#define MAX_CATEGORIA 50   // Tamanho máximo categoria
-#define MAX_RUA 100        // Tamanho máximo nome da rua
+#include <stddef.h>
 
-/* Estruturas do Grafo */
+/* Estruturas do Grafo
+ * Registro de tamanho fixo, sem ponteiros: os textos ficam na tabela 'textos' do
+ * grafo (strings terminadas em '\0') e o vértice guarda apenas o deslocamento.
+ * Assim o array de vértices pode ser usado direto do arquivo mapeado (grafo_binario.h).
+ * Use vertice_nome/vertice_categoria/vertice_rua para obter os textos. */
 typedef struct {
     int id;                        // ID único do vértice
-    char nome[MAX_NOME];           // Nome do local/esquina
-    char categoria[MAX_CATEGORIA]; // Tipo: restaurante, bar, esquina, etc
-    char rua[MAX_RUA];             // Nome da rua onde está
+    int nome;                      // Deslocamento do nome do local/esquina em 'textos'
+    int categoria;                 // Deslocamento do tipo (restaurante, bar, esquina, etc)
+    int rua;                       // Deslocamento do nome da rua onde está
     int tipo;                      // 0=esquina, 1=ponto turístico
     int x;                         // Coordenada X na calçada (para rotas)
     int y;                         // Coordenada Y na calçada (para rotas)
 } Vertice;
 
-typedef struct Aresta {
-    int destino_id;        // ID do vértice destino
-    int distancia;         // Distância em metros
-    struct Aresta* prox;   // Próxima aresta na lista (encadeamento)
-} Aresta;
-
+/* Adjacências em formato CSR (Compressed Sparse Row):
+ * as arestas que saem do vértice de índice u ocupam as posições
+ * [adj_inicio[u], adj_inicio[u + 1]) dos arrays paralelos adj_destino/adj_peso.
+ * O CSR reverso (rev_*) guarda as mesmas arestas agrupadas pelo destino,
+ * usado pela busca bidirecional para andar "de trás para frente". */
 typedef struct {
     int num_vertices;      // Total de vértices no grafo
     Vertice* vertices;     // Array dinâmico de vértices
-    Aresta** lista_adj;    // Array de listas encadeadas (adjacências)
+    int capacidade_vertices;  // Posições alocadas em 'vertices' (cresce em dobro)
+    int num_arestas;       // Total de arestas válidas no grafo
+    int* adj_inicio;       // Offsets por vértice (num_vertices + 1 posições)
+    int* adj_destino;      // Índice (não ID) do vértice destino de cada aresta
+    int* adj_peso;         // Distância em metros de cada aresta
+    int* rev_inicio;       // CSR reverso (arestas que CHEGAM em cada vértice), num_vertices + 1
+    int* rev_origem;       // Índice do vértice de origem de cada aresta reversa
+    int* rev_peso;         // Distância em metros de cada aresta reversa
+    int* indice_por_id;    // Tabela densa ID → índice em 'vertices' (-1 = ID inexistente)
+    int tamanho_indice;    // Quantidade de posições alocadas em indice_por_id (maior ID + 1)
+    unsigned int versao;   // Checksum dos dados carregados (muda quando o mapa muda)
+    double escala_heuristica;  // Metros por pixel (limite inferior, calibrado pelas arestas) para o A*
+    char* textos;          // Tabela de textos dos vértices (nomes, categorias e ruas)
+    int tamanho_textos;    // Bytes usados em 'textos'
+    int capacidade_textos; // Bytes alocados em 'textos' (0 quando mapeado)
+    int* pinos;            // Coordenadas visuais (id, x, y) por pino do mapa, NULL se ausentes
+    int num_pinos;
+    void* mapa;            // Arquivo binário mapeado em memória (NULL = arrays alocados com malloc)
+    size_t tamanho_mapa;
 } Grafo;
 
 /* Protótipos das Funções do Grafo */
 Grafo* criar_grafo();                                  // Aloca grafo vazio
 void adicionar_vertice(Grafo* g, int id, const char* nome, const char* categoria, const char* rua, int tipo, int x, int y);  // Adiciona vértice ao grafo
-void adicionar_aresta(Grafo* g, int origem, int destino, int distancia);  // Adiciona conexão entre vértices
 void destruir_grafo(Grafo* g);                        // Libera toda memória do grafo
-int encontrar_indice_vertice(Grafo* g, int id);      // Busca índice do vértice por ID (O(n))
+int encontrar_indice_vertice(Grafo* g, int id);      // Busca índice do vértice por ID (O(1))
+unsigned int calcular_versao_grafo(const Grafo* g);  // Checksum FNV-1a de vértices e arestas
+void calcular_escala_heuristica(Grafo* g);           // Calibra metros/pixel (menor razão peso/distância)
+int heuristica_distancia(const Grafo* g, int u, int v);  // Limite inferior em metros entre dois índices
+const char* vertice_nome(const Grafo* g, int indice);      // Textos do vértice de índice 'indice'
+const char* vertice_categoria(const Grafo* g, int indice);
+const char* vertice_rua(const Grafo* g, int indice);
+void* mapear_arquivo(const char* caminho, size_t* tamanho_out);  // Mapeia arquivo somente leitura (NULL = erro)
+void desmapear_arquivo(void* mapa, size_t tamanho);
 
 #endif
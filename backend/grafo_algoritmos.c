@@ -1,166 +1,434 @@
 #include "grafo_algoritmos.h"
 #include "grafo_db.h"
+#include "grafo_heap.h"
+#include "grafo_log.h"
 #include <stdlib.h>
 #include <string.h>
 #include <stdio.h>
 #include <limits.h>
 
-/* Função interna: Encontra vértice não visitado com menor distância (O(V)) */
-static int encontrar_menor_distancia(int* distancias, int* visitados, int num_vertices) {
-    int menor_distancia = INT_MAX;
-    int indice_menor = -1;
+#define MARCA_FRENTE 1  // Fixado pela busca da origem
+#define MARCA_TRAS   2  // Fixado pela busca do destino
+#define MARCA_TOCADO 4  // Já está na lista de tocados
+#define MARCA_ALVO   8  // Destino pendente de calcular_distancias_um_para_muitos
+
+/* FUNÇÃO EXPORTADA: Cria área de trabalho para consultas no grafo (uma por thread) */
+EXPORT AreaTrabalho* criar_area_trabalho(Grafo* grafo) {
+    int i, n;
+    AreaTrabalho* area;
+    
+    if (grafo == NULL) {
+        return NULL;
+    }
+    
+    n = grafo->num_vertices > 0 ? grafo->num_vertices : 1;
+    area = (AreaTrabalho*)calloc(1, sizeof(AreaTrabalho));
+    if (area == NULL) {
+        return NULL;
+    }
+    
+    area->capacidade = grafo->num_vertices;
+    area->dist_frente = (int*)malloc(n * sizeof(int));
+    area->dist_tras = (int*)malloc(n * sizeof(int));
+    area->anterior_frente = (int*)malloc(n * sizeof(int));
+    area->anterior_tras = (int*)malloc(n * sizeof(int));
+    area->marcas = (unsigned char*)calloc(n, 1);
+    area->tocados = (int*)malloc(n * sizeof(int));
+    area->caminho = (int*)malloc(n * sizeof(int));
+    area->trecho = (int*)malloc(n * sizeof(int));
+    area->heap_frente = heap_criar(n);
+    area->heap_tras = heap_criar(n);
+    
+    if (area->dist_frente == NULL || area->dist_tras == NULL || area->anterior_frente == NULL ||
+        area->anterior_tras == NULL || area->marcas == NULL || area->tocados == NULL ||
+        area->caminho == NULL || area->trecho == NULL || area->heap_frente == NULL || area->heap_tras == NULL) {
+        LOG(LOG_ERRO, "[ERRO] Falha ao alocar area de trabalho\n");
+        liberar_area_trabalho(area);
+        return NULL;
+    }
+    
+    for (i = 0; i < n; i++) {
+        area->dist_frente[i] = INT_MAX;
+        area->dist_tras[i] = INT_MAX;
+        area->anterior_frente[i] = -1;
+        area->anterior_tras[i] = -1;
+    }
+    
+    return area;
+}
+
+/* FUNÇÃO EXPORTADA: Libera área criada por criar_area_trabalho() */
+EXPORT void liberar_area_trabalho(AreaTrabalho* area) {
+    if (area == NULL) {
+        return;
+    }
+    free(area->dist_frente);
+    free(area->dist_tras);
+    free(area->anterior_frente);
+    free(area->anterior_tras);
+    free(area->marcas);
+    free(area->tocados);
+    free(area->caminho);
+    free(area->trecho);
+    if (area->heap_frente) heap_destruir(area->heap_frente);
+    if (area->heap_tras) heap_destruir(area->heap_tras);
+    free(area);
+}
+
+/* Função interna: Restaura os vértices tocados pela consulta anterior (O(tocados)) */
+void area_limpar(AreaTrabalho* area) {
     int i;
+    for (i = 0; i < area->num_tocados; i++) {
+        int v = area->tocados[i];
+        area->dist_frente[v] = INT_MAX;
+        area->dist_tras[v] = INT_MAX;
+        area->anterior_frente[v] = -1;
+        area->anterior_tras[v] = -1;
+        area->marcas[v] = 0;
+    }
+    area->num_tocados = 0;
+    area->arestas_relaxadas = 0;
+    area->insercoes_heap = 0;
+    area->remocoes_heap = 0;
+    heap_limpar(area->heap_frente);
+    heap_limpar(area->heap_tras);
+}
+
+/* Função interna: Registra v na lista de tocados (uma única vez por consulta) */
+void area_tocar(AreaTrabalho* area, int v) {
+    if (!(area->marcas[v] & MARCA_TOCADO)) {
+        area->marcas[v] |= MARCA_TOCADO;
+        area->tocados[area->num_tocados++] = v;
+    }
+}
+
+/* Função interna: Dijkstra bidirecional (origem → frente no CSR direto, destino → trás no
+ * CSR reverso). Mantém mu = melhor caminho completo visto ao relaxar arestas entre as
+ * duas buscas e para quando topo_frente + topo_tras >= mu (critério clássico de encontro).
+ * Deixa o resultado no formato de executar_busca_area: dist_frente[destino] = mu e
+ * anterior_frente encadeando o caminho inteiro até o destino (o trecho de trás é
+ * invertido no final). */
+static void executar_busca_bidirecional(Grafo* g, AreaTrabalho* area, int indice_origem, int indice_destino,
+                                        int* nos_visitados_out) {
+    int u, k;
+    int nos_visitados = 0;
+    int arestas_relaxadas = 0, insercoes_heap = 2;  // Origem e destino já entram no heap
+    long long mu = INT_MAX;          // Melhor distância origem → destino encontrada até agora
+    int encontro_a = -1, encontro_b = -1;  // Aresta a → b que liga as duas buscas
+    int* dist_frente = area->dist_frente;
+    int* dist_tras = area->dist_tras;
+    int* anteriores = area->anterior_frente;  // Predecessor (busca da origem)
+    int* sucessores = area->anterior_tras;    // Sucessor (busca do destino)
+    unsigned char* marcas = area->marcas;
+    HeapMin* heap_frente = area->heap_frente;
+    HeapMin* heap_tras = area->heap_tras;
     
-    for (i = 0; i < num_vertices; i++) {
-        if (!visitados[i] && distancias[i] <= menor_distancia) {
-            menor_distancia = distancias[i];
-            indice_menor = i;
+    LOG(LOG_TRACE, "\n=== INICIANDO DIJKSTRA BIDIRECIONAL ===\n");
+    
+    area_tocar(area, indice_origem);
+    area_tocar(area, indice_destino);
+    dist_frente[indice_origem] = 0;
+    dist_tras[indice_destino] = 0;
+    heap_inserir_ou_diminuir(heap_frente, indice_origem, 0);
+    heap_inserir_ou_diminuir(heap_tras, indice_destino, 0);
+    
+    /* Expande sempre o lado de menor topo até que nenhum caminho melhor que mu seja possível */
+    while (!heap_vazio(heap_frente) && !heap_vazio(heap_tras)) {
+        int topo_frente = heap_min_prioridade(heap_frente);
+        int topo_tras = heap_min_prioridade(heap_tras);
+        
+        if ((long long)topo_frente + topo_tras >= mu) {
+            break;  // Critério de parada: as buscas já cobriram o caminho ótimo
+        }
+        
+        if (topo_frente <= topo_tras) {
+            /* Passo para frente: relaxa arestas que SAEM de u */
+            u = heap_extrair_min(heap_frente);
+            marcas[u] |= MARCA_FRENTE;
+            nos_visitados++;
+            LOG(LOG_TRACE, "  [frente] ID=%d (distancia=%d)\n", g->vertices[u].id, dist_frente[u]);
+            
+            arestas_relaxadas += g->adj_inicio[u + 1] - g->adj_inicio[u];
+            for (k = g->adj_inicio[u]; k < g->adj_inicio[u + 1]; k++) {
+                int v = g->adj_destino[k];
+                int nova = dist_frente[u] + g->adj_peso[k];
+                if (!(marcas[v] & MARCA_FRENTE) && nova < dist_frente[v]) {
+                    area_tocar(area, v);
+                    dist_frente[v] = nova;
+                    anteriores[v] = u;
+                    heap_inserir_ou_diminuir(heap_frente, v, nova);
+                    insercoes_heap++;
+                }
+                if (dist_tras[v] != INT_MAX && (long long)nova + dist_tras[v] < mu) {
+                    mu = (long long)nova + dist_tras[v];
+                    encontro_a = u;
+                    encontro_b = v;
+                }
+            }
+        } else {
+            /* Passo para trás: relaxa arestas que CHEGAM em u (CSR reverso) */
+            u = heap_extrair_min(heap_tras);
+            marcas[u] |= MARCA_TRAS;
+            nos_visitados++;
+            LOG(LOG_TRACE, "  [tras] ID=%d (distancia=%d)\n", g->vertices[u].id, dist_tras[u]);
+            
+            arestas_relaxadas += g->rev_inicio[u + 1] - g->rev_inicio[u];
+            for (k = g->rev_inicio[u]; k < g->rev_inicio[u + 1]; k++) {
+                int v = g->rev_origem[k];
+                int nova = dist_tras[u] + g->rev_peso[k];
+                if (!(marcas[v] & MARCA_TRAS) && nova < dist_tras[v]) {
+                    area_tocar(area, v);
+                    dist_tras[v] = nova;
+                    sucessores[v] = u;
+                    heap_inserir_ou_diminuir(heap_tras, v, nova);
+                    insercoes_heap++;
+                }
+                if (dist_frente[v] != INT_MAX && (long long)nova + dist_frente[v] < mu) {
+                    mu = (long long)nova + dist_frente[v];
+                    encontro_a = v;
+                    encontro_b = u;
+                }
+            }
+        }
+    }
+    
+    LOG(LOG_INFO, "      Vertices fixados: %d de %d\n", nos_visitados, g->num_vertices);
+    area->arestas_relaxadas = arestas_relaxadas;
+    area->insercoes_heap = insercoes_heap;
+    area->remocoes_heap = nos_visitados;  // Cada vértice fixado saiu de um dos heaps
+    
+    /* Resultado: só o destino tem distância final (origem e destino estão sempre tocados) */
+    if (encontro_a != -1) {
+        dist_frente[indice_destino] = (int)mu;
+        
+        /* Encadeia a → b e segue os sucessores de b até o destino */
+        u = encontro_b;
+        anteriores[u] = encontro_a;
+        while (u != indice_destino) {
+            int proximo = sucessores[u];
+            anteriores[proximo] = u;
+            u = proximo;
         }
+    } else {
+        dist_frente[indice_destino] = INT_MAX;
     }
     
-    return indice_menor;
+    if (nos_visitados_out != NULL) {
+        *nos_visitados_out = nos_visitados;
+    }
 }
 
-/* Função interna: Executa algoritmo de Dijkstra */
-static int executar_dijkstra(Grafo* g, int indice_origem, int** distancias_out, int** anteriores_out) {
-    int i, count;
-    int* distancias = NULL;
-    int* anteriores = NULL;
-    int* visitados = NULL;
+/* Função interna: Busca com heap binário (O((V+E) log V)) a partir de indice_origem, usando
+ * a área de trabalho do chamador (reentrante: o grafo é apenas lido).
+ * MODO_DIJKSTRA ordena o heap pela distância; MODO_ASTAR soma a heurística até o destino;
+ * MODO_BIDIRECIONAL delega para executar_busca_bidirecional.
+ * Com indice_destino >= 0 a busca termina ao fixar o destino (só ele tem distância final
+ * garantida em area->dist_frente); com -1 percorre todos os vértices alcançáveis.
+ * Caminho: seguir area->anterior_frente a partir do destino. */
+int executar_busca_area(Grafo* g, AreaTrabalho* area, int indice_origem, int indice_destino, int modo,
+                        int* nos_visitados_out) {
+    int nos_visitados = 0;
+    int arestas_relaxadas = 0, insercoes_heap = 1;  // Origem já entra no heap
+    int usar_heuristica;
+    int* distancias;
+    int* anteriores;
+    unsigned char* marcas;
+    HeapMin* heap;
     
-    /* 1. VALIDAÇÃO */
-    if (g == NULL || indice_origem < 0 || indice_origem >= g->num_vertices) {
+    /* 1. VALIDAÇÃO (adjacências montadas e área do mesmo tamanho do grafo) */
+    if (g == NULL || area == NULL || g->adj_inicio == NULL || area->capacidade != g->num_vertices ||
+        indice_origem < 0 || indice_origem >= g->num_vertices) {
         return 0;
     }
     
-    printf("\n=== INICIANDO DIJKSTRA ===\n");
-    printf("Origem (indice=%d, ID=%d): %s\n", 
-           indice_origem, g->vertices[indice_origem].id, g->vertices[indice_origem].nome);
-    
-    /* 2. ALOCAÇÃO DE ARRAYS AUXILIARES */
-    distancias = (int*)malloc(g->num_vertices * sizeof(int));  // Menor distância até cada vértice
-    anteriores = (int*)malloc(g->num_vertices * sizeof(int));  // Predecessor no caminho ótimo
-    visitados = (int*)malloc(g->num_vertices * sizeof(int));   // Flag de processamento
-    
-    if (distancias == NULL || anteriores == NULL || visitados == NULL) {
-        if (distancias) free(distancias);
-        if (anteriores) free(anteriores);
-        if (visitados) free(visitados);
+    if (indice_destino >= g->num_vertices) {
         return 0;
     }
     
-    /* 3. INICIALIZAÇÃO: todas distâncias = infinito, exceto origem = 0 */
-    for (i = 0; i < g->num_vertices; i++) {
-        distancias[i] = INT_MAX;  // Infinito (inalcançável)
-        anteriores[i] = -1;       // Sem predecessor
-        visitados[i] = 0;         // Não visitado
+    /* 2. LIMPEZA da consulta anterior (apenas vértices tocados) */
+    area_limpar(area);
+    
+    /* Bidirecional requer destino definido e CSR reverso montado */
+    if (modo == MODO_BIDIRECIONAL && indice_destino >= 0 && indice_destino != indice_origem &&
+        g->rev_inicio != NULL) {
+        executar_busca_bidirecional(g, area, indice_origem, indice_destino, nos_visitados_out);
+        return 1;
     }
+    
+    /* A* só faz sentido com destino definido e escala calibrada */
+    usar_heuristica = (modo == MODO_ASTAR && indice_destino >= 0 && g->escala_heuristica > 0.0);
+    
+    LOG(LOG_TRACE, "\n=== INICIANDO %s ===\n", usar_heuristica ? "A*" : "DIJKSTRA");
+    LOG(LOG_TRACE, "Origem (indice=%d, ID=%d): %s\n", 
+           indice_origem, g->vertices[indice_origem].id, vertice_nome(g, indice_origem));
+    
+    distancias = area->dist_frente;      // Menor distância até cada vértice
+    anteriores = area->anterior_frente;  // Predecessor no caminho ótimo
+    marcas = area->marcas;               // Flag de processamento
+    heap = area->heap_frente;            // Fila de prioridade (menor distância)
+    
+    /* 3. INICIALIZAÇÃO: todas distâncias já estão em infinito; origem = 0 */
+    area_tocar(area, indice_origem);
     distancias[indice_origem] = 0;  // Origem: distância zero para si mesma
+    heap_inserir_ou_diminuir(heap, indice_origem,
+                             usar_heuristica ? heuristica_distancia(g, indice_origem, indice_destino) : 0);
     
-    /* 4. LOOP PRINCIPAL DO DIJKSTRA (V iterações) */
-    printf("\n--- Processamento dos vertices ---\n");
-    for (count = 0; count < g->num_vertices; count++) {
-        int u = encontrar_menor_distancia(distancias, visitados, g->num_vertices);
+    /* 4. LOOP PRINCIPAL (até esvaziar o heap ou fixar o destino) */
+    LOG(LOG_TRACE, "\n--- Processamento dos vertices ---\n");
+    while (!heap_vazio(heap)) {
+        int u = heap_extrair_min(heap);  // Vértice de menor prioridade (O(log V))
         
-        if (u == -1) {
-            break; /* Não há mais vértices alcançáveis */
-        }
+        marcas[u] |= MARCA_FRENTE;  // Marca como visitado (distância é final!)
+        nos_visitados++;
         
-        visitados[u] = 1;  // Marca como visitado (distância é final!)
+        LOG(LOG_TRACE, "\nVisitando vertice [%d] ID=%d '%s' (distancia=%d)\n", 
+               u, g->vertices[u].id, vertice_nome(g, u), distancias[u]);
         
-        printf("\nVisitando vertice [%d] ID=%d '%s' (distancia=%d)\n", 
-               u, g->vertices[u].id, g->vertices[u].nome, distancias[u]);
+        if (u == indice_destino) {
+            break;  // Destino fixado: o restante do grafo não altera o resultado
+        }
         
-        /* RELAXAMENTO: percorre todas as arestas adjacentes */
-        Aresta* aresta = g->lista_adj[u];
+        /* RELAXAMENTO: percorre as arestas de u (faixa contígua no CSR) */
         int num_vizinhos = 0;
-        while (aresta != NULL) {
-            int v = encontrar_indice_vertice(g, aresta->destino_id);
+        int k;
+        arestas_relaxadas += g->adj_inicio[u + 1] - g->adj_inicio[u];
+        for (k = g->adj_inicio[u]; k < g->adj_inicio[u + 1]; k++) {
+            int v = g->adj_destino[k];  // Índice já resolvido na montagem do grafo
+            int peso = g->adj_peso[k];
             
-            if (v != -1 && !visitados[v]) {
-                int nova_distancia = distancias[u] + aresta->distancia;
-                
-                printf("  -> Vizinho ID=%d '%s': dist_atual=%d, nova_dist=%d, peso_aresta=%d", 
-                       g->vertices[v].id, g->vertices[v].nome,
-                       (distancias[v] == INT_MAX ? -1 : distancias[v]),
-                       nova_distancia, aresta->distancia);
+            if (!(marcas[v] & MARCA_FRENTE)) {
+                int nova_distancia = distancias[u] + peso;
+                int dist_atual = distancias[v];
                 
                 /* Se encontrou caminho mais curto, atualiza */
-                if (nova_distancia < distancias[v]) {
+                if (nova_distancia < dist_atual) {
+                    int prioridade = nova_distancia;
+                    if (usar_heuristica) {
+                        prioridade += heuristica_distancia(g, v, indice_destino);  // f = g + h
+                    }
+                    area_tocar(area, v);
                     distancias[v] = nova_distancia;
                     anteriores[v] = u;  // u é predecessor de v no caminho ótimo
-                    printf(" [ATUALIZADO]\n");
+                    heap_inserir_ou_diminuir(heap, v, prioridade);  // Decrease-key
+                    insercoes_heap++;
                     num_vizinhos++;
-                } else {
-                    printf(" [sem mudanca]\n");
                 }
+                
+                LOG(LOG_TRACE, "  -> Vizinho ID=%d '%s': dist_atual=%d, nova_dist=%d, peso_aresta=%d %s\n", 
+                    g->vertices[v].id, vertice_nome(g, v),
+                    (dist_atual == INT_MAX ? -1 : dist_atual),
+                    nova_distancia, peso,
+                    (nova_distancia < dist_atual ? "[ATUALIZADO]" : "[sem mudanca]"));
             }
-            
-            aresta = aresta->prox;  // Próxima aresta da lista
         }
         
         if (num_vizinhos == 0) {
-            printf("  (sem vizinhos nao-visitados)\n");
+            LOG(LOG_TRACE, "  (sem vizinhos nao-visitados)\n");
         }
     }
     
-    /* 5. RETORNA ARRAYS (visitados não é mais necessário) */
-    free(visitados);
-    *distancias_out = distancias;  // Retorna via ponteiro
-    *anteriores_out = anteriores;  // Retorna via ponteiro
+    LOG(LOG_INFO, "      Vertices fixados: %d de %d\n", nos_visitados, g->num_vertices);
+    area->arestas_relaxadas = arestas_relaxadas;
+    area->insercoes_heap = insercoes_heap;
+    area->remocoes_heap = nos_visitados;
+    
+    if (nos_visitados_out != NULL) {
+        *nos_visitados_out = nos_visitados;
+    }
     
     return 1;  // Sucesso
 }
 
-/* Função interna: Reconstrói caminho usando array 'anteriores' */
-static ResultadoRota* reconstruir_caminho(Grafo* g, int* distancias, int* anteriores, 
-                                         int indice_origem, int indice_destino) {
-    int* caminho_temp = NULL;
+/* Função interna: Mesma busca de executar_busca_area, com área temporária; devolve os
+ * arrays de distâncias/anteriores alocados (o chamador libera com free) */
+int executar_busca(Grafo* g, int indice_origem, int indice_destino, int modo,
+                   int** distancias_out, int** anteriores_out, int* nos_visitados_out) {
+    AreaTrabalho* area = criar_area_trabalho(g);
+    
+    if (area == NULL) {
+        return 0;
+    }
+    
+    if (!executar_busca_area(g, area, indice_origem, indice_destino, modo, nos_visitados_out)) {
+        liberar_area_trabalho(area);
+        return 0;
+    }
+    
+    /* Entrega os arrays ao chamador em vez de copiá-los */
+    *distancias_out = area->dist_frente;
+    *anteriores_out = area->anterior_frente;
+    area->dist_frente = NULL;
+    area->anterior_frente = NULL;
+    liberar_area_trabalho(area);
+    
+    return 1;
+}
+
+/* Função interna: Executa Dijkstra completo (distâncias para todos os vértices) */
+int executar_dijkstra(Grafo* g, int indice_origem, int** distancias_out, int** anteriores_out) {
+    return executar_busca(g, indice_origem, -1, MODO_DIJKSTRA, distancias_out, anteriores_out, NULL);
+}
+
+/* Função interna: Copia os contadores da última busca da área e os tempos medidos para o resultado */
+void preencher_estatisticas(ResultadoRota* resultado, const AreaTrabalho* area,
+                            long long tempo_busca_us, long long tempo_reconstrucao_us) {
+    EstatisticasRota* e = &resultado->estatisticas;
+    e->tempo_carga_us = 0;
+    e->tempo_busca_us = tempo_busca_us;
+    e->tempo_reconstrucao_us = tempo_reconstrucao_us;
+    e->nos_fixados = resultado->nos_visitados;
+    e->arestas_relaxadas = area->arestas_relaxadas;
+    e->insercoes_heap = area->insercoes_heap;
+    e->remocoes_heap = area->remocoes_heap;
+}
+
+/* FUNÇÃO EXPORTADA: Tamanho de ResultadoRota (o Python só lê 'estatisticas' se o layout bater) */
+EXPORT int obter_tamanho_resultado() {
+    return (int)sizeof(ResultadoRota);
+}
+
+/* Função interna: Reconstrói caminho a partir do resultado de executar_busca_area
+ * (area->anterior_frente; area->caminho guarda os índices do caminho reverso) */
+static ResultadoRota* reconstruir_caminho(Grafo* g, AreaTrabalho* area, int indice_destino) {
+    int* distancias = area->dist_frente;
+    int* anteriores = area->anterior_frente;
+    int* caminho_temp = area->caminho;  // Tamanho máximo possível
     ResultadoRota* resultado = NULL;
     int current, num_ids, i;
     
     /* 1. VALIDAÇÃO */
-    if (g == NULL || distancias == NULL || anteriores == NULL) {
-        return NULL;
-    }
-    
     if (distancias[indice_destino] == INT_MAX) {
-        printf("\n[ERRO] Destino nao alcancavel!\n");
+        LOG(LOG_ERRO, "\n[ERRO] Destino nao alcancavel!\n");
         return NULL; /* Destino não tem caminho */
     }
     
-    printf("\n=== RECONSTRUINDO CAMINHO ===\n");
-    printf("Destino (indice=%d, ID=%d): %s\n", 
-           indice_destino, g->vertices[indice_destino].id, g->vertices[indice_destino].nome);
-    printf("Distancia total: %d metros\n\n", distancias[indice_destino]);
+    LOG(LOG_INFO, "\n=== RECONSTRUINDO CAMINHO ===\n");
+    LOG(LOG_INFO, "Destino (indice=%d, ID=%d): %s\n", 
+           indice_destino, g->vertices[indice_destino].id, vertice_nome(g, indice_destino));
+    LOG(LOG_INFO, "Distancia total: %d metros\n\n", distancias[indice_destino]);
     
-    /* 2. ALOCA ESTRUTURAS */
+    /* 2. ALOCA RESULTADO */
     resultado = (ResultadoRota*)malloc(sizeof(ResultadoRota));
-    caminho_temp = (int*)malloc(g->num_vertices * sizeof(int));  // Tamanho máximo possível
-    
-    if (resultado == NULL || caminho_temp == NULL) {
-        if (resultado) free(resultado);
-        if (caminho_temp) free(caminho_temp);
+    if (resultado == NULL) {
         return NULL;
     }
     
     /* 3. VOLTA DO DESTINO ATÉ ORIGEM usando array 'anteriores' */
-    printf("Caminho (reverso - Destino -> Origem):\n");
+    LOG(LOG_TRACE, "Caminho (reverso - Destino -> Origem):\n");
     current = indice_destino;
     num_ids = 0;
     
     /* Percorre predecessores até chegar na origem */
     while (current != -1 && num_ids < g->num_vertices) {
-        caminho_temp[num_ids] = g->vertices[current].id;
-        printf("  [%d] ID=%d '%s'\n", num_ids, g->vertices[current].id, g->vertices[current].nome);
+        caminho_temp[num_ids] = current;
+        LOG(LOG_TRACE, "  [%d] ID=%d '%s'\n", num_ids, g->vertices[current].id, vertice_nome(g, current));
         num_ids++;
         current = anteriores[current];  // Volta ao predecessor
     }
     
     /* Proteção contra loop infinito (indicaria erro no grafo) */
-    if (num_ids >= g->num_vertices) {
+    if (current != -1) {
         free(resultado);
-        free(caminho_temp);
         return NULL;
     }
     
@@ -168,116 +436,339 @@ static ResultadoRota* reconstruir_caminho(Grafo* g, int* distancias, int* anteri
     resultado->sequencia_ids = (int*)malloc(num_ids * sizeof(int));
     if (resultado->sequencia_ids == NULL) {
         free(resultado);
-        free(caminho_temp);
         return NULL;
     }
     
-    printf("\nCaminho final (Origem -> Destino):\n");
+    LOG(LOG_TRACE, "\nCaminho final (Origem -> Destino):\n");
     for (i = 0; i < num_ids; i++) {
-        resultado->sequencia_ids[i] = caminho_temp[num_ids - 1 - i];  // Inversão
-        int idx = encontrar_indice_vertice(g, resultado->sequencia_ids[i]);
-        if (idx != -1) {
-            printf("  [%d] ID=%d '%s'\n", i, resultado->sequencia_ids[i], g->vertices[idx].nome);
-        }
+        int idx = caminho_temp[num_ids - 1 - i];  // Inversão
+        resultado->sequencia_ids[i] = g->vertices[idx].id;
+        LOG(LOG_TRACE, "  [%d] ID=%d '%s'\n", i, resultado->sequencia_ids[i], vertice_nome(g, idx));
     }
     
     resultado->num_ids = num_ids;
     resultado->distancia_total = distancias[indice_destino];
     
-    printf("\n=== ROTA FINALIZADA ===\n");
-    printf("Total de pontos: %d\n", num_ids);
-    printf("Distancia: %d metros\n\n", resultado->distancia_total);
-    
-    /* 5. Libera buffer temporário e retorna resultado final */
-    free(caminho_temp);
+    LOG(LOG_INFO, "\n=== ROTA FINALIZADA ===\n");
+    LOG(LOG_INFO, "Total de pontos: %d\n", num_ids);
+    LOG(LOG_INFO, "Distancia: %d metros\n\n", resultado->distancia_total);
     
     return resultado;
 }
 
-/* FUNÇÃO PRINCIPAL EXPORTADA: Orquestra todo o cálculo da rota Dijkstra */
-EXPORT ResultadoRota* calcular_rota(int id_origem, int id_destino) {
+/* FUNÇÃO EXPORTADA: Cria sessão de grafo persistente (carregada uma única vez) */
+EXPORT Grafo* carregar_grafo() {
     Grafo* grafo = NULL;
+    
+    /* 1. CRIAR GRAFO VAZIO */
+    LOG(LOG_INFO, "\n[1/3] Criando grafo...\n");
+    grafo = criar_grafo();
+    if (grafo == NULL) {
+        LOG(LOG_ERRO, "[ERRO] Falha ao criar grafo!\n");
+        return NULL;
+    }
+    
+    /* 2. CARREGAR DADOS DO BANCO DE DADOS (grafo_data.c) */
+    LOG(LOG_INFO, "[2/3] Carregando vertices...\n");
+    inicializar_vertices(grafo);
+    LOG(LOG_INFO, "      Total de vertices: %d\n", grafo->num_vertices);
+    
+    LOG(LOG_INFO, "[3/3] Carregando arestas...\n");
+    inicializar_arestas(grafo);
+    
+    grafo->versao = calcular_versao_grafo(grafo);  // Identifica os dados carregados (cache de rotas)
+    
+    return grafo;  // Pertence ao chamador até liberar_grafo()
+}
+
+/* FUNÇÃO EXPORTADA: Retorna a versão (checksum) dos dados do grafo carregado */
+EXPORT unsigned int obter_versao_grafo(Grafo* grafo) {
+    return grafo != NULL ? grafo->versao : 0;
+}
+
+/* FUNÇÃO EXPORTADA: Libera sessão criada por carregar_grafo() */
+EXPORT void liberar_grafo(Grafo* grafo) {
+    destruir_grafo(grafo);
+}
+
+/* FUNÇÃO EXPORTADA: Calcula rota Dijkstra sobre um grafo já carregado (sem reconstruí-lo) */
+EXPORT ResultadoRota* calcular_rota_grafo(Grafo* grafo, int id_origem, int id_destino) {
+    return calcular_rota_modo(grafo, id_origem, id_destino, MODO_DIJKSTRA);
+}
+
+/* FUNÇÃO EXPORTADA: Calcula rota com o algoritmo escolhido (MODO_DIJKSTRA, MODO_ASTAR ou MODO_BIDIRECIONAL)
+ * Aloca uma área de trabalho por chamada; para consultas repetidas ou concorrentes use calcular_rota_area */
+EXPORT ResultadoRota* calcular_rota_modo(Grafo* grafo, int id_origem, int id_destino, int modo) {
+    ResultadoRota* resultado;
+    AreaTrabalho* area;
+    
+    if (grafo == NULL) {
+        LOG(LOG_ERRO, "[ERRO] Grafo nao carregado!\n");
+        return NULL;
+    }
+    
+    area = criar_area_trabalho(grafo);
+    if (area == NULL) {
+        return NULL;
+    }
+    resultado = calcular_rota_area(grafo, area, id_origem, id_destino, modo);
+    liberar_area_trabalho(area);
+    
+    return resultado;
+}
+
+/* FUNÇÃO EXPORTADA: Calcula rota usando a área de trabalho do chamador (reentrante) */
+EXPORT ResultadoRota* calcular_rota_area(Grafo* grafo, AreaTrabalho* area, int id_origem, int id_destino, int modo) {
     int idx_origem, idx_destino;
-    int* distancias = NULL;
-    int* anteriores = NULL;
+    int nos_visitados = 0;
+    long long inicio, fim_busca;
     ResultadoRota* resultado = NULL;
     
-    printf("\n");
-    printf("========================================\n");
-    printf("  CALCULO DE ROTA: ID %d -> ID %d\n", id_origem, id_destino);
-    printf("========================================\n");
+    LOG(LOG_INFO, "\n");
+    LOG(LOG_INFO, "========================================\n");
+    LOG(LOG_INFO, "  CALCULO DE ROTA: ID %d -> ID %d\n", id_origem, id_destino);
+    LOG(LOG_INFO, "========================================\n");
     
     /* 1. VALIDAÇÃO INICIAL */
-    if (id_origem == id_destino) {
-        printf("[ERRO] Origem e destino sao iguais!\n");
+    if (grafo == NULL || area == NULL) {
+        LOG(LOG_ERRO, "[ERRO] Grafo ou area de trabalho ausente!\n");
         return NULL;
     }
     
-    if (id_origem < 0 || id_destino < 0) {
-        printf("[ERRO] IDs invalidos!\n");
+    if (id_origem == id_destino) {
+        LOG(LOG_ERRO, "[ERRO] Origem e destino sao iguais!\n");
         return NULL;
     }
     
-    /* 2. CRIAR GRAFO VAZIO */
-    printf("\n[1/6] Criando grafo...\n");
-    grafo = criar_grafo();
-    if (grafo == NULL) {
-        printf("[ERRO] Falha ao criar grafo!\n");
+    if (id_origem < 0 || id_destino < 0) {
+        LOG(LOG_ERRO, "[ERRO] IDs invalidos!\n");
         return NULL;
     }
     
-    /* 3. CARREGAR DADOS DO BANCO DE DADOS (grafo_data.c) */
-    printf("[2/6] Carregando vertices...\n");
-    inicializar_vertices(grafo);
-    printf("      Total de vertices: %d\n", grafo->num_vertices);
-    
-    printf("[3/6] Carregando arestas...\n");
-    inicializar_arestas(grafo);
-    
-    /* 4. CONVERTER IDs para índices internos do array de vértices */
-    printf("[4/6] Localizando vertices na estrutura...\n");
+    /* 2. CONVERTER IDs para índices internos do array de vértices */
+    LOG(LOG_INFO, "\n[1/3] Localizando vertices na estrutura...\n");
     idx_origem = encontrar_indice_vertice(grafo, id_origem);
     idx_destino = encontrar_indice_vertice(grafo, id_destino);
     
     if (idx_origem == -1) {
-        printf("[ERRO] ID de origem %d nao encontrado!\n", id_origem);
-        destruir_grafo(grafo);
+        LOG(LOG_ERRO, "[ERRO] ID de origem %d nao encontrado!\n", id_origem);
         return NULL;
     }
     
     if (idx_destino == -1) {
-        printf("[ERRO] ID de destino %d nao encontrado!\n", id_destino);
-        destruir_grafo(grafo);
+        LOG(LOG_ERRO, "[ERRO] ID de destino %d nao encontrado!\n", id_destino);
         return NULL;
     }
     
-    printf("      Origem: indice=%d, ID=%d, nome='%s'\n", 
-           idx_origem, grafo->vertices[idx_origem].id, grafo->vertices[idx_origem].nome);
-    printf("      Destino: indice=%d, ID=%d, nome='%s'\n", 
-           idx_destino, grafo->vertices[idx_destino].id, grafo->vertices[idx_destino].nome);
+    LOG(LOG_INFO, "      Origem: indice=%d, ID=%d, nome='%s'\n", 
+           idx_origem, grafo->vertices[idx_origem].id, vertice_nome(grafo, idx_origem));
+    LOG(LOG_INFO, "      Destino: indice=%d, ID=%d, nome='%s'\n", 
+           idx_destino, grafo->vertices[idx_destino].id, vertice_nome(grafo, idx_destino));
     
-    /* 5. EXECUTAR DIJKSTRA (calcula distâncias e predecessores) */
-    printf("\n[5/6] Executando algoritmo Dijkstra...\n");
-    if (!executar_dijkstra(grafo, idx_origem, &distancias, &anteriores)) {
-        printf("[ERRO] Falha na execucao do Dijkstra!\n");
-        destruir_grafo(grafo);
+    /* 3. EXECUTAR BUSCA (para ao fixar o destino) */
+    LOG(LOG_INFO, "\n[2/3] Executando algoritmo %s...\n",
+        modo == MODO_ASTAR ? "A*" : (modo == MODO_BIDIRECIONAL ? "Dijkstra bidirecional" : "Dijkstra"));
+    inicio = relogio_us();
+    if (!executar_busca_area(grafo, area, idx_origem, idx_destino, modo, &nos_visitados)) {
+        LOG(LOG_ERRO, "[ERRO] Falha na execucao da busca!\n");
         return NULL;
     }
+    fim_busca = relogio_us();
+    
+    /* 4. RECONSTRUIR CAMINHO usando array 'anteriores' da área */
+    LOG(LOG_INFO, "\n[3/3] Reconstruindo caminho...\n");
+    resultado = reconstruir_caminho(grafo, area, idx_destino);
+    if (resultado != NULL) {
+        resultado->nos_visitados = nos_visitados;
+        preencher_estatisticas(resultado, area, fim_busca - inicio, relogio_us() - fim_busca);
+    }
+    
+    /* 5. RETORNA resultado (ou NULL se falhou) */
+    if (resultado == NULL) {
+        LOG(LOG_ERRO, "[ERRO] Falha ao reconstruir caminho!\n");
+    }
+    
+    return resultado;
+}
+
+/* FUNÇÃO EXPORTADA: Distâncias de vários pares origem → destino em uma única chamada
+ * (sem reconstruir caminhos). Pensada para lotes divididos entre threads, cada uma com
+ * sua área de trabalho. Par inválido ou sem caminho = -1; origem == destino = 0. */
+EXPORT int calcular_distancias_lote(Grafo* grafo, AreaTrabalho* area, int quantidade,
+                                    const int* origens, const int* destinos, int modo,
+                                    int* distancias_out, int* visitados_out) {
+    int i;
+    
+    if (grafo == NULL || area == NULL || area->capacidade != grafo->num_vertices || quantidade < 0 ||
+        (quantidade > 0 && (origens == NULL || destinos == NULL || distancias_out == NULL))) {
+        return -1;
+    }
+    
+    for (i = 0; i < quantidade; i++) {
+        int s = encontrar_indice_vertice(grafo, origens[i]);
+        int t = encontrar_indice_vertice(grafo, destinos[i]);
+        int nos_visitados = 0;
+        
+        distancias_out[i] = -1;
+        if (s != -1 && t != -1) {
+            if (s == t) {
+                distancias_out[i] = 0;
+            } else if (executar_busca_area(grafo, area, s, t, modo, &nos_visitados) &&
+                       area->dist_frente[t] != INT_MAX) {
+                distancias_out[i] = area->dist_frente[t];
+            }
+        }
+        if (visitados_out != NULL) {
+            visitados_out[i] = nos_visitados;
+        }
+    }
+    
+    return quantidade;
+}
+
+/* FUNÇÃO EXPORTADA: Distâncias de uma origem a vários destinos com um único Dijkstra na
+ * área da thread, interrompido assim que todos os destinos são fixados (sem alocar nem
+ * percorrer os V vértices como calcular_arvore_caminhos). distancias_out[i] = metros até
+ * destinos[i] (-1 = sem caminho ou ID inválido; origem = 0). Retorna quantidade ou -1. */
+EXPORT int calcular_distancias_um_para_muitos(Grafo* grafo, AreaTrabalho* area, int id_origem,
+                                              int quantidade, const int* destinos, int* distancias_out) {
+    int i, s, pendentes = 0;
+    int nos_visitados = 0, arestas_relaxadas = 0, insercoes_heap = 1;
+    int* distancias;
+    unsigned char* marcas;
+    HeapMin* heap;
+    
+    if (grafo == NULL || area == NULL || grafo->adj_inicio == NULL || area->capacidade != grafo->num_vertices ||
+        quantidade < 0 || (quantidade > 0 && (destinos == NULL || distancias_out == NULL))) {
+        return -1;
+    }
+    
+    s = encontrar_indice_vertice(grafo, id_origem);
+    if (s == -1) {
+        for (i = 0; i < quantidade; i++) {
+            distancias_out[i] = -1;
+        }
+        return quantidade;
+    }
+    
+    area_limpar(area);
+    distancias = area->dist_frente;
+    marcas = area->marcas;
+    heap = area->heap_frente;
+    
+    /* Marca os destinos (tocados, para que area_limpar remova a marca na próxima consulta) */
+    for (i = 0; i < quantidade; i++) {
+        int t = encontrar_indice_vertice(grafo, destinos[i]);
+        if (t != -1 && !(marcas[t] & MARCA_ALVO)) {
+            area_tocar(area, t);
+            marcas[t] |= MARCA_ALVO;
+            pendentes++;
+        }
+    }
+    
+    area_tocar(area, s);
+    distancias[s] = 0;
+    heap_inserir_ou_diminuir(heap, s, 0);
+    
+    while (pendentes > 0 && !heap_vazio(heap)) {
+        int u = heap_extrair_min(heap);
+        int k;
+        
+        marcas[u] |= MARCA_FRENTE;
+        nos_visitados++;
+        if (marcas[u] & MARCA_ALVO) {
+            pendentes--;  // Distância de u é final
+        }
+        
+        arestas_relaxadas += grafo->adj_inicio[u + 1] - grafo->adj_inicio[u];
+        for (k = grafo->adj_inicio[u]; k < grafo->adj_inicio[u + 1]; k++) {
+            int v = grafo->adj_destino[k];
+            int nova_distancia = distancias[u] + grafo->adj_peso[k];
+            
+            if (!(marcas[v] & MARCA_FRENTE) && nova_distancia < distancias[v]) {
+                area_tocar(area, v);
+                distancias[v] = nova_distancia;
+                area->anterior_frente[v] = u;
+                heap_inserir_ou_diminuir(heap, v, nova_distancia);
+                insercoes_heap++;
+            }
+        }
+    }
+    
+    area->arestas_relaxadas = arestas_relaxadas;
+    area->insercoes_heap = insercoes_heap;
+    area->remocoes_heap = nos_visitados;
+    
+    for (i = 0; i < quantidade; i++) {
+        int t = encontrar_indice_vertice(grafo, destinos[i]);
+        distancias_out[i] = (t == -1 || !(marcas[t] & MARCA_FRENTE)) ? -1 : distancias[t];
+    }
+    
+    return quantidade;
+}
+
+/* FUNÇÃO EXPORTADA: Árvore de caminhos mínimos a partir de uma origem (um-para-todos)
+ * Preenche buffers do chamador na ordem dos vértices (mesma de exportar_vertices):
+ *   distancias_out[i] = distância em metros até o vértice i (-1 se inalcançável)
+ *   anteriores_out[i] = ID do predecessor no caminho ótimo (-1 na origem/inalcançável)
+ * Retorna quantidade de vértices preenchidos, ou -1 em caso de erro */
+EXPORT int calcular_arvore_caminhos(Grafo* grafo, int id_origem, int capacidade,
+                                    int* distancias_out, int* anteriores_out) {
+    int i, idx_origem;
+    int* distancias = NULL;
+    int* anteriores = NULL;
+    
+    if (grafo == NULL || distancias_out == NULL || anteriores_out == NULL) {
+        return -1;
+    }
+    
+    if (capacidade < grafo->num_vertices) {
+        return -1;
+    }
+    
+    idx_origem = encontrar_indice_vertice(grafo, id_origem);
+    if (idx_origem == -1) {
+        LOG(LOG_ERRO, "[ERRO] ID de origem %d nao encontrado!\n", id_origem);
+        return -1;
+    }
     
-    /* 6. RECONSTRUIR CAMINHO usando array 'anteriores' */
-    printf("\n[6/6] Reconstruindo caminho...\n");
-    resultado = reconstruir_caminho(grafo, distancias, anteriores, idx_origem, idx_destino);
+    /* Uma única busca completa (sem destino) resolve todos os vértices */
+    if (!executar_dijkstra(grafo, idx_origem, &distancias, &anteriores)) {
+        LOG(LOG_ERRO, "[ERRO] Falha na execucao do Dijkstra!\n");
+        return -1;
+    }
+    
+    /* Converte para o formato público: -1 para infinito e predecessores por ID */
+    for (i = 0; i < grafo->num_vertices; i++) {
+        distancias_out[i] = (distancias[i] == INT_MAX) ? -1 : distancias[i];
+        anteriores_out[i] = (anteriores[i] == -1) ? -1 : grafo->vertices[anteriores[i]].id;
+    }
     
-    /* 7. LIMPEZA de estruturas temporárias */
     free(distancias);
     free(anteriores);
-    destruir_grafo(grafo);
     
-    /* 8. RETORNA resultado (ou NULL se falhou) */
-    if (resultado == NULL) {
-        printf("[ERRO] Falha ao reconstruir caminho!\n");
+    return grafo->num_vertices;
+}
+
+/* FUNÇÃO EXPORTADA (legada): Carrega grafo, calcula uma rota e descarta o grafo */
+EXPORT ResultadoRota* calcular_rota(int id_origem, int id_destino) {
+    Grafo* grafo = NULL;
+    ResultadoRota* resultado = NULL;
+    long long inicio = relogio_us();
+    
+    /* Prefira carregar_grafo() + calcular_rota_grafo() para múltiplas consultas */
+    grafo = carregar_grafo();
+    if (grafo == NULL) {
+        return NULL;
     }
     
+    resultado = calcular_rota_grafo(grafo, id_origem, id_destino);
+    if (resultado != NULL) {
+        resultado->estatisticas.tempo_carga_us = relogio_us() - inicio -
+            resultado->estatisticas.tempo_busca_us - resultado->estatisticas.tempo_reconstrucao_us;
+    }
+    liberar_grafo(grafo);
+    
     return resultado;
 }
 
@@ -298,58 +789,248 @@ EXPORT int obter_numero_total_vertices() {
     return count;
 }
 
-/* FUNÇÃO EXPORTADA: Busca vértice por ID e retorna suas informações */
-EXPORT int obter_info_vertice(int id, char* nome_out, int nome_len, 
-                             char* categoria_out, int cat_len,
-                             int* x_out, int* y_out) {
-    int count, i;
-    const VerticeData* vertices = obter_vertices_static(&count);
-    
-    /* Busca linear pelo ID no array de vértices */
-    for (i = 0; i < count; i++) {
-        if (vertices[i].id == id) {
-            /* Copia strings com segurança (evita buffer overflow) */
-            if (nome_out != NULL && nome_len > 0) {
-                strncpy(nome_out, vertices[i].nome, nome_len - 1);
-                nome_out[nome_len - 1] = '\0';  // Garante terminação
-            }
-            
-            if (categoria_out != NULL && cat_len > 0) {
-                strncpy(categoria_out, vertices[i].categoria, cat_len - 1);
-                categoria_out[cat_len - 1] = '\0';
-            }
-            
-            if (x_out != NULL) {
-                *x_out = vertices[i].x;
-            }
-            
-            if (y_out != NULL) {
-                *y_out = vertices[i].y;
-            }
-            
-            return 0;  // Sucesso
+/* FUNÇÃO EXPORTADA: Busca vértice por ID no grafo carregado e retorna suas informações */
+EXPORT int obter_info_vertice_grafo(Grafo* grafo, int id, char* nome_out, int nome_len,
+                                    char* categoria_out, int cat_len,
+                                    int* x_out, int* y_out) {
+    int i;
+    
+    if (grafo == NULL) {
+        return -1;
+    }
+    
+    /* Consulta direta pelo ID no grafo (tabela ID → índice) */
+    i = encontrar_indice_vertice(grafo, id);
+    if (i == -1) {
+        return -1;  // ID não encontrado
+    }
+    
+    /* Copia strings com segurança (evita buffer overflow) */
+    if (nome_out != NULL && nome_len > 0) {
+        strncpy(nome_out, vertice_nome(grafo, i), nome_len - 1);
+        nome_out[nome_len - 1] = '\0';  // Garante terminação
+    }
+    
+    if (categoria_out != NULL && cat_len > 0) {
+        strncpy(categoria_out, vertice_categoria(grafo, i), cat_len - 1);
+        categoria_out[cat_len - 1] = '\0';
+    }
+    
+    if (x_out != NULL) {
+        *x_out = grafo->vertices[i].x;
+    }
+    
+    if (y_out != NULL) {
+        *y_out = grafo->vertices[i].y;
+    }
+    
+    return 0;  // Sucesso
+}
+
+/* FUNÇÃO EXPORTADA: Retorna nome da rua de um vértice do grafo carregado */
+EXPORT int obter_rua_vertice_grafo(Grafo* grafo, int id, char* rua_out, int rua_len) {
+    int i;
+    
+    if (grafo == NULL) {
+        return -1;
+    }
+    
+    /* Consulta direta pelo ID (tabela ID → índice) */
+    i = encontrar_indice_vertice(grafo, id);
+    if (i == -1) {
+        return -1;  // ID não encontrado
+    }
+    
+    /* Copia nome da rua com segurança */
+    if (rua_out != NULL && rua_len > 0) {
+        strncpy(rua_out, vertice_rua(grafo, i), rua_len - 1);
+        rua_out[rua_len - 1] = '\0';
+    }
+    return 0;  // Sucesso
+}
+
+/* FUNÇÃO EXPORTADA: Retorna quantidade de vértices de um grafo carregado */
+EXPORT int obter_numero_vertices_grafo(Grafo* grafo) {
+    return grafo != NULL ? grafo->num_vertices : 0;
+}
+
+/* FUNÇÃO EXPORTADA: Retorna tamanho (bytes) do bloco de textos usado por exportar_vertices */
+EXPORT int obter_tamanho_textos_grafo(Grafo* grafo) {
+    int i, total = 0;
+    
+    if (grafo == NULL) {
+        return 0;
+    }
+    
+    for (i = 0; i < grafo->num_vertices; i++) {
+        total += (int)strlen(vertice_nome(grafo, i));
+        total += (int)strlen(vertice_categoria(grafo, i));
+        total += (int)strlen(vertice_rua(grafo, i));
+    }
+    
+    return total;
+}
+
+/* FUNÇÃO EXPORTADA: Copia todos os vértices para arrays do chamador em uma única chamada
+ * - ids_out, x_out, y_out, tipo_out: 'capacidade' posições cada (ordem = índice interno)
+ * - offsets_out: 3 * capacidade + 1 posições; para o vértice i,
+ *     nome      = textos_out[offsets_out[3i]     .. offsets_out[3i + 1])
+ *     categoria = textos_out[offsets_out[3i + 1] .. offsets_out[3i + 2])
+ *     rua       = textos_out[offsets_out[3i + 2] .. offsets_out[3i + 3])
+ * - textos_out: bloco UTF-8 compacto (sem terminadores), textos_len bytes
+ * Retorna quantidade de vértices exportados, ou -1 se os buffers forem pequenos */
+EXPORT int exportar_vertices(Grafo* grafo, int capacidade,
+                             int* ids_out, int* x_out, int* y_out, int* tipo_out,
+                             int* offsets_out, char* textos_out, int textos_len) {
+    int i, pos = 0;
+    
+    if (grafo == NULL || ids_out == NULL || x_out == NULL || y_out == NULL ||
+        tipo_out == NULL || offsets_out == NULL || textos_out == NULL) {
+        return -1;
+    }
+    
+    if (capacidade < grafo->num_vertices || textos_len < obter_tamanho_textos_grafo(grafo)) {
+        return -1;  // Chamador deve dimensionar com obter_numero_vertices_grafo/obter_tamanho_textos_grafo
+    }
+    
+    for (i = 0; i < grafo->num_vertices; i++) {
+        const Vertice* v = &grafo->vertices[i];
+        const char* textos[3];
+        int t;
+        
+        ids_out[i] = v->id;
+        x_out[i] = v->x;
+        y_out[i] = v->y;
+        tipo_out[i] = v->tipo;
+        
+        /* Empacota nome, categoria e rua em sequência no bloco de textos */
+        textos[0] = vertice_nome(grafo, i);
+        textos[1] = vertice_categoria(grafo, i);
+        textos[2] = vertice_rua(grafo, i);
+        for (t = 0; t < 3; t++) {
+            int len = (int)strlen(textos[t]);
+            offsets_out[3 * i + t] = pos;
+            memcpy(textos_out + pos, textos[t], len);
+            pos += len;
         }
     }
+    offsets_out[3 * grafo->num_vertices] = pos;  // Fim do último texto
     
-    return -1;  // ID não encontrado
+    return grafo->num_vertices;
+}
+
+/* FUNÇÃO EXPORTADA: Retorna quantidade de arestas de um grafo carregado */
+EXPORT int obter_numero_arestas_grafo(Grafo* grafo) {
+    return grafo != NULL ? grafo->num_arestas : 0;
 }
 
-/* FUNÇÃO EXPORTADA: Retorna nome da rua de um vértice */
-EXPORT int obter_rua_vertice(int id, char* rua_out, int rua_len) {
-    int count, i;
-    const VerticeData* vertices = obter_vertices_static(&count);
+/* FUNÇÃO EXPORTADA: Copia todas as arestas (por ID) para arrays do chamador
+ * Retorna quantidade de arestas exportadas, ou -1 se capacidade insuficiente */
+EXPORT int exportar_arestas(Grafo* grafo, int capacidade,
+                            int* origens_out, int* destinos_out, int* pesos_out) {
+    int u, k;
     
-    /* Busca linear pelo ID */
-    for (i = 0; i < count; i++) {
-        if (vertices[i].id == id) {
-            /* Copia nome da rua com segurança */
-            if (rua_out != NULL && rua_len > 0) {
-                strncpy(rua_out, vertices[i].rua, rua_len - 1);
-                rua_out[rua_len - 1] = '\0';
-            }
-            return 0;  // Sucesso
+    if (grafo == NULL || grafo->adj_inicio == NULL ||
+        origens_out == NULL || destinos_out == NULL || pesos_out == NULL) {
+        return -1;
+    }
+    
+    if (capacidade < grafo->num_arestas) {
+        return -1;
+    }
+    
+    /* Percorre o CSR convertendo índices internos de volta para IDs */
+    for (u = 0; u < grafo->num_vertices; u++) {
+        for (k = grafo->adj_inicio[u]; k < grafo->adj_inicio[u + 1]; k++) {
+            origens_out[k] = grafo->vertices[u].id;
+            destinos_out[k] = grafo->vertices[grafo->adj_destino[k]].id;
+            pesos_out[k] = grafo->adj_peso[k];
         }
     }
     
-    return -1;  // ID não encontrado
+    return grafo->num_arestas;
+}
+
+/* Função interna: Copia o k-ésimo texto do bloco (sem terminadores) para 'destino', com terminador */
+static const char* texto_importado(const char* textos, const int* offsets, int k, char* destino) {
+    int len = offsets[k + 1] - offsets[k];
+    if (len < 0) {
+        len = 0;
+    }
+    memcpy(destino, textos + offsets[k], len);
+    destino[len] = '\0';
+    return destino;
+}
+
+/* FUNÇÃO EXPORTADA: Monta um grafo a partir de arrays do chamador (inverso de exportar_vertices
+ * + exportar_arestas). Textos no mesmo formato de exportar_vertices: offsets com 3 * num_vertices + 1
+ * posições delimitando nome, categoria e rua de cada vértice em 'textos' (sem terminadores).
+ * Arestas por ID. Retorna NULL se algum array faltar; liberar com liberar_grafo(). */
+EXPORT Grafo* importar_grafo(int num_vertices, const int* ids, const int* x, const int* y, const int* tipo,
+                             const int* offsets, const char* textos,
+                             int num_arestas, const int* origens, const int* destinos, const int* pesos) {
+    int i, maior = 0;
+    char* buffer;
+    ArestaData* arestas;
+    Grafo* grafo;
+
+    if (num_vertices < 0 || num_arestas < 0 || ids == NULL || x == NULL || y == NULL || tipo == NULL ||
+        offsets == NULL || textos == NULL ||
+        (num_arestas > 0 && (origens == NULL || destinos == NULL || pesos == NULL))) {
+        LOG(LOG_ERRO, "[ERRO] Dados de importacao incompletos\n");
+        return NULL;
+    }
+
+    /* Maior texto individual define o tamanho de cada um dos 3 buffers temporários */
+    for (i = 0; i < 3 * num_vertices; i++) {
+        if (offsets[i + 1] - offsets[i] > maior) {
+            maior = offsets[i + 1] - offsets[i];
+        }
+    }
+
+    grafo = criar_grafo();
+    buffer = (char*)malloc(3 * ((size_t)maior + 1));
+    arestas = (ArestaData*)malloc((num_arestas > 0 ? num_arestas : 1) * sizeof(ArestaData));
+    if (grafo == NULL || buffer == NULL || arestas == NULL) {
+        LOG(LOG_ERRO, "[ERRO] Falha ao alocar grafo importado\n");
+        destruir_grafo(grafo);
+        free(buffer);
+        free(arestas);
+        return NULL;
+    }
+
+    /* 1. VÉRTICES (textos copiados para a tabela do grafo) */
+    for (i = 0; i < num_vertices; i++) {
+        adicionar_vertice(grafo, ids[i],
+                          texto_importado(textos, offsets, 3 * i, buffer),
+                          texto_importado(textos, offsets, 3 * i + 1, buffer + maior + 1),
+                          texto_importado(textos, offsets, 3 * i + 2, buffer + 2 * (maior + 1)),
+                          tipo[i], x[i], y[i]);
+    }
+    free(buffer);
+
+    if (grafo->num_vertices != num_vertices) {
+        LOG(LOG_ERRO, "[ERRO] Falha ao adicionar vertices importados\n");
+        destruir_grafo(grafo);
+        free(arestas);
+        return NULL;
+    }
+
+    /* 2. ARESTAS → CSR direto e reverso (IDs inexistentes são ignorados) */
+    for (i = 0; i < num_arestas; i++) {
+        arestas[i].origem = origens[i];
+        arestas[i].destino = destinos[i];
+        arestas[i].distancia = pesos[i];
+    }
+    if (!construir_adjacencias(grafo, arestas, num_arestas)) {
+        LOG(LOG_ERRO, "[ERRO] Falha ao montar adjacencias importadas\n");
+        destruir_grafo(grafo);
+        free(arestas);
+        return NULL;
+    }
+    free(arestas);
+
+    grafo->versao = calcular_versao_grafo(grafo);
+    LOG(LOG_INFO, "[IMPORTACAO] %d vertices, %d arestas\n", grafo->num_vertices, grafo->num_arestas);
+    return grafo;
 }
@@ -2,32 +2,138 @@
 #define GRAFO_ALGORITMOS_H
 
 #include "grafo.h"
+#include "grafo_heap.h"
 #include <limits.h>
 
+/* Tempos (microssegundos) e contadores de uma consulta, devolvidos junto com a rota */
+typedef struct {
+    long long tempo_carga_us;        /* Montagem do grafo (só calcular_rota legado; 0 com grafo persistente) */
+    long long tempo_busca_us;        /* Busca até fixar o destino (ou encontro das buscas) */
+    long long tempo_reconstrucao_us; /* Caminho a partir dos predecessores (na CH: desempacotar atalhos) */
+    int nos_fixados;                 /* Vértices extraídos do heap */
+    int arestas_relaxadas;           /* Arestas examinadas a partir dos vértices fixados */
+    int insercoes_heap;              /* Inserções e decrease-key */
+    int remocoes_heap;               /* Extrações do mínimo */
+} EstatisticasRota;
+
 /* Estrutura simplificada para resultado de rota */
 typedef struct {
     int* sequencia_ids;      /* Array de IDs no caminho (origem → destino) */
     int num_ids;             /* Quantidade de IDs no caminho */
     int distancia_total;     /* Distância total em metros */
+    int nos_visitados;       /* Vértices fixados (extraídos do heap) pela busca */
+    EstatisticasRota estatisticas;  /* Sempre por último: leitores antigos ignoram o campo */
 } ResultadoRota;
 
+/* Algoritmos de busca ponto a ponto (parâmetro 'modo' de calcular_rota_modo) */
+#define MODO_DIJKSTRA 0      /* Expande em todas as direções */
+#define MODO_ASTAR    1      /* Dijkstra guiado pela distância euclidiana até o destino */
+#define MODO_BIDIRECIONAL 2  /* Duas buscas (da origem e do destino, no CSR reverso) até se encontrarem */
+
 #ifdef _WIN32
     #define EXPORT __declspec(dllexport)
 #else
     #define EXPORT
 #endif
 
+/* Área de trabalho das consultas (uma por thread)
+ *
+ * Concorrência: durante as consultas o Grafo (e a HierarquiaCH) são apenas lidos
+ * e podem ser compartilhados por qualquer número de threads, desde que cada uma
+ * use a sua AreaTrabalho nas funções *_area. As funções sem área (calcular_rota_modo,
+ * calcular_rota_ch, ...) continuam disponíveis: as de grafo alocam uma área por
+ * chamada e a de CH usa a área interna da hierarquia (uma thread por vez).
+ * Carregar/liberar grafos e hierarquias não pode acontecer durante consultas. O
+ * nível de log é global e, com LOG ligado, mensagens de threads diferentes se
+ * intercalam no stdout (o callback de trace é chamado na thread da consulta).
+ *
+ * Entre consultas os arrays ficam sempre limpos (distâncias = INT_MAX, predecessores
+ * = -1): cada consulta restaura só os vértices que tocou, sem custo O(V) por rota. */
+typedef struct {
+    int capacidade;          // num_vertices do grafo para o qual foi criada
+    int* dist_frente;        // Distância a partir da origem
+    int* dist_tras;          // Distância até o destino (bidirecional e CH)
+    int* anterior_frente;    // Predecessor (na CH: aresta de subida usada)
+    int* anterior_tras;      // Sucessor da busca de trás (na CH: aresta de descida usada)
+    unsigned char* marcas;   // bit 1/2 = fixado pela frente/trás, bit 4 = tocado
+    int* tocados;            // Vértices alterados pela consulta atual
+    int num_tocados;
+    HeapMin* heap_frente;
+    HeapMin* heap_tras;
+    int* caminho;            // Buffer da reconstrução do caminho
+    int* trecho;             // Arestas de subida da rota CH (reconstrução em calcular_rota_ch_area)
+    int arestas_relaxadas;   // Contadores da última busca (EstatisticasRota)
+    int insercoes_heap;
+    int remocoes_heap;
+} AreaTrabalho;
+
+EXPORT AreaTrabalho* criar_area_trabalho(Grafo* grafo);  // Dimensionada para o grafo (NULL = erro)
+EXPORT void liberar_area_trabalho(AreaTrabalho* area);
+
+/* Sessão de grafo persistente: carrega uma vez, consulta várias vezes */
+EXPORT Grafo* carregar_grafo();                       // Constrói grafo a partir do banco estático
+EXPORT void liberar_grafo(Grafo* grafo);              // Libera grafo criado por carregar_grafo()
+EXPORT unsigned int obter_versao_grafo(Grafo* grafo); // Checksum dos dados (muda quando o mapa muda)
+
 /* Funções principais do Dijkstra */
-EXPORT ResultadoRota* calcular_rota(int id_origem, int id_destino);
+EXPORT ResultadoRota* calcular_rota_grafo(Grafo* grafo, int id_origem, int id_destino);
+EXPORT ResultadoRota* calcular_rota_modo(Grafo* grafo, int id_origem, int id_destino, int modo);
+EXPORT ResultadoRota* calcular_rota(int id_origem, int id_destino);  // Legado: recria o grafo a cada chamada
 EXPORT void liberar_resultado(ResultadoRota* resultado);
+EXPORT int obter_tamanho_resultado();  // sizeof(ResultadoRota): o Python confere o layout antes de ler estatisticas
+
+/* Versões reentrantes (área da thread chamadora) */
+EXPORT ResultadoRota* calcular_rota_area(Grafo* grafo, AreaTrabalho* area, int id_origem, int id_destino, int modo);
+/* Só distâncias, muitos pares em uma chamada: distancias_out[i] = metros (-1 = sem caminho),
+ * visitados_out[i] = vértices fixados (opcional). Retorna quantidade de pares ou -1. */
+EXPORT int calcular_distancias_lote(Grafo* grafo, AreaTrabalho* area, int quantidade,
+                                    const int* origens, const int* destinos, int modo,
+                                    int* distancias_out, int* visitados_out);
+
+/* Distâncias de uma origem a vários destinos (Dijkstra interrompido quando todos são fixados):
+ * distancias_out[i] = metros até destinos[i] (-1 = sem caminho). Retorna quantidade ou -1. */
+EXPORT int calcular_distancias_um_para_muitos(Grafo* grafo, AreaTrabalho* area, int id_origem,
+                                              int quantidade, const int* destinos, int* distancias_out);
+
+/* Árvore de caminhos mínimos (um-para-todos) em buffers do chamador, na ordem dos vértices */
+EXPORT int calcular_arvore_caminhos(Grafo* grafo, int id_origem, int capacidade,
+                                    int* distancias_out, int* anteriores_out);
 
 /* Funções auxiliares para frontend (SISTEMA DE LISTA) */
 EXPORT int obter_numero_total_vertices();
-EXPORT int obter_info_vertice(int id, char* nome_out, int nome_len, 
-                             char* categoria_out, int cat_len,
-                             int* x_out, int* y_out);
+EXPORT int obter_info_vertice_grafo(Grafo* grafo, int id, char* nome_out, int nome_len,
+                                    char* categoria_out, int cat_len,
+                                    int* x_out, int* y_out);   // Dados do vértice pelo ID no grafo carregado
+EXPORT int obter_rua_vertice_grafo(Grafo* grafo, int id, char* rua_out, int rua_len);
+
+/* Exportação em lote dos vértices do grafo (uma única chamada FFI) */
+EXPORT int obter_numero_vertices_grafo(Grafo* grafo);
+EXPORT int obter_tamanho_textos_grafo(Grafo* grafo);   // Bytes necessários para nomes + categorias + ruas
+EXPORT int exportar_vertices(Grafo* grafo, int capacidade,
+                             int* ids_out, int* x_out, int* y_out, int* tipo_out,
+                             int* offsets_out, char* textos_out, int textos_len);
+
+/* Exportação em lote das arestas (IDs de origem/destino e peso em metros) */
+EXPORT int obter_numero_arestas_grafo(Grafo* grafo);
+EXPORT int exportar_arestas(Grafo* grafo, int capacidade,
+                            int* origens_out, int* destinos_out, int* pesos_out);
+
+/* Importação em lote (mesmo layout de exportar_vertices/exportar_arestas), p. ex. de um
+ * extrato OpenStreetMap; o grafo resultante pode ser gravado com salvar_grafo_binario() */
+EXPORT Grafo* importar_grafo(int num_vertices, const int* ids, const int* x, const int* y, const int* tipo,
+                             const int* offsets, const char* textos,
+                             int num_arestas, const int* origens, const int* destinos, const int* pesos);
 
-/* Função interna auxiliar */
+/* Funções internas auxiliares */
 int encontrar_indice_vertice(Grafo* g, int id);
+int executar_dijkstra(Grafo* g, int indice_origem, int** distancias_out, int** anteriores_out);  // Aloca distâncias/anteriores (liberar com free)
+int executar_busca(Grafo* g, int indice_origem, int indice_destino, int modo,
+                   int** distancias_out, int** anteriores_out, int* nos_visitados_out);  // Para ao fixar o destino (-1 = todos)
+int executar_busca_area(Grafo* g, AreaTrabalho* area, int indice_origem, int indice_destino, int modo,
+                        int* nos_visitados_out);  // Resultado em area->dist_frente / area->anterior_frente
+void area_limpar(AreaTrabalho* area);              // Restaura os vértices tocados pela consulta anterior
+void area_tocar(AreaTrabalho* area, int v);         // Registra v para a próxima limpeza
+void preencher_estatisticas(ResultadoRota* resultado, const AreaTrabalho* area,
+                            long long tempo_busca_us, long long tempo_reconstrucao_us);  // Contadores da área + tempos
 
 #endif
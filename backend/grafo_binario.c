@@ -0,0 +1,367 @@
+#include "grafo_binario.h"
+#include "grafo_log.h"
+#include <stdlib.h>
+#include <string.h>
+#include <stdio.h>
+
+/* Função interna: Tabela de textos sem repetições (categorias e ruas se repetem muito) */
+typedef struct {
+    char* dados;
+    int tamanho;
+    int capacidade;
+    int* slots;          // Hash aberto: deslocamento do texto em 'dados' (-1 = livre)
+    int num_slots;       // Potência de 2
+} TabelaTextos;
+
+static unsigned int hash_texto(const char* texto) {
+    unsigned int hash = 2166136261u;  // FNV-1a
+    while (*texto) {
+        hash ^= (unsigned char)*texto++;
+        hash *= 16777619u;
+    }
+    return hash;
+}
+
+/* Função interna: Deslocamento do texto na tabela, inserindo se ainda não existir (-1 = erro) */
+static int tabela_texto(TabelaTextos* t, const char* texto) {
+    unsigned int i = hash_texto(texto) & (unsigned int)(t->num_slots - 1);
+    int len;
+
+    while (t->slots[i] != -1) {
+        if (strcmp(t->dados + t->slots[i], texto) == 0) {
+            return t->slots[i];
+        }
+        i = (i + 1) & (unsigned int)(t->num_slots - 1);
+    }
+
+    len = (int)strlen(texto) + 1;
+    if (t->tamanho + len > t->capacidade) {
+        int nova = t->capacidade > 0 ? t->capacidade : 4096;
+        char* dados;
+        while (nova < t->tamanho + len) {
+            nova *= 2;
+        }
+        dados = (char*)realloc(t->dados, nova);
+        if (dados == NULL) {
+            return -1;
+        }
+        t->dados = dados;
+        t->capacidade = nova;
+    }
+
+    memcpy(t->dados + t->tamanho, texto, len);
+    t->slots[i] = t->tamanho;
+    t->tamanho += len;
+    return t->slots[i];
+}
+
+/* Função interna: Grava bytes e completa com zeros até múltiplo de 8 (retorna 1 se ok) */
+static int gravar_secao(FILE* f, const void* dados, long long bytes, long long* posicao) {
+    static const char zeros[8] = {0};
+    int resto = (int)(bytes % 8);
+
+    if (bytes > 0 && fwrite(dados, 1, (size_t)bytes, f) != (size_t)bytes) {
+        return 0;
+    }
+    if (resto != 0 && fwrite(zeros, 1, 8 - resto, f) != (size_t)(8 - resto)) {
+        return 0;
+    }
+    *posicao += bytes + (resto != 0 ? 8 - resto : 0);
+    return 1;
+}
+
+/* FUNÇÃO EXPORTADA: Grava o grafo (com CSR direto/reverso, índice, textos e pinos) em arquivo */
+EXPORT int salvar_grafo_binario(Grafo* grafo, const char* caminho) {
+    CabecalhoGrafoBinario cab;
+    TabelaTextos textos = {NULL, 0, 0, NULL, 0};
+    Vertice* vertices = NULL;
+    const void* dados[NUM_SECOES];
+    long long bytes[NUM_SECOES];
+    long long posicao;
+    FILE* f = NULL;
+    int i, ok = 0;
+
+    if (grafo == NULL || caminho == NULL || grafo->adj_inicio == NULL || grafo->rev_inicio == NULL) {
+        LOG(LOG_ERRO, "[BINARIO] Grafo sem adjacencias, nada a gravar\n");
+        return -1;
+    }
+
+    /* 1. TEXTOS sem repetições; cópia dos vértices com os novos deslocamentos */
+    textos.num_slots = 64;
+    while (textos.num_slots < 6 * grafo->num_vertices) {
+        textos.num_slots *= 2;
+    }
+    textos.slots = (int*)malloc(textos.num_slots * sizeof(int));
+    vertices = (Vertice*)malloc((grafo->num_vertices > 0 ? grafo->num_vertices : 1) * sizeof(Vertice));
+    if (textos.slots == NULL || vertices == NULL) {
+        LOG(LOG_ERRO, "[BINARIO] Erro ao alocar memoria\n");
+        goto fim;
+    }
+    memset(textos.slots, -1, textos.num_slots * sizeof(int));
+
+    for (i = 0; i < grafo->num_vertices; i++) {
+        vertices[i] = grafo->vertices[i];
+        vertices[i].nome = tabela_texto(&textos, vertice_nome(grafo, i));
+        vertices[i].categoria = tabela_texto(&textos, vertice_categoria(grafo, i));
+        vertices[i].rua = tabela_texto(&textos, vertice_rua(grafo, i));
+        if (vertices[i].nome < 0 || vertices[i].categoria < 0 || vertices[i].rua < 0) {
+            LOG(LOG_ERRO, "[BINARIO] Erro ao alocar memoria para textos\n");
+            goto fim;
+        }
+    }
+
+    /* 2. CABEÇALHO com o deslocamento de cada seção */
+    dados[SECAO_VERTICES] = vertices;
+    bytes[SECAO_VERTICES] = (long long)grafo->num_vertices * sizeof(Vertice);
+    dados[SECAO_ADJ_INICIO] = grafo->adj_inicio;
+    bytes[SECAO_ADJ_INICIO] = (long long)(grafo->num_vertices + 1) * sizeof(int);
+    dados[SECAO_ADJ_DESTINO] = grafo->adj_destino;
+    bytes[SECAO_ADJ_DESTINO] = (long long)grafo->num_arestas * sizeof(int);
+    dados[SECAO_ADJ_PESO] = grafo->adj_peso;
+    bytes[SECAO_ADJ_PESO] = (long long)grafo->num_arestas * sizeof(int);
+    dados[SECAO_REV_INICIO] = grafo->rev_inicio;
+    bytes[SECAO_REV_INICIO] = (long long)(grafo->num_vertices + 1) * sizeof(int);
+    dados[SECAO_REV_ORIGEM] = grafo->rev_origem;
+    bytes[SECAO_REV_ORIGEM] = (long long)grafo->num_arestas * sizeof(int);
+    dados[SECAO_REV_PESO] = grafo->rev_peso;
+    bytes[SECAO_REV_PESO] = (long long)grafo->num_arestas * sizeof(int);
+    dados[SECAO_INDICE] = grafo->indice_por_id;
+    bytes[SECAO_INDICE] = (long long)grafo->tamanho_indice * sizeof(int);
+    dados[SECAO_TEXTOS] = textos.dados;
+    bytes[SECAO_TEXTOS] = textos.tamanho;
+    dados[SECAO_PINOS] = grafo->pinos;
+    bytes[SECAO_PINOS] = (long long)grafo->num_pinos * 3 * sizeof(int);
+
+    memset(&cab, 0, sizeof(cab));
+    cab.assinatura = GRAFO_BINARIO_ASSINATURA;
+    cab.formato = GRAFO_BINARIO_FORMATO;
+    cab.versao_grafo = grafo->versao;
+    cab.num_vertices = grafo->num_vertices;
+    cab.num_arestas = grafo->num_arestas;
+    cab.tamanho_indice = grafo->tamanho_indice;
+    cab.tamanho_textos = textos.tamanho;
+    cab.num_pinos = grafo->num_pinos;
+    cab.escala_heuristica = grafo->escala_heuristica;
+
+    posicao = ((long long)sizeof(cab) + 7) / 8 * 8;
+    for (i = 0; i < NUM_SECOES; i++) {
+        cab.secoes[i] = posicao;
+        posicao += (bytes[i] + 7) / 8 * 8;
+    }
+
+    /* 3. GRAVAÇÃO: cabeçalho + seções na ordem dos deslocamentos */
+    f = fopen(caminho, "wb");
+    if (f == NULL) {
+        LOG(LOG_ERRO, "[BINARIO] Nao foi possivel criar %s\n", caminho);
+        goto fim;
+    }
+
+    posicao = 0;
+    if (!gravar_secao(f, &cab, sizeof(cab), &posicao)) {
+        goto fim;
+    }
+    for (i = 0; i < NUM_SECOES; i++) {
+        if (!gravar_secao(f, dados[i], bytes[i], &posicao)) {
+            goto fim;
+        }
+    }
+    ok = 1;
+
+fim:
+    if (f != NULL && fclose(f) != 0) {
+        ok = 0;
+    }
+    if (f != NULL && !ok) {
+        LOG(LOG_ERRO, "[BINARIO] Erro ao gravar %s\n", caminho);
+    }
+    free(textos.dados);
+    free(textos.slots);
+    free(vertices);
+    return ok ? 0 : -1;
+}
+
+/* Função interna: Uma passada O(V + E) sobre o grafo mapeado. O arquivo pode ser trocado
+ * sem recompilar, então um mapa truncado ou corrompido não pode causar leituras fora das
+ * seções: CSR crescente com destinos/origens < num_vertices e pesos >= 0, textos dos
+ * vértices dentro da tabela (que termina em '\0') e tabela ID → índice coerente */
+static int validar_grafo_mapeado(const Grafo* g) {
+    int n = g->num_vertices, i, k;
+
+    if (g->adj_inicio[0] != 0 || g->adj_inicio[n] != g->num_arestas ||
+        g->rev_inicio[0] != 0 || g->rev_inicio[n] != g->num_arestas ||
+        (g->tamanho_textos > 0 && g->textos[g->tamanho_textos - 1] != '\0') ||
+        (n > 0 && g->tamanho_textos == 0) || !(g->escala_heuristica >= 0.0)) {
+        return 0;
+    }
+
+    for (i = 0; i < n; i++) {
+        const Vertice* v = &g->vertices[i];
+        if (g->adj_inicio[i] > g->adj_inicio[i + 1] || g->rev_inicio[i] > g->rev_inicio[i + 1] ||
+            v->nome < 0 || v->nome >= g->tamanho_textos ||
+            v->categoria < 0 || v->categoria >= g->tamanho_textos ||
+            v->rua < 0 || v->rua >= g->tamanho_textos) {
+            return 0;
+        }
+    }
+
+    for (k = 0; k < g->num_arestas; k++) {
+        if (g->adj_destino[k] < 0 || g->adj_destino[k] >= n || g->adj_peso[k] < 0 ||
+            g->rev_origem[k] < 0 || g->rev_origem[k] >= n || g->rev_peso[k] < 0) {
+            return 0;
+        }
+    }
+
+    for (i = 0; i < g->tamanho_indice; i++) {
+        int indice = g->indice_por_id[i];
+        if (indice < -1 || indice >= n || (indice >= 0 && g->vertices[indice].id != i)) {
+            return 0;
+        }
+    }
+    return 1;
+}
+
+/* FUNÇÃO EXPORTADA: Mapeia arquivo gerado por salvar_grafo_binario() e monta o Grafo sobre ele.
+ * Nada é copiado nem convertido: a carga é o mapeamento mais uma passada sequencial de
+ * validação (validar_grafo_mapeado), que também aquece o cache de páginas do SO. */
+EXPORT Grafo* carregar_grafo_binario(const char* caminho) {
+    const CabecalhoGrafoBinario* cab;
+    const char* base;
+    long long bytes[NUM_SECOES];
+    size_t tamanho = 0;
+    void* mapa;
+    Grafo* g;
+    int i;
+
+    if (caminho == NULL) {
+        return NULL;
+    }
+
+    mapa = mapear_arquivo(caminho, &tamanho);
+    if (mapa == NULL) {
+        LOG(LOG_ERRO, "[BINARIO] Nao foi possivel mapear %s\n", caminho);
+        return NULL;
+    }
+    base = (const char*)mapa;
+    cab = (const CabecalhoGrafoBinario*)mapa;
+
+    /* 1. CABEÇALHO: assinatura, formato e contagens */
+    if (tamanho < sizeof(CabecalhoGrafoBinario) || cab->assinatura != GRAFO_BINARIO_ASSINATURA ||
+        cab->formato != GRAFO_BINARIO_FORMATO) {
+        LOG(LOG_ERRO, "[BINARIO] %s nao e um grafo binario (formato %d)\n", caminho, GRAFO_BINARIO_FORMATO);
+        desmapear_arquivo(mapa, tamanho);
+        return NULL;
+    }
+
+    if (cab->num_vertices < 0 || cab->num_arestas < 0 || cab->tamanho_indice < 0 ||
+        cab->tamanho_textos < 0 || cab->num_pinos < 0) {
+        LOG(LOG_ERRO, "[BINARIO] Cabecalho corrompido: %s\n", caminho);
+        desmapear_arquivo(mapa, tamanho);
+        return NULL;
+    }
+
+    /* 2. SEÇÕES dentro do arquivo e alinhadas */
+    bytes[SECAO_VERTICES] = (long long)cab->num_vertices * sizeof(Vertice);
+    bytes[SECAO_ADJ_INICIO] = (long long)(cab->num_vertices + 1) * sizeof(int);
+    bytes[SECAO_ADJ_DESTINO] = (long long)cab->num_arestas * sizeof(int);
+    bytes[SECAO_ADJ_PESO] = bytes[SECAO_ADJ_DESTINO];
+    bytes[SECAO_REV_INICIO] = bytes[SECAO_ADJ_INICIO];
+    bytes[SECAO_REV_ORIGEM] = bytes[SECAO_ADJ_DESTINO];
+    bytes[SECAO_REV_PESO] = bytes[SECAO_ADJ_DESTINO];
+    bytes[SECAO_INDICE] = (long long)cab->tamanho_indice * sizeof(int);
+    bytes[SECAO_TEXTOS] = cab->tamanho_textos;
+    bytes[SECAO_PINOS] = (long long)cab->num_pinos * 3 * sizeof(int);
+
+    for (i = 0; i < NUM_SECOES; i++) {
+        if (cab->secoes[i] < (long long)sizeof(CabecalhoGrafoBinario) || cab->secoes[i] % 8 != 0 ||
+            cab->secoes[i] + bytes[i] > (long long)tamanho) {
+            LOG(LOG_ERRO, "[BINARIO] Arquivo truncado ou corrompido (secao %d): %s\n", i, caminho);
+            desmapear_arquivo(mapa, tamanho);
+            return NULL;
+        }
+    }
+
+    g = criar_grafo();
+    if (g == NULL) {
+        desmapear_arquivo(mapa, tamanho);
+        return NULL;
+    }
+
+    /* 3. ARRAYS do grafo apontam para o mapa (somente leitura, nada é copiado) */
+    g->mapa = mapa;
+    g->tamanho_mapa = tamanho;
+    g->num_vertices = cab->num_vertices;
+    g->num_arestas = cab->num_arestas;
+    g->tamanho_indice = cab->tamanho_indice;
+    g->tamanho_textos = cab->tamanho_textos;
+    g->num_pinos = cab->num_pinos;
+    g->versao = cab->versao_grafo;
+    g->escala_heuristica = cab->escala_heuristica;
+    g->vertices = (Vertice*)(base + cab->secoes[SECAO_VERTICES]);
+    g->adj_inicio = (int*)(base + cab->secoes[SECAO_ADJ_INICIO]);
+    g->adj_destino = (int*)(base + cab->secoes[SECAO_ADJ_DESTINO]);
+    g->adj_peso = (int*)(base + cab->secoes[SECAO_ADJ_PESO]);
+    g->rev_inicio = (int*)(base + cab->secoes[SECAO_REV_INICIO]);
+    g->rev_origem = (int*)(base + cab->secoes[SECAO_REV_ORIGEM]);
+    g->rev_peso = (int*)(base + cab->secoes[SECAO_REV_PESO]);
+    g->indice_por_id = (int*)(base + cab->secoes[SECAO_INDICE]);
+    g->textos = (char*)(base + cab->secoes[SECAO_TEXTOS]);
+    g->pinos = cab->num_pinos > 0 ? (int*)(base + cab->secoes[SECAO_PINOS]) : NULL;
+
+    /* 4. CONTEÚDO: toda posição usada pelas buscas aponta para dentro do mapa */
+    if (!validar_grafo_mapeado(g)) {
+        LOG(LOG_ERRO, "[BINARIO] Conteudo inconsistente (indices fora das secoes): %s\n", caminho);
+        destruir_grafo(g);
+        return NULL;
+    }
+
+    LOG(LOG_INFO, "[BINARIO] %s: %d vertices, %d arestas (%lu bytes mapeados)\n",
+        caminho, g->num_vertices, g->num_arestas, (unsigned long)tamanho);
+    return g;
+}
+
+/* FUNÇÃO EXPORTADA: Copia coordenadas visuais dos pinos para o grafo (gravadas por salvar_grafo_binario) */
+EXPORT int definir_pinos_grafo(Grafo* grafo, int quantidade, const int* ids, const int* xs, const int* ys) {
+    int i;
+    int* pinos;
+
+    if (grafo == NULL || grafo->mapa != NULL || quantidade < 0 ||
+        (quantidade > 0 && (ids == NULL || xs == NULL || ys == NULL))) {
+        return -1;
+    }
+
+    pinos = (int*)malloc((quantidade > 0 ? quantidade : 1) * 3 * sizeof(int));
+    if (pinos == NULL) {
+        return -1;
+    }
+    for (i = 0; i < quantidade; i++) {
+        pinos[3 * i] = ids[i];
+        pinos[3 * i + 1] = xs[i];
+        pinos[3 * i + 2] = ys[i];
+    }
+
+    free(grafo->pinos);
+    grafo->pinos = pinos;
+    grafo->num_pinos = quantidade;
+    return 0;
+}
+
+/* FUNÇÃO EXPORTADA: Quantidade de pinos gravados com o grafo (0 = usar pins.json) */
+EXPORT int obter_numero_pinos_grafo(Grafo* grafo) {
+    return grafo != NULL ? grafo->num_pinos : 0;
+}
+
+/* FUNÇÃO EXPORTADA: Copia pinos para arrays do chamador. Retorna quantidade, -1 se capacidade insuficiente */
+EXPORT int exportar_pinos(Grafo* grafo, int capacidade, int* ids_out, int* xs_out, int* ys_out) {
+    int i;
+
+    if (grafo == NULL || ids_out == NULL || xs_out == NULL || ys_out == NULL || capacidade < grafo->num_pinos) {
+        return -1;
+    }
+
+    for (i = 0; i < grafo->num_pinos; i++) {
+        ids_out[i] = grafo->pinos[3 * i];
+        xs_out[i] = grafo->pinos[3 * i + 1];
+        ys_out[i] = grafo->pinos[3 * i + 2];
+    }
+    return grafo->num_pinos;
+}
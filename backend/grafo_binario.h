@@ -0,0 +1,68 @@
+#ifndef GRAFO_BINARIO_H
+#define GRAFO_BINARIO_H
+
+#include "grafo.h"
+#include "grafo_algoritmos.h"
+
+/* Formato binário do grafo (arquivo .grafo), usado direto da memória mapeada
+ *
+ * Cabeçalho (CabecalhoGrafoBinario) seguido das seções, cada uma alinhada em
+ * 8 bytes e localizada pelo deslocamento guardado no cabeçalho:
+ *   vertices       num_vertices registros Vertice (textos como deslocamentos)
+ *   adj_inicio     num_vertices + 1 ints  \
+ *   adj_destino    num_arestas ints        > CSR direto
+ *   adj_peso       num_arestas ints       /
+ *   rev_inicio     num_vertices + 1 ints  \
+ *   rev_origem     num_arestas ints        > CSR reverso
+ *   rev_peso       num_arestas ints       /
+ *   indice_por_id  tamanho_indice ints (ID → índice, -1 = inexistente)
+ *   textos         tamanho_textos bytes (strings terminadas em '\0', sem repetições)
+ *   pinos          3 * num_pinos ints (id, x, y das coordenadas visuais)
+ *
+ * Inteiros na ordem de bytes da máquina que gerou o arquivo (a assinatura não
+ * confere em máquinas com outra ordem e o arquivo é recusado). A versão do
+ * grafo e a escala da heurística já vêm calculadas: carregar não percorre os
+ * dados, apenas valida o cabeçalho e aponta os arrays do Grafo para o mapa. */
+
+#define GRAFO_BINARIO_ASSINATURA 0x31465247u  /* "GRF1" */
+#define GRAFO_BINARIO_FORMATO 1               /* Incrementar a cada mudança de layout */
+
+enum {
+    SECAO_VERTICES,
+    SECAO_ADJ_INICIO,
+    SECAO_ADJ_DESTINO,
+    SECAO_ADJ_PESO,
+    SECAO_REV_INICIO,
+    SECAO_REV_ORIGEM,
+    SECAO_REV_PESO,
+    SECAO_INDICE,
+    SECAO_TEXTOS,
+    SECAO_PINOS,
+    NUM_SECOES
+};
+
+typedef struct {
+    unsigned int assinatura;      // GRAFO_BINARIO_ASSINATURA
+    unsigned int formato;         // GRAFO_BINARIO_FORMATO
+    unsigned int versao_grafo;    // Checksum dos dados (calcular_versao_grafo)
+    int num_vertices;
+    int num_arestas;
+    int tamanho_indice;
+    int tamanho_textos;
+    int num_pinos;
+    double escala_heuristica;     // Escala do A* já calibrada
+    long long secoes[NUM_SECOES]; // Deslocamento de cada seção a partir do início do arquivo
+} CabecalhoGrafoBinario;
+
+/* Carrega grafo mapeando o arquivo (sem cópia); liberar com liberar_grafo(). NULL se inválido. */
+EXPORT Grafo* carregar_grafo_binario(const char* caminho);
+
+/* Grava o grafo no formato binário. 0 = sucesso, -1 = erro. */
+EXPORT int salvar_grafo_binario(Grafo* grafo, const char* caminho);
+
+/* Coordenadas visuais dos pinos do mapa (gravadas junto com o grafo) */
+EXPORT int definir_pinos_grafo(Grafo* grafo, int quantidade, const int* ids, const int* xs, const int* ys);
+EXPORT int obter_numero_pinos_grafo(Grafo* grafo);
+EXPORT int exportar_pinos(Grafo* grafo, int capacidade, int* ids_out, int* xs_out, int* ys_out);
+
+#endif
@@ -0,0 +1,979 @@
+#include "grafo_ch.h"
+#include "grafo_log.h"
+#include <stdlib.h>
+#include <string.h>
+#include <stdio.h>
+#include <limits.h>
+
+#define CH_ASSINATURA 0x31484347u   /* "GCH1" no início do arquivo salvo */
+#define CH_LIMITE_TESTEMUNHA 500    /* Máximo de vértices fixados por busca de testemunha */
+
+/* Lista dinâmica de arestas de um vértice (grafo de trabalho da contração) */
+typedef struct {
+    int* vizinho;
+    int* peso;
+    int* meio;
+    int tamanho;
+    int capacidade;
+} ListaArestas;
+
+/* Estado da contração: grafo restante + área de trabalho da busca de testemunha */
+typedef struct {
+    int n;
+    ListaArestas* saida;        // saida[u]: arestas u → w para vértices ainda não contraídos
+    ListaArestas* entrada;      // entrada[w]: arestas u → w para vértices ainda não contraídos
+    int* vizinhos_contraidos;   // Quantos vizinhos de cada vértice já foram contraídos
+    int* nivel;                 // Limite inferior da altura do vértice na hierarquia
+    int* dist;                  // Distâncias da busca de testemunha (INT_MAX = não tocado)
+    int* tocados;
+    int num_tocados;
+    HeapMin* heap;
+    int num_atalhos;
+} Contracao;
+
+/* Função interna: Adiciona aresta (ou reduz peso se já existir para o mesmo vizinho) */
+static int lista_adicionar(ListaArestas* l, int vizinho, int peso, int meio) {
+    int i;
+
+    for (i = 0; i < l->tamanho; i++) {
+        if (l->vizinho[i] == vizinho) {
+            if (peso < l->peso[i]) {
+                l->peso[i] = peso;
+                l->meio[i] = meio;
+            }
+            return 1;
+        }
+    }
+
+    if (l->tamanho == l->capacidade) {
+        int nova = l->capacidade > 0 ? l->capacidade * 2 : 4;
+        int* v = (int*)realloc(l->vizinho, nova * sizeof(int));
+        int* p = v ? (int*)realloc(l->peso, nova * sizeof(int)) : NULL;
+        int* m = p ? (int*)realloc(l->meio, nova * sizeof(int)) : NULL;
+        if (v) l->vizinho = v;
+        if (p) l->peso = p;
+        if (m == NULL) {
+            return 0;
+        }
+        l->meio = m;
+        l->capacidade = nova;
+    }
+
+    l->vizinho[l->tamanho] = vizinho;
+    l->peso[l->tamanho] = peso;
+    l->meio[l->tamanho] = meio;
+    l->tamanho++;
+    return 1;
+}
+
+/* Função interna: Remove aresta para 'vizinho' (troca com a última, ordem não importa) */
+static void lista_remover(ListaArestas* l, int vizinho) {
+    int i;
+    for (i = 0; i < l->tamanho; i++) {
+        if (l->vizinho[i] == vizinho) {
+            l->tamanho--;
+            l->vizinho[i] = l->vizinho[l->tamanho];
+            l->peso[i] = l->peso[l->tamanho];
+            l->meio[i] = l->meio[l->tamanho];
+            return;
+        }
+    }
+}
+
+/* Função interna: Dijkstra local a partir de 'origem' ignorando 'ignorado', limitado
+ * por distância e por número de vértices fixados. Resultado fica em c->dist. */
+static void busca_testemunha(Contracao* c, int origem, int ignorado, int limite_dist) {
+    int fixados = 0;
+    int i;
+
+    /* Reset apenas do que a busca anterior tocou */
+    for (i = 0; i < c->num_tocados; i++) {
+        c->dist[c->tocados[i]] = INT_MAX;
+    }
+    c->num_tocados = 0;
+    heap_limpar(c->heap);
+
+    c->dist[origem] = 0;
+    c->tocados[c->num_tocados++] = origem;
+    heap_inserir_ou_diminuir(c->heap, origem, 0);
+
+    while (!heap_vazio(c->heap) && fixados < CH_LIMITE_TESTEMUNHA) {
+        int u;
+        const ListaArestas* l;
+
+        if (heap_min_prioridade(c->heap) > limite_dist) {
+            break;  // Nenhum caminho mais curto que o atalho pode surgir daqui em diante
+        }
+
+        u = heap_extrair_min(c->heap);
+        fixados++;
+        l = &c->saida[u];
+        for (i = 0; i < l->tamanho; i++) {
+            int v = l->vizinho[i];
+            int nova = c->dist[u] + l->peso[i];
+            if (v == ignorado) {
+                continue;
+            }
+            if (nova < c->dist[v]) {
+                if (c->dist[v] == INT_MAX) {
+                    c->tocados[c->num_tocados++] = v;
+                }
+                c->dist[v] = nova;
+                heap_inserir_ou_diminuir(c->heap, v, nova);
+            }
+        }
+    }
+}
+
+/* Função interna: Conta (simular = 1) ou cria (simular = 0) os atalhos necessários para contrair x.
+ * Retorna -1 se faltar memória para um atalho (a hierarquia ficaria incompleta) */
+static int contrair_vertice(Contracao* c, int x, int simular) {
+    int i, j, atalhos = 0;
+    ListaArestas* entrada = &c->entrada[x];
+    ListaArestas* saida = &c->saida[x];
+
+    for (i = 0; i < entrada->tamanho; i++) {
+        int u = entrada->vizinho[i];
+        int peso_ux = entrada->peso[i];
+        int limite = -1;
+
+        for (j = 0; j < saida->tamanho; j++) {
+            if (saida->vizinho[j] != u && peso_ux + saida->peso[j] > limite) {
+                limite = peso_ux + saida->peso[j];
+            }
+        }
+        if (limite < 0) {
+            continue;  // Único vizinho de saída é o próprio u
+        }
+
+        busca_testemunha(c, u, x, limite);
+
+        for (j = 0; j < saida->tamanho; j++) {
+            int w = saida->vizinho[j];
+            int custo = peso_ux + saida->peso[j];
+            if (w == u || c->dist[w] <= custo) {
+                continue;  // Existe testemunha: caminho u → w sem passar por x
+            }
+            atalhos++;
+            if (!simular && (!lista_adicionar(&c->saida[u], w, custo, x) ||
+                             !lista_adicionar(&c->entrada[w], u, custo, x))) {
+                return -1;
+            }
+        }
+    }
+
+    return atalhos;
+}
+
+/* Função interna: Prioridade de contração (menor = contrai antes): diferença de arestas
+ * (atalhos criados - arestas removidas) + vizinhos já contraídos + nível, os dois últimos
+ * espalham a contração pelo grafo e mantêm a hierarquia rasa */
+static int prioridade_contracao(Contracao* c, int x) {
+    int atalhos = contrair_vertice(c, x, 1);
+    return 2 * (atalhos - c->entrada[x].tamanho - c->saida[x].tamanho) +
+           c->vizinhos_contraidos[x] + c->nivel[x];
+}
+
+/* Função interna: Converte listas por vértice em CSR (inicio/alvo/peso/meio) */
+static int listas_para_csr(const ListaArestas* listas, int n, int** inicio_out, int** alvo_out,
+                           int** peso_out, int** meio_out, int* total_out) {
+    int i, j, pos = 0, total = 0;
+    int *inicio, *alvo, *peso, *meio;
+
+    for (i = 0; i < n; i++) {
+        total += listas[i].tamanho;
+    }
+
+    inicio = (int*)malloc((n + 1) * sizeof(int));
+    alvo = (int*)malloc((total > 0 ? total : 1) * sizeof(int));
+    peso = (int*)malloc((total > 0 ? total : 1) * sizeof(int));
+    meio = (int*)malloc((total > 0 ? total : 1) * sizeof(int));
+    if (inicio == NULL || alvo == NULL || peso == NULL || meio == NULL) {
+        free(inicio);
+        free(alvo);
+        free(peso);
+        free(meio);
+        return 0;
+    }
+
+    for (i = 0; i < n; i++) {
+        inicio[i] = pos;
+        for (j = 0; j < listas[i].tamanho; j++) {
+            alvo[pos] = listas[i].vizinho[j];
+            peso[pos] = listas[i].peso[j];
+            meio[pos] = listas[i].meio[j];
+            pos++;
+        }
+    }
+    inicio[n] = pos;
+
+    *inicio_out = inicio;
+    *alvo_out = alvo;
+    *peso_out = peso;
+    *meio_out = meio;
+    *total_out = total;
+    return 1;
+}
+
+/* Função interna: Aloca a área de trabalho interna (usada por calcular_rota_ch) */
+static int preparar_consulta(HierarquiaCH* ch, Grafo* grafo) {
+    ch->area = criar_area_trabalho(grafo);
+    return ch->area != NULL;
+}
+
+/* Função interna: Aloca hierarquia vazia (todos os ponteiros NULL) */
+static HierarquiaCH* criar_ch(int num_vertices) {
+    HierarquiaCH* ch = (HierarquiaCH*)calloc(1, sizeof(HierarquiaCH));
+    if (ch != NULL) {
+        ch->num_vertices = num_vertices;
+    }
+    return ch;
+}
+
+/* FUNÇÃO EXPORTADA: Pré-processa o grafo (contração de todos os vértices) */
+EXPORT HierarquiaCH* construir_ch(Grafo* grafo) {
+    Contracao c;
+    HierarquiaCH* ch = NULL;
+    int i, k, n, ordem = 0;
+
+    if (grafo == NULL || grafo->adj_inicio == NULL) {
+        return NULL;
+    }
+
+    n = grafo->num_vertices;
+    memset(&c, 0, sizeof(c));
+    c.n = n;
+    c.saida = (ListaArestas*)calloc(n > 0 ? n : 1, sizeof(ListaArestas));
+    c.entrada = (ListaArestas*)calloc(n > 0 ? n : 1, sizeof(ListaArestas));
+    c.vizinhos_contraidos = (int*)calloc(n > 0 ? n : 1, sizeof(int));
+    c.nivel = (int*)calloc(n > 0 ? n : 1, sizeof(int));
+    c.dist = (int*)malloc((n > 0 ? n : 1) * sizeof(int));
+    c.tocados = (int*)malloc((n > 0 ? n : 1) * sizeof(int));
+    c.heap = heap_criar(n);
+    ch = criar_ch(n);
+
+    if (c.saida == NULL || c.entrada == NULL || c.vizinhos_contraidos == NULL || c.nivel == NULL ||
+        c.dist == NULL || c.tocados == NULL || c.heap == NULL || ch == NULL) {
+        LOG(LOG_ERRO, "Erro ao alocar memória para a contração\n");
+        goto falha;
+    }
+
+    for (i = 0; i < n; i++) {
+        c.dist[i] = INT_MAX;
+    }
+
+    /* 1. GRAFO DE TRABALHO: arestas originais (sem laços, paralelas reduzidas ao menor peso) */
+    for (i = 0; i < n; i++) {
+        for (k = grafo->adj_inicio[i]; k < grafo->adj_inicio[i + 1]; k++) {
+            int v = grafo->adj_destino[k];
+            if (v != i && (!lista_adicionar(&c.saida[i], v, grafo->adj_peso[k], -1) ||
+                           !lista_adicionar(&c.entrada[v], i, grafo->adj_peso[k], -1))) {
+                LOG(LOG_ERRO, "Erro ao alocar memória para a contração\n");
+                goto falha;
+            }
+        }
+    }
+
+    /* 2. ORDEM INICIAL: prioridade simulada de cada vértice */
+    {
+        HeapMin* fila = heap_criar(n);
+        if (fila == NULL) {
+            goto falha;
+        }
+
+        for (i = 0; i < n; i++) {
+            heap_inserir_ou_diminuir(fila, i, prioridade_contracao(&c, i));
+        }
+
+        /* 3. CONTRAÇÃO com atualização preguiçosa: recalcula a prioridade do topo e só
+         *    contrai se ele continuar sendo o menor; senão volta para a fila */
+        while (!heap_vazio(fila)) {
+            int x = heap_extrair_min(fila);
+            int prioridade = prioridade_contracao(&c, x);
+            int atalhos;
+
+            if (!heap_vazio(fila) && prioridade > heap_min_prioridade(fila)) {
+                heap_inserir_ou_diminuir(fila, x, prioridade);
+                continue;
+            }
+
+            atalhos = contrair_vertice(&c, x, 0);
+            if (atalhos < 0) {
+                LOG(LOG_ERRO, "Erro ao alocar memória para os atalhos da contração\n");
+                heap_destruir(fila);
+                goto falha;
+            }
+            c.num_atalhos += atalhos;
+            ordem++;
+
+            /* Remove x do grafo restante; suas listas viram as arestas da hierarquia */
+            for (k = 0; k < c.saida[x].tamanho; k++) {
+                int w = c.saida[x].vizinho[k];
+                lista_remover(&c.entrada[w], x);
+                c.vizinhos_contraidos[w]++;
+                if (c.nivel[w] < c.nivel[x] + 1) {
+                    c.nivel[w] = c.nivel[x] + 1;
+                }
+            }
+            for (k = 0; k < c.entrada[x].tamanho; k++) {
+                int u = c.entrada[x].vizinho[k];
+                lista_remover(&c.saida[u], x);
+                c.vizinhos_contraidos[u]++;
+                if (c.nivel[u] < c.nivel[x] + 1) {
+                    c.nivel[u] = c.nivel[x] + 1;
+                }
+            }
+
+            if (ordem % 100000 == 0) {
+                LOG(LOG_INFO, "[CH] %d/%d vertices contraidos, %d atalhos\n", ordem, n, c.num_atalhos);
+            }
+        }
+        heap_destruir(fila);
+    }
+
+    /* 4. HIERARQUIA EM CSR: saida[x] = subida de x, entrada[x] = descida que chega em x */
+    if (!listas_para_csr(c.saida, n, &ch->sub_inicio, &ch->sub_destino, &ch->sub_peso,
+                         &ch->sub_meio, &ch->num_subida) ||
+        !listas_para_csr(c.entrada, n, &ch->desc_inicio, &ch->desc_origem, &ch->desc_peso,
+                         &ch->desc_meio, &ch->num_descida) ||
+        !preparar_consulta(ch, grafo)) {
+        LOG(LOG_ERRO, "Erro ao alocar memória para a hierarquia\n");
+        goto falha;
+    }
+
+    ch->num_atalhos = c.num_atalhos;
+    ch->versao_grafo = grafo->versao;
+    LOG(LOG_INFO, "[CH] Contracao concluida: %d vertices, %d atalhos\n", n, c.num_atalhos);
+
+    for (i = 0; i < n; i++) {
+        free(c.saida[i].vizinho); free(c.saida[i].peso); free(c.saida[i].meio);
+        free(c.entrada[i].vizinho); free(c.entrada[i].peso); free(c.entrada[i].meio);
+    }
+    free(c.saida);
+    free(c.entrada);
+    free(c.vizinhos_contraidos);
+    free(c.nivel);
+    free(c.dist);
+    free(c.tocados);
+    heap_destruir(c.heap);
+    return ch;
+
+falha:
+    if (c.saida != NULL && c.entrada != NULL) {
+        for (i = 0; i < n; i++) {
+            free(c.saida[i].vizinho); free(c.saida[i].peso); free(c.saida[i].meio);
+            free(c.entrada[i].vizinho); free(c.entrada[i].peso); free(c.entrada[i].meio);
+        }
+    }
+    free(c.saida);
+    free(c.entrada);
+    free(c.vizinhos_contraidos);
+    free(c.nivel);
+    free(c.dist);
+    free(c.tocados);
+    if (c.heap) heap_destruir(c.heap);
+    liberar_ch(ch);
+    return NULL;
+}
+
+/* FUNÇÃO EXPORTADA: Libera hierarquia e área de trabalho */
+EXPORT void liberar_ch(HierarquiaCH* ch) {
+    if (ch == NULL) {
+        return;
+    }
+    free(ch->sub_inicio);
+    free(ch->sub_destino);
+    free(ch->sub_peso);
+    free(ch->sub_meio);
+    free(ch->desc_inicio);
+    free(ch->desc_origem);
+    free(ch->desc_peso);
+    free(ch->desc_meio);
+    liberar_area_trabalho(ch->area);
+    free(ch);
+}
+
+/* Função interna: Grava/lê um array de inteiros (retorna 1 se completo) */
+static int gravar_ints(FILE* f, const int* dados, int quantidade) {
+    return quantidade == 0 || fwrite(dados, sizeof(int), quantidade, f) == (size_t)quantidade;
+}
+
+static int ler_ints(FILE* f, int** dados, int quantidade) {
+    *dados = (int*)malloc((quantidade > 0 ? quantidade : 1) * sizeof(int));
+    return *dados != NULL && (quantidade == 0 || fread(*dados, sizeof(int), quantidade, f) == (size_t)quantidade);
+}
+
+/* FUNÇÃO EXPORTADA: Salva hierarquia em arquivo binário (ordem de bytes da máquina)
+ * Cabeçalho: assinatura, versão do grafo, vértices, arestas de subida/descida, atalhos */
+EXPORT int salvar_ch(HierarquiaCH* ch, const char* caminho) {
+    FILE* f;
+    int ok;
+    unsigned int cabecalho[2];
+    int contagens[4];
+
+    if (ch == NULL || caminho == NULL) {
+        return -1;
+    }
+
+    f = fopen(caminho, "wb");
+    if (f == NULL) {
+        LOG(LOG_ERRO, "[CH] Nao foi possivel criar %s\n", caminho);
+        return -1;
+    }
+
+    cabecalho[0] = CH_ASSINATURA;
+    cabecalho[1] = ch->versao_grafo;
+    contagens[0] = ch->num_vertices;
+    contagens[1] = ch->num_subida;
+    contagens[2] = ch->num_descida;
+    contagens[3] = ch->num_atalhos;
+
+    ok = fwrite(cabecalho, sizeof(unsigned int), 2, f) == 2 &&
+         fwrite(contagens, sizeof(int), 4, f) == 4 &&
+         gravar_ints(f, ch->sub_inicio, ch->num_vertices + 1) &&
+         gravar_ints(f, ch->sub_destino, ch->num_subida) &&
+         gravar_ints(f, ch->sub_peso, ch->num_subida) &&
+         gravar_ints(f, ch->sub_meio, ch->num_subida) &&
+         gravar_ints(f, ch->desc_inicio, ch->num_vertices + 1) &&
+         gravar_ints(f, ch->desc_origem, ch->num_descida) &&
+         gravar_ints(f, ch->desc_peso, ch->num_descida) &&
+         gravar_ints(f, ch->desc_meio, ch->num_descida);
+
+    if (fclose(f) != 0) {
+        ok = 0;
+    }
+
+    if (!ok) {
+        LOG(LOG_ERRO, "[CH] Erro ao gravar %s\n", caminho);
+        return -1;
+    }
+    return 0;
+}
+
+/* FUNÇÃO EXPORTADA: Carrega hierarquia salva por salvar_ch(), validando contra o grafo atual */
+EXPORT HierarquiaCH* carregar_ch(Grafo* grafo, const char* caminho) {
+    FILE* f;
+    HierarquiaCH* ch;
+    unsigned int cabecalho[2];
+    int contagens[4];
+    int ok;
+
+    if (grafo == NULL || caminho == NULL) {
+        return NULL;
+    }
+
+    f = fopen(caminho, "rb");
+    if (f == NULL) {
+        return NULL;
+    }
+
+    if (fread(cabecalho, sizeof(unsigned int), 2, f) != 2 || fread(contagens, sizeof(int), 4, f) != 4 ||
+        cabecalho[0] != CH_ASSINATURA) {
+        LOG(LOG_ERRO, "[CH] Arquivo invalido: %s\n", caminho);
+        fclose(f);
+        return NULL;
+    }
+
+    /* Índice de outra versão do mapa daria rotas erradas: exige reprocessamento */
+    if (cabecalho[1] != grafo->versao || contagens[0] != grafo->num_vertices ||
+        contagens[1] < 0 || contagens[2] < 0) {
+        LOG(LOG_ERRO, "[CH] %s pertence a outra versao do grafo\n", caminho);
+        fclose(f);
+        return NULL;
+    }
+
+    ch = criar_ch(contagens[0]);
+    if (ch == NULL) {
+        fclose(f);
+        return NULL;
+    }
+    ch->versao_grafo = cabecalho[1];
+    ch->num_subida = contagens[1];
+    ch->num_descida = contagens[2];
+    ch->num_atalhos = contagens[3];
+
+    ok = ler_ints(f, &ch->sub_inicio, ch->num_vertices + 1) &&
+         ler_ints(f, &ch->sub_destino, ch->num_subida) &&
+         ler_ints(f, &ch->sub_peso, ch->num_subida) &&
+         ler_ints(f, &ch->sub_meio, ch->num_subida) &&
+         ler_ints(f, &ch->desc_inicio, ch->num_vertices + 1) &&
+         ler_ints(f, &ch->desc_origem, ch->num_descida) &&
+         ler_ints(f, &ch->desc_peso, ch->num_descida) &&
+         ler_ints(f, &ch->desc_meio, ch->num_descida) &&
+         preparar_consulta(ch, grafo);
+    fclose(f);
+
+    if (!ok) {
+        LOG(LOG_ERRO, "[CH] Arquivo truncado: %s\n", caminho);
+        liberar_ch(ch);
+        return NULL;
+    }
+    return ch;
+}
+
+/* Função interna: Aresta de descida u → x guardada em x (-1 se não existe) */
+static int buscar_descida(const HierarquiaCH* ch, int x, int u) {
+    int k;
+    for (k = ch->desc_inicio[x]; k < ch->desc_inicio[x + 1]; k++) {
+        if (ch->desc_origem[k] == u) {
+            return k;
+        }
+    }
+    return -1;
+}
+
+/* Função interna: Aresta de subida x → w guardada em x (-1 se não existe) */
+static int buscar_subida(const HierarquiaCH* ch, int x, int w) {
+    int k;
+    for (k = ch->sub_inicio[x]; k < ch->sub_inicio[x + 1]; k++) {
+        if (ch->sub_destino[k] == w) {
+            return k;
+        }
+    }
+    return -1;
+}
+
+/* Função interna: Pilha de arestas a desempacotar (origem, destino, meio) */
+typedef struct {
+    int* dados;
+    int tamanho;
+    int capacidade;
+} PilhaInts;
+
+static int pilha_empilhar(PilhaInts* p, int a, int b, int c) {
+    if (p->tamanho + 3 > p->capacidade) {
+        int nova = p->capacidade > 0 ? p->capacidade * 2 : 96;
+        int* d = p->capacidade <= INT_MAX / 2 ? (int*)realloc(p->dados, (size_t)nova * sizeof(int)) : NULL;
+        if (d == NULL) {  // Sem memória ou tamanho que não cabe em int
+            return 0;
+        }
+        p->dados = d;
+        p->capacidade = nova;
+    }
+    p->dados[p->tamanho++] = a;
+    p->dados[p->tamanho++] = b;
+    p->dados[p->tamanho++] = c;
+    return 1;
+}
+
+/* Função interna: Desempacota a aresta u → v (meio = vértice pulado) acrescentando ao
+ * caminho os índices dos vértices depois de u, até v inclusive (iterativo, sem recursão) */
+static int desempacotar(const HierarquiaCH* ch, int u, int v, int meio,
+                        int* caminho, int* num, int capacidade, PilhaInts* pilha) {
+    pilha->tamanho = 0;
+    if (!pilha_empilhar(pilha, u, v, meio)) {
+        return 0;
+    }
+
+    while (pilha->tamanho > 0) {
+        int m = pilha->dados[--pilha->tamanho];
+        int b = pilha->dados[--pilha->tamanho];
+        int a = pilha->dados[--pilha->tamanho];
+
+        if (m == -1) {
+            if (*num >= capacidade) {
+                return 0;  // Caminho maior que o grafo: hierarquia corrompida
+            }
+            caminho[(*num)++] = b;
+            continue;
+        }
+
+        /* a → m é descida (guardada em m) e m → b é subida (guardada em m);
+         * empilha a segunda metade primeiro para processar a → m antes */
+        {
+            int k_desc = buscar_descida(ch, m, a);
+            int k_sub = buscar_subida(ch, m, b);
+            if (k_desc == -1 || k_sub == -1) {
+                return 0;
+            }
+            if (!pilha_empilhar(pilha, m, b, ch->sub_meio[k_sub]) ||
+                !pilha_empilhar(pilha, a, m, ch->desc_meio[k_desc])) {
+                return 0;
+            }
+        }
+    }
+    return 1;
+}
+
+/* Função interna: Vértice dono da aresta num CSR (maior x com inicio[x] <= aresta) */
+static int dono_aresta(const int* inicio, int n, int aresta) {
+    int baixo = 0, alto = n - 1;
+    while (baixo < alto) {
+        int meio = (baixo + alto + 1) / 2;
+        if (inicio[meio] <= aresta) {
+            baixo = meio;
+        } else {
+            alto = meio - 1;
+        }
+    }
+    return baixo;
+}
+
+/* Função interna: Buscas só para cima na hierarquia, da origem s (subida) e do destino t
+ * (descida, ao contrário). Retorna o vértice de encontro do caminho ótimo (-1 = sem caminho);
+ * mu_out recebe a distância. Usa apenas a área de trabalho (a hierarquia é só lida). */
+static int executar_busca_ch(HierarquiaCH* ch, AreaTrabalho* area, int s, int t,
+                             long long* mu_out, int* nos_visitados_out) {
+    int k, u;
+    int nos_visitados = 0;
+    int arestas_relaxadas = 0, insercoes_heap = 2;  // Origem e destino já entram nos heaps
+    long long mu = INT_MAX;
+    int encontro = -1;
+    int* dist_frente = area->dist_frente;
+    int* dist_tras = area->dist_tras;
+
+    /* 1. LIMPEZA da consulta anterior (apenas vértices tocados) */
+    area_limpar(area);
+
+    area_tocar(area, s);
+    dist_frente[s] = 0;
+    area_tocar(area, t);
+    dist_tras[t] = 0;
+    heap_inserir_ou_diminuir(area->heap_frente, s, 0);
+    heap_inserir_ou_diminuir(area->heap_tras, t, 0);
+
+    /* 2. BUSCAS SÓ PARA CIMA: cada lado para quando seu topo não pode melhorar mu */
+    while (1) {
+        int topo_frente = heap_min_prioridade(area->heap_frente);
+        int topo_tras = heap_min_prioridade(area->heap_tras);
+        int frente_ativa = topo_frente < mu;
+        int tras_ativa = topo_tras < mu;
+
+        if (!frente_ativa && !tras_ativa) {
+            break;
+        }
+
+        if (frente_ativa && (!tras_ativa || topo_frente <= topo_tras)) {
+            u = heap_extrair_min(area->heap_frente);
+            nos_visitados++;
+            if (dist_tras[u] != INT_MAX && (long long)dist_frente[u] + dist_tras[u] < mu) {
+                mu = (long long)dist_frente[u] + dist_tras[u];
+                encontro = u;
+            }
+            arestas_relaxadas += ch->sub_inicio[u + 1] - ch->sub_inicio[u];
+            for (k = ch->sub_inicio[u]; k < ch->sub_inicio[u + 1]; k++) {
+                int v = ch->sub_destino[k];
+                int nova = dist_frente[u] + ch->sub_peso[k];
+                if (nova < dist_frente[v]) {
+                    area_tocar(area, v);
+                    dist_frente[v] = nova;
+                    area->anterior_frente[v] = k;  // Aresta de subida que chega em v
+                    heap_inserir_ou_diminuir(area->heap_frente, v, nova);
+                    insercoes_heap++;
+                    if (dist_tras[v] != INT_MAX && (long long)nova + dist_tras[v] < mu) {
+                        mu = (long long)nova + dist_tras[v];
+                        encontro = v;
+                    }
+                }
+            }
+        } else {
+            u = heap_extrair_min(area->heap_tras);
+            nos_visitados++;
+            if (dist_frente[u] != INT_MAX && (long long)dist_frente[u] + dist_tras[u] < mu) {
+                mu = (long long)dist_frente[u] + dist_tras[u];
+                encontro = u;
+            }
+            arestas_relaxadas += ch->desc_inicio[u + 1] - ch->desc_inicio[u];
+            for (k = ch->desc_inicio[u]; k < ch->desc_inicio[u + 1]; k++) {
+                int v = ch->desc_origem[k];
+                int nova = dist_tras[u] + ch->desc_peso[k];
+                if (nova < dist_tras[v]) {
+                    area_tocar(area, v);
+                    dist_tras[v] = nova;
+                    area->anterior_tras[v] = k;  // Aresta de descida que sai de v
+                    heap_inserir_ou_diminuir(area->heap_tras, v, nova);
+                    insercoes_heap++;
+                    if (dist_frente[v] != INT_MAX && (long long)nova + dist_frente[v] < mu) {
+                        mu = (long long)nova + dist_frente[v];
+                        encontro = v;
+                    }
+                }
+            }
+        }
+    }
+
+    area->arestas_relaxadas = arestas_relaxadas;
+    area->insercoes_heap = insercoes_heap;
+    area->remocoes_heap = nos_visitados;
+
+    *mu_out = mu;
+    if (nos_visitados_out != NULL) {
+        *nos_visitados_out = nos_visitados;
+    }
+    return encontro;
+}
+
+/* Função interna: Hierarquia e área de trabalho compatíveis com o grafo */
+static int ch_valida(Grafo* grafo, HierarquiaCH* ch, AreaTrabalho* area) {
+    return grafo != NULL && ch != NULL && area != NULL && ch->num_vertices == grafo->num_vertices &&
+           area->capacidade == grafo->num_vertices;
+}
+
+/* FUNÇÃO EXPORTADA: Rota pela hierarquia (mesmo ResultadoRota de calcular_rota_grafo)
+ * Usa a área interna da hierarquia: não chamar de várias threads ao mesmo tempo */
+EXPORT ResultadoRota* calcular_rota_ch(Grafo* grafo, HierarquiaCH* ch, int id_origem, int id_destino) {
+    return calcular_rota_ch_area(grafo, ch, ch != NULL ? ch->area : NULL, id_origem, id_destino);
+}
+
+/* FUNÇÃO EXPORTADA: Rota pela hierarquia com a área de trabalho do chamador (reentrante) */
+EXPORT ResultadoRota* calcular_rota_ch_area(Grafo* grafo, HierarquiaCH* ch, AreaTrabalho* area,
+                                            int id_origem, int id_destino) {
+    int i, s, t, u, encontro;
+    int nos_visitados = 0;
+    long long mu, inicio, fim_busca;
+    int* caminho;
+    int num = 0;
+    int* trecho;
+    int num_trecho = 0;
+    PilhaInts pilha = {NULL, 0, 0};
+    ResultadoRota* resultado = NULL;
+
+    if (!ch_valida(grafo, ch, area)) {
+        LOG(LOG_ERRO, "[ERRO] Hierarquia ausente ou de outro grafo!\n");
+        return NULL;
+    }
+
+    s = encontrar_indice_vertice(grafo, id_origem);
+    t = encontrar_indice_vertice(grafo, id_destino);
+    if (s == -1 || t == -1 || s == t) {
+        LOG(LOG_ERRO, "[ERRO] Origem/destino invalidos (%d -> %d)\n", id_origem, id_destino);
+        return NULL;
+    }
+
+    inicio = relogio_us();
+    encontro = executar_busca_ch(ch, area, s, t, &mu, &nos_visitados);
+    fim_busca = relogio_us();
+    if (encontro == -1) {
+        LOG(LOG_ERRO, "\n[ERRO] Destino nao alcancavel!\n");
+        return NULL;
+    }
+
+    /* 3. CAMINHO NA HIERARQUIA: origem → encontro (subida) e encontro → destino (descida) */
+    caminho = area->caminho;
+    trecho = area->trecho;  // Buffers da área: nenhuma alocação O(V) por consulta
+    resultado = (ResultadoRota*)malloc(sizeof(ResultadoRota));
+    if (resultado == NULL) {
+        goto falha;
+    }
+
+    /* Arestas da subida, do encontro de volta até a origem (percorridas depois ao contrário) */
+    u = encontro;
+    while (u != s && num_trecho < grafo->num_vertices) {
+        int aresta = area->anterior_frente[u];  // Aresta de subida que chega em u
+        trecho[num_trecho++] = aresta;
+        u = dono_aresta(ch->sub_inicio, grafo->num_vertices, aresta);
+    }
+
+    /* 4. DESEMPACOTA cada aresta de atalho até as arestas originais */
+    caminho[num++] = s;
+    for (i = num_trecho - 1; i >= 0; i--) {
+        int aresta = trecho[i];
+        int origem = caminho[num - 1];
+        if (!desempacotar(ch, origem, ch->sub_destino[aresta], ch->sub_meio[aresta],
+                          caminho, &num, grafo->num_vertices, &pilha)) {
+            goto falha;
+        }
+    }
+
+    u = encontro;
+    while (u != t) {
+        int aresta = area->anterior_tras[u];  // Aresta de descida u → proximo, guardada em 'proximo'
+        int proximo = dono_aresta(ch->desc_inicio, grafo->num_vertices, aresta);
+        if (!desempacotar(ch, u, proximo, ch->desc_meio[aresta], caminho, &num, grafo->num_vertices, &pilha)) {
+            goto falha;
+        }
+        u = proximo;
+    }
+
+    /* 5. CONVERTE índices para IDs */
+    resultado->sequencia_ids = (int*)malloc(num * sizeof(int));
+    if (resultado->sequencia_ids == NULL) {
+        goto falha;
+    }
+    for (i = 0; i < num; i++) {
+        resultado->sequencia_ids[i] = grafo->vertices[caminho[i]].id;
+    }
+    resultado->num_ids = num;
+    resultado->distancia_total = (int)mu;
+    resultado->nos_visitados = nos_visitados;
+    preencher_estatisticas(resultado, area, fim_busca - inicio, relogio_us() - fim_busca);
+
+    LOG(LOG_INFO, "[CH] Rota %d -> %d: %d metros, %d pontos, %d vertices fixados\n",
+        id_origem, id_destino, resultado->distancia_total, num, nos_visitados);
+
+    free(pilha.dados);
+    return resultado;
+
+falha:
+    LOG(LOG_ERRO, "[ERRO] Falha ao desempacotar rota da hierarquia!\n");
+    free(pilha.dados);
+    free(resultado);
+    return NULL;
+}
+
+/* FUNÇÃO EXPORTADA: Distâncias de vários pares pela hierarquia (sem desempacotar caminhos) */
+EXPORT int calcular_distancias_lote_ch(Grafo* grafo, HierarquiaCH* ch, AreaTrabalho* area, int quantidade,
+                                       const int* origens, const int* destinos,
+                                       int* distancias_out, int* visitados_out) {
+    int i;
+
+    if (!ch_valida(grafo, ch, area) || quantidade < 0 ||
+        (quantidade > 0 && (origens == NULL || destinos == NULL || distancias_out == NULL))) {
+        return -1;
+    }
+
+    for (i = 0; i < quantidade; i++) {
+        int s = encontrar_indice_vertice(grafo, origens[i]);
+        int t = encontrar_indice_vertice(grafo, destinos[i]);
+        int nos_visitados = 0;
+        long long mu;
+
+        distancias_out[i] = -1;
+        if (s != -1 && t != -1) {
+            if (s == t) {
+                distancias_out[i] = 0;
+            } else if (executar_busca_ch(ch, area, s, t, &mu, &nos_visitados) != -1) {
+                distancias_out[i] = (int)mu;
+            }
+        }
+        if (visitados_out != NULL) {
+            visitados_out[i] = nos_visitados;
+        }
+    }
+
+    return quantidade;
+}
+
+/* Função interna: Ordena as entradas (vértice, destino, distância) dos baldes pelo vértice */
+static int comparar_balde(const void* a, const void* b) {
+    int va = ((const int*)a)[0], vb = ((const int*)b)[0];
+    return (va > vb) - (va < vb);
+}
+
+/* FUNÇÃO EXPORTADA: Matriz de distâncias entre k vértices pela hierarquia (muitos-para-muitos
+ * com baldes): uma busca de descida por destino grava (vértice, destino, distância) nos
+ * baldes; uma busca de subida por origem combina cada vértice fixado com o seu balde.
+ * São 2k buscas só para cima em vez de k² consultas. matriz_out[i * k + j] = metros de
+ * ids[i] até ids[j] (-1 = sem caminho ou ID inválido); o chamador aloca k*k ints (k até
+ * MATRIZ_CH_MAX_PARADAS). Retorna k ou -1. */
+EXPORT int calcular_matriz_ch(Grafo* grafo, HierarquiaCH* ch, AreaTrabalho* area, int quantidade,
+                              const int* ids, int* matriz_out) {
+    int i, j, k, u;
+    int* indices;
+    PilhaInts baldes = {NULL, 0, 0};
+    int num_baldes;
+    size_t celula, num_celulas;
+
+    if (!ch_valida(grafo, ch, area) || quantidade < 0 || quantidade > MATRIZ_CH_MAX_PARADAS ||
+        (quantidade > 0 && (ids == NULL || matriz_out == NULL))) {
+        return -1;
+    }
+    num_celulas = (size_t)quantidade * (size_t)quantidade;
+
+    indices = (int*)malloc((quantidade > 0 ? quantidade : 1) * sizeof(int));
+    if (indices == NULL) {
+        return -1;
+    }
+    for (i = 0; i < quantidade; i++) {
+        indices[i] = encontrar_indice_vertice(grafo, ids[i]);
+    }
+    for (celula = 0; celula < num_celulas; celula++) {
+        matriz_out[celula] = -1;
+    }
+
+    /* 1. DESCIDA (ao contrário) de cada destino: preenche os baldes */
+    for (j = 0; j < quantidade; j++) {
+        int t = indices[j];
+        if (t == -1) {
+            continue;
+        }
+        area_limpar(area);
+        area_tocar(area, t);
+        area->dist_tras[t] = 0;
+        heap_inserir_ou_diminuir(area->heap_tras, t, 0);
+        while (!heap_vazio(area->heap_tras)) {
+            u = heap_extrair_min(area->heap_tras);
+            if (!pilha_empilhar(&baldes, u, j, area->dist_tras[u])) {
+                free(baldes.dados);
+                free(indices);
+                return -1;
+            }
+            for (k = ch->desc_inicio[u]; k < ch->desc_inicio[u + 1]; k++) {
+                int v = ch->desc_origem[k];
+                int nova = area->dist_tras[u] + ch->desc_peso[k];
+                if (nova < area->dist_tras[v]) {
+                    area_tocar(area, v);
+                    area->dist_tras[v] = nova;
+                    heap_inserir_ou_diminuir(area->heap_tras, v, nova);
+                }
+            }
+        }
+    }
+    num_baldes = baldes.tamanho / 3;
+    if (num_baldes > 0) {
+        qsort(baldes.dados, num_baldes, 3 * sizeof(int), comparar_balde);
+    }
+
+    /* 2. SUBIDA de cada origem: cada vértice fixado fecha os caminhos dos destinos do seu balde */
+    for (i = 0; i < quantidade; i++) {
+        int s = indices[i];
+        int* linha = matriz_out + (size_t)i * (size_t)quantidade;
+        if (s == -1) {
+            continue;
+        }
+        area_limpar(area);
+        area_tocar(area, s);
+        area->dist_frente[s] = 0;
+        heap_inserir_ou_diminuir(area->heap_frente, s, 0);
+        while (!heap_vazio(area->heap_frente)) {
+            int baixo = 0, alto = num_baldes;
+            u = heap_extrair_min(area->heap_frente);
+
+            /* Primeira entrada do balde de u (busca binária nas entradas ordenadas) */
+            while (baixo < alto) {
+                int meio = (baixo + alto) / 2;
+                if (baldes.dados[3 * meio] < u) {
+                    baixo = meio + 1;
+                } else {
+                    alto = meio;
+                }
+            }
+            for (k = baixo; k < num_baldes && baldes.dados[3 * k] == u; k++) {
+                int total = area->dist_frente[u] + baldes.dados[3 * k + 2];
+                int destino = baldes.dados[3 * k + 1];
+                if (linha[destino] == -1 || total < linha[destino]) {
+                    linha[destino] = total;
+                }
+            }
+
+            for (k = ch->sub_inicio[u]; k < ch->sub_inicio[u + 1]; k++) {
+                int v = ch->sub_destino[k];
+                int nova = area->dist_frente[u] + ch->sub_peso[k];
+                if (nova < area->dist_frente[v]) {
+                    area_tocar(area, v);
+                    area->dist_frente[v] = nova;
+                    heap_inserir_ou_diminuir(area->heap_frente, v, nova);
+                }
+            }
+        }
+        linha[i] = 0;
+    }
+
+    free(baldes.dados);
+    free(indices);
+    return quantidade;
+}
+
+/* FUNÇÃO EXPORTADA: Quantidade de atalhos criados na contração */
+EXPORT int obter_numero_atalhos_ch(HierarquiaCH* ch) {
+    return ch != NULL ? ch->num_atalhos : 0;
+}
+
+/* FUNÇÃO EXPORTADA: Tamanho do índice em bytes (CSR de subida e descida) */
+EXPORT long long obter_tamanho_ch(HierarquiaCH* ch) {
+    if (ch == NULL) {
+        return 0;
+    }
+    return (long long)sizeof(int) * (2LL * (ch->num_vertices + 1) +
+                                     3LL * ch->num_subida + 3LL * ch->num_descida);
+}
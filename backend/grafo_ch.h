@@ -0,0 +1,67 @@
+#ifndef GRAFO_CH_H
+#define GRAFO_CH_H
+
+#include "grafo.h"
+#include "grafo_algoritmos.h"
+#include "grafo_heap.h"
+
+/* Contraction Hierarchies (CH)
+ *
+ * Pré-processamento: os vértices são contraídos um a um (ordem pela diferença
+ * de arestas). Ao contrair x, cada par u → x → w sem caminho alternativo
+ * ("testemunha") de custo menor ou igual vira um atalho u → w. As arestas de
+ * cada vértice para vizinhos contraídos depois dele formam a hierarquia:
+ *   - subida:  arestas x → w (w mais alto que x), agrupadas por x
+ *   - descida: arestas u → x (u mais alto que x), agrupadas por x
+ * Cada aresta guarda o vértice contraído que ela pula ('meio', -1 = original),
+ * o que permite desempacotar atalhos de volta às arestas originais.
+ *
+ * Consulta: busca da origem só na subida e do destino só na descida (ao
+ * contrário); ambas sobem na hierarquia e se encontram no vértice mais alto
+ * do caminho ótimo. */
+typedef struct {
+    int num_vertices;
+    int num_subida;            // Arestas de subida (originais + atalhos)
+    int num_descida;           // Arestas de descida (originais + atalhos)
+    int num_atalhos;           // Quantos atalhos foram criados na contração
+    unsigned int versao_grafo; // Versão do grafo de origem (arquivo salvo só vale para ela)
+
+    int* sub_inicio;           // CSR da subida (num_vertices + 1)
+    int* sub_destino;
+    int* sub_peso;
+    int* sub_meio;
+
+    int* desc_inicio;          // CSR da descida, agrupado pelo vértice mais baixo (num_vertices + 1)
+    int* desc_origem;
+    int* desc_peso;
+    int* desc_meio;
+
+    /* Área de trabalho de calcular_rota_ch (uma thread por vez); consultas concorrentes
+     * usam calcular_rota_ch_area com uma área por thread (ver AreaTrabalho) */
+    AreaTrabalho* area;
+} HierarquiaCH;
+
+#define MODO_CH 3  /* Consulta na hierarquia (calcular_rota_ch); requer construir_ch ou carregar_ch */
+
+/* Pré-processamento e persistência */
+EXPORT HierarquiaCH* construir_ch(Grafo* grafo);                        // Contrai todos os vértices
+EXPORT int salvar_ch(HierarquiaCH* ch, const char* caminho);             // 0 = sucesso, -1 = erro
+EXPORT HierarquiaCH* carregar_ch(Grafo* grafo, const char* caminho);     // NULL se inválido ou de outra versão do grafo
+EXPORT void liberar_ch(HierarquiaCH* ch);
+
+/* Consulta ponto a ponto (sequencia_ids com atalhos já desempacotados) */
+EXPORT ResultadoRota* calcular_rota_ch(Grafo* grafo, HierarquiaCH* ch, int id_origem, int id_destino);
+EXPORT ResultadoRota* calcular_rota_ch_area(Grafo* grafo, HierarquiaCH* ch, AreaTrabalho* area,
+                                            int id_origem, int id_destino);  // Reentrante
+EXPORT int calcular_distancias_lote_ch(Grafo* grafo, HierarquiaCH* ch, AreaTrabalho* area, int quantidade,
+                                       const int* origens, const int* destinos,
+                                       int* distancias_out, int* visitados_out);  // Como calcular_distancias_lote
+EXPORT int calcular_matriz_ch(Grafo* grafo, HierarquiaCH* ch, AreaTrabalho* area, int quantidade,
+                              const int* ids, int* matriz_out);  // k×k distâncias (muitos-para-muitos)
+#define MATRIZ_CH_MAX_PARADAS 46340  /* Maior k com k*k <= INT_MAX (k maior é recusado) */
+
+/* Estatísticas do índice */
+EXPORT int obter_numero_atalhos_ch(HierarquiaCH* ch);
+EXPORT long long obter_tamanho_ch(HierarquiaCH* ch);                    // Bytes do índice (sem área de trabalho)
+
+#endif
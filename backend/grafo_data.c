@@ -6,7 +6,7 @@
  * 
  * CONTEÚDO:
  * - 120 vértices (esquinas + pontos turísticos) com coordenadas (x, y)
- * - 152 arestas bidirecionais com distâncias em metros
+ * - 135 arestas direcionadas com distâncias em metros
  * 
  * PROPÓSITO:
  * Serve como "banco de dados" do sistema de rotas. Ao invés de ler de arquivo
@@ -144,7 +144,7 @@ static const VerticeData VERTICES_STATIC[] = {
     {119, "Praça Hardy Elmiro Martin", "Centro Histórico", "R. Venâncio Aires", 1, 23, 113}
 };
 
-static const int VERTICES_STATIC_COUNT = 120;
+static const int VERTICES_STATIC_COUNT = (int)(sizeof(VERTICES_STATIC) / sizeof(VERTICES_STATIC[0]));  // 120
 
 /* Array estático de arestas */
 static const ArestaData ARESTAS_STATIC[] = {
@@ -208,7 +208,7 @@ static const ArestaData ARESTAS_STATIC[] = {
     {15, 117, 62}, {117, 118, 26}, {118, 19, 66}, // P-T
 };
 
-static const int ARESTAS_STATIC_COUNT = 152;
+static const int ARESTAS_STATIC_COUNT = (int)(sizeof(ARESTAS_STATIC) / sizeof(ARESTAS_STATIC[0]));  // 135
 
 /* Funções de acesso: Retornam ponteiros para arrays estáticos + quantidade de elementos */
 
@@ -218,6 +218,6 @@ const VerticeData* obter_vertices_static(int* count) {
 }
 
 const ArestaData* obter_arestas_static(int* count) {
-    *count = ARESTAS_STATIC_COUNT;   // 152 arestas
+    *count = ARESTAS_STATIC_COUNT;   // 135 arestas
     return ARESTAS_STATIC;
 }
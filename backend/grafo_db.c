@@ -1,8 +1,65 @@
 #include "grafo_db.h"
+#include "grafo_log.h"
 #include <stdlib.h>
 #include <string.h>
 #include <stdio.h>
 
+#ifdef _WIN32
+    #if !defined(_WIN32_WINNT) || _WIN32_WINNT < 0x0600
+        #undef _WIN32_WINNT
+        #define _WIN32_WINNT 0x0600  // InitOnceExecuteOnce (Vista+); MinGW antigo assume XP
+    #endif
+    #include <windows.h>
+#else
+    #include <pthread.h>
+#endif
+
+/* Posições dos pontos turísticos (tipo == 1) em VERTICES_STATIC, construídas uma única vez.
+ * get_ponto_info pode ser chamada de várias threads: a construção passa por pthread_once /
+ * InitOnceExecuteOnce, e depois disso a tabela é só lida. */
+static int* indices_pontos_static = NULL;
+static int num_pontos_static = 0;
+
+static void construir_indices_pontos_static(void) {
+    int total, i, n = 0;
+    const VerticeData* vertices = obter_vertices_static(&total);
+    int* indices = (int*)malloc((total > 0 ? total : 1) * sizeof(int));
+    
+    if (indices == NULL) {
+        return;  // Sem memória: get_num_pontos retorna 0
+    }
+    for (i = 0; i < total; i++) {
+        if (vertices[i].tipo == 1) {
+            indices[n++] = i;
+        }
+    }
+    num_pontos_static = n;
+    indices_pontos_static = indices;
+}
+
+#ifdef _WIN32
+static INIT_ONCE indices_pontos_uma_vez = INIT_ONCE_STATIC_INIT;
+
+static BOOL CALLBACK construir_indices_pontos_win(PINIT_ONCE uma_vez, PVOID parametro, PVOID* contexto) {
+    (void)uma_vez; (void)parametro; (void)contexto;
+    construir_indices_pontos_static();
+    return TRUE;
+}
+#else
+static pthread_once_t indices_pontos_uma_vez = PTHREAD_ONCE_INIT;
+#endif
+
+/* Retorna array com a posição de cada ponto turístico no array estático (na ordem original) */
+const int* obter_indices_pontos_static(int* count) {
+#ifdef _WIN32
+    InitOnceExecuteOnce(&indices_pontos_uma_vez, construir_indices_pontos_win, NULL, NULL);
+#else
+    pthread_once(&indices_pontos_uma_vez, construir_indices_pontos_static);
+#endif
+    *count = num_pontos_static;
+    return indices_pontos_static;
+}
+
 /* Popula grafo com todos os vértices do banco estático (grafo_data.c) */
 void inicializar_vertices(Grafo* g) {
     int count;
@@ -22,17 +79,136 @@ void inicializar_vertices(Grafo* g) {
     }
 }
 
-/* Popula grafo com todas as arestas do banco estático (grafo_data.c) */
+/* Função interna: Monta o CSR reverso (transposto) a partir do CSR direto, O(V + E) */
+static int construir_adjacencias_reversas(Grafo* g) {
+    int u, k, pos;
+    int* inicio = NULL;
+    int* origens = NULL;
+    int* pesos = NULL;
+    int* cursor = NULL;
+    int total = g->num_arestas;
+    
+    inicio = (int*)calloc(g->num_vertices + 1, sizeof(int));
+    origens = (int*)malloc((total > 0 ? total : 1) * sizeof(int));
+    pesos = (int*)malloc((total > 0 ? total : 1) * sizeof(int));
+    cursor = (int*)malloc((g->num_vertices > 0 ? g->num_vertices : 1) * sizeof(int));
+    
+    if (inicio == NULL || origens == NULL || pesos == NULL || cursor == NULL) {
+        LOG(LOG_ERRO, "Erro ao alocar memória para adjacências reversas\n");
+        free(inicio);
+        free(origens);
+        free(pesos);
+        free(cursor);
+        return 0;
+    }
+    
+    /* Contagem por destino → offsets → preenchimento (mesmo esquema do CSR direto) */
+    for (k = 0; k < total; k++) {
+        inicio[g->adj_destino[k] + 1]++;
+    }
+    for (u = 0; u < g->num_vertices; u++) {
+        inicio[u + 1] += inicio[u];
+    }
+    
+    memcpy(cursor, inicio, g->num_vertices * sizeof(int));
+    for (u = 0; u < g->num_vertices; u++) {
+        for (k = g->adj_inicio[u]; k < g->adj_inicio[u + 1]; k++) {
+            pos = cursor[g->adj_destino[k]]++;
+            origens[pos] = u;
+            pesos[pos] = g->adj_peso[k];
+        }
+    }
+    free(cursor);
+    
+    free(g->rev_inicio);
+    free(g->rev_origem);
+    free(g->rev_peso);
+    g->rev_inicio = inicio;
+    g->rev_origem = origens;
+    g->rev_peso = pesos;
+    
+    return 1;
+}
+
+/* Monta adjacências CSR: conta arestas por origem, acumula offsets e preenche (O(V + E)) */
+int construir_adjacencias(Grafo* g, const ArestaData* arestas, int count) {
+    int i, total, origem, destino, pos;
+    int* inicio = NULL;
+    int* destinos = NULL;
+    int* pesos = NULL;
+    int* cursor = NULL;
+    
+    if (g == NULL) {
+        return 0;
+    }
+    
+    /* 1. CONTAGEM: quantas arestas válidas saem de cada vértice */
+    inicio = (int*)calloc(g->num_vertices + 1, sizeof(int));
+    if (inicio == NULL) {
+        LOG(LOG_ERRO, "Erro ao alocar memória para adjacências\n");
+        return 0;
+    }
+    
+    for (i = 0; i < count; i++) {
+        origem = encontrar_indice_vertice(g, arestas[i].origem);
+        destino = encontrar_indice_vertice(g, arestas[i].destino);
+        if (origem != -1 && destino != -1) {  // Ignora arestas para vértices inexistentes
+            inicio[origem + 1]++;
+        }
+    }
+    
+    /* 2. OFFSETS: soma acumulada (inicio[u] = primeira aresta de u) */
+    for (i = 0; i < g->num_vertices; i++) {
+        inicio[i + 1] += inicio[i];
+    }
+    total = inicio[g->num_vertices];
+    
+    /* 3. PREENCHIMENTO: cada aresta vai para a próxima posição livre da sua origem */
+    destinos = (int*)malloc((total > 0 ? total : 1) * sizeof(int));
+    pesos = (int*)malloc((total > 0 ? total : 1) * sizeof(int));
+    cursor = (int*)malloc((g->num_vertices > 0 ? g->num_vertices : 1) * sizeof(int));
+    
+    if (destinos == NULL || pesos == NULL || cursor == NULL) {
+        LOG(LOG_ERRO, "Erro ao alocar memória para adjacências\n");
+        free(inicio);
+        free(destinos);
+        free(pesos);
+        free(cursor);
+        return 0;
+    }
+    
+    memcpy(cursor, inicio, g->num_vertices * sizeof(int));
+    for (i = 0; i < count; i++) {
+        origem = encontrar_indice_vertice(g, arestas[i].origem);
+        destino = encontrar_indice_vertice(g, arestas[i].destino);
+        if (origem != -1 && destino != -1) {
+            pos = cursor[origem]++;
+            destinos[pos] = destino;  // Guarda índice já resolvido (sem busca na relaxação)
+            pesos[pos] = arestas[i].distancia;
+        }
+    }
+    free(cursor);
+    
+    /* 4. SUBSTITUI adjacências anteriores do grafo */
+    free(g->adj_inicio);
+    free(g->adj_destino);
+    free(g->adj_peso);
+    g->adj_inicio = inicio;
+    g->adj_destino = destinos;
+    g->adj_peso = pesos;
+    g->num_arestas = total;
+    
+    /* 5. Calibra a heurística do A* com as arestas recém-montadas */
+    calcular_escala_heuristica(g);
+    
+    /* 6. CSR reverso para a busca bidirecional */
+    return construir_adjacencias_reversas(g);
+}
+
+/* Monta adjacências do grafo com todas as arestas do banco estático (grafo_data.c) */
 void inicializar_arestas(Grafo* g) {
     int count;
     const ArestaData* arestas = obter_arestas_static(&count);
     
-    int i;
-    /* Itera sobre array estático e adiciona cada aresta ao grafo dinâmico */
-    for (i = 0; i < count; i++) {
-        adicionar_aresta(g, 
-                        arestas[i].origem, 
-                        arestas[i].destino, 
-                        arestas[i].distancia);
-    }
+    construir_adjacencias(g, arestas, count);
 }
@@ -24,9 +24,15 @@ typedef struct {
 /* Funções de acesso aos dados estáticos (implementadas em grafo_data.c) */
 const VerticeData* obter_vertices_static(int* count);  // Retorna array de vértices
 const ArestaData* obter_arestas_static(int* count);    // Retorna array de arestas
+const int* obter_indices_pontos_static(int* count);    // Posições dos vértices tipo 1 (pontos) em VERTICES_STATIC (thread-safe)
 
 /* Funções de inicialização do grafo a partir do banco estático */
 void inicializar_vertices(Grafo* g);  // Popula grafo com vértices do banco
-void inicializar_arestas(Grafo* g);   // Popula grafo com arestas do banco
+void inicializar_arestas(Grafo* g);   // Monta adjacências CSR com arestas do banco
+
+/* Monta as adjacências CSR do grafo a partir de um array de arestas (por ID).
+ * Deve ser chamada depois que todos os vértices foram adicionados.
+ * Arestas com origem/destino inexistente são ignoradas. Retorna 1 se sucesso. */
+int construir_adjacencias(Grafo* g, const ArestaData* arestas, int count);
 
 #endif
\ No newline at end of file
@@ -0,0 +1,144 @@
+#include "grafo_heap.h"
+#include <stdlib.h>
+#include <limits.h>
+
+/* Função interna: Troca dois elementos do heap e atualiza suas posições */
+static void trocar(HeapMin* h, int i, int j) {
+    int tmp = h->elementos[i];
+    h->elementos[i] = h->elementos[j];
+    h->elementos[j] = tmp;
+    h->posicao[h->elementos[i]] = i;
+    h->posicao[h->elementos[j]] = j;
+}
+
+/* Função interna: Sobe elemento até restaurar a propriedade do heap */
+static void subir(HeapMin* h, int i) {
+    while (i > 0) {
+        int pai = (i - 1) / 2;
+        if (h->prioridade[h->elementos[pai]] <= h->prioridade[h->elementos[i]]) {
+            break;
+        }
+        trocar(h, i, pai);
+        i = pai;
+    }
+}
+
+/* Função interna: Desce elemento até restaurar a propriedade do heap */
+static void descer(HeapMin* h, int i) {
+    while (1) {
+        int esq = 2 * i + 1;
+        int dir = esq + 1;
+        int menor = i;
+        
+        if (esq < h->tamanho && h->prioridade[h->elementos[esq]] < h->prioridade[h->elementos[menor]]) {
+            menor = esq;
+        }
+        if (dir < h->tamanho && h->prioridade[h->elementos[dir]] < h->prioridade[h->elementos[menor]]) {
+            menor = dir;
+        }
+        if (menor == i) {
+            break;
+        }
+        trocar(h, i, menor);
+        i = menor;
+    }
+}
+
+/* Cria um heap vazio com espaço para 'capacidade' vértices */
+HeapMin* heap_criar(int capacidade) {
+    int i;
+    HeapMin* h = (HeapMin*)malloc(sizeof(HeapMin));
+    if (h == NULL) {
+        return NULL;
+    }
+    
+    h->elementos = (int*)malloc(capacidade * sizeof(int));
+    h->posicao = (int*)malloc(capacidade * sizeof(int));
+    h->prioridade = (int*)malloc(capacidade * sizeof(int));
+    
+    if (h->elementos == NULL || h->posicao == NULL || h->prioridade == NULL) {
+        heap_destruir(h);
+        return NULL;
+    }
+    
+    for (i = 0; i < capacidade; i++) {
+        h->posicao[i] = -1;  // Nenhum vértice no heap
+    }
+    h->tamanho = 0;
+    h->capacidade = capacidade;
+    
+    return h;
+}
+
+/* Libera toda memória do heap */
+void heap_destruir(HeapMin* h) {
+    if (h == NULL) {
+        return;
+    }
+    free(h->elementos);
+    free(h->posicao);
+    free(h->prioridade);
+    free(h);
+}
+
+/* Esvazia o heap (O(tamanho)), mantendo a memória alocada */
+void heap_limpar(HeapMin* h) {
+    int i;
+    for (i = 0; i < h->tamanho; i++) {
+        h->posicao[h->elementos[i]] = -1;
+    }
+    h->tamanho = 0;
+}
+
+/* Retorna 1 se o heap está vazio */
+int heap_vazio(const HeapMin* h) {
+    return h->tamanho == 0;
+}
+
+/* Insere vértice com prioridade, ou diminui sua prioridade se já estiver no heap (O(log V)) */
+void heap_inserir_ou_diminuir(HeapMin* h, int v, int prioridade) {
+    if (v < 0 || v >= h->capacidade) {
+        return;
+    }
+    
+    if (h->posicao[v] == -1) {
+        /* Novo elemento: insere no final e sobe */
+        h->elementos[h->tamanho] = v;
+        h->posicao[v] = h->tamanho;
+        h->prioridade[v] = prioridade;
+        h->tamanho++;
+        subir(h, h->tamanho - 1);
+    } else if (prioridade < h->prioridade[v]) {
+        /* Decrease-key: atualiza chave e sobe a partir da posição atual */
+        h->prioridade[v] = prioridade;
+        subir(h, h->posicao[v]);
+    }
+}
+
+/* Retorna a menor prioridade do heap sem removê-la (INT_MAX se heap vazio) */
+int heap_min_prioridade(const HeapMin* h) {
+    if (h->tamanho == 0) {
+        return INT_MAX;
+    }
+    return h->prioridade[h->elementos[0]];
+}
+
+/* Remove e retorna o vértice com menor prioridade (-1 se heap vazio) */
+int heap_extrair_min(HeapMin* h) {
+    int menor;
+    
+    if (h->tamanho == 0) {
+        return -1;
+    }
+    
+    menor = h->elementos[0];
+    h->tamanho--;
+    if (h->tamanho > 0) {
+        h->elementos[0] = h->elementos[h->tamanho];
+        h->posicao[h->elementos[0]] = 0;
+        descer(h, 0);
+    }
+    h->posicao[menor] = -1;
+    
+    return menor;
+}
@@ -0,0 +1,24 @@
+#ifndef GRAFO_HEAP_H
+#define GRAFO_HEAP_H
+
+/* Heap binário mínimo indexado (fila de prioridade com decrease-key)
+ * Cada elemento é um índice de vértice em [0, capacidade). A posição de cada
+ * vértice dentro do heap é mantida em 'posicao', permitindo diminuir a
+ * prioridade de um vértice já enfileirado em O(log V). */
+typedef struct {
+    int* elementos;    // Índices de vértices organizados como heap
+    int* posicao;      // posicao[v] = posição de v em 'elementos' (-1 = fora do heap)
+    int* prioridade;   // prioridade[v] = chave atual de v
+    int tamanho;       // Quantidade de elementos no heap
+    int capacidade;    // Quantidade máxima de vértices (num_vertices do grafo)
+} HeapMin;
+
+HeapMin* heap_criar(int capacidade);                     // Aloca heap vazio
+void heap_destruir(HeapMin* h);                          // Libera memória do heap
+void heap_limpar(HeapMin* h);                            // Esvazia heap para reutilização
+int heap_vazio(const HeapMin* h);                        // 1 se não há elementos
+void heap_inserir_ou_diminuir(HeapMin* h, int v, int prioridade);  // Insere v ou diminui sua chave
+int heap_extrair_min(HeapMin* h);                        // Remove e retorna vértice de menor chave (-1 se vazio)
+int heap_min_prioridade(const HeapMin* h);               // Menor chave sem remover (INT_MAX se vazio)
+
+#endif
@@ -0,0 +1,69 @@
+#ifndef _WIN32
+#define _POSIX_C_SOURCE 199309L  // clock_gettime com -std=c99
+#endif
+
+#include "grafo_log.h"
+#include <stdio.h>
+#include <stdarg.h>
+#ifdef _WIN32
+#include <windows.h>
+#else
+#include <time.h>
+#endif
+
+int nivel_log_atual = LOG_SILENCIOSO;            // Silencioso por padrão
+static CallbackTrace callback_trace = NULL;      // NULL = imprime no stdout
+
+/* Formata mensagem e entrega ao callback registrado (ou stdout) */
+void registrar_log(int nivel, const char* formato, ...) {
+    char mensagem[512];
+    va_list args;
+    
+    va_start(args, formato);
+    if (callback_trace != NULL) {
+        vsnprintf(mensagem, sizeof(mensagem), formato, args);
+        callback_trace(nivel, mensagem);
+    } else {
+        vprintf(formato, args);
+    }
+    va_end(args);
+}
+
+/* FUNÇÃO EXPORTADA: Define o nível de log (valores fora da faixa são ajustados) */
+EXPORT void definir_nivel_log(int nivel) {
+    if (nivel < LOG_SILENCIOSO) {
+        nivel = LOG_SILENCIOSO;
+    }
+    if (nivel > LOG_TRACE) {
+        nivel = LOG_TRACE;
+    }
+    nivel_log_atual = nivel;
+}
+
+/* FUNÇÃO EXPORTADA: Retorna o nível de log atual */
+EXPORT int obter_nivel_log() {
+    return nivel_log_atual;
+}
+
+/* FUNÇÃO EXPORTADA: Registra callback que recebe as mensagens de log/trace */
+EXPORT void definir_callback_trace(CallbackTrace callback) {
+    callback_trace = callback;
+}
+
+/* Relógio monotônico (não volta com ajustes de hora do sistema) em microssegundos */
+long long relogio_us(void) {
+#ifdef _WIN32
+    static LARGE_INTEGER frequencia;
+    LARGE_INTEGER agora;
+    if (frequencia.QuadPart == 0) {
+        QueryPerformanceFrequency(&frequencia);
+    }
+    QueryPerformanceCounter(&agora);
+    return (long long)(agora.QuadPart / frequencia.QuadPart) * 1000000LL +
+           (long long)(agora.QuadPart % frequencia.QuadPart) * 1000000LL / frequencia.QuadPart;
+#else
+    struct timespec ts;
+    clock_gettime(CLOCK_MONOTONIC, &ts);
+    return (long long)ts.tv_sec * 1000000LL + ts.tv_nsec / 1000;
+#endif
+}
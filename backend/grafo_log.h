@@ -0,0 +1,36 @@
+#ifndef GRAFO_LOG_H
+#define GRAFO_LOG_H
+
+/* Níveis de log do backend (configuráveis em tempo de execução) */
+#define LOG_SILENCIOSO 0   // Padrão: nenhuma saída
+#define LOG_ERRO       1   // Falhas de validação e alocação
+#define LOG_INFO       2   // Etapas de cada consulta e resumo da rota
+#define LOG_TRACE      3   // Cada vértice visitado e cada aresta relaxada (muito verboso)
+
+#ifdef _WIN32
+    #define EXPORT __declspec(dllexport)
+#else
+    #define EXPORT
+#endif
+
+/* Callback opcional que recebe cada mensagem em vez do stdout */
+typedef void (*CallbackTrace)(int nivel, const char* mensagem);
+
+/* Nível atual (lido diretamente pela macro LOG para não formatar nada quando desligado) */
+extern int nivel_log_atual;
+
+/* Só avalia os argumentos e formata a mensagem se o nível estiver habilitado */
+#define LOG(nivel, ...) \
+    do { if (nivel_log_atual >= (nivel)) registrar_log((nivel), __VA_ARGS__); } while (0)
+
+void registrar_log(int nivel, const char* formato, ...);  // Formata e envia ao callback ou stdout
+
+/* Relógio monotônico em microssegundos (tempos por fase das consultas) */
+long long relogio_us(void);
+
+/* Funções exportadas para configuração a partir do Python */
+EXPORT void definir_nivel_log(int nivel);                  // LOG_SILENCIOSO .. LOG_TRACE
+EXPORT int obter_nivel_log();
+EXPORT void definir_callback_trace(CallbackTrace callback); // NULL = volta a usar stdout
+
+#endif
@@ -23,58 +23,45 @@ EXPORT const char* get_test_message() {
 
 /* Função para obter o número de vértices do tipo PONTO (tipo == 1) */
 EXPORT int get_num_pontos() {
-    int count;
-    const VerticeData* vertices = obter_vertices_static(&count);
-    
-    int num_pontos = 0;
-    int i;
-    for (i = 0; i < count; i++) {
-        if (vertices[i].tipo == 1) {
-            num_pontos++;
-        }
-    }
-    
+    int num_pontos;
+    obter_indices_pontos_static(&num_pontos);  // Índice de pontos pré-computado
     return num_pontos;
 }
 
-/* Função otimizada para obter informações de um ponto específico por índice */
+/* Função otimizada para obter informações de um ponto específico por índice (O(1)) */
 EXPORT int get_ponto_info(int index, char* nome_out, int nome_len, 
                           char* categoria_out, int cat_len, 
                           int* id_out, int* x_out, int* y_out) {
-    int count;
+    int count, num_pontos;
     const VerticeData* vertices = obter_vertices_static(&count);
+    const int* indices_pontos = obter_indices_pontos_static(&num_pontos);
     
-    int ponto_index = 0;
-    int i;
-    
-    for (i = 0; i < count; i++) {
-        if (vertices[i].tipo == 1) {
-            if (ponto_index == index) {
-                /* Copiar informações diretamente do array estático */
-                if (nome_out != NULL && nome_len > 0) {
-                    strncpy(nome_out, vertices[i].nome, nome_len - 1);
-                    nome_out[nome_len - 1] = '\0';
-                }
-                if (categoria_out != NULL && cat_len > 0) {
-                    strncpy(categoria_out, vertices[i].categoria, cat_len - 1);
-                    categoria_out[cat_len - 1] = '\0';
-                }
-                if (id_out != NULL) {
-                    *id_out = vertices[i].id;
-                }
-                if (x_out != NULL) {
-                    *x_out = vertices[i].x;
-                }
-                if (y_out != NULL) {
-                    *y_out = vertices[i].y;
-                }
-                return 0;
-            }
-            ponto_index++;
-        }
+    if (indices_pontos == NULL || index < 0 || index >= num_pontos) {
+        return -1;
     }
     
-    return -1;
+    /* Acesso direto ao i-ésimo ponto pelo índice pré-computado */
+    int i = indices_pontos[index];
+    
+    /* Copiar informações diretamente do array estático */
+    if (nome_out != NULL && nome_len > 0) {
+        strncpy(nome_out, vertices[i].nome, nome_len - 1);
+        nome_out[nome_len - 1] = '\0';
+    }
+    if (categoria_out != NULL && cat_len > 0) {
+        strncpy(categoria_out, vertices[i].categoria, cat_len - 1);
+        categoria_out[cat_len - 1] = '\0';
+    }
+    if (id_out != NULL) {
+        *id_out = vertices[i].id;
+    }
+    if (x_out != NULL) {
+        *x_out = vertices[i].x;
+    }
+    if (y_out != NULL) {
+        *y_out = vertices[i].y;
+    }
+    return 0;
 }
 
 /* Função principal para testes locais */
@@ -102,10 +89,10 @@ int main() {
             if (grafo->vertices[i].tipo == 1) { /* Pontos de interesse */
                 printf("ID: %d | Nome: %s\n", 
                        grafo->vertices[i].id, 
-                       grafo->vertices[i].nome);
+                       vertice_nome(grafo, i));
                 printf("  Categoria: %s | Rua: %s\n", 
-                       grafo->vertices[i].categoria, 
-                       grafo->vertices[i].rua);
+                       vertice_categoria(grafo, i), 
+                       vertice_rua(grafo, i));
                 printf("  Coordenadas: (%d, %d)\n\n", 
                        grafo->vertices[i].x, 
                        grafo->vertices[i].y);
@@ -0,0 +1,170 @@
+/*
+ * bench_carga.c - BENCHMARK DE INICIALIZAÇÃO: CONSTRUÇÃO EM MEMÓRIA x GRAFO BINÁRIO MAPEADO
+ *
+ * Para cada tamanho de grade (mesmo gerador de bench_dijkstra.c) mede:
+ *   - construcao_ms: adicionar_vertice + construir_adjacencias (o que carregar_grafo()
+ *                    faz com os dados estáticos, inclusive o checksum de versão)
+ *   - gravacao_ms:   salvar_grafo_binario()
+ *   - mapeamento_ms: carregar_grafo_binario() (mapeamento + validação O(V + E), sem cópia)
+ *   - consulta_ms:   primeira rota no grafo mapeado (inclui as falhas de página)
+ *
+ * A distância da consulta é conferida com a do grafo construído em memória.
+ *
+ * COMPILAÇÃO (a partir da raiz do projeto):
+ *   gcc -std=c99 -O2 -Ibackend -o bench_carga benchmarks/bench_carga.c
+ *       backend/grafo.c backend/grafo_heap.c backend/grafo_algoritmos.c
+ *       backend/grafo_db.c backend/grafo_data.c backend/grafo_log.c
+ *       backend/grafo_binario.c -lm
+ *
+ * USO:
+ *   ./bench_carga [--arquivo caminho] [tamanho ...] > /dev/null
+ *   (tamanhos padrão: 10000 100000 1000000; a tabela sai em stderr)
+ */
+
+#include "grafo.h"
+#include "grafo_db.h"
+#include "grafo_algoritmos.h"
+#include "grafo_binario.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <math.h>
+#include <time.h>
+
+/* Tempo de CPU em milissegundos (clock() é portável entre MinGW e Linux) */
+static double agora_ms(void) {
+    return clock() * 1000.0 / CLOCKS_PER_SEC;
+}
+
+/* Gerador pseudoaleatório determinístico (xorshift32) */
+static unsigned int semente = 2463534242u;
+static int aleatorio(int min, int max) {
+    semente ^= semente << 13;
+    semente ^= semente >> 17;
+    semente ^= semente << 5;
+    return min + (int)(semente % (unsigned int)(max - min + 1));
+}
+
+/* Cria grade lado x lado: vértice (l, c) tem ID l * lado + c */
+static Grafo* gerar_grade(int lado, int* num_arestas_out) {
+    int l, c, num_arestas = 0;
+    ArestaData* arestas;
+    Grafo* g = criar_grafo();
+    if (g == NULL) {
+        return NULL;
+    }
+
+    for (l = 0; l < lado; l++) {
+        for (c = 0; c < lado; c++) {
+            adicionar_vertice(g, l * lado + c, "Esquina", "Esquina", "N/A", 0, c * 100, l * 100);
+        }
+    }
+
+    arestas = (ArestaData*)malloc(4 * (size_t)lado * lado * sizeof(ArestaData));
+    if (arestas == NULL) {
+        destruir_grafo(g);
+        return NULL;
+    }
+
+    for (l = 0; l < lado; l++) {
+        for (c = 0; c < lado; c++) {
+            int id = l * lado + c;
+            if (c + 1 < lado) {
+                int peso = aleatorio(50, 150);
+                arestas[num_arestas++] = (ArestaData){id, id + 1, peso};
+                arestas[num_arestas++] = (ArestaData){id + 1, id, peso};
+            }
+            if (l + 1 < lado) {
+                int peso = aleatorio(50, 150);
+                arestas[num_arestas++] = (ArestaData){id, id + lado, peso};
+                arestas[num_arestas++] = (ArestaData){id + lado, id, peso};
+            }
+        }
+    }
+
+    construir_adjacencias(g, arestas, num_arestas);
+    free(arestas);
+
+    *num_arestas_out = num_arestas;
+    return g;
+}
+
+int main(int argc, char** argv) {
+    int tamanhos[32];
+    int num_tamanhos = 0;
+    const char* arquivo = "bench_carga.grafo";
+    int i;
+
+    for (i = 1; i < argc; i++) {
+        if (strcmp(argv[i], "--arquivo") == 0 && i + 1 < argc) {
+            arquivo = argv[++i];
+        } else if (num_tamanhos < 32) {
+            tamanhos[num_tamanhos++] = atoi(argv[i]);
+        }
+    }
+    if (num_tamanhos == 0) {
+        tamanhos[num_tamanhos++] = 10000;
+        tamanhos[num_tamanhos++] = 100000;
+        tamanhos[num_tamanhos++] = 1000000;
+    }
+
+    fprintf(stderr, "%10s %10s %14s %12s %14s %12s\n", "vertices", "arestas", "construcao_ms",
+            "gravacao_ms", "mapeamento_ms", "consulta_ms");
+
+    for (i = 0; i < num_tamanhos; i++) {
+        int num_arestas, destino;
+        double t0, t_construcao, t_gravacao, t_mapeamento, t_consulta;
+        ResultadoRota* r_memoria;
+        ResultadoRota* r_mapa;
+        Grafo* mapeado;
+        Grafo* g;
+
+        t0 = agora_ms();
+        g = gerar_grade((int)sqrt((double)tamanhos[i]), &num_arestas);
+        if (g != NULL) {
+            g->versao = calcular_versao_grafo(g);
+        }
+        t_construcao = agora_ms() - t0;
+        if (g == NULL) {
+            fprintf(stderr, "Erro ao gerar grade %d\n", tamanhos[i]);
+            return 1;
+        }
+
+        t0 = agora_ms();
+        if (salvar_grafo_binario(g, arquivo) != 0) {
+            fprintf(stderr, "Erro ao gravar %s\n", arquivo);
+            return 1;
+        }
+        t_gravacao = agora_ms() - t0;
+
+        t0 = agora_ms();
+        mapeado = carregar_grafo_binario(arquivo);
+        t_mapeamento = agora_ms() - t0;
+        if (mapeado == NULL) {
+            fprintf(stderr, "Erro ao mapear %s\n", arquivo);
+            return 1;
+        }
+
+        destino = g->vertices[g->num_vertices - 1].id;  // Canto oposto da grade
+        t0 = agora_ms();
+        r_mapa = calcular_rota_modo(mapeado, 0, destino, MODO_BIDIRECIONAL);
+        t_consulta = agora_ms() - t0;
+        r_memoria = calcular_rota_modo(g, 0, destino, MODO_BIDIRECIONAL);
+
+        if (r_mapa == NULL || r_memoria == NULL || r_mapa->distancia_total != r_memoria->distancia_total ||
+            mapeado->versao != g->versao) {
+            fprintf(stderr, "[ERRO] Grafo mapeado diverge do grafo em memoria\n");
+        }
+
+        fprintf(stderr, "%10d %10d %14.1f %12.1f %14.3f %12.2f\n", g->num_vertices, num_arestas,
+                t_construcao, t_gravacao, t_mapeamento, t_consulta);
+
+        liberar_resultado(r_mapa);
+        liberar_resultado(r_memoria);
+        liberar_grafo(mapeado);
+        destruir_grafo(g);
+    }
+
+    remove(arquivo);
+    return 0;
+}
@@ -0,0 +1,179 @@
+/*
+ * bench_ch.c - BENCHMARK DE CONTRACTION HIERARCHIES EM GRADES SINTÉTICAS DE RUAS
+ *
+ * Para cada tamanho de grade (mesmo gerador de bench_dijkstra.c: ruas nos dois
+ * sentidos com quarteirões de 50 a 150 metros) mede:
+ *   - pre_ms:     tempo de construir_ch() (contração de todos os vértices)
+ *   - atalhos:    arestas de atalho criadas
+ *   - indice_kb:  tamanho do índice (obter_tamanho_ch)
+ *   - consultas ponto a ponto entre pares aleatórios com calcular_rota_ch()
+ *     e com MODO_DIJKSTRA: média de vértices fixados e tempo por consulta
+ *
+ * As distâncias das duas buscas são conferidas par a par.
+ *
+ * COMPILAÇÃO (a partir da raiz do projeto):
+ *   gcc -std=c99 -O2 -Ibackend -o bench_ch benchmarks/bench_ch.c
+ *       backend/grafo.c backend/grafo_heap.c backend/grafo_algoritmos.c
+ *       backend/grafo_db.c backend/grafo_data.c backend/grafo_log.c
+ *       backend/grafo_ch.c -lm
+ *
+ * USO:
+ *   ./bench_ch [--pares N] [tamanho ...] > /dev/null
+ *   (tamanhos padrão: 10000 100000; a tabela sai em stderr)
+ */
+
+#include "grafo.h"
+#include "grafo_db.h"
+#include "grafo_algoritmos.h"
+#include "grafo_ch.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <math.h>
+#include <time.h>
+
+/* Tempo de CPU em milissegundos (clock() é portável entre MinGW e Linux) */
+static double agora_ms(void) {
+    return clock() * 1000.0 / CLOCKS_PER_SEC;
+}
+
+/* Gerador pseudoaleatório determinístico (xorshift32) */
+static unsigned int semente = 2463534242u;
+static int aleatorio(int min, int max) {
+    semente ^= semente << 13;
+    semente ^= semente >> 17;
+    semente ^= semente << 5;
+    return min + (int)(semente % (unsigned int)(max - min + 1));
+}
+
+/* Cria grade lado x lado: vértice (l, c) tem ID l * lado + c */
+static Grafo* gerar_grade(int lado, int* num_arestas_out) {
+    int l, c, num_arestas = 0;
+    ArestaData* arestas;
+    Grafo* g = criar_grafo();
+    if (g == NULL) {
+        return NULL;
+    }
+
+    for (l = 0; l < lado; l++) {
+        for (c = 0; c < lado; c++) {
+            adicionar_vertice(g, l * lado + c, "Esquina", "Esquina", "N/A", 0, c * 100, l * 100);
+        }
+    }
+
+    arestas = (ArestaData*)malloc(4 * (size_t)lado * lado * sizeof(ArestaData));
+    if (arestas == NULL) {
+        destruir_grafo(g);
+        return NULL;
+    }
+
+    for (l = 0; l < lado; l++) {
+        for (c = 0; c < lado; c++) {
+            int id = l * lado + c;
+            if (c + 1 < lado) {
+                int peso = aleatorio(50, 150);
+                arestas[num_arestas++] = (ArestaData){id, id + 1, peso};
+                arestas[num_arestas++] = (ArestaData){id + 1, id, peso};
+            }
+            if (l + 1 < lado) {
+                int peso = aleatorio(50, 150);
+                arestas[num_arestas++] = (ArestaData){id, id + lado, peso};
+                arestas[num_arestas++] = (ArestaData){id + lado, id, peso};
+            }
+        }
+    }
+
+    construir_adjacencias(g, arestas, num_arestas);
+    free(arestas);
+
+    *num_arestas_out = num_arestas;
+    return g;
+}
+
+int main(int argc, char** argv) {
+    int tamanhos[32];
+    int num_tamanhos = 0;
+    int num_pares = 100;
+    int i;
+
+    for (i = 1; i < argc; i++) {
+        if (strcmp(argv[i], "--pares") == 0 && i + 1 < argc) {
+            num_pares = atoi(argv[++i]);
+        } else if (num_tamanhos < 32) {
+            tamanhos[num_tamanhos++] = atoi(argv[i]);
+        }
+    }
+    if (num_tamanhos == 0) {
+        tamanhos[num_tamanhos++] = 10000;
+        tamanhos[num_tamanhos++] = 100000;
+    }
+
+    fprintf(stderr, "%10s %10s %10s %10s %10s %8s %9s %9s %12s %10s\n", "vertices", "arestas", "pre_ms",
+            "atalhos", "indice_kb", "pares", "fix_dijk", "fix_ch", "dijkstra_ms", "ch_ms");
+
+    for (i = 0; i < num_tamanhos; i++) {
+        int num_arestas, p, divergentes = 0;
+        long long fixados_dijkstra = 0, fixados_ch = 0;
+        double t0, t_pre, t_dijkstra = 0, t_ch = 0;
+        HierarquiaCH* ch;
+        Grafo* g = gerar_grade((int)sqrt((double)tamanhos[i]), &num_arestas);
+        if (g == NULL) {
+            fprintf(stderr, "Erro ao gerar grade %d\n", tamanhos[i]);
+            return 1;
+        }
+
+        t0 = agora_ms();
+        ch = construir_ch(g);
+        t_pre = agora_ms() - t0;
+        if (ch == NULL) {
+            fprintf(stderr, "Erro no pre-processamento\n");
+            return 1;
+        }
+
+        for (p = 0; p < num_pares; p++) {
+            int origem = g->vertices[aleatorio(0, g->num_vertices - 1)].id;
+            int destino = g->vertices[aleatorio(0, g->num_vertices - 1)].id;
+            ResultadoRota* r_dijkstra;
+            ResultadoRota* r_ch;
+
+            if (origem == destino) {
+                continue;
+            }
+
+            t0 = agora_ms();
+            r_dijkstra = calcular_rota_modo(g, origem, destino, MODO_DIJKSTRA);
+            t_dijkstra += agora_ms() - t0;
+
+            t0 = agora_ms();
+            r_ch = calcular_rota_ch(g, ch, origem, destino);
+            t_ch += agora_ms() - t0;
+
+            if ((r_dijkstra == NULL) != (r_ch == NULL) ||
+                (r_dijkstra != NULL && r_dijkstra->distancia_total != r_ch->distancia_total)) {
+                divergentes++;
+            }
+            if (r_dijkstra != NULL) {
+                fixados_dijkstra += r_dijkstra->nos_visitados;
+                liberar_resultado(r_dijkstra);
+            }
+            if (r_ch != NULL) {
+                fixados_ch += r_ch->nos_visitados;
+                liberar_resultado(r_ch);
+            }
+        }
+
+        if (divergentes > 0) {
+            fprintf(stderr, "[ERRO] %d pares com distancias divergentes entre Dijkstra e CH\n", divergentes);
+        }
+
+        fprintf(stderr, "%10d %10d %10.1f %10d %10.0f %8d %9.0f %9.0f %12.3f %10.3f\n", g->num_vertices,
+                num_arestas, t_pre, obter_numero_atalhos_ch(ch), obter_tamanho_ch(ch) / 1024.0, num_pares,
+                (double)fixados_dijkstra / num_pares, (double)fixados_ch / num_pares,
+                t_dijkstra / num_pares, t_ch / num_pares);
+
+        liberar_ch(ch);
+        destruir_grafo(g);
+    }
+
+    return 0;
+}
@@ -0,0 +1,70 @@
+"""
+Benchmark: vazão das consultas em lote (RouterLib.calcular_distancias_lote) por número de threads
+
+Os mesmos pares origem → destino são resolvidos com 1, 2, 4, ... threads sobre um único
+grafo compartilhado (cada thread com sua área de trabalho no C). A escala ideal é
+consultas/s proporcional ao número de threads, até o número de núcleos da máquina.
+As distâncias de cada execução são conferidas com as da execução com 1 thread.
+
+Uso:
+    python benchmarks/bench_concorrencia.py [num_consultas] [caminho.grafo] [modo]
+    (modo: 0 = Dijkstra, 1 = A*, 2 = bidirecional, 3 = Contraction Hierarchies)
+"""
+import io
+import os
+import sys
+import time
+import random
+import contextlib
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from main import RouterLib  # noqa: E402
+
+
+def main():
+    num_consultas = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    caminho = sys.argv[2] if len(sys.argv) > 2 else None
+    modo = int(sys.argv[3]) if len(sys.argv) > 3 else RouterLib.MODO_BIDIRECIONAL
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        router = RouterLib(capacidade_cache=0, caminho_grafo=caminho)
+        if modo == RouterLib.MODO_CH:
+            router.carregar_ch()
+        vertices = router._exportar_vertices()
+
+    if not router.lib or not hasattr(router.lib, 'calcular_distancias_lote'):
+        print("Backend C reentrante não disponível")
+        return
+
+    rng = random.Random(42)
+    ids = [v['id'] for v in vertices]
+    pares = [(rng.choice(ids), rng.choice(ids)) for _ in range(num_consultas)]
+    nucleos = os.cpu_count() or 1
+
+    print(f"\nGrafo: {len(ids)} vértices, {num_consultas} consultas, modo {RouterLib.NOMES_MODOS[modo]}, "
+          f"{nucleos} núcleos")
+    print(f"{'threads':>8} {'total_ms':>10} {'consultas/s':>12} {'aceleracao':>11}")
+
+    referencia = None
+    tempo_base = None
+    threads = 1
+    while threads <= max(nucleos, 1) * 2:
+        router.calcular_distancias_lote(pares[:threads * 4], modo, trabalhadores=threads)  # Aquece áreas e pool
+        inicio = time.perf_counter()
+        distancias = router.calcular_distancias_lote(pares, modo, trabalhadores=threads)
+        total = time.perf_counter() - inicio
+
+        if referencia is None:
+            referencia, tempo_base = distancias, total
+        divergentes = sum(1 for a, b in zip(referencia, distancias) if a != b)
+        print(f"{threads:>8} {total * 1000:>10.1f} {num_consultas / total:>12.0f} {tempo_base / total:>10.2f}x"
+              + (f"  [ERRO] {divergentes} distâncias divergentes" if divergentes else ""))
+        threads *= 2
+
+    router.fechar()
+
+
+if __name__ == '__main__':
+    main()
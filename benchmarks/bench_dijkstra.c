@@ -0,0 +1,266 @@
+/*
+ * bench_dijkstra.c - BENCHMARK DO DIJKSTRA EM GRADES SINTÉTICAS DE RUAS
+ *
+ * Gera grades quadradas (lado x lado esquinas, ruas nos dois sentidos com
+ * quarteirões de 50 a 150 metros) e mede o tempo de uma busca completa a
+ * partir da esquina do canto superior esquerdo:
+ *   - heap:      executar_dijkstra() da biblioteca (heap binário indexado)
+ *   - varredura: seleção linear do menor vértice a cada iteração (O(V²)),
+ *                a mesma estratégia da versão anterior, como referência
+ *
+ * A varredura só é executada até --limite-varredura vértices (padrão 20000),
+ * pois acima disso um único teste leva minutos.
+ *
+ * Uma segunda tabela compara consultas ponto a ponto (pares aleatórios) entre
+ * MODO_DIJKSTRA, MODO_ASTAR e MODO_BIDIRECIONAL: média de vértices fixados e
+ * tempo por consulta.
+ *
+ * COMPILAÇÃO (a partir da raiz do projeto):
+ *   gcc -std=c99 -O2 -Ibackend -o bench_dijkstra benchmarks/bench_dijkstra.c
+ *       backend/grafo.c backend/grafo_heap.c backend/grafo_algoritmos.c
+ *       backend/grafo_db.c backend/grafo_data.c backend/grafo_log.c -lm
+ *
+ * USO:
+ *   ./bench_dijkstra [--limite-varredura N] [--pares N] [tamanho ...] > /dev/null
+ *   (tamanhos padrão: 10000 100000 1000000; a tabela sai em stderr)
+ */
+
+#include "grafo.h"
+#include "grafo_db.h"
+#include "grafo_algoritmos.h"
+#include <stdio.h>
+#include <stdlib.h>
+#include <string.h>
+#include <math.h>
+#include <time.h>
+#include <limits.h>
+
+/* Tempo de CPU em milissegundos (clock() é portável entre MinGW e Linux) */
+static double agora_ms(void) {
+    return clock() * 1000.0 / CLOCKS_PER_SEC;
+}
+
+/* Gerador pseudoaleatório determinístico (xorshift32) */
+static unsigned int semente = 2463534242u;
+static int aleatorio(int min, int max) {
+    semente ^= semente << 13;
+    semente ^= semente >> 17;
+    semente ^= semente << 5;
+    return min + (int)(semente % (unsigned int)(max - min + 1));
+}
+
+/* Cria grade lado x lado: vértice (l, c) tem ID l * lado + c */
+static Grafo* gerar_grade(int lado, int* num_arestas_out) {
+    int l, c, num_arestas = 0;
+    ArestaData* arestas;
+    Grafo* g = criar_grafo();
+    if (g == NULL) {
+        return NULL;
+    }
+    
+    for (l = 0; l < lado; l++) {
+        for (c = 0; c < lado; c++) {
+            adicionar_vertice(g, l * lado + c, "Esquina", "Esquina", "N/A", 0, c * 100, l * 100);
+        }
+    }
+    
+    /* Cada esquina tem no máximo 4 arestas de saída */
+    arestas = (ArestaData*)malloc(4 * (size_t)lado * lado * sizeof(ArestaData));
+    if (arestas == NULL) {
+        destruir_grafo(g);
+        return NULL;
+    }
+    
+    for (l = 0; l < lado; l++) {
+        for (c = 0; c < lado; c++) {
+            int id = l * lado + c;
+            if (c + 1 < lado) {  // Quarteirão horizontal (dois sentidos)
+                int peso = aleatorio(50, 150);
+                arestas[num_arestas++] = (ArestaData){id, id + 1, peso};
+                arestas[num_arestas++] = (ArestaData){id + 1, id, peso};
+            }
+            if (l + 1 < lado) {  // Quarteirão vertical (dois sentidos)
+                int peso = aleatorio(50, 150);
+                arestas[num_arestas++] = (ArestaData){id, id + lado, peso};
+                arestas[num_arestas++] = (ArestaData){id + lado, id, peso};
+            }
+        }
+    }
+    
+    construir_adjacencias(g, arestas, num_arestas);
+    free(arestas);
+    
+    *num_arestas_out = num_arestas;
+    return g;
+}
+
+/* Dijkstra de referência com seleção por varredura linear (O(V²)) */
+static long long dijkstra_varredura(Grafo* g, int indice_origem) {
+    int i, count;
+    long long soma = 0;
+    int* distancias = (int*)malloc(g->num_vertices * sizeof(int));
+    int* visitados = (int*)calloc(g->num_vertices, sizeof(int));
+    
+    for (i = 0; i < g->num_vertices; i++) {
+        distancias[i] = INT_MAX;
+    }
+    distancias[indice_origem] = 0;
+    
+    for (count = 0; count < g->num_vertices; count++) {
+        int u = -1;
+        for (i = 0; i < g->num_vertices; i++) {
+            if (!visitados[i] && distancias[i] != INT_MAX && (u == -1 || distancias[i] < distancias[u])) {
+                u = i;
+            }
+        }
+        if (u == -1) {
+            break;
+        }
+        visitados[u] = 1;
+        soma += distancias[u];
+        
+        for (i = g->adj_inicio[u]; i < g->adj_inicio[u + 1]; i++) {
+            int v = g->adj_destino[i];
+            if (!visitados[v] && distancias[u] + g->adj_peso[i] < distancias[v]) {
+                distancias[v] = distancias[u] + g->adj_peso[i];
+            }
+        }
+    }
+    
+    free(distancias);
+    free(visitados);
+    return soma;  // Checksum para conferir com a versão com heap
+}
+
+/* Consultas ponto a ponto entre pares aleatórios: soma vértices fixados e tempo por modo */
+static void comparar_modos(Grafo* g, int num_pares) {
+    int p, modo;
+    int* origens = (int*)malloc(num_pares * sizeof(int));
+    int* destinos = (int*)malloc(num_pares * sizeof(int));
+    long long fixados[3] = {0, 0, 0};
+    long long distancias[3] = {0, 0, 0};
+    double tempo[3] = {0, 0, 0};
+    
+    for (p = 0; p < num_pares; p++) {
+        origens[p] = g->vertices[aleatorio(0, g->num_vertices - 1)].id;
+        destinos[p] = g->vertices[aleatorio(0, g->num_vertices - 1)].id;
+    }
+    
+    for (modo = MODO_DIJKSTRA; modo <= MODO_BIDIRECIONAL; modo++) {
+        double t0 = agora_ms();
+        for (p = 0; p < num_pares; p++) {
+            ResultadoRota* r = calcular_rota_modo(g, origens[p], destinos[p], modo);
+            if (r != NULL) {
+                fixados[modo] += r->nos_visitados;
+                distancias[modo] += r->distancia_total;
+                liberar_resultado(r);
+            }
+        }
+        tempo[modo] = agora_ms() - t0;
+    }
+    
+    if (distancias[MODO_DIJKSTRA] != distancias[MODO_ASTAR] ||
+        distancias[MODO_DIJKSTRA] != distancias[MODO_BIDIRECIONAL]) {
+        fprintf(stderr, "[ERRO] Distancias divergentes: dijkstra=%lld astar=%lld bidirecional=%lld\n",
+                distancias[MODO_DIJKSTRA], distancias[MODO_ASTAR], distancias[MODO_BIDIRECIONAL]);
+    }
+    
+    fprintf(stderr, "%10d %8d %11.0f %11.0f %11.0f %12.2f %12.2f %12.2f\n", g->num_vertices, num_pares,
+            (double)fixados[MODO_DIJKSTRA] / num_pares, (double)fixados[MODO_ASTAR] / num_pares,
+            (double)fixados[MODO_BIDIRECIONAL] / num_pares,
+            tempo[MODO_DIJKSTRA] / num_pares, tempo[MODO_ASTAR] / num_pares,
+            tempo[MODO_BIDIRECIONAL] / num_pares);
+    
+    free(origens);
+    free(destinos);
+}
+
+int main(int argc, char** argv) {
+    int tamanhos[32];
+    int num_tamanhos = 0;
+    int limite_varredura = 20000;
+    int num_pares = 20;
+    int i;
+    
+    for (i = 1; i < argc; i++) {
+        if (strcmp(argv[i], "--limite-varredura") == 0 && i + 1 < argc) {
+            limite_varredura = atoi(argv[++i]);
+        } else if (strcmp(argv[i], "--pares") == 0 && i + 1 < argc) {
+            num_pares = atoi(argv[++i]);
+        } else if (num_tamanhos < 32) {
+            tamanhos[num_tamanhos++] = atoi(argv[i]);
+        }
+    }
+    if (num_tamanhos == 0) {
+        tamanhos[num_tamanhos++] = 10000;
+        tamanhos[num_tamanhos++] = 100000;
+        tamanhos[num_tamanhos++] = 1000000;
+    }
+    
+    fprintf(stderr, "%10s %10s %14s %12s %15s\n", "vertices", "arestas", "construcao_ms", "heap_ms", "varredura_ms");
+    
+    for (i = 0; i < num_tamanhos; i++) {
+        int lado = (int)sqrt((double)tamanhos[i]);
+        int num_arestas, v;
+        double t0, t_construcao, t_heap, t_varredura = -1;
+        int* distancias = NULL;
+        int* anteriores = NULL;
+        long long soma_heap = 0, soma_varredura = -1;
+        Grafo* g;
+        
+        t0 = agora_ms();
+        g = gerar_grade(lado, &num_arestas);
+        t_construcao = agora_ms() - t0;
+        if (g == NULL) {
+            fprintf(stderr, "Erro ao gerar grade %d\n", lado);
+            return 1;
+        }
+        
+        t0 = agora_ms();
+        if (!executar_dijkstra(g, 0, &distancias, &anteriores)) {
+            fprintf(stderr, "Erro no Dijkstra\n");
+            return 1;
+        }
+        t_heap = agora_ms() - t0;
+        for (v = 0; v < g->num_vertices; v++) {
+            if (distancias[v] != INT_MAX) {
+                soma_heap += distancias[v];
+            }
+        }
+        free(distancias);
+        free(anteriores);
+        
+        if (g->num_vertices <= limite_varredura) {
+            t0 = agora_ms();
+            soma_varredura = dijkstra_varredura(g, 0);
+            t_varredura = agora_ms() - t0;
+            if (soma_varredura != soma_heap) {
+                fprintf(stderr, "[ERRO] Distancias divergentes: heap=%lld varredura=%lld\n", soma_heap, soma_varredura);
+            }
+        }
+        
+        if (t_varredura >= 0) {
+            fprintf(stderr, "%10d %10d %14.1f %12.1f %15.1f\n", g->num_vertices, num_arestas, t_construcao, t_heap, t_varredura);
+        } else {
+            fprintf(stderr, "%10d %10d %14.1f %12.1f %15s\n", g->num_vertices, num_arestas, t_construcao, t_heap, "-");
+        }
+        
+        destruir_grafo(g);
+    }
+    
+    fprintf(stderr, "\n%10s %8s %11s %11s %11s %12s %12s %12s\n", "vertices", "pares",
+            "fix_dijk", "fix_astar", "fix_bidir", "dijkstra_ms", "astar_ms", "bidir_ms");
+    
+    for (i = 0; i < num_tamanhos; i++) {
+        int num_arestas;
+        Grafo* g = gerar_grade((int)sqrt((double)tamanhos[i]), &num_arestas);
+        if (g == NULL) {
+            fprintf(stderr, "Erro ao gerar grade %d\n", tamanhos[i]);
+            return 1;
+        }
+        comparar_modos(g, num_pares);
+        destruir_grafo(g);
+    }
+    
+    return 0;
+}
@@ -0,0 +1,69 @@
+"""
+Benchmark: motor C (RouterLib + DLL/SO) x motor Python (motor_python.py) no mesmo grafo
+
+Os dois motores respondem às mesmas consultas origem → destino sorteadas entre os
+vértices do grafo exportado (grafo.json). As distâncias são conferidas entre si.
+
+Uso:
+    python benchmarks/bench_motores.py [num_consultas] [caminho_grafo.json]
+"""
+import io
+import os
+import sys
+import time
+import random
+import contextlib
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from main import RouterLib      # noqa: E402
+from motor_python import MotorPython  # noqa: E402
+
+
+def medir(calcular, pares):
+    """Executa todas as consultas e retorna (tempo total em s, lista de distâncias)"""
+    distancias = []
+    with contextlib.redirect_stdout(io.StringIO()):  # Ignora logs por consulta
+        inicio = time.perf_counter()
+        for origem, destino in pares:
+            resultado = calcular(origem, destino)
+            distancias.append(resultado['distancia_total'] if resultado else None)
+        total = time.perf_counter() - inicio
+    return total, distancias
+
+
+def main():
+    num_consultas = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    caminho = sys.argv[2] if len(sys.argv) > 2 else os.path.join(RAIZ, 'grafo.json')
+
+    motor = MotorPython(caminho)
+    router = RouterLib()
+
+    rng = random.Random(42)
+    ids = list(motor.ids)
+    pares = []
+    while len(pares) < num_consultas:
+        origem, destino = rng.choice(ids), rng.choice(ids)
+        if origem != destino:
+            pares.append((origem, destino))
+
+    print(f"\nGrafo: {motor.num_vertices} vértices, {motor.num_arestas} arestas, {num_consultas} consultas")
+    print(f"{'motor':<10} {'total_ms':>10} {'us/consulta':>12}")
+
+    tempo_py, dist_py = medir(motor.calcular_rota_dijkstra, pares)
+    print(f"{'python':<10} {tempo_py * 1000:>10.1f} {tempo_py / num_consultas * 1e6:>12.1f}")
+
+    if router.lib:
+        tempo_c, dist_c = medir(router.calcular_rota_dijkstra, pares)
+        print(f"{'c':<10} {tempo_c * 1000:>10.1f} {tempo_c / num_consultas * 1e6:>12.1f}")
+        divergentes = sum(1 for a, b in zip(dist_py, dist_c) if a != b)
+        print(f"Razão python/c: {tempo_py / tempo_c:.1f}x | distâncias divergentes: {divergentes}")
+    else:
+        print("⚠️ Backend C não carregado: apenas o motor Python foi medido")
+
+    router.fechar()
+
+
+if __name__ == '__main__':
+    main()
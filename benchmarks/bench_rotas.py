@@ -0,0 +1,236 @@
+"""
+Benchmark: RouterLib.calcular_rota_dijkstra de ponta a ponta, por fase, do grafo atual a 1M vértices
+
+Para cada tamanho (grafo atual + cidades sintéticas de benchmarks/cidade_sintetica.py) mede:
+- construção: geração e gravação do grafo sintético (reaproveitado entre execuções),
+  carga no RouterLib e exportação dos vértices usada pela geometria;
+- por consulta (pares entre pontos turísticos), em µs:
+    busca          só a busca no C (calcular_distancias_lote com 1 par, sem caminho)
+    reconstrucao   caminho no C (calcular_rota_area − busca)
+    marshalling    custo fixo de uma chamada ctypes + cópia do ResultadoRota para dict
+    geometria      IDs → coordenadas e ruas (resolver_geometria)
+    total          calcular_rota_dijkstra sem cache; "outros" = total − soma das fases
+
+Os resultados vão para um JSON (commit, máquina, parâmetros e medidas por tamanho/modo);
+--comparar ANTERIOR.json mostra a razão entre as duas execuções.
+
+Uso:
+    python benchmarks/bench_rotas.py [--tamanhos atual,1000,10000,100000,1000000] [--consultas 200]
+        [--modos 2] [--saida bench_rotas.json] [--comparar anterior.json] [--dados DIR]
+"""
+import argparse
+import contextlib
+import ctypes
+import gc
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from main import RouterLib  # noqa: E402
+from cidade_sintetica import gerar_arquivo  # noqa: E402
+
+TAMANHOS = 'atual,1000,10000,100000,1000000'
+FASES = ('busca', 'reconstrucao', 'marshalling', 'geometria', 'outros')
+
+
+def versao_codigo() -> str:
+    """Commit atual (com '+' se houver alterações não commitadas); 'desconhecido' fora do git"""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        alterado = subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=RAIZ,
+                                  capture_output=True, text=True).stdout.strip()
+        return commit + ('+' if alterado else '')
+    except (OSError, subprocess.CalledProcessError):
+        return 'desconhecido'
+
+
+def percentil(ordenados, p: float) -> float:
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+def preparar_grafo(tamanho: str, pasta: str, semente: int, densidade: float):
+    """Caminho do grafo e tempos de construção (None = grafo atual do projeto)"""
+    if tamanho == 'atual':
+        return None, {}
+    caminho = os.path.join(pasta, f"cidade_{tamanho}_s{semente}_d{densidade}.grafo")
+    if os.path.exists(caminho):
+        return caminho, {'reaproveitado': True}
+    os.makedirs(pasta, exist_ok=True)
+    with contextlib.redirect_stdout(io.StringIO()):
+        info = gerar_arquivo(caminho, int(tamanho), semente, densidade)
+    return caminho, {'geracao_ms': info['geracao_ms'], 'gravacao_ms': info['gravacao_ms']}
+
+
+def medir_consultas(router: RouterLib, pares, modo: int) -> dict:
+    """Tempos por fase (µs) de cada consulta; pares sem rota são contados à parte"""
+    lib, grafo = router.lib, router.grafo
+    area = router._area_trabalho()
+    origem_c, destino_c = (ctypes.c_int * 1)(), (ctypes.c_int * 1)()
+    distancia_c, visitados_c = (ctypes.c_int * 1)(), (ctypes.c_int * 1)()
+    relogio = time.perf_counter
+
+    amostras = {fase: [] for fase in FASES}
+    totais, visitados, comprimentos = [], [], []
+    sem_rota = 0
+    for origem, destino in pares:
+        origem_c[0], destino_c[0] = origem, destino
+        t0 = relogio()
+        lib.calcular_distancias_lote(grafo, area, 1, origem_c, destino_c, modo, distancia_c, visitados_c)
+        t1 = relogio()
+        resultado_ptr = lib.calcular_rota_area(grafo, area, origem, destino, modo)
+        t2 = relogio()
+        if not resultado_ptr:
+            sem_rota += 1
+            continue
+        rota = router._converter_resultado(resultado_ptr)
+        t3 = relogio()
+        router.resolver_geometria(rota['sequencia_ids'])
+        t4 = relogio()
+        lib.obter_numero_vertices_grafo(grafo)  # Chamada ctypes vazia: custo fixo da travessia
+        t5 = relogio()
+        router.calcular_rota_dijkstra(origem, destino, modo)
+        t6 = relogio()
+
+        chamada = t5 - t4
+        fases = {'busca': max(0.0, (t1 - t0) - chamada), 'reconstrucao': max(0.0, (t2 - t1) - (t1 - t0)),
+                 'marshalling': chamada + (t3 - t2), 'geometria': t4 - t3}
+        fases['outros'] = max(0.0, (t6 - t5) - sum(fases.values()))
+        for fase, valor in fases.items():
+            amostras[fase].append(valor * 1e6)
+        totais.append((t6 - t5) * 1e6)
+        visitados.append(rota['nos_visitados'])
+        comprimentos.append(rota['num_ids'])
+
+    totais.sort()
+    n = len(totais) or 1
+    return {
+        'consultas': len(pares), 'sem_rota': sem_rota,
+        'fases_us': {fase: sum(valores) / n for fase, valores in amostras.items()},
+        'total_us': {'media': sum(totais) / n, 'p50': percentil(totais, 50), 'p90': percentil(totais, 90),
+                     'p99': percentil(totais, 99), 'max': totais[-1] if totais else 0.0},
+        'nos_visitados_medio': sum(visitados) / n,
+        'vertices_rota_medio': sum(comprimentos) / n,
+    }
+
+
+def executar_tamanho(tamanho: str, args) -> list:
+    caminho, construcao = preparar_grafo(tamanho, args.dados, args.semente, args.densidade_pontos)
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        inicio = time.perf_counter()
+        router = RouterLib(capacidade_cache=0, caminho_grafo=caminho)
+        construcao['carga_ms'] = (time.perf_counter() - inicio) * 1000
+        inicio = time.perf_counter()
+        vertices = router._exportar_vertices()
+        router.resolver_geometria([])  # Monta o índice id → vértice da geometria
+        construcao['exportacao_ms'] = (time.perf_counter() - inicio) * 1000
+    router.verboso = False
+
+    resultados = []
+    if not router.lib or not router.grafo or not hasattr(router.lib, 'calcular_rota_area') or vertices is None:
+        print("⚠️ Backend C reentrante não disponível: tamanho ignorado")
+        router.fechar()
+        return resultados
+
+    pontos = [v['id'] for v in vertices if v['tipo'] == 1]
+    candidatos = pontos if len(pontos) >= 2 else [v['id'] for v in vertices]
+    rng = random.Random(args.semente)
+    pares = []
+    while len(pares) < args.consultas:
+        origem, destino = rng.choice(candidatos), rng.choice(candidatos)
+        if origem != destino:
+            pares.append((origem, destino))
+
+    num_arestas = router.lib.obter_numero_arestas_grafo(router.grafo) \
+        if hasattr(router.lib, 'obter_numero_arestas_grafo') else None
+    for modo in args.modos:
+        medidas = medir_consultas(router, pares, modo)
+        resultados.append({'tamanho': tamanho, 'vertices': len(vertices), 'arestas': num_arestas,
+                           'pontos': len(pontos), 'modo': modo, 'algoritmo': RouterLib.NOMES_MODOS[modo],
+                           'construcao_ms': construcao, **medidas})
+        fases = medidas['fases_us']
+        total = medidas['total_us']
+        print(f"{tamanho:>9} {len(vertices):>9} {RouterLib.NOMES_MODOS[modo]:<22} "
+              + ' '.join(f"{fases[f]:>12.1f}" for f in FASES)
+              + f" {total['p50']:>10.1f} {total['p99']:>10.1f}")
+
+    router.fechar()
+    del router, vertices
+    gc.collect()
+    return resultados
+
+
+def comparar(resultados: list, caminho: str):
+    with open(caminho, 'r', encoding='utf-8') as f:
+        anterior = json.load(f)
+    base = {(r['tamanho'], r['modo']): r for r in anterior['resultados']}
+    print(f"\nComparação com {anterior.get('commit', '?')} (razão atual/anterior; < 1 = mais rápido)")
+    print(f"{'tamanho':>9} {'modo':<22} " + ' '.join(f"{f:>12}" for f in FASES) + f" {'p50':>10} {'p99':>10}")
+    for r in resultados:
+        b = base.get((r['tamanho'], r['modo']))
+        if b is None:
+            continue
+
+        def razao(atual, antes):
+            return f"{atual / antes:>12.2f}" if antes else f"{'-':>12}"
+        print(f"{r['tamanho']:>9} {r['algoritmo']:<22} "
+              + ' '.join(razao(r['fases_us'][f], b['fases_us'][f]) for f in FASES)
+              + f" {r['total_us']['p50'] / b['total_us']['p50'] if b['total_us']['p50'] else 0:>10.2f}"
+              + f" {r['total_us']['p99'] / b['total_us']['p99'] if b['total_us']['p99'] else 0:>10.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark por fase de calcular_rota_dijkstra")
+    parser.add_argument('--tamanhos', default=TAMANHOS, help="Lista: 'atual' e/ou números de vértices")
+    parser.add_argument('--consultas', type=int, default=200, help="Consultas por tamanho e modo")
+    parser.add_argument('--modos', default='2', help="0 Dijkstra, 1 A*, 2 bidirecional (lista)")
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--densidade-pontos', type=float, default=0.05)
+    parser.add_argument('--dados', default=os.path.join(tempfile.gettempdir(), 'roteador_bench'),
+                        help="Pasta dos grafos sintéticos gerados")
+    parser.add_argument('--saida', default='bench_rotas.json')
+    parser.add_argument('--comparar', help="JSON de uma execução anterior")
+    args = parser.parse_args()
+    args.modos = [int(m) for m in args.modos.split(',')]
+    tamanhos = [t.strip() for t in args.tamanhos.split(',') if t.strip()]
+
+    print(f"\n{args.consultas} consultas por tamanho, fases em µs por consulta (média), total p50/p99")
+    print(f"{'tamanho':>9} {'vertices':>9} {'modo':<22} " + ' '.join(f"{f:>12}" for f in FASES)
+          + f" {'p50':>10} {'p99':>10}")
+
+    resultados = []
+    for tamanho in tamanhos:
+        resultados += executar_tamanho(tamanho, args)
+
+    relatorio = {
+        'commit': versao_codigo(),
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'maquina': {'sistema': platform.platform(), 'processador': platform.processor() or platform.machine(),
+                    'nucleos': os.cpu_count(), 'python': platform.python_version()},
+        'parametros': {'consultas': args.consultas, 'semente': args.semente,
+                       'densidade_pontos': args.densidade_pontos},
+        'resultados': resultados,
+    }
+    with open(args.saida, 'w', encoding='utf-8') as f:
+        json.dump(relatorio, f, ensure_ascii=False, indent=2)
+    print(f"\n💾 Resultados gravados em {args.saida}")
+
+    if args.comparar:
+        comparar(resultados, args.comparar)
+
+
+if __name__ == '__main__':
+    main()
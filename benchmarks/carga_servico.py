@@ -0,0 +1,167 @@
+"""
+Gerador de carga para o serviço HTTP (python main.py serve)
+
+Abre N conexões keep-alive e dispara requisições em sequência em cada uma durante
+o tempo pedido. Os pares origem → destino são sorteados entre os pontos de /pontos.
+Mostra vazão (req/s) e latências p50/p90/p99/máxima, e o resumo de /metricas.
+
+Uso:
+    python benchmarks/carga_servico.py [--url http://127.0.0.1:8080] [--conexoes 16]
+        [--duracao 10] [--rota distancia|rota|pontos|lote] [--pares 200] [--servidor]
+
+    --servidor sobe o serviço (main.py serve) num subprocesso na porta da --url
+    --pares limita os pares distintos sorteados; repetições exercitam cache e agrupamento
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from urllib.parse import urlsplit
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+async def requisitar(reader, writer, metodo: str, alvo: str, host: str, corpo: bytes = b''):
+    """Envia uma requisição HTTP/1.1 keep-alive e devolve (status, corpo)"""
+    cabecalho = (f"{metodo} {alvo} HTTP/1.1\r\nHost: {host}\r\n"
+                 + (f"Content-Type: application/json\r\nContent-Length: {len(corpo)}\r\n" if corpo else "")
+                 + "\r\n")
+    writer.write(cabecalho.encode('latin-1') + corpo)
+    await writer.drain()
+
+    linhas = (await reader.readuntil(b'\r\n\r\n')).decode('latin-1').split('\r\n')
+    status = int(linhas[0].split(' ')[1])
+    tamanho = 0
+    for linha in linhas[1:]:
+        nome, _, valor = linha.partition(':')
+        if nome.strip().lower() == 'content-length':
+            tamanho = int(valor)
+    return status, await reader.readexactly(tamanho)
+
+
+async def obter(host: str, porta: int, alvo: str):
+    reader, writer = await asyncio.open_connection(host, porta)
+    try:
+        return await requisitar(reader, writer, 'GET', alvo, host)
+    finally:
+        writer.close()
+
+
+async def aguardar_servico(host: str, porta: int, limite_s: float) -> bool:
+    fim = time.monotonic() + limite_s
+    while time.monotonic() < fim:
+        try:
+            status, _ = await obter(host, porta, '/saude')
+            if status == 200:
+                return True
+        except OSError:
+            pass
+        await asyncio.sleep(0.2)
+    return False
+
+
+def montar_requisicao(args, pares, rng):
+    """(método, alvo, corpo) da próxima requisição"""
+    if args.rota == 'pontos':
+        return 'GET', '/pontos', b''
+    if args.rota == 'lote':
+        lote = [rng.choice(pares) for _ in range(args.tamanho_lote)]
+        return 'POST', '/lote', json.dumps({'pares': lote, 'modo': args.modo}).encode()
+    origem, destino = rng.choice(pares)
+    return 'GET', f'/{args.rota}?origem={origem}&destino={destino}&modo={args.modo}', b''
+
+
+async def conexao(host, porta, args, pares, semente, fim, latencias, status_contagem):
+    rng = random.Random(semente)
+    reader, writer = await asyncio.open_connection(host, porta)
+    try:
+        while time.perf_counter() < fim:
+            metodo, alvo, corpo = montar_requisicao(args, pares, rng)
+            inicio = time.perf_counter()
+            status, _ = await requisitar(reader, writer, metodo, alvo, host, corpo)
+            latencias.append(time.perf_counter() - inicio)
+            status_contagem[status] = status_contagem.get(status, 0) + 1
+    finally:
+        writer.close()
+
+
+def percentil(ordenados, p: float) -> float:
+    if not ordenados:
+        return 0.0
+    return ordenados[min(len(ordenados) - 1, int(p / 100 * len(ordenados)))]
+
+
+async def executar(args):
+    url = urlsplit(args.url)
+    host, porta = url.hostname or '127.0.0.1', url.port or 80
+
+    if not await aguardar_servico(host, porta, args.espera):
+        print(f"❌ Serviço não respondeu em {args.url}/saude")
+        return
+
+    status, corpo = await obter(host, porta, '/pontos')
+    ids = [p['id'] for p in json.loads(corpo)] if status == 200 else []
+    if len(ids) < 2:
+        print("❌ /pontos retornou menos de 2 pontos")
+        return
+    rng = random.Random(42)
+    pares = []
+    while len(pares) < args.pares:
+        o, d = rng.sample(ids, 2)
+        pares.append((o, d))
+
+    print(f"🚀 {args.conexoes} conexões por {args.duracao:.0f}s em /{args.rota} "
+          f"({len(pares)} pares, modo {args.modo})")
+    latencias, status_contagem = [], {}
+    inicio = time.perf_counter()
+    fim = inicio + args.duracao
+    await asyncio.gather(*(conexao(host, porta, args, pares, i, fim, latencias, status_contagem)
+                           for i in range(args.conexoes)))
+    total = time.perf_counter() - inicio
+
+    latencias.sort()
+    print(f"\n{'requisicoes':>12} {'req/s':>10} {'p50_ms':>8} {'p90_ms':>8} {'p99_ms':>8} {'max_ms':>8}")
+    print(f"{len(latencias):>12} {len(latencias) / total:>10.0f} {percentil(latencias, 50) * 1000:>8.2f} "
+          f"{percentil(latencias, 90) * 1000:>8.2f} {percentil(latencias, 99) * 1000:>8.2f} "
+          f"{(latencias[-1] if latencias else 0) * 1000:>8.2f}")
+    print("status: " + ", ".join(f"{s}={n}" for s, n in sorted(status_contagem.items())))
+
+    status, corpo = await obter(host, porta, '/metricas')
+    if status == 200:
+        for linha in corpo.decode('utf-8').splitlines():
+            if linha.startswith(('roteador_requisicoes_agrupadas_total', 'roteador_cache_')):
+                print(linha)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gerador de carga para main.py serve")
+    parser.add_argument('--url', default='http://127.0.0.1:8080')
+    parser.add_argument('--conexoes', type=int, default=16)
+    parser.add_argument('--duracao', type=float, default=10.0, help="Segundos de carga")
+    parser.add_argument('--rota', choices=('distancia', 'rota', 'pontos', 'lote'), default='distancia')
+    parser.add_argument('--modo', type=int, default=2, help="0 Dijkstra, 1 A*, 2 bidirecional, 3 CH")
+    parser.add_argument('--pares', type=int, default=200, help="Pares distintos sorteados")
+    parser.add_argument('--tamanho-lote', type=int, default=100, help="Pares por requisição em /lote")
+    parser.add_argument('--servidor', action='store_true', help="Sobe main.py serve num subprocesso")
+    parser.add_argument('--espera', type=float, default=30.0, help="Segundos aguardando /saude")
+    args, extras = parser.parse_known_args()  # Extras vão para o main.py serve (ex.: --grafo, --ch)
+
+    processo = None
+    if args.servidor:
+        porta = urlsplit(args.url).port or 8080
+        processo = subprocess.Popen([sys.executable, os.path.join(RAIZ, 'main.py'), 'serve',
+                                     '--porta', str(porta)] + extras, cwd=RAIZ)
+    try:
+        asyncio.run(executar(args))
+    finally:
+        if processo:
+            processo.terminate()
+            processo.wait()
+
+
+if __name__ == '__main__':
+    main()
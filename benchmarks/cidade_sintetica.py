@@ -0,0 +1,163 @@
+"""
+Gerador de grafos sintéticos de cidade para os benchmarks (de milhares a milhões de vértices)
+
+Malha de quadras com perturbação, no formato do importador OSM (ferramentas/importar_osm.py):
+- Esquinas numa grade de quadras de ~100 m com deslocamento aleatório; ~8% dos trechos
+  removidos (quadras irregulares e ruas sem saída).
+- Cada trecho entre esquinas tem 0 a 2 vértices intermediários (curvas/números), como nos
+  extratos OSM: esquinas com grau 3–4, intermediários com grau 2, ~2,2 arestas dirigidas por vértice.
+- Uma a cada 10 linhas da grade é avenida de mão dupla; das demais ruas, 1/3 são de mão única
+  com sentidos alternados.
+- Pontos turísticos (tipo 1) substituem vértices intermediários na proporção --densidade-pontos,
+  com as categorias do mapa atual.
+- Pesos em metros: comprimento do trecho com acréscimo aleatório de até 10% (nunca abaixo
+  da distância euclidiana, então a heurística do A* continua admissível).
+
+Uso:
+    python benchmarks/cidade_sintetica.py NUM_VERTICES [--saida cidade.grafo] [--semente 42]
+        [--densidade-pontos 0.05] [--json grafo.json]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+from array import array
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, 'ferramentas'))
+
+QUADRA_M = 100  # Distância média entre esquinas
+DESLOCAMENTO_M = 15  # Perturbação máxima das esquinas
+PROB_TRECHO_REMOVIDO = 0.08
+INTERMEDIARIOS = (0, 1, 1, 2)  # Vértices intermediários sorteados por trecho (média 1)
+VERTICES_POR_ESQUINA = 1 + 2 * (1 - PROB_TRECHO_REMOVIDO) * 1.0  # Esquina + intermediários dos 2 trechos
+DENSIDADE_PONTOS = 0.05
+CATEGORIAS = ('Restaurante', 'Moda e Vestuário', 'Comércio', 'Centro Histórico', 'Bar', 'Banco', 'Saúde',
+              'Hotel', 'Cafeteria', 'Padaria', 'Supermercado', 'Galeria', 'Entretenimento', 'Estacionamento')
+
+
+def gerar_cidade(num_vertices: int, semente: int = 42, densidade_pontos: float = DENSIDADE_PONTOS):
+    """Retorna (vertices, pinos_info, arestas) no formato de importar_osm.gravar_binario"""
+    rng = random.Random(semente)
+    lado = max(2, math.ceil(math.sqrt(num_vertices / VERTICES_POR_ESQUINA)))
+
+    vertices = {'id': array('i'), 'x': array('i'), 'y': array('i'), 'rua': []}
+    arestas = {'origem': array('i'), 'destino': array('i'), 'peso': array('i')}
+    intermediarios = array('i')
+
+    def nome_rua(linha: int, horizontal: bool) -> str:
+        tipo = "Avenida" if linha % 10 == 0 else "Rua"
+        return f"{tipo} {'H' if horizontal else 'V'}{linha}"
+
+    def sentido_rua(linha: int) -> int:
+        """1 = sentido crescente, -1 = decrescente, 0 = mão dupla"""
+        if linha % 10 == 0 or linha % 3 != 1:
+            return 0
+        return 1 if (linha // 3) % 2 == 0 else -1
+
+    def novo_vertice(x: float, y: float, rua: str) -> int:
+        vid = len(vertices['id'])
+        vertices['id'].append(vid)
+        vertices['x'].append(int(round(x)))
+        vertices['y'].append(int(round(y)))
+        vertices['rua'].append(rua)
+        return vid
+
+    def ligar(a: int, b: int, sentido: int):
+        dx = vertices['x'][a] - vertices['x'][b]
+        dy = vertices['y'][a] - vertices['y'][b]
+        peso = max(1, math.ceil(math.hypot(dx, dy) * (1 + 0.1 * rng.random())))
+        if sentido >= 0:
+            arestas['origem'].append(a)
+            arestas['destino'].append(b)
+            arestas['peso'].append(peso)
+        if sentido <= 0:
+            arestas['origem'].append(b)
+            arestas['destino'].append(a)
+            arestas['peso'].append(peso)
+
+    # Esquinas (IDs 0 .. lado² - 1, linha a linha)
+    for i in range(lado):
+        rua = nome_rua(i, True)
+        for j in range(lado):
+            novo_vertice(j * QUADRA_M + rng.uniform(-DESLOCAMENTO_M, DESLOCAMENTO_M),
+                         i * QUADRA_M + rng.uniform(-DESLOCAMENTO_M, DESLOCAMENTO_M), rua)
+
+    # Trechos horizontais (ao longo da linha i) e verticais (ao longo da coluna j)
+    for horizontal in (True, False):
+        for linha in range(lado):
+            rua = nome_rua(linha, horizontal)
+            sentido = sentido_rua(linha)
+            avenida = linha % 10 == 0
+            for k in range(lado - 1):
+                a = linha * lado + k if horizontal else k * lado + linha
+                b = a + 1 if horizontal else a + lado
+                if not avenida and rng.random() < PROB_TRECHO_REMOVIDO:
+                    continue
+                anterior = a
+                quantidade = rng.choice(INTERMEDIARIOS)
+                for passo in range(1, quantidade + 1):
+                    t = passo / (quantidade + 1)
+                    x = vertices['x'][a] + t * (vertices['x'][b] - vertices['x'][a]) + rng.uniform(-5, 5)
+                    y = vertices['y'][a] + t * (vertices['y'][b] - vertices['y'][a]) + rng.uniform(-5, 5)
+                    meio = novo_vertice(x, y, rua)
+                    intermediarios.append(meio)
+                    ligar(anterior, meio, sentido)
+                    anterior = meio
+                ligar(anterior, b, sentido)
+
+    total = len(vertices['id'])
+    quantidade_pontos = min(len(intermediarios), int(round(total * densidade_pontos)))
+    pinos_info = [{'id': vid, 'nome': f"Ponto {n + 1}", 'categoria': rng.choice(CATEGORIAS)}
+                  for n, vid in enumerate(sorted(rng.sample(range(len(intermediarios)), quantidade_pontos)))]
+    for pino in pinos_info:
+        pino['id'] = intermediarios[pino['id']]
+    return vertices, pinos_info, arestas
+
+
+def gerar_arquivo(caminho: str, num_vertices: int, semente: int = 42,
+                  densidade_pontos: float = DENSIDADE_PONTOS, router=None) -> dict:
+    """Gera a cidade e grava o grafo binário; retorna tamanhos e tempos (ms) de geração e gravação"""
+    from importar_osm import gravar_binario
+    if router is None:
+        from main import RouterLib
+        router = RouterLib(capacidade_cache=0)
+
+    inicio = time.perf_counter()
+    vertices, pinos_info, arestas = gerar_cidade(num_vertices, semente, densidade_pontos)
+    geracao = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    if not gravar_binario(router, caminho, vertices, pinos_info, arestas, None):
+        raise RuntimeError(f"falha ao gravar {caminho}")
+    gravacao = time.perf_counter() - inicio
+
+    return {'vertices': len(vertices['id']), 'arestas': len(arestas['origem']), 'pontos': len(pinos_info),
+            'geracao_ms': geracao * 1000, 'gravacao_ms': gravacao * 1000}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera um grafo sintético de cidade no formato binário")
+    parser.add_argument('num_vertices', type=int, help="Número aproximado de vértices")
+    parser.add_argument('--saida', default='cidade.grafo')
+    parser.add_argument('--semente', type=int, default=42)
+    parser.add_argument('--densidade-pontos', type=float, default=DENSIDADE_PONTOS,
+                        help="Fração dos vértices que são pontos turísticos")
+    parser.add_argument('--json', help="Também grava grafo.json (motor Python)")
+    args = parser.parse_args()
+
+    if args.json:
+        from importar_osm import gravar_json
+        vertices, pinos_info, arestas = gerar_cidade(args.num_vertices, args.semente, args.densidade_pontos)
+        gravar_json(args.json, vertices, pinos_info, arestas)
+
+    info = gerar_arquivo(args.saida, args.num_vertices, args.semente, args.densidade_pontos)
+    print(f"🏙️ {info['vertices']} vértices, {info['arestas']} arestas, {info['pontos']} pontos "
+          f"(geração {info['geracao_ms']:.0f} ms, gravação {info['gravacao_ms']:.0f} ms)")
+
+
+if __name__ == '__main__':
+    main()
@@ -58,6 +58,7 @@ def build_executable():
         '--icon=NONE',                       # Sem ícone personalizado
         '--add-data=perimetro-mapa.png;.',  # Inclui imagem do mapa
         '--add-data=pins.json;.',           # Inclui dados dos pins
+        '--add-data=grafo.json;.',          # Grafo exportado (motor Python de fallback)
         '--add-data=assets;assets',         # Inclui pasta de ícones
         '--add-data=backend/router.dll;backend',  # Inclui DLL C
         '--hidden-import=PIL._tkinter_finder',    # Import oculto do Pillow
@@ -117,6 +118,8 @@ def create_dist_package():
     files_to_copy = [
         'perimetro-mapa.png',
         'pins.json',
+        'grafo.json',
+        'mapa.grafo',  # Grafo binário (opcional, gerado por ferramentas/converter_grafo.py ou importar_osm.py)
         'README.md'
     ]
     
@@ -1,73 +1,89 @@
-@echo off
-setlocal
-
-echo ========================================
-echo Compilando com MSYS2 GCC (64-bit)
-echo ========================================
-echo.
-
-REM Adicionar MSYS2 ao PATH temporariamente
-set "PATH=C:\msys64\ucrt64\bin;%PATH%"
-
-REM Verificar GCC
-gcc --version | findstr "gcc"
-echo.
-
-cd backend
-
-echo Limpando...
-if exist *.o del /Q *.o
-if exist router.dll del /Q router.dll
-
-echo.
-echo [1/6] grafo.c
-gcc -std=c99 -c grafo.c -o grafo.o || goto erro
-echo   OK
-
-echo [2/6] grafo_data.c
-gcc -std=c99 -c grafo_data.c -o grafo_data.o || goto erro
-echo   OK
-
-echo [3/6] grafo_db.c
-gcc -std=c99 -c grafo_db.c -o grafo_db.o || goto erro
-echo   OK
-
-echo [4/6] grafo_algoritmos.c
-gcc -std=c99 -c grafo_algoritmos.c -o grafo_algoritmos.o || goto erro
-echo   OK
-
-echo [5/6] main.c
-gcc -std=c99 -c main.c -o main.o || goto erro
-echo   OK
-
-echo [6/6] Gerando DLL
-gcc -shared -o router.dll main.o grafo.o grafo_data.o grafo_db.o grafo_algoritmos.o || goto erro
-echo   OK
-
-cd ..
-
-echo.
-echo ========================================
-echo SUCESSO! DLL 64-bit gerada!
-echo ========================================
-echo.
-dir backend\router.dll | findstr "router.dll"
-echo.
-
-echo Testando integracao Python + C...
-echo.
-python test_integration.py
-
-goto fim
-
-:erro
-cd ..
-echo.
-echo ========================================
-echo ERRO na compilacao
-echo ========================================
-echo.
-
-:fim
-pause
-endlocal
+@echo off
+setlocal
+
+echo ========================================
+echo Compilando com MSYS2 GCC (64-bit)
+echo ========================================
+echo.
+
+REM Adicionar MSYS2 ao PATH temporariamente
+set "PATH=C:\msys64\ucrt64\bin;%PATH%"
+
+REM Verificar GCC
+gcc --version | findstr "gcc"
+echo.
+
+cd backend
+
+echo Limpando...
+if exist *.o del /Q *.o
+if exist router.dll del /Q router.dll
+
+echo.
+echo [1/10] grafo.c
+gcc -std=c99 -c grafo.c -o grafo.o || goto erro
+echo   OK
+
+echo [2/10] grafo_data.c
+gcc -std=c99 -c grafo_data.c -o grafo_data.o || goto erro
+echo   OK
+
+echo [3/10] grafo_db.c
+gcc -std=c99 -c grafo_db.c -o grafo_db.o || goto erro
+echo   OK
+
+echo [4/10] grafo_heap.c
+gcc -std=c99 -c grafo_heap.c -o grafo_heap.o || goto erro
+echo   OK
+
+echo [5/10] grafo_log.c
+gcc -std=c99 -c grafo_log.c -o grafo_log.o || goto erro
+echo   OK
+
+echo [6/10] grafo_algoritmos.c
+gcc -std=c99 -c grafo_algoritmos.c -o grafo_algoritmos.o || goto erro
+echo   OK
+
+echo [7/10] grafo_ch.c
+gcc -std=c99 -c grafo_ch.c -o grafo_ch.o || goto erro
+echo   OK
+
+echo [8/10] grafo_binario.c
+gcc -std=c99 -c grafo_binario.c -o grafo_binario.o || goto erro
+echo   OK
+
+echo [9/10] main.c
+gcc -std=c99 -c main.c -o main.o || goto erro
+echo   OK
+
+echo [10/10] Gerando DLL
+gcc -shared -o router.dll main.o grafo.o grafo_data.o grafo_db.o grafo_heap.o grafo_log.o grafo_algoritmos.o grafo_ch.o grafo_binario.o || goto erro
+echo   OK
+
+cd ..
+
+echo.
+echo ========================================
+echo SUCESSO! DLL 64-bit gerada!
+echo ========================================
+echo.
+dir backend\router.dll | findstr "router.dll"
+echo.
+
+echo Testando integracao Python + C...
+echo.
+python test_integration.py
+
+goto fim
+
+:erro
+cd ..
+echo.
+echo ========================================
+echo ERRO na compilacao
+echo ========================================
+echo.
+
+:fim
+pause
+endlocal
@@ -0,0 +1,60 @@
+"""
+Converte os dados estáticos do backend C (grafo_data.c) e as coordenadas visuais
+(pins.json) para o grafo binário carregado por mapeamento de memória (mapa.grafo).
+
+Com mapa.grafo presente, RouterLib usa o arquivo em vez dos dados compilados na DLL:
+trocar o mapa passa a ser trocar o arquivo, sem recompilar.
+
+Uso:
+    python ferramentas/converter_grafo.py [saida.grafo] [--pins pins.json]
+"""
+import json
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from main import RouterLib  # noqa: E402
+
+
+def carregar_pins(caminho: str):
+    """Lê pins.json e retorna dict id -> (x, y)"""
+    with open(caminho, 'r', encoding='utf-8') as f:
+        dados = json.load(f)
+    return {pin['id']: (pin['x'], pin['y']) for pin in dados['pins']}
+
+
+def main():
+    args = sys.argv[1:]
+    caminho_pins = os.path.join(RAIZ, 'pins.json')
+    if '--pins' in args:
+        i = args.index('--pins')
+        if i + 1 >= len(args):
+            print("❌ --pins requer o caminho do arquivo")
+            sys.exit(1)
+        caminho_pins = args[i + 1]
+        del args[i:i + 2]
+    saida = args[0] if args else os.path.join(RAIZ, 'mapa.grafo')
+
+    router = RouterLib(capacidade_cache=0, caminho_grafo='')  # Fonte: dados estáticos da DLL
+    try:
+        if not router.lib or not router.grafo:
+            print("❌ Backend C não encontrado. Compile a biblioteca antes de converter.")
+            sys.exit(1)
+
+        pinos = None
+        if os.path.exists(caminho_pins):
+            pinos = carregar_pins(caminho_pins)
+            print(f"📍 {len(pinos)} pinos lidos de {caminho_pins}")
+        else:
+            print(f"⚠️ {caminho_pins} não encontrado: grafo gravado sem pinos")
+
+        if not router.salvar_grafo_binario(saida, pinos):
+            sys.exit(1)
+    finally:
+        router.fechar()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,31 @@
+"""
+Exporta o grafo do backend C (router.dll / librouter.so) para grafo.json,
+usado pelo motor Python (motor_python.py) quando a biblioteca nativa não está disponível.
+
+Uso:
+    python ferramentas/exportar_grafo.py [saida.json]
+"""
+import os
+import sys
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from main import RouterLib  # noqa: E402
+
+
+def main():
+    saida = sys.argv[1] if len(sys.argv) > 1 else os.path.join(RAIZ, 'grafo.json')
+    router = RouterLib()
+    try:
+        if not router.lib:
+            print("❌ Backend C não encontrado. Compile a biblioteca antes de exportar.")
+            sys.exit(1)
+        if not router.exportar_grafo(saida):
+            sys.exit(1)
+    finally:
+        router.fechar()
+
+
+if __name__ == '__main__':
+    main()
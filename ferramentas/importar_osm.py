@@ -0,0 +1,447 @@
+"""
+Importa um extrato OpenStreetMap (.osm XML) para o grafo binário do roteador (mapa.grafo).
+
+- Leitura em fluxo (iterparse): cada <node>/<way> é descartado da árvore logo após
+  ser processado, então a memória cresce apenas com os arrays compactos de nós
+  (id, lat, lon: 24 bytes por nó) e as referências das vias mantidas.
+- Apenas vias com a tag highway (exceto as de HIGHWAY_IGNORADOS) viram arestas;
+  oneway/roundabout definem o sentido. Comprimentos em metros (haversine).
+- Coordenadas projetadas no espaço de pixels de perimetro-mapa.png, para casar com
+  pins.json: pela caixa <bounds> do arquivo, por --bbox ou por --ancora (3 ou mais
+  pontos lat,lon,x,y ajustados por mínimos quadrados).
+- Cada pino de pins.json vira um vértice (mesmo ID, tipo 1) ligado à esquina mais
+  próxima, para que os pontos da interface continuem roteáveis.
+
+Uso:
+    python ferramentas/importar_osm.py extrato.osm [--saida mapa.grafo] [--json grafo.json]
+        [--bbox lat_min,lon_min,lat_max,lon_max] [--ancora lat,lon,x,y ...]
+        [--imagem perimetro-mapa.png] [--pins pins.json | --sem-pinos]
+"""
+import argparse
+import ctypes
+import json
+import math
+import os
+import struct
+import sys
+import time
+import xml.etree.ElementTree as ET
+from array import array
+from bisect import bisect_left
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from main import RouterLib  # noqa: E402
+
+RAIO_TERRA_M = 6371008.8
+HIGHWAY_IGNORADOS = {'proposed', 'construction', 'abandoned', 'disused', 'platform', 'raceway',
+                     'bus_stop', 'elevator', 'rest_area', 'services', 'corridor'}
+TAMANHO_CELULA = 32  # Pixels por célula da grade usada para achar a esquina mais próxima dos pinos
+
+
+def distancia_metros(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Distância haversine em metros"""
+    p1 = math.radians(lat1)
+    p2 = math.radians(lat2)
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * RAIO_TERRA_M * math.asin(math.sqrt(a))
+
+
+def tamanho_png(caminho: str):
+    """(largura, altura) lidos do cabeçalho IHDR do PNG (sem depender do Pillow)"""
+    with open(caminho, 'rb') as f:
+        cabecalho = f.read(24)
+    if cabecalho[:8] != b'\x89PNG\r\n\x1a\n':
+        raise ValueError(f"{caminho} não é PNG")
+    return struct.unpack('>II', cabecalho[16:24])
+
+
+def _resolver_3x3(a, b):
+    """Resolve a·x = b (3x3) por eliminação de Gauss com pivoteamento parcial"""
+    m = [list(a[i]) + [b[i]] for i in range(3)]
+    for c in range(3):
+        pivo = max(range(c, 3), key=lambda r: abs(m[r][c]))
+        if abs(m[pivo][c]) < 1e-12:
+            raise ValueError("Âncoras colineares: use ao menos 3 pontos não alinhados")
+        m[c], m[pivo] = m[pivo], m[c]
+        for r in range(c + 1, 3):
+            f = m[r][c] / m[c][c]
+            for k in range(c, 4):
+                m[r][k] -= f * m[c][k]
+    x = [0.0] * 3
+    for r in (2, 1, 0):
+        x[r] = (m[r][3] - sum(m[r][k] * x[k] for k in range(r + 1, 3))) / m[r][r]
+    return x
+
+
+class Projecao:
+    """Lat/lon → pixel do mapa. Equirretangular local (longitude escalada por cos(lat))
+    seguida de uma transformação afim, suficiente para a extensão de uma cidade."""
+
+    def __init__(self, coef_x, coef_y, lat_ref: float):
+        self.coef_x = coef_x
+        self.coef_y = coef_y
+        self.cos_ref = math.cos(math.radians(lat_ref))
+
+    @classmethod
+    def por_caixa(cls, lat_min, lon_min, lat_max, lon_max, largura, altura):
+        """Caixa geográfica ocupando exatamente a imagem (norte para cima)"""
+        lat_ref = (lat_min + lat_max) / 2
+        cos_ref = math.cos(math.radians(lat_ref))
+        escala_x = largura / ((lon_max - lon_min) * cos_ref)
+        escala_y = altura / (lat_max - lat_min)
+        return cls((escala_x, 0.0, -lon_min * cos_ref * escala_x), (0.0, -escala_y, lat_max * escala_y), lat_ref)
+
+    @classmethod
+    def por_ancoras(cls, ancoras):
+        """Ajuste afim por mínimos quadrados a partir de (lat, lon, x, y) conhecidos"""
+        lat_ref = sum(a[0] for a in ancoras) / len(ancoras)
+        cos_ref = math.cos(math.radians(lat_ref))
+        linhas = [(lon * cos_ref, lat, 1.0) for lat, lon, _, _ in ancoras]
+        ata = [[sum(l[i] * l[j] for l in linhas) for j in range(3)] for i in range(3)]
+        coef_x = _resolver_3x3(ata, [sum(l[i] * a[2] for l, a in zip(linhas, ancoras)) for i in range(3)])
+        coef_y = _resolver_3x3(ata, [sum(l[i] * a[3] for l, a in zip(linhas, ancoras)) for i in range(3)])
+        return cls(coef_x, coef_y, lat_ref)
+
+    def pixel(self, lat: float, lon: float):
+        u = lon * self.cos_ref
+        x = self.coef_x[0] * u + self.coef_x[1] * lat + self.coef_x[2]
+        y = self.coef_y[0] * u + self.coef_y[1] * lat + self.coef_y[2]
+        return int(round(x)), int(round(y))
+
+
+def _sentido(tags) -> int:
+    """1 = só no sentido da via, -1 = só no contrário, 0 = mão dupla"""
+    oneway = tags.get('oneway', '')
+    if oneway in ('yes', 'true', '1'):
+        return 1
+    if oneway in ('-1', 'reverse'):
+        return -1
+    if oneway == 'no':
+        return 0
+    if tags.get('junction') in ('roundabout', 'circular') or tags.get('highway') == 'motorway':
+        return 1
+    return 0
+
+
+def ler_osm(caminho: str):
+    """Leitura em fluxo do XML. Retorna dict com arrays de nós, vias de highway e <bounds>."""
+    nos_id = array('q')
+    nos_lat = array('d')
+    nos_lon = array('d')
+    refs = array('q')            # Referências de todas as vias mantidas, em sequência
+    vias_inicio = array('l', [0])  # Via k usa refs[vias_inicio[k]:vias_inicio[k + 1]]
+    vias_sentido = array('b')
+    vias_nome = []
+    nomes = {}                   # Internação dos nomes de rua (repetem em muitas vias)
+    limites = None
+    vias_lidas = 0
+
+    contexto = ET.iterparse(caminho, events=('start', 'end'))
+    _, raiz = next(contexto)
+    for evento, elem in contexto:
+        if evento != 'end':
+            continue
+        tag = elem.tag
+        if tag == 'node':
+            nos_id.append(int(elem.get('id')))
+            nos_lat.append(float(elem.get('lat')))
+            nos_lon.append(float(elem.get('lon')))
+        elif tag == 'way':
+            vias_lidas += 1
+            tags = {t.get('k'): t.get('v') for t in elem.iter('tag')}
+            highway = tags.get('highway')
+            if highway and highway not in HIGHWAY_IGNORADOS and tags.get('area') != 'yes':
+                refs.extend(int(nd.get('ref')) for nd in elem.iter('nd'))
+                vias_inicio.append(len(refs))
+                vias_sentido.append(_sentido(tags))
+                nome = tags.get('name') or tags.get('ref') or 'N/A'
+                vias_nome.append(nomes.setdefault(nome, nome))
+        elif tag == 'bounds':
+            limites = tuple(float(elem.get(k)) for k in ('minlat', 'minlon', 'maxlat', 'maxlon'))
+        else:
+            continue  # <nd>/<tag> são lidos junto com a via; só elementos de topo são descartados
+        elem.clear()
+        raiz.clear()  # Remove da raiz os elementos já processados (memória limitada)
+
+    # Extratos OSM vêm ordenados por ID; se não vierem, ordena para a busca binária
+    if any(nos_id[i] >= nos_id[i + 1] for i in range(len(nos_id) - 1)):
+        ordem = sorted(range(len(nos_id)), key=nos_id.__getitem__)
+        nos_id = array('q', (nos_id[i] for i in ordem))
+        nos_lat = array('d', (nos_lat[i] for i in ordem))
+        nos_lon = array('d', (nos_lon[i] for i in ordem))
+
+    return {
+        'nos_id': nos_id, 'nos_lat': nos_lat, 'nos_lon': nos_lon,
+        'refs': refs, 'vias_inicio': vias_inicio, 'vias_sentido': vias_sentido, 'vias_nome': vias_nome,
+        'limites': limites, 'vias_lidas': vias_lidas
+    }
+
+
+def montar_grafo(osm, projecao: Projecao, id_inicial: int):
+    """Vértices (nós usados pelas vias, IDs a partir de id_inicial) e arestas em metros"""
+    nos_id = osm['nos_id']
+    lat = osm['nos_lat']
+    lon = osm['nos_lon']
+    refs = osm['refs']
+    inicio = osm['vias_inicio']
+    num_nos = len(nos_id)
+
+    vertice_do_no = array('i', [-1]) * num_nos  # Posição do nó → ID do vértice (-1 = não usado)
+    vertices = {'id': array('i'), 'x': array('i'), 'y': array('i'), 'rua': []}
+    arestas = {'origem': array('i'), 'destino': array('i'), 'peso': array('i')}
+    refs_ausentes = 0
+
+    for k in range(len(osm['vias_sentido'])):
+        sentido = osm['vias_sentido'][k]
+        nome = osm['vias_nome'][k]
+        anterior = -1
+        for r in range(inicio[k], inicio[k + 1]):
+            pos = bisect_left(nos_id, refs[r])
+            if pos == num_nos or nos_id[pos] != refs[r]:
+                refs_ausentes += 1  # Nó fora do extrato: interrompe o trecho
+                anterior = -1
+                continue
+            if vertice_do_no[pos] == -1:
+                vertice_do_no[pos] = id_inicial + len(vertices['id'])
+                x, y = projecao.pixel(lat[pos], lon[pos])
+                vertices['id'].append(vertice_do_no[pos])
+                vertices['x'].append(x)
+                vertices['y'].append(y)
+                vertices['rua'].append(nome)
+            if anterior != -1 and anterior != pos:
+                peso = max(1, int(round(distancia_metros(lat[anterior], lon[anterior], lat[pos], lon[pos]))))
+                a, b = vertice_do_no[anterior], vertice_do_no[pos]
+                if sentido >= 0:
+                    arestas['origem'].append(a)
+                    arestas['destino'].append(b)
+                    arestas['peso'].append(peso)
+                if sentido <= 0:
+                    arestas['origem'].append(b)
+                    arestas['destino'].append(a)
+                    arestas['peso'].append(peso)
+            anterior = pos
+
+    return vertices, arestas, refs_ausentes
+
+
+def ligar_pinos(vertices, arestas, pinos, info_pontos):
+    """Adiciona cada pino como vértice tipo 1 ligado (nos dois sentidos) à esquina mais próxima.
+    Retorna lista de dicts dos pinos adicionados."""
+    base = len(vertices['id'])
+    if base == 0:
+        return []
+
+    # IDs importados são sequenciais (montar_grafo): índice do vértice = id - primeiro
+    primeiro = vertices['id'][0]
+    assert vertices['id'][-1] - primeiro == base - 1, "IDs dos vértices importados não são contíguos"
+
+    # Metros por pixel médios das arestas importadas (custo das ligações pino ↔ esquina)
+    soma_m = soma_px = 0.0
+    for o, d, p in zip(arestas['origem'], arestas['destino'], arestas['peso']):
+        io, id_ = o - primeiro, d - primeiro
+        px = math.hypot(vertices['x'][io] - vertices['x'][id_], vertices['y'][io] - vertices['y'][id_])
+        if px > 0:
+            soma_m += p
+            soma_px += px
+    metros_por_pixel = soma_m / soma_px if soma_px > 0 else 1.0
+
+    # Grade espacial: célula → índices dos vértices importados
+    celulas = {}
+    for i in range(base):
+        chave = (vertices['x'][i] // TAMANHO_CELULA, vertices['y'][i] // TAMANHO_CELULA)
+        celulas.setdefault(chave, []).append(i)
+
+    adicionados = []
+    for id_pino, (px, py) in sorted(pinos.items()):
+        cx, cy = px // TAMANHO_CELULA, py // TAMANHO_CELULA
+        melhor, melhor_d2, anel = -1, None, 0
+        while melhor == -1 or (anel - 1) * TAMANHO_CELULA <= math.sqrt(melhor_d2):
+            for gx in range(cx - anel, cx + anel + 1):
+                for gy in range(cy - anel, cy + anel + 1):
+                    if max(abs(gx - cx), abs(gy - cy)) != anel:
+                        continue  # Só a borda do anel atual
+                    for i in celulas.get((gx, gy), ()):
+                        d2 = (vertices['x'][i] - px) ** 2 + (vertices['y'][i] - py) ** 2
+                        if melhor_d2 is None or d2 < melhor_d2:
+                            melhor, melhor_d2 = i, d2
+            anel += 1
+
+        nome, categoria, rua = info_pontos.get(id_pino, (f"Ponto {id_pino}", "Ponto", vertices['rua'][melhor]))
+        peso = max(1, int(round(math.sqrt(melhor_d2) * metros_por_pixel)))
+        vertices['id'].append(id_pino)
+        vertices['x'].append(px)
+        vertices['y'].append(py)
+        vertices['rua'].append(rua)
+        for o, d in ((id_pino, vertices['id'][melhor]), (vertices['id'][melhor], id_pino)):
+            arestas['origem'].append(o)
+            arestas['destino'].append(d)
+            arestas['peso'].append(peso)
+        adicionados.append({'id': id_pino, 'nome': nome, 'categoria': categoria})
+
+    return adicionados
+
+
+def gravar_binario(router: RouterLib, caminho: str, vertices, pinos_info, arestas, pinos) -> bool:
+    """Monta o grafo no backend C (importar_grafo) e grava no formato binário"""
+    lib = router.lib
+    n = len(vertices['id'])
+    m = len(arestas['origem'])
+    nomes_pinos = {p['id']: p for p in pinos_info}
+
+    # Bloco de textos no layout de exportar_vertices: nome, categoria, rua por vértice
+    # (codificação cacheada por texto: nomes de rua se repetem em muitos vértices)
+    bloco = bytearray()
+    offsets = array('i')
+    tipos = array('i', [0]) * n
+    codificados = {}
+    for i in range(n):
+        pino = nomes_pinos.get(vertices['id'][i])
+        if pino is not None:
+            textos = (pino['nome'], pino['categoria'], vertices['rua'][i])
+            tipos[i] = 1
+        else:
+            textos = ("Esquina", "Esquina", vertices['rua'][i])
+        for texto in textos:
+            dados = codificados.get(texto)
+            if dados is None:
+                dados = codificados[texto] = texto.encode('utf-8')
+            offsets.append(len(bloco))
+            bloco += dados
+    offsets.append(len(bloco))
+
+    def c_array(valores):
+        return (ctypes.c_int * len(valores)).from_buffer(valores) if len(valores) else (ctypes.c_int * 1)()
+
+    grafo = lib.importar_grafo(n, c_array(vertices['id']), c_array(vertices['x']), c_array(vertices['y']),
+                               c_array(tipos), c_array(offsets), bytes(bloco), m, c_array(arestas['origem']),
+                               c_array(arestas['destino']), c_array(arestas['peso']))
+    if not grafo:
+        print("❌ Backend recusou o grafo importado")
+        return False
+
+    try:
+        if pinos:
+            ids = sorted(pinos)
+            ids_c = (ctypes.c_int * len(ids))(*ids)
+            xs_c = (ctypes.c_int * len(ids))(*(pinos[i][0] for i in ids))
+            ys_c = (ctypes.c_int * len(ids))(*(pinos[i][1] for i in ids))
+            lib.definir_pinos_grafo(grafo, len(ids), ids_c, xs_c, ys_c)
+        if lib.salvar_grafo_binario(grafo, caminho.encode('utf-8')) != 0:
+            print(f"❌ Falha ao gravar {caminho}")
+            return False
+    finally:
+        lib.liberar_grafo(grafo)
+
+    print(f"✅ Grafo binário gravado: {n} vértices, {m} arestas, {os.path.getsize(caminho)} bytes → {caminho}")
+    return True
+
+
+def gravar_json(caminho: str, vertices, pinos_info, arestas):
+    """Grafo no formato do motor Python (grafo.json), para uso sem o backend C"""
+    nomes_pinos = {p['id']: p for p in pinos_info}
+    lista = []
+    for i, vid in enumerate(vertices['id']):
+        pino = nomes_pinos.get(vid)
+        lista.append({
+            'id': vid,
+            'nome': pino['nome'] if pino else "Esquina",
+            'categoria': pino['categoria'] if pino else "Esquina",
+            'rua': vertices['rua'][i],
+            'tipo': 1 if pino else 0,
+            'x': vertices['x'][i],
+            'y': vertices['y'][i],
+        })
+    dados = {'vertices': lista,
+             'arestas': [list(a) for a in zip(arestas['origem'], arestas['destino'], arestas['peso'])]}
+    with open(caminho, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, ensure_ascii=False, separators=(',', ':'))
+    print(f"✅ Grafo JSON gravado: {caminho}")
+
+
+def _memoria_pico_mb():
+    """Pico de memória residente do processo (None onde não disponível, p. ex. Windows)"""
+    try:
+        import resource
+    except ImportError:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return pico / 1024 / (1024 if sys.platform == 'darwin' else 1)  # bytes no macOS, KB no Linux
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa extrato OpenStreetMap (.osm) para o grafo do roteador")
+    parser.add_argument('entrada', help="Arquivo .osm (XML)")
+    parser.add_argument('--saida', default=os.path.join(RAIZ, 'mapa.grafo'), help="Grafo binário de saída")
+    parser.add_argument('--json', help="Também grava o grafo no formato do motor Python")
+    parser.add_argument('--imagem', default=os.path.join(RAIZ, 'perimetro-mapa.png'),
+                        help="Imagem do mapa (define o espaço de pixels)")
+    parser.add_argument('--bbox', help="lat_min,lon_min,lat_max,lon_max ocupando a imagem inteira")
+    parser.add_argument('--ancora', action='append', default=[],
+                        help="lat,lon,x,y de um ponto conhecido do mapa (3 ou mais substituem a bbox)")
+    parser.add_argument('--pins', default=os.path.join(RAIZ, 'pins.json'), help="Pinos da interface")
+    parser.add_argument('--sem-pinos', action='store_true', help="Não liga os pinos ao grafo importado")
+    args = parser.parse_args()
+
+    # 1. Leitura em fluxo
+    inicio = time.perf_counter()
+    osm = ler_osm(args.entrada)
+    t_leitura = time.perf_counter() - inicio
+    num_nos = len(osm['nos_id'])
+    print(f"📥 {num_nos} nós e {osm['vias_lidas']} vias lidos em {t_leitura:.2f} s "
+          f"({num_nos / max(t_leitura, 1e-9):,.0f} nós/s); {len(osm['vias_sentido'])} vias highway")
+
+    # 2. Projeção para o espaço de pixels do mapa
+    if len(args.ancora) >= 3:
+        projecao = Projecao.por_ancoras([tuple(float(v) for v in a.split(',')) for a in args.ancora])
+    else:
+        caixa = tuple(float(v) for v in args.bbox.split(',')) if args.bbox else osm['limites']
+        if caixa is None:
+            print("❌ Extrato sem <bounds>: informe --bbox ou ao menos 3 --ancora")
+            sys.exit(1)
+        largura, altura = tamanho_png(args.imagem)
+        projecao = Projecao.por_caixa(*caixa, largura, altura)
+
+    # 3. Grafo (IDs das esquinas começam depois do maior ID de pino)
+    pinos = {}
+    if not args.sem_pinos and os.path.exists(args.pins):
+        with open(args.pins, 'r', encoding='utf-8') as f:
+            pinos = {p['id']: (p['x'], p['y']) for p in json.load(f)['pins']}
+
+    vertices, arestas, ausentes = montar_grafo(osm, projecao, max(pinos) + 1 if pinos else 0)
+    del osm  # Arrays de nós não são mais necessários
+    if ausentes:
+        print(f"⚠️ {ausentes} referências a nós fora do extrato ignoradas")
+
+    router = RouterLib(capacidade_cache=0, caminho_grafo='')
+    try:
+        # Nomes e categorias dos pinos vêm dos dados atuais do backend (quando disponível)
+        info_pontos = {v['id']: (v['nome'], v['categoria'], v['rua'])
+                       for v in (router._exportar_vertices() or []) if v['tipo'] == 1}
+        pinos_info = ligar_pinos(vertices, arestas, pinos, info_pontos)
+        if pinos_info:
+            print(f"📍 {len(pinos_info)} pinos ligados à esquina mais próxima")
+
+        if args.json:
+            gravar_json(args.json, vertices, pinos_info, arestas)
+
+        if not router.lib or not hasattr(router.lib, 'importar_grafo'):
+            print("⚠️ Backend C não encontrado: grafo binário não gravado")
+            ok = bool(args.json)
+        else:
+            ok = gravar_binario(router, args.saida, vertices, pinos_info, arestas, pinos)
+    finally:
+        router.fechar()
+
+    total = time.perf_counter() - inicio
+    pico = _memoria_pico_mb()
+    print(f"⏱️ Importação concluída em {total:.2f} s ({num_nos / max(total, 1e-9):,.0f} nós/s)"
+          + (f", pico de memória {pico:.0f} MB" if pico is not None else ""))
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
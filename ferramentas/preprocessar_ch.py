@@ -0,0 +1,51 @@
+"""
+Pré-processa o grafo do backend C em Contraction Hierarchies e salva o índice (grafo.ch),
+carregado depois por RouterLib.carregar_ch() para consultas no modo MODO_CH.
+
+O arquivo guarda a versão do grafo: se os dados mudarem, o índice antigo é recusado
+e precisa ser gerado de novo (carregar_ch() reconstrói automaticamente).
+
+Uso:
+    python ferramentas/preprocessar_ch.py [saida.ch]
+"""
+import os
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from main import RouterLib  # noqa: E402
+
+
+def main():
+    saida = sys.argv[1] if len(sys.argv) > 1 else os.path.join(RAIZ, 'grafo.ch')
+    router = RouterLib()
+    try:
+        if not router.lib or not router.grafo or not hasattr(router.lib, 'construir_ch'):
+            print("❌ Backend C com suporte a CH não encontrado. Compile a biblioteca antes.")
+            sys.exit(1)
+
+        inicio = time.perf_counter()
+        ch = router.lib.construir_ch(router.grafo)
+        duracao_ms = (time.perf_counter() - inicio) * 1000
+        if not ch:
+            print("❌ Falha no pré-processamento")
+            sys.exit(1)
+
+        try:
+            atalhos = router.lib.obter_numero_atalhos_ch(ch)
+            tamanho_kb = router.lib.obter_tamanho_ch(ch) / 1024
+            print(f"🏗️ Contração concluída em {duracao_ms:.2f} ms: {atalhos} atalhos, índice de {tamanho_kb:.1f} KB")
+            if router.lib.salvar_ch(ch, saida.encode('utf-8')) != 0:
+                print(f"❌ Não foi possível gravar {saida}")
+                sys.exit(1)
+            print(f"✅ Hierarquia salva em {saida}")
+        finally:
+            router.lib.liberar_ch(ch)
+    finally:
+        router.fechar()
+
+
+if __name__ == '__main__':
+    main()
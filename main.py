@@ -1,10 +1,18 @@
 import os
 import sys
+import time
 import ctypes  # Integração Python ↔ C
 from ctypes import Structure, POINTER, c_int, c_char_p, byref, create_string_buffer, cdll
 import json
+import queue
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import Optional, Tuple, Dict, List
 
+from motor_python import MotorPython  # Fallback de roteamento sem backend C
+from planejador import planejar_roteiro  # Roteiro com múltiplas paradas
+
 try:
     import customtkinter as ctk  # UI moderna
 except Exception:
@@ -21,12 +29,26 @@ import tkinter as tk
 from tkinter import messagebox
 
 
-# Estrutura C mapeada em Python via ctypes
+# Estruturas C mapeadas em Python via ctypes
+class EstatisticasRota(Structure):
+    _fields_ = [
+        ("tempo_carga_us", ctypes.c_longlong),         # Montagem do grafo (só no calcular_rota legado)
+        ("tempo_busca_us", ctypes.c_longlong),         # Busca
+        ("tempo_reconstrucao_us", ctypes.c_longlong),  # Reconstrução do caminho
+        ("nos_fixados", c_int),                        # Vértices extraídos do heap
+        ("arestas_relaxadas", c_int),                  # Arestas examinadas
+        ("insercoes_heap", c_int),                     # Inserções e decrease-key
+        ("remocoes_heap", c_int)                       # Extrações do mínimo
+    ]
+
+
 class ResultadoRota(Structure):
     _fields_ = [
         ("sequencia_ids", POINTER(c_int)),  # Array de IDs do caminho calculado
         ("num_ids", c_int),                  # Quantidade de vértices na rota
-        ("distancia_total", c_int)           # Distância total em metros
+        ("distancia_total", c_int),          # Distância total em metros
+        ("nos_visitados", c_int),            # Vértices fixados pela busca
+        ("estatisticas", EstatisticasRota)   # Tempos e contadores (só lido se o layout do C bater)
     ]
 
 
@@ -36,25 +58,250 @@ def resource_path(filename: str) -> str:
     return os.path.join(base, filename)
 
 
+# Assinatura do callback de trace do backend C: void (*)(int nivel, const char* mensagem)
+CallbackTrace = ctypes.CFUNCTYPE(None, ctypes.c_int, ctypes.c_char_p)
+
+
+class CacheLRU:
+    """Cache LRU limitado (thread-safe) com contadores de acertos e falhas"""
+
+    def __init__(self, capacidade: int = 256):
+        self.capacidade = max(0, int(capacidade))
+        self.acertos = 0
+        self.falhas = 0
+        self._itens = OrderedDict()  # Ordem de uso: mais antigo primeiro
+        self._lock = threading.Lock()
+
+    def obter(self, chave):
+        """Retorna o valor da chave (marcando como usado recentemente) ou None"""
+        with self._lock:
+            valor = self._itens.get(chave)
+            if valor is None:
+                self.falhas += 1
+                return None
+            self._itens.move_to_end(chave)
+            self.acertos += 1
+            return valor
+
+    def inserir(self, chave, valor):
+        """Armazena valor, descartando o item menos usado se exceder a capacidade"""
+        if self.capacidade == 0:
+            return
+        with self._lock:
+            self._itens[chave] = valor
+            self._itens.move_to_end(chave)
+            while len(self._itens) > self.capacidade:
+                self._itens.popitem(last=False)
+
+    def limpar(self):
+        """Remove todos os itens (contadores são mantidos)"""
+        with self._lock:
+            self._itens.clear()
+
+    def estatisticas(self) -> Dict:
+        """Retorna tamanho, capacidade, acertos, falhas e taxa de acerto"""
+        with self._lock:
+            total = self.acertos + self.falhas
+            return {
+                'tamanho': len(self._itens),
+                'capacidade': self.capacidade,
+                'acertos': self.acertos,
+                'falhas': self.falhas,
+                'taxa_acerto': self.acertos / total if total else 0.0
+            }
+
+    def __len__(self):
+        return len(self._itens)
+
+
+class ExecutorRotas:
+    """Executa cálculos de rota em uma thread de trabalho, fora do loop da interface.
+
+    As chamadas ctypes liberam o GIL enquanto o C calcula, então a thread da
+    interface continua redesenhando durante buscas longas. Só o pedido mais
+    recente interessa: um novo pedido substitui o que ainda não começou, e o
+    resultado de um pedido já em execução é descartado ao chegar (geração
+    desatualizada). Cada executor tem uma única thread de trabalho: pedidos do
+    mesmo executor nunca rodam em paralelo (outros executores e os pools de lote
+    podem buscar ao mesmo tempo, cada thread com sua própria AreaTrabalho).
+
+    A interface deve consultar com estado(), que entrega o resultado e o
+    indicador de ocupado numa única leitura sob o lock."""
+
+    def __init__(self, nome: str = 'ExecutorRotas'):
+        self._geracao = 0  # Incrementada a cada pedido ou cancelamento
+        self._pendente = None  # (geração, função, args) aguardando a thread de trabalho
+        self._em_execucao = None  # Geração do cálculo em andamento (None = ociosa)
+        self._resultados = queue.Queue()  # (geração, resultado, erro) consumidos pela interface
+        self._condicao = threading.Condition()
+        self._ativo = True
+        self._thread = threading.Thread(target=self._executar, name=nome, daemon=True)
+        self._thread.start()
+
+    def enviar(self, funcao, *args) -> int:
+        """Agenda funcao(*args), substituindo qualquer pedido anterior. Retorna a geração do pedido."""
+        with self._condicao:
+            self._geracao += 1
+            self._pendente = (self._geracao, funcao, args)
+            self._condicao.notify()
+            return self._geracao
+
+    def cancelar(self):
+        """Descarta o pedido pendente e o resultado do que estiver em execução"""
+        with self._condicao:
+            self._geracao += 1
+            self._pendente = None
+
+    def ocupado(self) -> bool:
+        """True se o pedido atual ainda não teve resultado entregue"""
+        with self._condicao:
+            return self._pendente is not None or self._em_execucao == self._geracao
+
+    def obter_resultado(self) -> Optional[Tuple[int, object, Optional[Exception]]]:
+        """Próximo resultado ainda atual: (geração, resultado, erro). None se não houver."""
+        with self._condicao:
+            while True:
+                try:
+                    geracao, resultado, erro = self._resultados.get_nowait()
+                except queue.Empty:
+                    return None
+                if geracao == self._geracao:
+                    return geracao, resultado, erro
+
+    def estado(self) -> Tuple[Optional[Tuple[int, object, Optional[Exception]]], bool]:
+        """(resultado atual ou None, ocupado) numa única consulta atômica. Com obter_resultado()
+        seguido de ocupado(), a thread de trabalho pode terminar entre as duas chamadas e o
+        resultado parece um cancelamento."""
+        with self._condicao:  # Condition usa RLock: as duas leituras ficam na mesma seção
+            return self.obter_resultado(), self.ocupado()
+
+    def encerrar(self, timeout: Optional[float] = None):
+        """Para a thread de trabalho (aguarda o cálculo em andamento terminar)"""
+        with self._condicao:
+            self._ativo = False
+            self._pendente = None
+            self._condicao.notify()
+        self._thread.join(timeout)
+
+    def _executar(self):
+        while True:
+            with self._condicao:
+                while self._ativo and self._pendente is None:
+                    self._condicao.wait()
+                if not self._ativo:
+                    return
+                geracao, funcao, args = self._pendente
+                self._pendente = None
+                self._em_execucao = geracao
+            try:
+                resultado, erro = funcao(*args), None
+            except Exception as e:
+                resultado, erro = None, e
+            with self._condicao:
+                self._em_execucao = None
+                self._resultados.put((geracao, resultado, erro))
+
+
+class ArvoreCaminhos:
+    """Resultado de uma busca um-para-todos: extrai rotas para qualquer destino sem nova busca"""
+
+    def __init__(self, id_origem: int, ids: List[int], distancias: List[int], anteriores: List[int]):
+        self.id_origem = id_origem
+        self.distancias = {}  # id -> distância em metros (apenas vértices alcançáveis)
+        self.anteriores = {}  # id -> ID do predecessor no caminho ótimo
+        for id_vertice, dist, ant in zip(ids, distancias, anteriores):
+            if dist >= 0:
+                self.distancias[id_vertice] = dist
+                self.anteriores[id_vertice] = ant
+
+    def distancia(self, id_destino: int) -> Optional[int]:
+        """Distância da origem até o destino (None se inalcançável)"""
+        return self.distancias.get(id_destino)
+
+    def caminho(self, id_destino: int) -> Optional[List[int]]:
+        """Sequência de IDs origem → destino seguindo os predecessores (None se inalcançável)"""
+        if id_destino not in self.distancias:
+            return None
+        caminho = []
+        atual = id_destino
+        while atual != -1:
+            caminho.append(atual)
+            atual = self.anteriores[atual]
+        caminho.reverse()
+        return caminho
+
+    def rota(self, id_destino: int) -> Optional[Dict]:
+        """Rota no mesmo formato de RouterLib.calcular_rota_dijkstra (sem coordenadas/ruas)"""
+        if id_destino == self.id_origem:
+            return None
+        caminho = self.caminho(id_destino)
+        if caminho is None:
+            return None
+        return {
+            'sequencia_ids': caminho,
+            'num_ids': len(caminho),
+            'distancia_total': self.distancias[id_destino]
+        }
+
+
 class RouterLib:
     """Wrapper para carregar e usar a biblioteca C (DLL/SO) de rotas"""
 
-    def __init__(self):
+    # Níveis de log do backend C (mesmos valores de grafo_log.h)
+    LOG_SILENCIOSO = 0
+    LOG_ERRO = 1
+    LOG_INFO = 2
+    LOG_TRACE = 3
+
+    # Algoritmos de busca ponto a ponto (mesmos valores de grafo_algoritmos.h)
+    MODO_DIJKSTRA = 0
+    MODO_ASTAR = 1
+    MODO_BIDIRECIONAL = 2
+    MODO_CH = 3  # Contraction Hierarchies (grafo_ch.h); requer carregar_ch()
+    NOMES_MODOS = {MODO_DIJKSTRA: "Dijkstra", MODO_ASTAR: "A*", MODO_BIDIRECIONAL: "Dijkstra bidirecional",
+                   MODO_CH: "Contraction Hierarchies"}
+
+    def __init__(self, capacidade_cache: int = 256, caminho_grafo: Optional[str] = None):
         self.lib = None  # Referência para DLL carregada
+        # Grafo binário mapeado em memória ('' = sempre usar os dados estáticos da DLL)
+        self.caminho_grafo = resource_path('mapa.grafo') if caminho_grafo is None else caminho_grafo
+        self.motor = None  # Motor Python (usado apenas se a DLL/SO não carregar)
+        self.grafo = None  # Handle do grafo persistente (Grafo* no C)
+        self.ch = None  # Handle da hierarquia de contração (HierarquiaCH* no C), ver carregar_ch()
+        self._caminho_ch = None  # Arquivo .ch em uso (recarregado junto com o grafo)
+        self._trace_callback = None  # Referência ao CallbackTrace (evita garbage collection)
+        self._areas_local = threading.local()  # AreaTrabalho* da thread atual (consultas reentrantes no C)
+        self._areas = []  # Todas as áreas criadas (liberadas junto com o grafo)
+        self._geracao_areas = 0  # Incrementada ao liberar o grafo: áreas antigas deixam de valer
+        self._lock_areas = threading.Lock()
+        self._pools = {}  # trabalhadores → ThreadPoolExecutor das consultas em lote (criados sob demanda)
+        self._lock_pools = threading.Lock()
+        self.verboso = True  # Mensagens por consulta no stdout (o serviço HTTP desliga)
+        self.gancho_metricas = None  # Função chamada com as estatísticas de cada consulta (metricas.py)
+        self._tem_estatisticas = False  # ResultadoRota do C traz EstatisticasRota
+        self._tem_nos_visitados = False  # ResultadoRota do C traz nos_visitados (DLL antiga: 16 bytes)
+        self._vertices_exportados = None  # Cache da exportação em lote: lista de dicts por vértice
+        self._vertices_por_id = None  # Índice id -> dict do vértice (montado a partir da exportação)
+        self._indice_por_id = None  # Índice id -> posição do vértice nos arrays do C (árvores de caminhos)
+        self.cache_rotas = CacheLRU(capacidade_cache)  # Cache LRU: (origem, destino, versão) -> rota
+        self._versao_cache = None  # Versão do grafo dos itens atualmente no cache
         self.pontos_info = {}  # Cache: id -> (nome, categoria)
         self._load_lib()
+        self._load_grafo()
+        self._load_motor_python()
         self._load_pontos_info()
 
     def _load_lib(self):
         """Localiza e carrega DLL/SO, configura assinaturas de funções C"""
-        candidates = [  # Tenta múltiplos caminhos (Windows/Linux/Mac)
-            resource_path('backend\\router.dll'),
-            resource_path('backend\\librouter.dll'),
-            resource_path('router.dll'),
-            resource_path('librouter.dll'),
-            resource_path('librouter.so'),
-            resource_path('librouter.dylib'),
-        ]
+        # Tenta múltiplos caminhos conforme a plataforma (Windows/Linux/Mac)
+        if sys.platform.startswith('win'):
+            nomes = ['router.dll', 'librouter.dll']
+        elif sys.platform == 'darwin':
+            nomes = ['librouter.dylib', 'librouter.so']
+        else:
+            nomes = ['librouter.so']
+        candidates = [resource_path(os.path.join('backend', nome)) for nome in nomes]
+        candidates += [resource_path(nome) for nome in nomes]
         for path in candidates:
             if os.path.exists(path):
                 try:
@@ -88,12 +335,196 @@ class RouterLib:
                         _fields_ = [
                             ("sequencia_ids", ctypes.POINTER(ctypes.c_int)),
                             ("num_ids", ctypes.c_int),
-                            ("distancia_total", ctypes.c_int)
+                            ("distancia_total", ctypes.c_int),
+                            ("nos_visitados", ctypes.c_int),
+                            ("estatisticas", EstatisticasRota)
                         ]
                     
                     self.ResultadoRota = ResultadoRota
                     
-                    # Função principal: calcular_rota
+                    # Estatísticas por consulta: DLL antiga (sem o campo) não passa na conferência de tamanho
+                    if hasattr(self.lib, 'obter_tamanho_resultado'):
+                        self.lib.obter_tamanho_resultado.argtypes = []
+                        self.lib.obter_tamanho_resultado.restype = ctypes.c_int
+                        self._tem_estatisticas = (self.lib.obter_tamanho_resultado() ==
+                                                  ctypes.sizeof(ResultadoRota))
+                    # nos_visitados entrou junto com calcular_rota_modo; sem ele o campo está fora da alocação do C
+                    self._tem_nos_visitados = self._tem_estatisticas or hasattr(self.lib, 'calcular_rota_modo')
+                    
+                    # Configuração de log do backend (silencioso por padrão)
+                    if hasattr(self.lib, 'definir_nivel_log'):
+                        self.lib.definir_nivel_log.argtypes = [ctypes.c_int]
+                        self.lib.definir_nivel_log.restype = None
+                    
+                    if hasattr(self.lib, 'definir_callback_trace'):
+                        self.lib.definir_callback_trace.argtypes = [CallbackTrace]
+                        self.lib.definir_callback_trace.restype = None
+                    
+                    # Sessão de grafo persistente: carregar_grafo / calcular_rota_grafo / liberar_grafo
+                    if hasattr(self.lib, 'carregar_grafo'):
+                        self.lib.carregar_grafo.argtypes = []
+                        self.lib.carregar_grafo.restype = ctypes.c_void_p
+                    
+                    # Grafo binário mapeado em memória (grafo_binario.h) e pinos gravados com ele
+                    if hasattr(self.lib, 'carregar_grafo_binario'):
+                        self.lib.carregar_grafo_binario.argtypes = [ctypes.c_char_p]
+                        self.lib.carregar_grafo_binario.restype = ctypes.c_void_p
+                        self.lib.salvar_grafo_binario.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+                        self.lib.salvar_grafo_binario.restype = ctypes.c_int
+                        self.lib.definir_pinos_grafo.argtypes = [
+                            ctypes.c_void_p, ctypes.c_int,
+                            ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)
+                        ]
+                        self.lib.definir_pinos_grafo.restype = ctypes.c_int
+                        self.lib.obter_numero_pinos_grafo.argtypes = [ctypes.c_void_p]
+                        self.lib.obter_numero_pinos_grafo.restype = ctypes.c_int
+                        self.lib.exportar_pinos.argtypes = [
+                            ctypes.c_void_p, ctypes.c_int,
+                            ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)
+                        ]
+                        self.lib.exportar_pinos.restype = ctypes.c_int
+                    
+                    if hasattr(self.lib, 'liberar_grafo'):
+                        self.lib.liberar_grafo.argtypes = [ctypes.c_void_p]
+                        self.lib.liberar_grafo.restype = None
+                    
+                    if hasattr(self.lib, 'calcular_rota_grafo'):
+                        self.lib.calcular_rota_grafo.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
+                        self.lib.calcular_rota_grafo.restype = ctypes.POINTER(ResultadoRota)
+                    
+                    if hasattr(self.lib, 'calcular_rota_modo'):
+                        self.lib.calcular_rota_modo.argtypes = [ctypes.c_void_p, ctypes.c_int, ctypes.c_int, ctypes.c_int]
+                        self.lib.calcular_rota_modo.restype = ctypes.POINTER(ResultadoRota)
+                    
+                    # Consultas reentrantes: uma AreaTrabalho por thread, grafo compartilhado
+                    if hasattr(self.lib, 'criar_area_trabalho'):
+                        self.lib.criar_area_trabalho.argtypes = [ctypes.c_void_p]
+                        self.lib.criar_area_trabalho.restype = ctypes.c_void_p
+                        self.lib.liberar_area_trabalho.argtypes = [ctypes.c_void_p]
+                        self.lib.liberar_area_trabalho.restype = None
+                        self.lib.calcular_rota_area.argtypes = [ctypes.c_void_p, ctypes.c_void_p,
+                                                                ctypes.c_int, ctypes.c_int, ctypes.c_int]
+                        self.lib.calcular_rota_area.restype = ctypes.POINTER(ResultadoRota)
+                        self.lib.calcular_distancias_lote.argtypes = [
+                            ctypes.c_void_p,                # grafo
+                            ctypes.c_void_p,                # área de trabalho
+                            ctypes.c_int,                   # quantidade de pares
+                            ctypes.POINTER(ctypes.c_int),   # origens (IDs)
+                            ctypes.POINTER(ctypes.c_int),   # destinos (IDs)
+                            ctypes.c_int,                   # modo
+                            ctypes.POINTER(ctypes.c_int),   # distâncias (-1 = sem caminho)
+                            ctypes.POINTER(ctypes.c_int)    # vértices fixados (opcional)
+                        ]
+                        self.lib.calcular_distancias_lote.restype = ctypes.c_int
+                    if hasattr(self.lib, 'calcular_distancias_um_para_muitos'):
+                        self.lib.calcular_distancias_um_para_muitos.argtypes = [
+                            ctypes.c_void_p,                # grafo
+                            ctypes.c_void_p,                # área de trabalho
+                            ctypes.c_int,                   # id de origem
+                            ctypes.c_int,                   # quantidade de destinos
+                            ctypes.POINTER(ctypes.c_int),   # destinos (IDs)
+                            ctypes.POINTER(ctypes.c_int)    # distâncias (-1 = sem caminho)
+                        ]
+                        self.lib.calcular_distancias_um_para_muitos.restype = ctypes.c_int
+                    
+                    # Árvore de caminhos mínimos (um-para-todos) em buffers do chamador
+                    if hasattr(self.lib, 'calcular_arvore_caminhos'):
+                        self.lib.calcular_arvore_caminhos.argtypes = [
+                            ctypes.c_void_p,                # grafo
+                            ctypes.c_int,                   # id de origem
+                            ctypes.c_int,                   # capacidade
+                            ctypes.POINTER(ctypes.c_int),   # distâncias (-1 = inalcançável)
+                            ctypes.POINTER(ctypes.c_int)    # IDs dos predecessores
+                        ]
+                        self.lib.calcular_arvore_caminhos.restype = ctypes.c_int
+                    
+                    # Versão (checksum) dos dados do grafo: invalida o cache de rotas
+                    if hasattr(self.lib, 'obter_versao_grafo'):
+                        self.lib.obter_versao_grafo.argtypes = [ctypes.c_void_p]
+                        self.lib.obter_versao_grafo.restype = ctypes.c_uint
+                    
+                    # Contraction Hierarchies: pré-processamento, arquivo .ch e consulta
+                    if hasattr(self.lib, 'construir_ch'):
+                        self.lib.construir_ch.argtypes = [ctypes.c_void_p]
+                        self.lib.construir_ch.restype = ctypes.c_void_p
+                        self.lib.salvar_ch.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+                        self.lib.salvar_ch.restype = ctypes.c_int
+                        self.lib.carregar_ch.argtypes = [ctypes.c_void_p, ctypes.c_char_p]
+                        self.lib.carregar_ch.restype = ctypes.c_void_p
+                        self.lib.liberar_ch.argtypes = [ctypes.c_void_p]
+                        self.lib.liberar_ch.restype = None
+                        self.lib.calcular_rota_ch.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int, ctypes.c_int]
+                        self.lib.calcular_rota_ch.restype = ctypes.POINTER(ResultadoRota)
+                        if hasattr(self.lib, 'calcular_rota_ch_area'):
+                            self.lib.calcular_rota_ch_area.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p,
+                                                                       ctypes.c_int, ctypes.c_int]
+                            self.lib.calcular_rota_ch_area.restype = ctypes.POINTER(ResultadoRota)
+                            self.lib.calcular_distancias_lote_ch.argtypes = [
+                                ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int,
+                                ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int),
+                                ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)
+                            ]
+                            self.lib.calcular_distancias_lote_ch.restype = ctypes.c_int
+                        if hasattr(self.lib, 'calcular_matriz_ch'):
+                            self.lib.calcular_matriz_ch.argtypes = [
+                                ctypes.c_void_p, ctypes.c_void_p, ctypes.c_void_p, ctypes.c_int,
+                                ctypes.POINTER(ctypes.c_int), ctypes.POINTER(ctypes.c_int)
+                            ]
+                            self.lib.calcular_matriz_ch.restype = ctypes.c_int
+                        self.lib.obter_numero_atalhos_ch.argtypes = [ctypes.c_void_p]
+                        self.lib.obter_numero_atalhos_ch.restype = ctypes.c_int
+                        self.lib.obter_tamanho_ch.argtypes = [ctypes.c_void_p]
+                        self.lib.obter_tamanho_ch.restype = ctypes.c_longlong
+                    
+                    # Exportação em lote dos vértices (uma única chamada em vez de uma por vértice)
+                    if hasattr(self.lib, 'exportar_vertices'):
+                        self.lib.obter_numero_vertices_grafo.argtypes = [ctypes.c_void_p]
+                        self.lib.obter_numero_vertices_grafo.restype = ctypes.c_int
+                        self.lib.obter_tamanho_textos_grafo.argtypes = [ctypes.c_void_p]
+                        self.lib.obter_tamanho_textos_grafo.restype = ctypes.c_int
+                        self.lib.exportar_vertices.argtypes = [
+                            ctypes.c_void_p,                # grafo
+                            ctypes.c_int,                   # capacidade
+                            ctypes.POINTER(ctypes.c_int),   # ids
+                            ctypes.POINTER(ctypes.c_int),   # x
+                            ctypes.POINTER(ctypes.c_int),   # y
+                            ctypes.POINTER(ctypes.c_int),   # tipo
+                            ctypes.POINTER(ctypes.c_int),   # offsets (3 * capacidade + 1)
+                            ctypes.c_char_p,                # bloco de textos UTF-8
+                            ctypes.c_int                    # tamanho do bloco
+                        ]
+                        self.lib.exportar_vertices.restype = ctypes.c_int
+                    
+                    if hasattr(self.lib, 'exportar_arestas'):
+                        self.lib.obter_numero_arestas_grafo.argtypes = [ctypes.c_void_p]
+                        self.lib.obter_numero_arestas_grafo.restype = ctypes.c_int
+                        self.lib.exportar_arestas.argtypes = [
+                            ctypes.c_void_p,                # grafo
+                            ctypes.c_int,                   # capacidade
+                            ctypes.POINTER(ctypes.c_int),   # IDs de origem
+                            ctypes.POINTER(ctypes.c_int),   # IDs de destino
+                            ctypes.POINTER(ctypes.c_int)    # pesos (metros)
+                        ]
+                        self.lib.exportar_arestas.restype = ctypes.c_int
+                    
+                    # Importação em lote (inverso das exportações), usada por ferramentas/importar_osm.py
+                    if hasattr(self.lib, 'importar_grafo'):
+                        self.lib.importar_grafo.argtypes = [
+                            ctypes.c_int,                   # num_vertices
+                            ctypes.POINTER(ctypes.c_int),   # ids
+                            ctypes.POINTER(ctypes.c_int),   # x
+                            ctypes.POINTER(ctypes.c_int),   # y
+                            ctypes.POINTER(ctypes.c_int),   # tipo
+                            ctypes.POINTER(ctypes.c_int),   # offsets (3 * num_vertices + 1)
+                            ctypes.c_char_p,                # textos
+                            ctypes.c_int,                   # num_arestas
+                            ctypes.POINTER(ctypes.c_int),   # origens (IDs)
+                            ctypes.POINTER(ctypes.c_int),   # destinos (IDs)
+                            ctypes.POINTER(ctypes.c_int)    # pesos (metros)
+                        ]
+                        self.lib.importar_grafo.restype = ctypes.c_void_p
+                    
+                    # Função legada: calcular_rota (recria o grafo a cada chamada)
                     if hasattr(self.lib, 'calcular_rota'):
                         self.lib.calcular_rota.argtypes = [ctypes.c_int, ctypes.c_int]
                         self.lib.calcular_rota.restype = ctypes.POINTER(ResultadoRota)
@@ -103,7 +534,29 @@ class RouterLib:
                         self.lib.liberar_resultado.argtypes = [ctypes.POINTER(ResultadoRota)]
                         self.lib.liberar_resultado.restype = None
                     
-                    # Função: obter_info_vertice - retorna nome, categoria e coords de um vértice
+                    # Função: obter_info_vertice_grafo - nome, categoria e coords de um vértice do grafo carregado
+                    if hasattr(self.lib, 'obter_info_vertice_grafo'):
+                        self.lib.obter_info_vertice_grafo.argtypes = [
+                            ctypes.c_void_p,                 # Grafo*
+                            ctypes.c_int,                    # id do vértice
+                            ctypes.c_char_p, ctypes.c_int,  # buffer nome + tamanho
+                            ctypes.c_char_p, ctypes.c_int,  # buffer categoria + tamanho
+                            ctypes.POINTER(ctypes.c_int),   # x_out
+                            ctypes.POINTER(ctypes.c_int)    # y_out
+                        ]
+                        self.lib.obter_info_vertice_grafo.restype = ctypes.c_int
+                    
+                    # Função: obter_rua_vertice_grafo - nome da rua de um vértice do grafo carregado
+                    if hasattr(self.lib, 'obter_rua_vertice_grafo'):
+                        self.lib.obter_rua_vertice_grafo.argtypes = [
+                            ctypes.c_void_p,    # Grafo*
+                            ctypes.c_int,       # id do vértice
+                            ctypes.c_char_p,    # buffer de saída
+                            ctypes.c_int        # tamanho do buffer
+                        ]
+                        self.lib.obter_rua_vertice_grafo.restype = ctypes.c_int
+                    
+                    # Função (DLL antiga): obter_info_vertice - mesmos dados, lidos do banco estático
                     if hasattr(self.lib, 'obter_info_vertice'):
                         self.lib.obter_info_vertice.argtypes = [
                             ctypes.c_int,                    # id do vértice
@@ -119,7 +572,7 @@ class RouterLib:
                         self.lib.obter_numero_total_vertices.argtypes = []
                         self.lib.obter_numero_total_vertices.restype = ctypes.c_int
                     
-                    # Função: obter_rua_vertice - retorna nome da rua de um vértice
+                    # Função (DLL antiga): obter_rua_vertice - nome da rua, lido do banco estático
                     if hasattr(self.lib, 'obter_rua_vertice'):
                         self.lib.obter_rua_vertice.argtypes = [
                             ctypes.c_int,       # id do vértice
@@ -134,8 +587,380 @@ class RouterLib:
                     print(f"Erro ao carregar DLL: {e}")
                     self.lib = None
 
+    def _load_grafo(self):
+        """Cria o grafo persistente no C uma única vez (reutilizado por todas as consultas).
+        Usa o grafo binário (mapa.grafo) se existir; senão, os dados estáticos compilados na DLL."""
+        if not self.lib or not hasattr(self.lib, 'carregar_grafo'):
+            return
+        
+        try:
+            inicio = time.perf_counter()
+            grafo = None
+            origem = "dados estáticos"
+            if (self.caminho_grafo and hasattr(self.lib, 'carregar_grafo_binario')
+                    and os.path.exists(self.caminho_grafo)):
+                grafo = self.lib.carregar_grafo_binario(self.caminho_grafo.encode('utf-8'))
+                if grafo:
+                    origem = os.path.basename(self.caminho_grafo)
+                else:
+                    print(f"⚠️ Grafo binário inválido: {self.caminho_grafo} (usando dados estáticos)")
+            if not grafo:
+                grafo = self.lib.carregar_grafo()
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            
+            if grafo:
+                self.grafo = grafo
+                print(f"⏱️ Grafo carregado de {origem} em {duracao_ms:.2f} ms")
+            else:
+                print("⚠️ Falha ao carregar grafo persistente (usando calcular_rota legado)")
+        except Exception as e:
+            print(f"Erro ao carregar grafo: {e}")
+            self.grafo = None
+
+    def _load_motor_python(self):
+        """Sem backend C: carrega motor Python a partir do grafo exportado (grafo.json)"""
+        if self.lib:
+            return
+        
+        caminho = resource_path('grafo.json')
+        if not os.path.exists(caminho):
+            print(f"⚠️ Grafo exportado não encontrado: {caminho}")
+            return
+        
+        try:
+            inicio = time.perf_counter()
+            self.motor = MotorPython(caminho)
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            print(f"🐍 Motor Python carregado ({self.motor.num_vertices} vértices) em {duracao_ms:.2f} ms")
+        except Exception as e:
+            print(f"Erro ao carregar motor Python: {e}")
+            self.motor = None
+
+    def exportar_grafo(self, caminho: str) -> bool:
+        """Exporta o grafo do backend C para JSON (entrada do motor Python)"""
+        vertices = self._exportar_vertices()
+        if vertices is None or not hasattr(self.lib, 'exportar_arestas'):
+            print("❌ Exportação de grafo requer o backend C")
+            return False
+        
+        n = self.lib.obter_numero_arestas_grafo(self.grafo)
+        origens = (ctypes.c_int * n)()
+        destinos = (ctypes.c_int * n)()
+        pesos = (ctypes.c_int * n)()
+        if self.lib.exportar_arestas(self.grafo, n, origens, destinos, pesos) < 0:
+            print("❌ Falha ao exportar arestas")
+            return False
+        
+        dados = {
+            'vertices': vertices,
+            'arestas': [[origens[i], destinos[i], pesos[i]] for i in range(n)]
+        }
+        with open(caminho, 'w', encoding='utf-8') as f:
+            json.dump(dados, f, ensure_ascii=False, separators=(',', ':'))
+        
+        print(f"✅ Grafo exportado: {len(vertices)} vértices, {n} arestas → {caminho}")
+        return True
+
+    def salvar_grafo_binario(self, caminho: str, pinos: Optional[Dict[int, Tuple[int, int]]] = None) -> bool:
+        """Grava o grafo carregado no formato binário (carregado por mapeamento de memória).
+        pinos: id -> (x, y) das coordenadas visuais, gravados junto com o grafo."""
+        if not self.lib or not self.grafo or not hasattr(self.lib, 'salvar_grafo_binario'):
+            print("❌ Grafo binário requer o backend C")
+            return False
+        
+        if pinos is not None:
+            ids = sorted(pinos)
+            n = len(ids)
+            ids_c = (ctypes.c_int * n)(*ids)
+            xs_c = (ctypes.c_int * n)(*(pinos[i][0] for i in ids))
+            ys_c = (ctypes.c_int * n)(*(pinos[i][1] for i in ids))
+            if self.lib.definir_pinos_grafo(self.grafo, n, ids_c, xs_c, ys_c) != 0:
+                print("❌ Não foi possível registrar os pinos (grafo mapeado é somente leitura)")
+                return False
+        
+        if self.lib.salvar_grafo_binario(self.grafo, caminho.encode('utf-8')) != 0:
+            print(f"❌ Falha ao gravar {caminho}")
+            return False
+        
+        print(f"✅ Grafo binário gravado: {os.path.getsize(caminho)} bytes → {caminho}")
+        return True
+
+    def obter_pinos(self) -> Optional[Dict[int, Tuple[int, int]]]:
+        """Coordenadas visuais gravadas no grafo binário (id -> (x, y)); None se o grafo não tiver pinos"""
+        if not self.lib or not self.grafo or not hasattr(self.lib, 'exportar_pinos'):
+            return None
+        
+        n = self.lib.obter_numero_pinos_grafo(self.grafo)
+        if n <= 0:
+            return None
+        
+        ids = (ctypes.c_int * n)()
+        xs = (ctypes.c_int * n)()
+        ys = (ctypes.c_int * n)()
+        if self.lib.exportar_pinos(self.grafo, n, ids, xs, ys) < 0:
+            return None
+        return {ids[i]: (xs[i], ys[i]) for i in range(n)}
+
+    def definir_nivel_log(self, nivel: int):
+        """Define a verbosidade do backend C (LOG_SILENCIOSO, LOG_ERRO, LOG_INFO ou LOG_TRACE)"""
+        if self.lib and hasattr(self.lib, 'definir_nivel_log'):
+            self.lib.definir_nivel_log(int(nivel))
+
+    def definir_trace(self, callback=None):
+        """Encaminha as mensagens de log do backend para callback(nivel, mensagem); None volta ao stdout"""
+        if not self.lib or not hasattr(self.lib, 'definir_callback_trace'):
+            return
+        
+        if callback is None:
+            self._trace_callback = None
+            self.lib.definir_callback_trace(CallbackTrace())  # Ponteiro NULL
+            return
+        
+        def _encaminhar(nivel, mensagem):
+            callback(nivel, mensagem.decode('utf-8', errors='ignore') if mensagem else '')
+        
+        self._trace_callback = CallbackTrace(_encaminhar)
+        self.lib.definir_callback_trace(self._trace_callback)
+
+    def carregar_ch(self, caminho: Optional[str] = None, construir: bool = True) -> bool:
+        """Carrega a hierarquia de contração (MODO_CH) do arquivo; se ausente ou de outra versão do
+        grafo e construir=True, executa o pré-processamento e salva o resultado em 'caminho'"""
+        if not self.lib or not self.grafo or not hasattr(self.lib, 'construir_ch'):
+            print("⚠️ Contraction Hierarchies requer o backend C")
+            return False
+        
+        caminho = caminho or resource_path('grafo.ch')
+        self.liberar_ch()
+        
+        inicio = time.perf_counter()
+        ch = self.lib.carregar_ch(self.grafo, caminho.encode('utf-8')) if os.path.exists(caminho) else None
+        if ch:
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            print(f"📦 Hierarquia carregada de {caminho} em {duracao_ms:.2f} ms")
+        elif construir:
+            ch = self.lib.construir_ch(self.grafo)
+            if not ch:
+                print("❌ Falha no pré-processamento da hierarquia")
+                return False
+            duracao_ms = (time.perf_counter() - inicio) * 1000
+            print(f"🏗️ Hierarquia construída em {duracao_ms:.2f} ms "
+                  f"({self.lib.obter_numero_atalhos_ch(ch)} atalhos)")
+            if self.lib.salvar_ch(ch, caminho.encode('utf-8')) == 0:
+                print(f"💾 Hierarquia salva em {caminho}")
+        else:
+            print(f"⚠️ Hierarquia inválida ou ausente: {caminho}")
+            return False
+        
+        self.ch = ch
+        self._caminho_ch = caminho
+        return True
+
+    def liberar_ch(self):
+        """Libera a hierarquia de contração (consultas MODO_CH voltam a usar a busca bidirecional)"""
+        if self.lib and self.ch and hasattr(self.lib, 'liberar_ch'):
+            self.lib.liberar_ch(self.ch)
+        self.ch = None
+
+    def _area_trabalho(self):
+        """AreaTrabalho* da thread atual (criada na primeira consulta da thread). None se indisponível."""
+        if not self.lib or not self.grafo or not hasattr(self.lib, 'criar_area_trabalho'):
+            return None
+        
+        local = self._areas_local
+        if getattr(local, 'geracao', None) != self._geracao_areas:
+            area = self.lib.criar_area_trabalho(self.grafo)
+            if not area:
+                return None
+            with self._lock_areas:
+                self._areas.append(area)
+            local.area = area
+            local.geracao = self._geracao_areas
+        return local.area
+
+    def _liberar_areas(self):
+        """Libera as áreas de todas as threads (o grafo a que pertencem está sendo descartado)"""
+        with self._lock_areas:
+            if self.lib and hasattr(self.lib, 'liberar_area_trabalho'):
+                for area in self._areas:
+                    self.lib.liberar_area_trabalho(area)
+            self._areas = []
+            self._geracao_areas += 1
+
+    def _obter_pool(self, trabalhadores: int) -> ThreadPoolExecutor:
+        """Pool de threads das consultas em lote, um por tamanho pedido. Pools nunca são trocados
+        enquanto o RouterLib está aberto: lotes concorrentes (p. ex. vários /lote do serviço) podem
+        estar usando qualquer um deles; só fechar() os encerra."""
+        with self._lock_pools:
+            pool = self._pools.get(trabalhadores)
+            if pool is None:
+                pool = ThreadPoolExecutor(max_workers=trabalhadores, thread_name_prefix=f'RouterLib{trabalhadores}')
+                self._pools[trabalhadores] = pool
+            return pool
+
+    def calcular_distancias_lote(self, pares: List[Tuple[int, int]], modo: int = MODO_BIDIRECIONAL,
+                                 trabalhadores: Optional[int] = None) -> List[Optional[int]]:
+        """Distâncias (metros, None = sem caminho) de muitos pares origem → destino, na ordem dos pares.
+        
+        Os pares são divididos em blocos distribuídos num pool de threads; cada bloco é
+        uma única chamada C (sem o GIL) com a área de trabalho da thread, sobre o mesmo
+        grafo compartilhado. Não passa pelo cache de rotas."""
+        pares = list(pares)
+        n = len(pares)
+        if n == 0:
+            return []
+        
+        # Sem backend C reentrante: consultas sequenciais (motor Python ou DLL antiga)
+        if not self.lib or not self.grafo or not hasattr(self.lib, 'calcular_distancias_lote'):
+            distancias = []
+            for id_origem, id_destino in pares:
+                rota = self._calcular_rota_backend(id_origem, id_destino, modo) if id_origem != id_destino else None
+                distancias.append(0 if id_origem == id_destino else (rota['distancia_total'] if rota else None))
+            return distancias
+        
+        modo = self.modo_efetivo(modo)  # Sem hierarquia carregada, MODO_CH usa a busca bidirecional
+        usar_ch = modo == self.MODO_CH and hasattr(self.lib, 'calcular_distancias_lote_ch')
+        
+        trabalhadores = max(1, trabalhadores or os.cpu_count() or 1)
+        tamanho_bloco = max(1, min(256, -(-n // (trabalhadores * 4))))  # ~4 blocos por thread (balanceamento)
+        origens = (ctypes.c_int * n)(*(o for o, _ in pares))
+        destinos = (ctypes.c_int * n)(*(d for _, d in pares))
+        saida = (ctypes.c_int * n)()
+        tamanho_int = ctypes.sizeof(ctypes.c_int)
+        
+        def _executar_bloco(inicio: int) -> int:
+            area = self._area_trabalho()
+            if area is None:
+                return -1
+            quantidade = min(tamanho_bloco, n - inicio)
+            bloco = ctypes.c_int * quantidade  # Visões do trecho do bloco (sem cópia)
+            deslocamento = inicio * tamanho_int
+            o = bloco.from_buffer(origens, deslocamento)
+            d = bloco.from_buffer(destinos, deslocamento)
+            s = bloco.from_buffer(saida, deslocamento)
+            if usar_ch:
+                return self.lib.calcular_distancias_lote_ch(self.grafo, self.ch, area, quantidade, o, d, s, None)
+            return self.lib.calcular_distancias_lote(self.grafo, area, quantidade, o, d, modo, s, None)
+        
+        if any(r < 0 for r in self._obter_pool(trabalhadores).map(_executar_bloco, range(0, n, tamanho_bloco))):
+            print("❌ Falha no cálculo em lote")
+            return [None] * n
+        
+        return [d if d >= 0 else None for d in saida]
+
+    def fechar(self):
+        """Libera o grafo persistente no C (chamar ao encerrar a aplicação)"""
+        with self._lock_pools:
+            pools, self._pools = list(self._pools.values()), {}
+        for pool in pools:
+            pool.shutdown(wait=True)  # Nenhuma consulta em lote pode estar usando o grafo
+        self._liberar_areas()
+        self.liberar_ch()
+        if self.lib and self.grafo and hasattr(self.lib, 'liberar_grafo'):
+            self.lib.liberar_grafo(self.grafo)
+        self.grafo = None
+
+    def versao_grafo(self):
+        """Versão dos dados do grafo em uso (checksum no C, CRC32 do grafo.json no motor Python)"""
+        if self.motor:
+            return self.motor.versao
+        if self.lib and self.grafo and hasattr(self.lib, 'obter_versao_grafo'):
+            return self.lib.obter_versao_grafo(self.grafo)
+        return 0
+
+    def recarregar_grafo(self):
+        """Recarrega o grafo (backend C ou grafo.json) e descarta caches derivados dos dados antigos"""
+        caminho_ch = self._caminho_ch if self.ch else None
+        self.fechar()
+        self.motor = None
+        self._vertices_exportados = None
+        self._vertices_por_id = None
+        self._indice_por_id = None
+        self.pontos_info = {}
+        self._load_grafo()
+        self._load_motor_python()
+        self._load_pontos_info()
+        if caminho_ch:
+            self.carregar_ch(caminho_ch)  # Arquivo de outra versão do grafo é reconstruído
+        self._validar_cache()
+
+    def _validar_cache(self):
+        """Limpa o cache de rotas se a versão do grafo mudou; retorna a versão atual"""
+        versao = self.versao_grafo()
+        if versao != self._versao_cache:
+            if len(self.cache_rotas):
+                print(f"♻️ Grafo alterado: {len(self.cache_rotas)} rotas removidas do cache")
+            self.cache_rotas.limpar()
+            self._versao_cache = versao
+        return versao
+
+    def estatisticas_cache(self) -> Dict:
+        """Acertos, falhas, tamanho e taxa de acerto do cache de rotas"""
+        return self.cache_rotas.estatisticas()
+
+    def _exportar_vertices(self) -> Optional[List[Dict]]:
+        """Exporta todos os vértices do grafo em uma única chamada C (cacheado). None se indisponível."""
+        if self._vertices_exportados is not None:
+            return self._vertices_exportados
+        
+        if self.motor:
+            self._vertices_exportados = self.motor.exportar_vertices()
+            return self._vertices_exportados
+        
+        if not self.lib or not self.grafo or not hasattr(self.lib, 'exportar_vertices'):
+            return None
+        
+        try:
+            n = self.lib.obter_numero_vertices_grafo(self.grafo)
+            tamanho_textos = self.lib.obter_tamanho_textos_grafo(self.grafo)
+            
+            # Arrays contíguos preenchidos pelo C
+            ids = (ctypes.c_int * n)()
+            xs = (ctypes.c_int * n)()
+            ys = (ctypes.c_int * n)()
+            tipos = (ctypes.c_int * n)()
+            offsets = (ctypes.c_int * (3 * n + 1))()
+            textos = ctypes.create_string_buffer(max(tamanho_textos, 1))
+            
+            exportados = self.lib.exportar_vertices(self.grafo, n, ids, xs, ys, tipos,
+                                                    offsets, textos, len(textos))
+            if exportados < 0:
+                print("⚠️ Falha na exportação em lote de vértices")
+                return None
+            
+            # Fatia o bloco de textos usando os offsets (nome, categoria, rua)
+            bloco = textos.raw
+            offs = list(offsets)
+            vertices = []
+            for i in range(exportados):
+                o = 3 * i
+                vertices.append({
+                    'id': ids[i],
+                    'nome': bloco[offs[o]:offs[o + 1]].decode('utf-8', errors='ignore'),
+                    'categoria': bloco[offs[o + 1]:offs[o + 2]].decode('utf-8', errors='ignore'),
+                    'rua': bloco[offs[o + 2]:offs[o + 3]].decode('utf-8', errors='ignore'),
+                    'tipo': tipos[i],
+                    'x': xs[i],
+                    'y': ys[i],
+                })
+            
+            self._vertices_exportados = vertices
+            return vertices
+        
+        except Exception as e:
+            print(f"Erro na exportação em lote de vértices: {e}")
+            return None
+
     def _load_pontos_info(self):
         """Cache de pontos turísticos do backend C (exclui esquinas)"""
+        # Caminho rápido: exportação em lote (uma chamada FFI, O(V))
+        vertices = self._exportar_vertices()
+        if vertices is not None:
+            for v in vertices:
+                if v['tipo'] == 1 and v['categoria'] and v['categoria'] != "Esquina":
+                    self.pontos_info[v['id']] = (v['nome'], v['categoria'])
+            print(f"📋 {len(self.pontos_info)} pontos turísticos carregados")
+            return
+        
         if not self.lib or not hasattr(self.lib, 'get_num_pontos') or not hasattr(self.lib, 'get_ponto_info'):
             print("⚠️ Funções de pontos não disponíveis no backend")
             return
@@ -144,14 +969,14 @@ class RouterLib:
             num_pontos = self.lib.get_num_pontos()
             print(f"📋 Carregando {num_pontos} pontos turísticos...")
             
+            # Buffers reutilizados em todas as chamadas (get_ponto_info é O(1) por índice)
+            nome_buf = ctypes.create_string_buffer(100)
+            cat_buf = ctypes.create_string_buffer(50)
+            id_val = ctypes.c_int()
+            x_val = ctypes.c_int()
+            y_val = ctypes.c_int()
+            
             for i in range(num_pontos):
-                # Aloca buffers para receber strings do C
-                nome_buf = ctypes.create_string_buffer(100)
-                cat_buf = ctypes.create_string_buffer(50)
-                id_val = ctypes.c_int()
-                x_val = ctypes.c_int()
-                y_val = ctypes.c_int()
-                
                 # Chama função C para obter dados do ponto
                 result = self.lib.get_ponto_info(
                     i, 
@@ -176,14 +1001,29 @@ class RouterLib:
     
     def carregar_lista_pontos(self) -> List[Dict]:
         """Retorna lista de todos os vértices do grafo (banco de rotas) com nome, categoria e coordenadas"""
-        if not self.lib:
+        if not self.lib and not self.motor:
             print("❌ Biblioteca C não carregada")
             return []
         
+        # Caminho rápido: exportação em lote
+        vertices = self._exportar_vertices()
+        if vertices is not None:
+            pontos = [{
+                'id': v['id'],
+                'nome': v['nome'],
+                'categoria': v['categoria'],
+                'x_vertice': v['x'],    # Coordenada do vértice (usada no Dijkstra)
+                'y_vertice': v['y'],
+                'x_visual': v['x'],     # Coordenada visual (mesmo valor por enquanto)
+                'y_visual': v['y']
+            } for v in vertices]
+            print(f"✅ {len(pontos)} pontos carregados do BANCO 1")
+            return pontos
+        
         pontos = []
         try:
             # Obtém quantidade total de vértices no grafo
-            if not hasattr(self.lib, 'obter_numero_total_vertices'):
+            if not hasattr(self.lib, 'obter_numero_total_vertices') or not hasattr(self.lib, 'obter_info_vertice'):
                 print("⚠️ Função obter_numero_total_vertices não disponível")
                 return []
             
@@ -262,47 +1102,251 @@ class RouterLib:
             pts.append((x, y))
         return '\n'.join(f'{x},{y}' for x, y in pts)
 
-    def calcular_rota_dijkstra(self, id_origem: int, id_destino: int) -> Optional[Dict]:
-        """Calcula menor caminho usando Dijkstra no backend C. Retorna dict com IDs e distância."""
-        if not self.lib:
-            print("❌ Biblioteca C não carregada")
-            return None
+    def calcular_rota_dijkstra(self, id_origem: int, id_destino: int,
+                               modo: int = MODO_DIJKSTRA) -> Optional[Dict]:
+        """Calcula menor caminho no backend C (modo = MODO_DIJKSTRA, MODO_ASTAR ou MODO_BIDIRECIONAL). Retorna dict com
+        IDs, distância, vértices fixados ('nos_visitados'), coordenadas ('pontos'), ruas ('ruas') e
+        'estatisticas' (tempos por fase em µs e contadores da busca, também entregues ao gancho de métricas).
+        Consultas repetidas vêm do cache LRU."""
+        inicio = time.perf_counter()
         
         # Validação: origem e destino diferentes
         if id_origem == id_destino:
-            print("❌ Origem e destino são iguais")
+            if self.verboso:
+                print("❌ Origem e destino são iguais")
+            return None
+        
+        # Modo realmente executado (ex.: MODO_CH sem hierarquia roda o bidirecional): vale para a
+        # chave do cache, o rótulo das métricas e o 'modo' da rota
+        modo = self.modo_efetivo(modo)
+        
+        # Cache: chave inclui a versão do grafo (dados novos nunca reutilizam rotas antigas)
+        chave = (id_origem, id_destino, modo, self._validar_cache())
+        rota = self.cache_rotas.obter(chave)
+        if rota is not None:
+            rota = self._copiar_rota(rota)
+            rota['estatisticas'] = self._publicar_estatisticas({'cache': True}, modo, inicio)
+            return rota
+        
+        rota = self._calcular_rota_backend(id_origem, id_destino, modo)
+        if rota is None:
+            self._publicar_estatisticas({'encontrada': False}, modo, inicio)
+            return None
+        
+        inicio_geometria = time.perf_counter()
+        rota['pontos'], rota['ruas'] = self.resolver_geometria(rota['sequencia_ids'])
+        estatisticas = rota.setdefault('estatisticas', {})
+        estatisticas['geometria_us'] = (time.perf_counter() - inicio_geometria) * 1e6
+        self.cache_rotas.inserir(chave, rota)
+        
+        rota = self._copiar_rota(rota)
+        rota['estatisticas'] = self._publicar_estatisticas(dict(estatisticas), modo, inicio)
+        return rota
+
+    @staticmethod
+    def _copiar_rota(rota: Dict) -> Dict:
+        """Cópia da rota com listas próprias: quem recebe pode alterá-las sem corromper o cache"""
+        return {chave: list(valor) if isinstance(valor, list) else valor for chave, valor in rota.items()}
+
+    def modo_efetivo(self, modo: int) -> int:
+        """Algoritmo que o backend executa para o modo pedido (fallbacks sem hierarquia, DLL antiga
+        ou motor Python, que só tem Dijkstra e A*)"""
+        if not self.lib and self.motor:
+            return self.MODO_ASTAR if modo == self.MODO_ASTAR else self.MODO_DIJKSTRA
+        if not self.lib:
+            return modo
+        if modo == self.MODO_CH and not self.ch:
+            return self.MODO_BIDIRECIONAL
+        if modo != self.MODO_CH and not hasattr(self.lib, 'calcular_rota_area') and \
+                not hasattr(self.lib, 'calcular_rota_modo'):
+            return self.MODO_DIJKSTRA  # DLL antiga: só calcular_rota_grafo/calcular_rota
+        return modo
+
+    def definir_gancho_metricas(self, gancho=None):
+        """Registra função chamada com as estatísticas de cada consulta (None desliga), p. ex.
+        metricas.ColetorMetricas().registrar. Roda na thread da consulta."""
+        self.gancho_metricas = gancho
+
+    def _publicar_estatisticas(self, estatisticas: Dict, modo: int, inicio: float) -> Dict:
+        """Completa as estatísticas (algoritmo, total) e entrega ao gancho de métricas"""
+        estatisticas['algoritmo'] = self.NOMES_MODOS.get(modo, "Dijkstra")
+        estatisticas.setdefault('cache', False)
+        estatisticas.setdefault('encontrada', True)
+        estatisticas['total_us'] = (time.perf_counter() - inicio) * 1e6
+        gancho = self.gancho_metricas
+        if gancho is not None:
+            try:
+                gancho(estatisticas)
+            except Exception as e:
+                print(f"⚠️ Erro no gancho de métricas: {e}")
+        return estatisticas
+
+    def calcular_arvore_caminhos(self, id_origem: int) -> Optional[ArvoreCaminhos]:
+        """Executa uma única busca a partir da origem e retorna distâncias/caminhos para todos os vértices"""
+        if not self.lib and self.motor:
+            arvore = self.motor.calcular_arvore_caminhos(id_origem)
+            if arvore is None:
+                return None
+            return ArvoreCaminhos(id_origem, list(self.motor.ids), *arvore)
+        
+        vertices = self._exportar_vertices()
+        if vertices is None or not hasattr(self.lib, 'calcular_arvore_caminhos'):
+            print("❌ Árvore de caminhos requer o grafo persistente do backend C")
+            return None
+        
+        n = len(vertices)
+        distancias = (ctypes.c_int * n)()
+        anteriores = (ctypes.c_int * n)()
+        if self.lib.calcular_arvore_caminhos(self.grafo, id_origem, n, distancias, anteriores) < 0:
+            print(f"❌ Não foi possível calcular a árvore de caminhos a partir de {id_origem}")
+            return None
+        
+        return ArvoreCaminhos(id_origem, [v['id'] for v in vertices], list(distancias), list(anteriores))
+
+    def distancias_um_para_muitos(self, id_origem: int, destinos: List[int]) -> List[Optional[int]]:
+        """Distâncias da origem a cada destino com uma única busca um-para-todos (None se inalcançável).
+        Não monta ArvoreCaminhos: a busca do C para quando todos os destinos são fixados e só as
+        posições pedidas são copiadas. Seguro entre threads (área de trabalho da thread)."""
+        area = self._area_trabalho()
+        if area and hasattr(self.lib, 'calcular_distancias_um_para_muitos'):
+            quantidade = len(destinos)
+            ids = (ctypes.c_int * quantidade)(*destinos)
+            saida = (ctypes.c_int * quantidade)()
+            if self.lib.calcular_distancias_um_para_muitos(self.grafo, area, id_origem, quantidade, ids, saida) < 0:
+                return [None] * quantidade
+            return [d if d >= 0 else None for d in saida]
+        
+        if not self.lib and self.motor:
+            arvore = self.motor.calcular_arvore_caminhos(id_origem)
+            if arvore is None:
+                return [None] * len(destinos)
+            indices, distancias = self.motor.indice_por_id, arvore[0]
+        else:
+            vertices = self._exportar_vertices()
+            if vertices is None or not hasattr(self.lib, 'calcular_arvore_caminhos'):
+                print("❌ Árvore de caminhos requer o grafo persistente do backend C")
+                return [None] * len(destinos)
+            if self._indice_por_id is None:
+                self._indice_por_id = {v['id']: i for i, v in enumerate(vertices)}
+            indices = self._indice_por_id
+            n = len(vertices)
+            distancias = (ctypes.c_int * n)()
+            anteriores = (ctypes.c_int * n)()
+            if self.lib.calcular_arvore_caminhos(self.grafo, id_origem, n, distancias, anteriores) < 0:
+                return [None] * len(destinos)
+        
+        resultado = []
+        for id_destino in destinos:
+            i = indices.get(id_destino)
+            d = distancias[i] if i is not None else -1
+            resultado.append(d if d >= 0 else None)
+        return resultado
+
+    def matriz_distancias(self, ids: List[int]) -> List[List[Optional[int]]]:
+        """matriz[i][j] = distância de ids[i] até ids[j] (None se inalcançável). Com a hierarquia
+        carregada usa a busca muitos-para-muitos do C (2k buscas na hierarquia); sem ela, uma
+        busca um-para-muitos por origem."""
+        area = self._area_trabalho()
+        if self.ch and area and hasattr(self.lib, 'calcular_matriz_ch'):
+            k = len(ids)
+            entrada = (ctypes.c_int * k)(*ids)
+            saida = (ctypes.c_int * (k * k))()
+            if self.lib.calcular_matriz_ch(self.grafo, self.ch, area, k, entrada, saida) == k:
+                return [[d if d >= 0 else None for d in saida[i * k:(i + 1) * k]] for i in range(k)]
+        return [self.distancias_um_para_muitos(id_origem, ids) for id_origem in ids]
+
+    def distancias_para_pontos(self, id_origem: int) -> Dict[int, int]:
+        """Distância da origem até cada ponto turístico alcançável (uma busca em vez de N)"""
+        arvore = self.calcular_arvore_caminhos(id_origem)
+        if arvore is None:
+            return {}
+        return {pid: arvore.distancias[pid] for pid in self.pontos_info
+                if pid in arvore.distancias and pid != id_origem}
+
+    def resolver_geometria(self, sequencia_ids: List[int]) -> Tuple[List[Tuple[int, int]], List[str]]:
+        """Converte IDs da rota em coordenadas (x, y) e lista de ruas sem repetição (para desenho)"""
+        if self._vertices_por_id is None:
+            vertices = self._exportar_vertices()
+            if vertices is not None:
+                self._vertices_por_id = {v['id']: v for v in vertices}
+        
+        pontos = []
+        ruas = []
+        for id_vertice in sequencia_ids:
+            if self._vertices_por_id is not None:
+                v = self._vertices_por_id.get(id_vertice)
+                if v is None:
+                    continue
+                coords = (v['x'], v['y'])
+                rua = v['rua'] if v['rua'] and v['rua'] != "N/A" else None
+            else:
+                coords = self.obter_coordenadas_vertice(id_vertice)
+                if not coords:
+                    continue
+                rua = self.obter_rua_vertice(id_vertice)
+            
+            pontos.append(coords)
+            if rua and rua not in ruas:
+                ruas.append(rua)
+        
+        return pontos, ruas
+
+    def _calcular_rota_backend(self, id_origem: int, id_destino: int,
+                               modo: int = MODO_DIJKSTRA) -> Optional[Dict]:
+        """Executa a busca no backend (C ou motor Python), sem passar pelo cache.
+        rota['modo'] = algoritmo realmente executado (ver modo_efetivo)."""
+        modo = self.modo_efetivo(modo)
+        
+        # Sem backend C: usa motor Python (mesmo formato de retorno; só o tempo total da busca)
+        if not self.lib and self.motor:
+            inicio = time.perf_counter()
+            rota = self.motor.calcular_rota_dijkstra(id_origem, id_destino, modo)
+            if rota is not None:
+                rota['modo'] = modo
+                rota['estatisticas'] = {'busca_us': (time.perf_counter() - inicio) * 1e6,
+                                        'nos_fixados': rota.get('nos_visitados')}
+            return rota
+        
+        if not self.lib:
+            print("❌ Biblioteca C não carregada")
             return None
         
         try:
-            print(f"🔄 Calculando rota Dijkstra: {id_origem} → {id_destino}")
+            algoritmo = self.NOMES_MODOS.get(modo, "Dijkstra")
+            if self.verboso:
+                print(f"🔄 Calculando rota {algoritmo}: {id_origem} → {id_destino}")
             
-            # Chama função C que executa Dijkstra
-            resultado_ptr = self.lib.calcular_rota(id_origem, id_destino)
+            # Chama função C da busca (reutiliza grafo persistente e a área de trabalho da thread)
+            area = self._area_trabalho()
+            inicio = time.perf_counter()
+            if modo == self.MODO_CH and area and hasattr(self.lib, 'calcular_rota_ch_area'):
+                resultado_ptr = self.lib.calcular_rota_ch_area(self.grafo, self.ch, area, id_origem, id_destino)
+            elif modo == self.MODO_CH:
+                resultado_ptr = self.lib.calcular_rota_ch(self.grafo, self.ch, id_origem, id_destino)
+            elif area:
+                resultado_ptr = self.lib.calcular_rota_area(self.grafo, area, id_origem, id_destino, modo)
+            elif self.grafo and hasattr(self.lib, 'calcular_rota_modo'):
+                resultado_ptr = self.lib.calcular_rota_modo(self.grafo, id_origem, id_destino, modo)
+            elif self.grafo:
+                resultado_ptr = self.lib.calcular_rota_grafo(self.grafo, id_origem, id_destino)
+            else:
+                resultado_ptr = self.lib.calcular_rota(id_origem, id_destino)
+            chamada_us = (time.perf_counter() - inicio) * 1e6
             
             # Verifica se rota foi encontrada (NULL = sem caminho)
             if not resultado_ptr:
-                print("❌ Não foi possível calcular a rota (retornou NULL)")
+                if self.verboso:
+                    print("❌ Não foi possível calcular a rota (retornou NULL)")
                 return None
             
-            # Acessa estrutura ResultadoRota retornada
-            resultado = resultado_ptr.contents
-            
-            # Converte para dicionário Python
-            rota_dict = {
-                'sequencia_ids': [],
-                'num_ids': resultado.num_ids,
-                'distancia_total': resultado.distancia_total
-            }
+            rota_dict = self._converter_resultado(resultado_ptr, chamada_us)
+            rota_dict['modo'] = modo
             
-            # Copia array de IDs do C para lista Python
-            for i in range(resultado.num_ids):
-                rota_dict['sequencia_ids'].append(resultado.sequencia_ids[i])
-            
-            print(f"✅ Rota calculada: {rota_dict['num_ids']} pontos, "
-                  f"{rota_dict['distancia_total']} metros")
-            
-            # Libera memória alocada no C
-            self.lib.liberar_resultado(resultado_ptr)
+            if self.verboso:
+                busca_us = rota_dict['estatisticas'].get('busca_us')
+                print(f"✅ Rota calculada: {rota_dict['num_ids']} pontos, "
+                      f"{rota_dict['distancia_total']} metros, {rota_dict['nos_visitados'] or '?'} vértices fixados"
+                      + (f" ({busca_us} µs de busca)" if busca_us is not None else ""))
             
             return rota_dict
             
@@ -312,6 +1356,51 @@ class RouterLib:
             traceback.print_exc()
             return None
 
+    def _converter_resultado(self, resultado_ptr, chamada_us: float = 0.0) -> Dict:
+        """Copia o ResultadoRota do C para um dict Python e libera a memória do C (marshalling ctypes).
+        chamada_us = duração da chamada C vista do Python; o que exceder os tempos do C conta como marshalling."""
+        inicio = time.perf_counter()
+        
+        # Acessa estrutura ResultadoRota retornada
+        resultado = resultado_ptr.contents
+        
+        # Converte para dicionário Python (campos do fim da estrutura só se o layout do C os tiver)
+        nos_visitados = resultado.nos_visitados if self._tem_nos_visitados else None
+        rota_dict = {
+            'sequencia_ids': [],
+            'num_ids': resultado.num_ids,
+            'distancia_total': resultado.distancia_total,
+            'nos_visitados': nos_visitados
+        }
+        
+        # Copia array de IDs do C para lista Python
+        for i in range(resultado.num_ids):
+            rota_dict['sequencia_ids'].append(resultado.sequencia_ids[i])
+        
+        # Tempos por fase e contadores da busca (EstatisticasRota)
+        if self._tem_estatisticas:
+            e = resultado.estatisticas
+            tempo_c = e.tempo_carga_us + e.tempo_busca_us + e.tempo_reconstrucao_us
+            rota_dict['estatisticas'] = {
+                'carga_us': e.tempo_carga_us,
+                'busca_us': e.tempo_busca_us,
+                'reconstrucao_us': e.tempo_reconstrucao_us,
+                'nos_fixados': e.nos_fixados,
+                'arestas_relaxadas': e.arestas_relaxadas,
+                'insercoes_heap': e.insercoes_heap,
+                'remocoes_heap': e.remocoes_heap,
+            }
+        else:
+            tempo_c = 0
+            rota_dict['estatisticas'] = {'nos_fixados': nos_visitados}
+        
+        # Libera memória alocada no C
+        self.lib.liberar_resultado(resultado_ptr)
+        
+        rota_dict['estatisticas']['marshalling_us'] = (max(0.0, chamada_us - tempo_c) +
+                                                       (time.perf_counter() - inicio) * 1e6)
+        return rota_dict
+
     def obter_coordenadas_por_id(self, ponto_id: int) -> Optional[Tuple[int, int]]:
         """Alias para obter_coordenadas_vertice (compatibilidade)"""
         return self.obter_coordenadas_vertice(ponto_id)
@@ -319,20 +1408,26 @@ class RouterLib:
     def obter_coordenadas_vertice(self, id_vertice: int) -> Optional[Tuple[int, int]]:
         """Retorna (x, y) de um vértice pelo ID. Usado para desenhar rota no canvas."""
         if not self.lib:
-            return None
+            return self.motor.obter_coordenadas_vertice(id_vertice) if self.motor else None
         
         try:
             x = ctypes.c_int()
             y = ctypes.c_int()
             
             # Chama função C para obter coordenadas (ignora nome e categoria)
-            resultado = self.lib.obter_info_vertice(
-                id_vertice,
-                None, 0,   # Não precisa do nome
-                None, 0,   # Não precisa da categoria
-                ctypes.byref(x),  # Coordenada X do vértice
-                ctypes.byref(y)   # Coordenada Y do vértice
-            )
+            if self.grafo and hasattr(self.lib, 'obter_info_vertice_grafo'):
+                resultado = self.lib.obter_info_vertice_grafo(
+                    self.grafo, id_vertice,
+                    None, 0,   # Não precisa do nome
+                    None, 0,   # Não precisa da categoria
+                    ctypes.byref(x),  # Coordenada X do vértice
+                    ctypes.byref(y)   # Coordenada Y do vértice
+                )
+            elif hasattr(self.lib, 'obter_info_vertice'):
+                resultado = self.lib.obter_info_vertice(
+                    id_vertice, None, 0, None, 0, ctypes.byref(x), ctypes.byref(y))
+            else:
+                return None
             
             if resultado == 0:
                 return (x.value, y.value)
@@ -346,16 +1441,20 @@ class RouterLib:
     
     def obter_rua_vertice(self, id_vertice: int) -> Optional[str]:
         """Retorna nome da rua de um vértice pelo ID (ou None se não tiver)"""
-        if not self.lib or not hasattr(self.lib, 'obter_rua_vertice'):
+        if not self.lib and self.motor:
+            return self.motor.obter_rua_vertice(id_vertice)
+        
+        if not self.lib:
             return None
         
         try:
             rua_buf = ctypes.create_string_buffer(100)
-            resultado = self.lib.obter_rua_vertice(
-                id_vertice,
-                rua_buf,
-                100
-            )
+            if self.grafo and hasattr(self.lib, 'obter_rua_vertice_grafo'):
+                resultado = self.lib.obter_rua_vertice_grafo(self.grafo, id_vertice, rua_buf, 100)
+            elif hasattr(self.lib, 'obter_rua_vertice'):
+                resultado = self.lib.obter_rua_vertice(id_vertice, rua_buf, 100)
+            else:
+                return None
             
             if resultado == 0:
                 rua = rua_buf.value.decode('utf-8', errors='ignore')
@@ -407,11 +1506,16 @@ class ModernMapApp:
             messagebox.showerror('Dependência ausente', 'Pillow não está instalado. Instale com: pip install pillow')
             raise SystemExit(1)
 
-        # Carrega imagem base do mapa
+        # Carrega imagem base do mapa e a pirâmide de blocos usada no desenho (cache em disco)
+        from piramide_mapa import PiramideMapa  # Import tardio: depende do Pillow
         self.original_image = Image.open(self.image_path)
+        self.original_image.load()
+        self.piramide = PiramideMapa(self.original_image, self.image_path)
 
         # Inicializa wrapper para biblioteca C
         self.router = RouterLib()
+        self.executor = ExecutorRotas()  # Buscas rodam fora do loop da interface
+        self.refinador = ExecutorRotas('RefinamentoMapa')  # Versões LANCZOS dos blocos do mapa (segundo plano)
 
         # Carrega coordenadas visuais (pins.json)
         self.pins = self._load_pins()
@@ -440,10 +1544,10 @@ class ModernMapApp:
 
         # Estado da aplicação
         self.scale = 1.0  # Nível de zoom
-        self.canvas_img_id = None  # ID da imagem no canvas
-        self.tk_image = None  # Referência ImageTk (evita garbage collection)
+        self.map_tiles: Dict[tuple, tuple] = {}  # (nível, bx, by) → (canvas_id, PhotoImage, escala, refinado)
         self.origin_id: Optional[int] = None  # ID do ponto de origem selecionado
         self.destination_id: Optional[int] = None  # ID do ponto de destino selecionado
+        self.stop_ids: List[int] = []  # Paradas intermediárias (modo múltiplos destinos)
         self.markers: List[int] = []  # IDs dos marcadores desenhados (círculos)
         self.icon_markers: Dict[int, int] = {}  # id_ponto → canvas_id do ícone
         self.pan_x = 0  # Offset horizontal do pan
@@ -453,14 +1557,21 @@ class ModernMapApp:
         self._lazy_load_id = None  # Timer para lazy loading da lista
         self._resize_debounce_id = None  # Timer para debounce do resize
         self._drag_update_id = None  # Timer para throttle do drag
+        self._drag_target = None  # Pan (x, y) pendente do último evento de arrasto
+        self._refine_debounce_id = None  # Timer do refinamento do mapa (entrada ociosa)
+        self._refine_poll_id = None  # Timer da verificação dos blocos refinados
+        self.REFINE_IDLE_MS = 150  # Ociosidade antes de trocar as prévias pelos blocos LANCZOS
         self._all_pontos = []  # Cache de todos os pontos carregados
         self._loaded_count = 0  # Quantidade de itens já carregados na lista
         self.BATCH_SIZE = 20  # Carregar 20 itens por vez (performance)
         self.route_active = False  # Flag: há rota calculada e desenhada?
         self.route_lines: List[int] = []  # IDs das linhas da rota no canvas
         self._pontos_cache = None  # Cache dos pontos turísticos
-        self._image_cache = {}  # Cache de imagens redimensionadas (scale → PIL.Image)
         self._last_canvas_size = (0, 0)  # Última dimensão do canvas
+        self._calculo_callback = None  # Função que recebe o resultado do cálculo em andamento
+        self._calculo_descricao = ""  # Texto do indicador de progresso
+        self._calculo_inicio = 0.0  # perf_counter() do início do cálculo
+        self._calculo_poll_id = None  # Timer da verificação de resultados
 
         # Constrói interface gráfica
         self._build_ui()
@@ -471,7 +1582,11 @@ class ModernMapApp:
         self._draw_all_icons()  # Desenha ícones imediatamente
         
     def _load_pins(self) -> Dict:
-        """Carrega coordenadas visuais do arquivo pins.json. Retorna dict: id → (x, y)"""
+        """Carrega coordenadas visuais (do grafo binário ou do arquivo pins.json). Retorna dict: id → (x, y)"""
+        pinos = self.router.obter_pinos()
+        if pinos:
+            return pinos
+        
         pins_path = resource_path('pins.json')
         try:
             with open(pins_path, 'r', encoding='utf-8') as f:
@@ -617,6 +1732,14 @@ class ModernMapApp:
                                          font=('Arial', 11), text_color="#ffffff", anchor='w')
             self.dest_label.pack(fill='x', padx=10, pady=3)
             
+            self.stops_label = ctk.CTkLabel(selection_content_frame, text="🧭 Paradas: nenhuma", 
+                                          font=('Arial', 11), text_color="#ffffff", anchor='w')
+            self.stops_label.pack(fill='x', padx=10, pady=3)
+            
+            # Indicador de progresso (visível apenas durante cálculos)
+            self.progress_label = ctk.CTkLabel(selection_content_frame, text="", 
+                                             font=('Arial', 11), text_color="#ffd166", anchor='w')
+            
             # Frame para informações da rota - ALTURA DINÂMICA
             self.route_info_frame = ctk.CTkFrame(selection_content_frame, fg_color="transparent", height=0)
             self.route_info_frame.pack(fill='x', padx=10, pady=3)
@@ -630,6 +1753,14 @@ class ModernMapApp:
                                       font=('Arial', 10), bg='#1a1a1a', fg='#ffffff', anchor='w')
             self.dest_label.pack(fill='x', padx=10, pady=3)
             
+            self.stops_label = tk.Label(selection_content_frame, text="🧭 Paradas: nenhuma", 
+                                       font=('Arial', 10), bg='#1a1a1a', fg='#ffffff', anchor='w')
+            self.stops_label.pack(fill='x', padx=10, pady=3)
+            
+            # Indicador de progresso (visível apenas durante cálculos)
+            self.progress_label = tk.Label(selection_content_frame, text="", 
+                                          font=('Arial', 10), bg='#1a1a1a', fg='#ffd166', anchor='w')
+            
             # Frame para informações da rota - ALTURA DINÂMICA
             self.route_info_frame = tk.Frame(selection_content_frame, bg='#1a1a1a', height=0)
             self.route_info_frame.pack(fill='x', padx=10, pady=3)
@@ -651,6 +1782,8 @@ class ModernMapApp:
 
         buttons = [
             ("🚀 Calcular Rota", self._generate_route, "#4cc9f0"),
+            ("➕ Adicionar Parada", self._add_stop, "#7209b7"),
+            ("🧭 Otimizar Roteiro", self._generate_tour, "#06d6a0"),
             ("🗑️ Limpar Tudo", self._clear, "#ef476f"),
         ]
 
@@ -899,14 +2032,15 @@ class ModernMapApp:
             self.dest_label.configure(text=f"🎯 Destino: {nome}")
             self._log_message(f"🎯 Destino: {nome} (ID: {ponto_id})")
         
+        self._cancelar_calculo()  # Resultado pendente seria de outros pontos
         self._redraw_markers()
 
     def _draw_all_icons(self):
         """Renderiza ícones de todos os pontos turísticos no mapa (ou só origem/destino se há rota ativa)"""
         # Limpa apenas ícones que não serão redesenhados
         if self.route_active and self.origin_id and self.destination_id:
-            # Se há rota ativa, mantém apenas origem e destino
-            icons_to_keep = {self.origin_id, self.destination_id}
+            # Se há rota ativa, mantém apenas origem, destino e paradas
+            icons_to_keep = {self.origin_id, self.destination_id, *self.stop_ids}
             icons_to_remove = []
             for ponto_id, canvas_id in self.icon_markers.items():
                 if ponto_id not in icons_to_keep:
@@ -928,6 +2062,12 @@ class ModernMapApp:
                 x, y = self.pins[self.destination_id]
                 nome, categoria = self.router.pontos_info.get(self.destination_id, ("Destino", "Comércio"))
                 self._draw_icon(self.destination_id, x, y, categoria)
+            
+            for stop_id in self.stop_ids:
+                if stop_id not in self.icon_markers and stop_id in self.pins:
+                    x, y = self.pins[stop_id]
+                    nome, categoria = self.router.pontos_info.get(stop_id, ("Parada", "Comércio"))
+                    self._draw_icon(stop_id, x, y, categoria)
         else:
             # Limpa todos os ícones
             for canvas_id in self.icon_markers.values():
@@ -968,7 +2108,7 @@ class ModernMapApp:
         
         # Desenha no canvas com anchor='s' (ponta inferior do pin na coordenada)
         canvas_id = self.canvas.create_image(canvas_x, canvas_y, image=photo, 
-                                            anchor='s', tags=f"icon_{ponto_id}")
+                                            anchor='s', tags=(f"icon_{ponto_id}", 'icon'))
         
         # Mantém referência para evitar garbage collection do PhotoImage
         if not hasattr(self, '_icon_photos'):
@@ -1022,6 +2162,7 @@ class ModernMapApp:
                 self.dest_label.configure(text=f"🎯 Destino: {nome}")
                 self._log_message(f"🎯 Destino: {nome}")
         
+        self._cancelar_calculo()  # Resultado pendente seria de outros pontos
         self._redraw_markers()
 
     def _img_to_canvas(self, ix: int, iy: int) -> Tuple[Optional[int], Optional[int]]:
@@ -1077,9 +2218,15 @@ class ModernMapApp:
             messagebox.showwarning("Pontos iguais", "Origem e destino não podem ser o mesmo ponto.")
             return
 
+        # Consulta ponto a ponto: busca bidirecional no backend C (sem pré-processamento)
+        self._iniciar_calculo("Calculando rota", self._concluir_rota, self.router.calcular_rota_dijkstra,
+                              self.origin_id, self.destination_id, self.router.MODO_BIDIRECIONAL)
+
+    def _concluir_rota(self, resultado: Optional[Dict], erro: Optional[Exception]):
+        """Recebe (na thread da interface) o resultado de _generate_route e desenha a rota"""
         try:
-            # Chama função Dijkstra do backend C via ctypes
-            resultado = self.router.calcular_rota_dijkstra(self.origin_id, self.destination_id)
+            if erro is not None:
+                raise erro
             
             if resultado is None:
                 self._log_message("❌ Erro ao calcular rota")
@@ -1096,152 +2243,259 @@ class ModernMapApp:
                 messagebox.showerror("Erro", "Rota calculada é inválida")
                 return
             
-            # Converte IDs de vértices para coordenadas (x, y) para desenhar
-            points = []
-            ruas_visitadas = []
-            for ponto_id in sequencia_ids:
-                coords = self.router.obter_coordenadas_vertice(ponto_id)
-                if coords:
-                    points.append(coords)
-                    # Coleta nome da rua (evita duplicatas)
-                    rua = self.router.obter_rua_vertice(ponto_id)
-                    if rua and rua not in ruas_visitadas:
-                        ruas_visitadas.append(rua)
+            # Coordenadas (x, y) e ruas já resolvidas pelo RouterLib (reaproveitadas do cache)
+            points = resultado['pontos']
+            ruas_visitadas = resultado['ruas']
             
             if len(points) < 2:
                 self._log_message("❌ Coordenadas insuficientes para desenhar rota")
                 messagebox.showerror("Erro", "Não foi possível obter coordenadas da rota")
                 return
             
-            # Formata distância para exibição
-            if distancia_total >= 1000:
-                distancia_valor = f"{distancia_total / 1000:.2f}"
-                distancia_unidade = "km"
-            else:
-                distancia_valor = str(distancia_total)
-                distancia_unidade = "m"
-            
-            # Criar texto das ruas com quebras de linha
-            if ruas_visitadas:
-                # Juntar com quebra de linha após cada seta
-                ruas_texto = ""
-                for i, rua in enumerate(ruas_visitadas):
-                    if i > 0:
-                        ruas_texto += "→ "
-                    ruas_texto += f"{rua}"
-                    if i < len(ruas_visitadas) - 1:
-                        ruas_texto += "\n"
-            else:
-                ruas_texto = "Caminho interno"
-            
-            # Limpar frame de informações anteriores
-            for widget in self.route_info_frame.winfo_children():
-                widget.destroy()
-            
-            # Calcular altura necessária baseada no número de linhas
-            num_linhas = len(ruas_visitadas) if ruas_visitadas else 1
-            altura_necessaria = 50 + (num_linhas * 25)  # 50px base + 25px por linha
+            self._show_route_result(distancia_total, points, ruas_visitadas)
+            self._log_message(f"✅ Rota calculada: {self._format_distance(distancia_total)}, {len(ruas_visitadas)} ruas")
             
-            # Criar labels formatados
-            if self.is_ctk:
-                # Ajustar altura do frame
-                self.route_info_frame.configure(height=altura_necessaria)
-                
-                # Label de distância
-                dist_frame = ctk.CTkFrame(self.route_info_frame, fg_color="transparent")
-                dist_frame.pack(fill='x', pady=(5, 2))
-                
-                ctk.CTkLabel(dist_frame, text="📏 Distância: ", 
-                           font=('Arial', 11), text_color="#ffffff", anchor='w').pack(side='left')
-                ctk.CTkLabel(dist_frame, text=distancia_valor, 
-                           font=('Arial', 16, 'bold'), text_color="#4cc9f0", anchor='w').pack(side='left')
-                ctk.CTkLabel(dist_frame, text=f" {distancia_unidade}", 
-                           font=('Arial', 11), text_color="#ffffff", anchor='w').pack(side='left')
-                
-                # Label de ruas
-                ruas_label_frame = ctk.CTkFrame(self.route_info_frame, fg_color="transparent")
-                ruas_label_frame.pack(fill='x', pady=(5, 2), padx=0)
-                
-                ctk.CTkLabel(ruas_label_frame, text="🛣️ Ruas:", 
-                           font=('Arial', 11), text_color="#ffffff", anchor='w', justify='left').pack(side='left', anchor='nw')
-                
-                # Frame para o texto das ruas com scroll se necessário
-                ruas_text_frame = ctk.CTkFrame(self.route_info_frame, fg_color="transparent")
-                ruas_text_frame.pack(fill='x', padx=10, pady=(0, 5))
-                
-                ruas_text_widget = ctk.CTkTextbox(ruas_text_frame, 
-                                                height=min(num_linhas * 25, 100),  # Máximo 100px
-                                                font=('Arial', 10),
-                                                text_color="#4cc9f0",
-                                                fg_color="#1a1a1a",
-                                                border_width=0,
-                                                wrap='word',
-                                                activate_scrollbars=True)
-                ruas_text_widget.insert('1.0', ruas_texto)
-                ruas_text_widget.configure(state='disabled')
-                ruas_text_widget.pack(fill='x', pady=2)
-                
-            else:
-                # Ajustar altura do frame
-                self.route_info_frame.configure(height=altura_necessaria)
-                
-                # Label de distância
-                dist_frame = tk.Frame(self.route_info_frame, bg='#1a1a1a')
-                dist_frame.pack(fill='x', pady=(5, 2))
-                
-                tk.Label(dist_frame, text="📏 Distância: ", 
-                       font=('Arial', 10), bg='#1a1a1a', fg='#ffffff', anchor='w', justify='left').pack(side='left')
-                tk.Label(dist_frame, text=distancia_valor, 
-                       font=('Arial', 14, 'bold'), bg='#1a1a1a', fg='#4cc9f0', anchor='w', justify='left').pack(side='left')
-                tk.Label(dist_frame, text=f" {distancia_unidade}", 
-                       font=('Arial', 10), bg='#1a1a1a', fg='#ffffff', anchor='w', justify='left').pack(side='left')
-                
-                # Label de ruas
-                tk.Label(self.route_info_frame, text="🛣️ Ruas:", 
-                       font=('Arial', 10), bg='#1a1a1a', fg='#ffffff', anchor='w', justify='left').pack(fill='x', pady=(5, 2), padx=10)
-                
-                # Text widget para as ruas (permite scroll)
-                ruas_text_frame = tk.Frame(self.route_info_frame, bg='#1a1a1a')
-                ruas_text_frame.pack(fill='x', padx=10, pady=(0, 5))
-                
-                # Text widget com scrollbar
-                text_widget = tk.Text(ruas_text_frame,
-                                    height=min(num_linhas, 4),  # Mostrar até 4 linhas
-                                    width=50,
-                                    bg='#1a1a1a',
-                                    fg='#4cc9f0',
-                                    font=('Arial', 9),
-                                    wrap='word',
-                                    relief='flat',
-                                    borderwidth=0,
-                                    highlightthickness=0)
-                
-                scrollbar = tk.Scrollbar(ruas_text_frame, command=text_widget.yview)
-                text_widget.configure(yscrollcommand=scrollbar.set)
-                
-                text_widget.insert('1.0', ruas_texto)
-                text_widget.configure(state='disabled')
-                
-                text_widget.pack(side='left', fill='x', expand=True)
-                scrollbar.pack(side='right', fill='y')
-            
-            # Marcar rota como ativa ANTES de desenhar para otimizar
-            self.route_active = True
-            
-            # Desenhar rota
-            self._draw_route(points)
-            
-            # Redesenhar ícones (mostrando apenas origem/destino) - otimizado
-            self._draw_all_icons()
+        except Exception as e:
+            self._log_message(f"❌ Erro: {e}")
+            messagebox.showerror("Erro", f"Erro ao processar rota: {e}")
+
+    def _iniciar_calculo(self, descricao: str, callback, funcao, *args):
+        """Envia o cálculo para a thread de trabalho; callback(resultado, erro) roda na interface.
+        Um cálculo ainda em andamento é substituído (seu resultado será descartado)."""
+        if self.executor.ocupado():
+            self._log_message(f"⏹️ {self._calculo_descricao} substituído")
+        
+        self._calculo_callback = callback
+        self._calculo_descricao = descricao
+        self._calculo_inicio = time.perf_counter()
+        self.executor.enviar(funcao, *args)
+        
+        self.progress_label.configure(text=f"⏳ {descricao}...")
+        self.progress_label.pack(fill='x', padx=10, pady=3, before=self.route_info_frame)
+        if self._calculo_poll_id is None:
+            self._verificar_calculo()
+
+    def _verificar_calculo(self):
+        """Consulta a fila de resultados a cada quadro (~60 FPS) sem bloquear o loop do Tk"""
+        self._calculo_poll_id = None
+        item, ocupado = self.executor.estado()
+        
+        if item is not None:
+            _, resultado, erro = item
+            callback = self._calculo_callback
+            self._encerrar_progresso()
+            self._log_message(f"⏱️ {self._calculo_descricao}: {(time.perf_counter() - self._calculo_inicio) * 1000:.1f} ms")
+            callback(resultado, erro)
+            return
+        
+        if not ocupado:
+            self._encerrar_progresso()  # Cálculo cancelado
+            return
+        
+        segundos = time.perf_counter() - self._calculo_inicio
+        quadro = "◐◓◑◒"[int(segundos * 8) % 4]
+        self.progress_label.configure(text=f"{quadro} {self._calculo_descricao}... {segundos:.1f} s")
+        self._calculo_poll_id = self.root.after(16, self._verificar_calculo)
+
+    def _cancelar_calculo(self):
+        """Cancela o cálculo pendente (novos pontos escolhidos ou tela limpa)"""
+        if self.executor.ocupado():
+            self.executor.cancelar()
+            self._log_message(f"⏹️ {self._calculo_descricao} cancelado")
+        self._encerrar_progresso()
+
+    def _encerrar_progresso(self):
+        if self._calculo_poll_id is not None:
+            self.root.after_cancel(self._calculo_poll_id)
+            self._calculo_poll_id = None
+        self._calculo_callback = None
+        self.progress_label.pack_forget()
+
+    def _add_stop(self):
+        """Move o destino atual para a lista de paradas (permite escolher o próximo destino)"""
+        if self.destination_id is None:
+            messagebox.showwarning("Destino não definido", "Selecione um destino para adicioná-lo como parada.")
+            return
+        
+        if self.destination_id not in self.stop_ids:
+            self.stop_ids.append(self.destination_id)
+            nome, _ = self.router.pontos_info.get(self.destination_id, ("Desconhecido", ""))
+            self._log_message(f"➕ Parada adicionada: {nome}")
+        
+        self.destination_id = None
+        self.dest_label.configure(text="🎯 Destino: Não selecionado")
+        self.stops_label.configure(text=f"🧭 Paradas: {len(self.stop_ids)}")
+        self._cancelar_calculo()
+        self._redraw_markers()
+
+    def _generate_tour(self):
+        """Planeja roteiro saindo da origem e visitando paradas + destino na melhor ordem encontrada"""
+        if self.origin_id is None:
+            messagebox.showwarning("Origem não definida", "Por favor, selecione um ponto de origem.")
+            return
+        
+        paradas = [self.origin_id] + self.stop_ids
+        if self.destination_id is not None:
+            paradas.append(self.destination_id)
+        
+        if len(set(paradas)) < 2:
+            messagebox.showwarning("Paradas insuficientes", "Adicione ao menos uma parada além da origem.")
+            return
+        
+        self._iniciar_calculo("Planejando roteiro", self._concluir_roteiro, planejar_roteiro, self.router, paradas)
+
+    def _concluir_roteiro(self, roteiro: Optional[Dict], erro: Optional[Exception]):
+        """Recebe (na thread da interface) o resultado de _generate_tour e desenha o roteiro"""
+        try:
+            if erro is not None:
+                raise erro
             
-            # Forçar atualização da UI sem bloquear
-            self.canvas.update_idletasks()
+            if roteiro is None:
+                self._log_message("❌ Erro ao planejar roteiro")
+                messagebox.showerror("Erro", "Não foi possível planejar o roteiro")
+                return
             
-            self._log_message(f"✅ Rota calculada: {distancia_valor}{distancia_unidade}, {len(ruas_visitadas)} ruas")
+            self._show_route_result(roteiro['distancia_total'], roteiro['pontos'], roteiro['ruas'])
             
+            nomes = [self.router.pontos_info.get(pid, (str(pid), ""))[0] for pid in roteiro['ordem']]
+            self._log_message(f"🧭 Roteiro: {' → '.join(nomes)}")
+            self._log_message(f"✅ Roteiro calculado: {self._format_distance(roteiro['distancia_total'])}, "
+                              f"{len(roteiro['ordem'])} paradas em {roteiro['tempo_ms']:.1f} ms")
+        
         except Exception as e:
             self._log_message(f"❌ Erro: {e}")
-            messagebox.showerror("Erro", f"Erro ao processar rota: {e}")
+            messagebox.showerror("Erro", f"Erro ao processar roteiro: {e}")
+
+    def _split_distance(self, distancia_total: int) -> Tuple[str, str]:
+        """Separa distância em (valor, unidade) para exibição: metros até 1 km, depois km"""
+        if distancia_total >= 1000:
+            return f"{distancia_total / 1000:.2f}", "km"
+        return str(distancia_total), "m"
+
+    def _format_distance(self, distancia_total: int) -> str:
+        valor, unidade = self._split_distance(distancia_total)
+        return f"{valor}{unidade}"
+
+    def _show_route_result(self, distancia_total: int, points: List[Tuple[int, int]], ruas_visitadas: List[str]):
+        """Exibe distância e ruas no painel e desenha a rota no mapa"""
+        # Formata distância para exibição
+        distancia_valor, distancia_unidade = self._split_distance(distancia_total)
+
+        # Criar texto das ruas com quebras de linha
+        if ruas_visitadas:
+            # Juntar com quebra de linha após cada seta
+            ruas_texto = ""
+            for i, rua in enumerate(ruas_visitadas):
+                if i > 0:
+                    ruas_texto += "→ "
+                ruas_texto += f"{rua}"
+                if i < len(ruas_visitadas) - 1:
+                    ruas_texto += "\n"
+        else:
+            ruas_texto = "Caminho interno"
+
+        # Limpar frame de informações anteriores
+        for widget in self.route_info_frame.winfo_children():
+            widget.destroy()
+
+        # Calcular altura necessária baseada no número de linhas
+        num_linhas = len(ruas_visitadas) if ruas_visitadas else 1
+        altura_necessaria = 50 + (num_linhas * 25)  # 50px base + 25px por linha
+
+        # Criar labels formatados
+        if self.is_ctk:
+            # Ajustar altura do frame
+            self.route_info_frame.configure(height=altura_necessaria)
+
+            # Label de distância
+            dist_frame = ctk.CTkFrame(self.route_info_frame, fg_color="transparent")
+            dist_frame.pack(fill='x', pady=(5, 2))
+
+            ctk.CTkLabel(dist_frame, text="📏 Distância: ", 
+                       font=('Arial', 11), text_color="#ffffff", anchor='w').pack(side='left')
+            ctk.CTkLabel(dist_frame, text=distancia_valor, 
+                       font=('Arial', 16, 'bold'), text_color="#4cc9f0", anchor='w').pack(side='left')
+            ctk.CTkLabel(dist_frame, text=f" {distancia_unidade}", 
+                       font=('Arial', 11), text_color="#ffffff", anchor='w').pack(side='left')
+
+            # Label de ruas
+            ruas_label_frame = ctk.CTkFrame(self.route_info_frame, fg_color="transparent")
+            ruas_label_frame.pack(fill='x', pady=(5, 2), padx=0)
+
+            ctk.CTkLabel(ruas_label_frame, text="🛣️ Ruas:", 
+                       font=('Arial', 11), text_color="#ffffff", anchor='w', justify='left').pack(side='left', anchor='nw')
+
+            # Frame para o texto das ruas com scroll se necessário
+            ruas_text_frame = ctk.CTkFrame(self.route_info_frame, fg_color="transparent")
+            ruas_text_frame.pack(fill='x', padx=10, pady=(0, 5))
+
+            ruas_text_widget = ctk.CTkTextbox(ruas_text_frame, 
+                                            height=min(num_linhas * 25, 100),  # Máximo 100px
+                                            font=('Arial', 10),
+                                            text_color="#4cc9f0",
+                                            fg_color="#1a1a1a",
+                                            border_width=0,
+                                            wrap='word',
+                                            activate_scrollbars=True)
+            ruas_text_widget.insert('1.0', ruas_texto)
+            ruas_text_widget.configure(state='disabled')
+            ruas_text_widget.pack(fill='x', pady=2)
+
+        else:
+            # Ajustar altura do frame
+            self.route_info_frame.configure(height=altura_necessaria)
+
+            # Label de distância
+            dist_frame = tk.Frame(self.route_info_frame, bg='#1a1a1a')
+            dist_frame.pack(fill='x', pady=(5, 2))
+
+            tk.Label(dist_frame, text="📏 Distância: ", 
+                   font=('Arial', 10), bg='#1a1a1a', fg='#ffffff', anchor='w', justify='left').pack(side='left')
+            tk.Label(dist_frame, text=distancia_valor, 
+                   font=('Arial', 14, 'bold'), bg='#1a1a1a', fg='#4cc9f0', anchor='w', justify='left').pack(side='left')
+            tk.Label(dist_frame, text=f" {distancia_unidade}", 
+                   font=('Arial', 10), bg='#1a1a1a', fg='#ffffff', anchor='w', justify='left').pack(side='left')
+
+            # Label de ruas
+            tk.Label(self.route_info_frame, text="🛣️ Ruas:", 
+                   font=('Arial', 10), bg='#1a1a1a', fg='#ffffff', anchor='w', justify='left').pack(fill='x', pady=(5, 2), padx=10)
+
+            # Text widget para as ruas (permite scroll)
+            ruas_text_frame = tk.Frame(self.route_info_frame, bg='#1a1a1a')
+            ruas_text_frame.pack(fill='x', padx=10, pady=(0, 5))
+
+            # Text widget com scrollbar
+            text_widget = tk.Text(ruas_text_frame,
+                                height=min(num_linhas, 4),  # Mostrar até 4 linhas
+                                width=50,
+                                bg='#1a1a1a',
+                                fg='#4cc9f0',
+                                font=('Arial', 9),
+                                wrap='word',
+                                relief='flat',
+                                borderwidth=0,
+                                highlightthickness=0)
+
+            scrollbar = tk.Scrollbar(ruas_text_frame, command=text_widget.yview)
+            text_widget.configure(yscrollcommand=scrollbar.set)
+
+            text_widget.insert('1.0', ruas_texto)
+            text_widget.configure(state='disabled')
+
+            text_widget.pack(side='left', fill='x', expand=True)
+            scrollbar.pack(side='right', fill='y')
+
+        # Marcar rota como ativa ANTES de desenhar para otimizar
+        self.route_active = True
+
+        # Desenhar rota
+        self._draw_route(points)
+
+        # Redesenhar ícones (mostrando apenas origem/destino) - otimizado
+        self._draw_all_icons()
+
+        # Forçar atualização da UI sem bloquear
+        self.canvas.update_idletasks()
 
     def _draw_route(self, points: List[Tuple[int, int]]):
         """Desenha a rota no mapa (otimizado com batch de coordenadas)"""
@@ -1285,6 +2539,19 @@ class ModernMapApp:
                                                 width=2, tags='marker')
                 self.markers.append(marker)
 
+        # Desenhar paradas intermediárias
+        for stop_id in self.stop_ids:
+            if stop_id in self.pins:
+                x, y = self.pins[stop_id]
+                cx, cy = self._img_to_canvas(x, y)
+                if cx is not None:
+                    # Círculo amarelo para paradas
+                    r = 7
+                    marker = self.canvas.create_oval(cx - r, cy - r, cx + r, cy + r,
+                                                    fill='#ffd166', outline='#ffffff',
+                                                    width=2, tags='marker')
+                    self.markers.append(marker)
+
         # Desenhar destino
         if self.destination_id and self.destination_id in self.pins:
             x, y = self.pins[self.destination_id]
@@ -1299,10 +2566,13 @@ class ModernMapApp:
 
     def _clear(self):
         """Limpa todas as seleções e rotas (otimizado)"""
+        self._cancelar_calculo()
         self.origin_id = None
         self.destination_id = None
+        self.stop_ids.clear()
         self.origin_label.configure(text="📍 Origem: Não selecionada")
         self.dest_label.configure(text="🎯 Destino: Não selecionado")
+        self.stops_label.configure(text="🧭 Paradas: nenhuma")
         
         # Limpar informações da rota
         for widget in self.route_info_frame.winfo_children():
@@ -1328,38 +2598,14 @@ class ModernMapApp:
         self._log_message("🗑️ Tudo limpo. Selecione novos pontos.")
 
     def _update_canvas_image(self):
-        """Atualiza a imagem do mapa no canvas (otimizado com cache)"""
+        """Atualiza o mapa no canvas (zoom/resize: prévia imediata, refinamento quando ocioso)
+        e reposiciona ícones e marcadores"""
         canvas_w = self.canvas.winfo_width()
         canvas_h = self.canvas.winfo_height()
         if canvas_w <= 1 or canvas_h <= 1:
             return
 
-        img_w, img_h = self.original_image.size
-        scale = self.scale
-        disp_w = int(img_w * scale)
-        disp_h = int(img_h * scale)
-
-        # Usa cache de imagem redimensionada se disponível
-        cache_key = (disp_w, disp_h)
-        if cache_key in self._image_cache:
-            resized = self._image_cache[cache_key]
-        else:
-            resized = self.original_image.resize((disp_w, disp_h), Image.Resampling.LANCZOS)
-            # Limita cache a 5 imagens
-            if len(self._image_cache) >= 5:
-                self._image_cache.pop(next(iter(self._image_cache)))
-            self._image_cache[cache_key] = resized
-        
-        self.tk_image = ImageTk.PhotoImage(resized)
-
-        x0 = max((canvas_w - disp_w) // 2, 0) + self.pan_x
-        y0 = max((canvas_h - disp_h) // 2, 0) + self.pan_y
-
-        if self.canvas_img_id:
-            self.canvas.delete(self.canvas_img_id)
-        
-        self.canvas_img_id = self.canvas.create_image(x0, y0, anchor='nw', image=self.tk_image, tags='map_image')
-        self.canvas.tag_lower('map_image')
+        self._update_map_tiles(canvas_w, canvas_h, reposicionar=True)
         
         # Só redesenha ícones e marcadores se o canvas mudou de tamanho
         current_size = (canvas_w, canvas_h)
@@ -1380,6 +2626,93 @@ class ModernMapApp:
             # Atualiza marcadores
             self._redraw_markers()
 
+    def _update_map_tiles(self, canvas_w: int, canvas_h: int, reposicionar: bool):
+        """Desenha só os blocos da pirâmide que cruzam o viewport; blocos já desenhados na escala
+        atual são reaproveitados e os que saíram da tela são removidos"""
+        img_w, img_h = self.original_image.size
+        scale = self.scale
+        disp_w = int(img_w * scale)
+        disp_h = int(img_h * scale)
+        x0 = max((canvas_w - disp_w) // 2, 0) + self.pan_x
+        y0 = max((canvas_h - disp_h) // 2, 0) + self.pan_y
+
+        nivel, visiveis = self.piramide.blocos_visiveis(scale, x0, y0, canvas_w, canvas_h)
+        anteriores = self.map_tiles
+        novos = False
+        previas = False
+        self.map_tiles = {}
+        for bx, by, esquerda, topo, largura, altura in visiveis:
+            chave = (nivel, bx, by)
+            item = anteriores.pop(chave, None)
+            if item is not None and item[2] == scale:
+                # Bloco já desenhado nesta escala: só reposiciona (no pan, canvas.move já o levou)
+                if reposicionar:
+                    self.canvas.coords(item[0], x0 + esquerda, y0 + topo)
+                self.map_tiles[chave] = item
+                previas = previas or not item[3]
+                continue
+            if item is not None:
+                self.canvas.delete(item[0])
+
+            # Prévia rápida (BILINEAR); a versão LANCZOS chega depois, com a entrada ociosa
+            bloco, refinado = self.piramide.bloco_exibicao(nivel, bx, by, (largura, altura), previa=True)
+            if bloco is None:
+                continue
+            foto = ImageTk.PhotoImage(bloco)
+            canvas_id = self.canvas.create_image(x0 + esquerda, y0 + topo, anchor='nw', image=foto,
+                                                 tags=('map_image', 'map_tile'))
+            self.map_tiles[chave] = (canvas_id, foto, scale, refinado)
+            novos = True
+            previas = previas or not refinado
+
+        # Blocos que saíram do viewport (ou de outro nível de zoom)
+        for item in anteriores.values():
+            self.canvas.delete(item[0])
+        if novos:
+            self.canvas.tag_lower('map_image')
+        if previas:
+            self._schedule_refine()
+
+    def _schedule_refine(self):
+        """(Re)agenda o refinamento: cada zoom, pan ou resize adia a troca pelos blocos LANCZOS"""
+        if self._refine_debounce_id:
+            self.root.after_cancel(self._refine_debounce_id)
+        self.refinador.cancelar()  # Refinamento em andamento é de um viewport antigo
+        self._refine_debounce_id = self.root.after(self.REFINE_IDLE_MS, self._start_refine)
+
+    def _start_refine(self):
+        """Envia os blocos ainda em prévia para a thread de refinamento"""
+        self._refine_debounce_id = None
+        pedidos = [((chave, escala), chave, (foto.width(), foto.height()))
+                   for chave, (_, foto, escala, refinado) in self.map_tiles.items() if not refinado]
+        if not pedidos:
+            return
+        self.refinador.enviar(self.piramide.refinar, pedidos)
+        if self._refine_poll_id is None:
+            self._check_refine()
+
+    def _check_refine(self):
+        """Troca as prévias pelos blocos refinados (na thread da interface, via root.after)"""
+        self._refine_poll_id = None
+        item, ocupado = self.refinador.estado()
+        if item is None:
+            if ocupado:
+                self._refine_poll_id = self.root.after(16, self._check_refine)
+            return
+
+        _, resultado, erro = item
+        if erro is not None:
+            self._log_message(f"⚠️ Refinamento do mapa falhou: {erro}")
+            return
+        for (chave, escala), imagem in resultado:
+            atual = self.map_tiles.get(chave)
+            # Descarta blocos que saíram da tela ou mudaram de escala durante o refinamento
+            if atual is None or atual[2] != escala or atual[3]:
+                continue
+            foto = ImageTk.PhotoImage(imagem)
+            self.canvas.itemconfigure(atual[0], image=foto)
+            self.map_tiles[chave] = (atual[0], foto, escala, True)
+
     def _on_resize(self, event):
         """Handler para resize da janela (com debounce para evitar lag)"""
         # Cancela timer anterior se existir
@@ -1397,24 +2730,45 @@ class ModernMapApp:
         """Handler para pressionar botão esquerdo"""
         if (event.state & 0x4) != 0:  # Ctrl pressionado
             self._drag_start = (event.x, event.y, self.pan_x, self.pan_y)
+        else:
+            self._drag_start = None
 
     def _on_left_drag(self, event):
         """Handler para arrastar com botão esquerdo (throttled para melhor performance)"""
         if not self._drag_start:
             return
         
-        # Throttle: atualiza no máximo a cada 16ms (~60 FPS)
-        if self._drag_update_id is not None:
-            return
-        
         sx, sy, px, py = self._drag_start
-        dx = event.x - sx
-        dy = event.y - sy
-        self.pan_x = px + dx
-        self.pan_y = py + dy
+        self._drag_target = (px + event.x - sx, py + event.y - sy)
         
-        self._update_canvas_image()
-        self._drag_update_id = self.root.after(16, lambda: setattr(self, '_drag_update_id', None))
+        # Throttle: atualiza no máximo a cada 16ms (~60 FPS); o timer aplica a última posição
+        if self._drag_update_id is None:
+            self._apply_drag()
+
+    def _apply_drag(self):
+        """Aplica o pan pendente e agenda a próxima verificação enquanto o arrasto continuar"""
+        self._drag_update_id = None
+        if self._drag_target is None:
+            return
+        pan_x, pan_y = self._drag_target
+        self._drag_target = None
+        self._pan_by(pan_x - self.pan_x, pan_y - self.pan_y)
+        self._drag_update_id = self.root.after(16, self._apply_drag)
+
+    def _pan_by(self, dx: int, dy: int):
+        """Pan sem redesenhar: desloca os grupos de itens do canvas (O(1) chamadas por quadro,
+        independente do número de pontos) e só cria os blocos do mapa que entraram na tela"""
+        if not dx and not dy:
+            return
+        self.pan_x += dx
+        self.pan_y += dy
+        for tag in ('map_image', 'icon', 'marker', 'route'):
+            self.canvas.move(tag, dx, dy)
+
+        canvas_w = self.canvas.winfo_width()
+        canvas_h = self.canvas.winfo_height()
+        if canvas_w > 1 and canvas_h > 1:
+            self._update_map_tiles(canvas_w, canvas_h, reposicionar=False)
 
     def _zoom_in(self):
         """Aumenta o zoom"""
@@ -1456,11 +2810,26 @@ class ModernMapApp:
 
     def run(self):
         """Inicia a aplicação"""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            self.executor.encerrar()  # Aguarda busca em andamento antes de liberar o grafo
+            self.refinador.encerrar()
+            self.router.fechar()  # Libera grafo persistente do backend C
 
 
 def main():
-    """Função principal"""
+    """Função principal (sem interface: python main.py serve [opções] inicia o serviço HTTP,
+    python main.py lote ENTRADA SAIDA [opções] roteia pares origem/destino em lote)"""
+    if len(sys.argv) > 1 and sys.argv[1] == 'serve':
+        import servico
+        servico.main(sys.argv[2:], RouterLib)
+        return
+    if len(sys.argv) > 1 and sys.argv[1] == 'lote':
+        import roteamento_lote
+        roteamento_lote.main(sys.argv[2:], RouterLib)
+        return
+    
     app = ModernMapApp()
     app.run()
 
@@ -0,0 +1,121 @@
+"""
+Métricas das consultas de rota no formato texto do Prometheus
+
+RouterLib entrega as estatísticas de cada consulta (tempos por fase em µs e contadores
+da busca, ver EstatisticasRota em backend/grafo_algoritmos.h) ao gancho registrado com
+RouterLib.definir_gancho_metricas(). ColetorMetricas é o gancho padrão: acumula
+histogramas e contadores por algoritmo e gera o texto de /metricas.
+
+Uso:
+    coletor = ColetorMetricas()
+    router.definir_gancho_metricas(coletor.registrar)
+    print(coletor.texto_prometheus())
+
+Qualquer função que receba o dict de estatísticas serve de gancho (log de consultas lentas,
+envio para outro sistema, ...). O gancho roda na thread da consulta e deve ser rápido.
+"""
+import threading
+from typing import Dict, List
+
+LIMITES_LATENCIA_S = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+LIMITES_FASE_S = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)  # Fases de µs a s
+LIMITES_CONTAGEM = (10, 100, 1000, 10000, 100000, 1000000)
+FASES = ('carga', 'busca', 'reconstrucao', 'marshalling', 'geometria', 'total')
+CONTADORES = ('nos_fixados', 'arestas_relaxadas', 'insercoes_heap', 'remocoes_heap')
+
+
+class HistogramaLatencia:
+    """Histograma cumulativo (segundos, por padrão) no modelo do Prometheus"""
+
+    def __init__(self, limites=LIMITES_LATENCIA_S):
+        self.limites = limites
+        self.contagens = [0] * (len(limites) + 1)  # Última posição = +Inf
+        self.soma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float):
+        i = 0
+        while i < len(self.limites) and valor > self.limites[i]:
+            i += 1
+        self.contagens[i] += 1
+        self.soma += valor
+        self.total += 1
+
+    def linhas_prometheus(self, nome: str, rotulos: str) -> List[str]:
+        linhas = []
+        acumulado = 0
+        for limite, contagem in zip(self.limites, self.contagens):
+            acumulado += contagem
+            linhas.append(f'{nome}_bucket{{{rotulos},le="{limite}"}} {acumulado}')
+        linhas.append(f'{nome}_bucket{{{rotulos},le="+Inf"}} {self.total}')
+        linhas.append(f'{nome}_sum{{{rotulos}}} {self.soma:.6f}')
+        linhas.append(f'{nome}_count{{{rotulos}}} {self.total}')
+        return linhas
+
+
+class ColetorMetricas:
+    """Gancho de métricas: histogramas por fase e contadores da busca, por algoritmo (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fases: Dict[tuple, HistogramaLatencia] = {}  # (algoritmo, fase) → histograma em segundos
+        self._nos: Dict[str, HistogramaLatencia] = {}      # algoritmo → vértices fixados por consulta
+        self._contadores: Dict[tuple, int] = {}            # (algoritmo, contador) → soma
+        self._consultas: Dict[tuple, int] = {}             # (algoritmo, origem do resultado) → quantidade
+
+    def registrar(self, estatisticas: Dict):
+        """Recebe o dict de estatísticas de RouterLib.calcular_rota_dijkstra"""
+        algoritmo = estatisticas.get('algoritmo', '?')
+        origem = 'cache' if estatisticas.get('cache') else ('sem_rota' if not estatisticas.get('encontrada')
+                                                           else 'busca')
+        with self._lock:
+            chave = (algoritmo, origem)
+            self._consultas[chave] = self._consultas.get(chave, 0) + 1
+            if origem == 'cache':
+                return
+            for fase in FASES:
+                valor = estatisticas.get(f'{fase}_us')
+                if valor is None or (fase == 'carga' and not valor):  # Carga só no calcular_rota legado
+                    continue
+                histograma = self._fases.get((algoritmo, fase))
+                if histograma is None:
+                    histograma = self._fases[(algoritmo, fase)] = HistogramaLatencia(LIMITES_FASE_S)
+                histograma.observar(valor / 1e6)
+            for contador in CONTADORES:
+                valor = estatisticas.get(contador)
+                if valor is not None:
+                    self._contadores[(algoritmo, contador)] = self._contadores.get((algoritmo, contador), 0) + valor
+            if estatisticas.get('nos_fixados') is not None:
+                histograma = self._nos.get(algoritmo)
+                if histograma is None:
+                    histograma = self._nos[algoritmo] = HistogramaLatencia(LIMITES_CONTAGEM)
+                histograma.observar(estatisticas['nos_fixados'])
+
+    def texto_prometheus(self) -> str:
+        with self._lock:
+            linhas = ['# HELP roteador_consultas_total Consultas de rota por algoritmo e origem do resultado',
+                      '# TYPE roteador_consultas_total counter']
+            for (algoritmo, origem), quantidade in sorted(self._consultas.items()):
+                linhas.append(f'roteador_consultas_total{{algoritmo="{algoritmo}",resultado="{origem}"}} '
+                              f'{quantidade}')
+
+            linhas += ['# HELP roteador_fase_segundos Tempo de cada fase da consulta '
+                       '(carga, busca, reconstrucao, marshalling, geometria, total)',
+                       '# TYPE roteador_fase_segundos histogram']
+            for (algoritmo, fase), histograma in sorted(self._fases.items()):
+                linhas += histograma.linhas_prometheus('roteador_fase_segundos',
+                                                       f'algoritmo="{algoritmo}",fase="{fase}"')
+
+            linhas += ['# HELP roteador_nos_fixados Vértices fixados por consulta',
+                       '# TYPE roteador_nos_fixados histogram']
+            for algoritmo, histograma in sorted(self._nos.items()):
+                linhas += histograma.linhas_prometheus('roteador_nos_fixados', f'algoritmo="{algoritmo}"')
+
+            for contador in CONTADORES:
+                nome = f'roteador_{contador}_total'
+                linhas += [f'# HELP {nome} Soma de {contador} em todas as buscas',
+                           f'# TYPE {nome} counter']
+                for (algoritmo, c), valor in sorted(self._contadores.items()):
+                    if c == contador:
+                        linhas.append(f'{nome}{{algoritmo="{algoritmo}"}} {valor}')
+        return '\n'.join(linhas) + '\n'
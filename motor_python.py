@@ -0,0 +1,190 @@
+"""
+Motor de rotas em Python puro (fallback quando a DLL/SO do backend C não está disponível)
+
+Carrega o grafo exportado em grafo.json e monta as adjacências no mesmo formato
+CSR do backend C (arrays contíguos de offsets, destinos e pesos). A busca usa
+Dijkstra com heapq (remoção preguiçosa), opcionalmente guiado pela heurística
+euclidiana do A* (mesma calibração do C), e retorna os mesmos dicionários que
+RouterLib.calcular_rota_dijkstra.
+"""
+import json
+import heapq
+import math
+import zlib
+from array import array
+from typing import Optional, Tuple, Dict, List
+
+
+MODO_DIJKSTRA = 0  # Mesmos valores de grafo_algoritmos.h
+MODO_ASTAR = 1
+
+
+class MotorPython:
+    """Motor de rotas em Python com o mesmo contrato de RouterLib (IDs, distância, coordenadas)"""
+
+    def __init__(self, caminho_grafo: str):
+        with open(caminho_grafo, 'rb') as f:
+            conteudo = f.read()
+        dados = json.loads(conteudo.decode('utf-8'))
+        self.versao = zlib.crc32(conteudo)  # Versão dos dados (muda quando o grafo.json muda)
+
+        vertices = dados['vertices']
+        n = len(vertices)
+
+        # Dados dos vértices em arrays paralelos (posição = índice interno)
+        self.ids = array('i', (v['id'] for v in vertices))
+        self.xs = array('i', (v['x'] for v in vertices))
+        self.ys = array('i', (v['y'] for v in vertices))
+        self.tipos = array('i', (v['tipo'] for v in vertices))
+        self.nomes = [v['nome'] for v in vertices]
+        self.categorias = [v['categoria'] for v in vertices]
+        self.ruas = [v['rua'] for v in vertices]
+
+        # Tabela ID → índice (mantém a primeira ocorrência, como no C)
+        self.indice_por_id: Dict[int, int] = {}
+        for i, id_vertice in enumerate(self.ids):
+            self.indice_por_id.setdefault(id_vertice, i)
+
+        self._montar_csr(dados['arestas'], n)
+
+    def _montar_csr(self, arestas: List[List[int]], n: int):
+        """Monta adjacências CSR (contagem por origem → offsets → preenchimento), O(V + E)"""
+        indice = self.indice_por_id
+        validas = [(indice[o], indice[d], peso) for o, d, peso in arestas
+                   if o in indice and d in indice]
+
+        inicio = array('i', bytes(4 * (n + 1)))
+        for o, _, _ in validas:
+            inicio[o + 1] += 1
+        for i in range(n):
+            inicio[i + 1] += inicio[i]
+
+        destinos = array('i', bytes(4 * len(validas)))
+        pesos = array('i', bytes(4 * len(validas)))
+        cursor = array('i', inicio[:n])
+        for o, d, peso in validas:
+            pos = cursor[o]
+            destinos[pos] = d
+            pesos[pos] = peso
+            cursor[o] = pos + 1
+
+        self.adj_inicio = inicio
+        self.adj_destino = destinos
+        self.adj_peso = pesos
+        self.num_arestas = len(validas)
+
+        # Escala pixel → metro do A*: menor razão peso / comprimento em pixels (heurística admissível)
+        escala = None
+        for o, d, peso in validas:
+            pixels = math.hypot(self.xs[o] - self.xs[d], self.ys[o] - self.ys[d])
+            if pixels > 0 and (escala is None or peso / pixels < escala):
+                escala = peso / pixels
+        self.escala_heuristica = escala * (1 - 1e-9) if escala else 0.0
+
+    @property
+    def num_vertices(self) -> int:
+        return len(self.ids)
+
+    def _dijkstra(self, origem: int, destino: int = -1,
+                  modo: int = MODO_DIJKSTRA) -> Tuple[Dict[int, int], Dict[int, int], int]:
+        """Dijkstra (ou A*, se modo=MODO_ASTAR e houver destino) com heapq a partir do índice 'origem'.
+        Outros modos do C (ex.: bidirecional) usam o Dijkstra unidirecional, com o mesmo resultado.
+        Para ao fixar 'destino', se informado. Retorna (distâncias, anteriores, vértices fixados)."""
+        inicio, destinos, pesos = self.adj_inicio, self.adj_destino, self.adj_peso
+        distancias = {origem: 0}
+        anteriores = {origem: -1}
+        visitados = set()
+
+        if modo == MODO_ASTAR and destino >= 0 and self.escala_heuristica > 0:
+            escala, xd, yd, xs, ys = self.escala_heuristica, self.xs[destino], self.ys[destino], self.xs, self.ys
+            h = lambda v: int(escala * math.hypot(xs[v] - xd, ys[v] - yd))
+        else:
+            h = lambda v: 0
+        heap = [(h(origem), origem)]
+
+        while heap:
+            _, u = heapq.heappop(heap)
+            if u in visitados:
+                continue  # Entrada obsoleta (remoção preguiçosa)
+            visitados.add(u)
+            if u == destino:
+                break
+
+            dist_u = distancias[u]
+            for k in range(inicio[u], inicio[u + 1]):
+                v = destinos[k]
+                nova = dist_u + pesos[k]
+                if v not in visitados and nova < distancias.get(v, nova + 1):
+                    distancias[v] = nova
+                    anteriores[v] = u
+                    heapq.heappush(heap, (nova + h(v), v))
+
+        return distancias, anteriores, len(visitados)
+
+    def calcular_rota_dijkstra(self, id_origem: int, id_destino: int,
+                               modo: int = MODO_DIJKSTRA) -> Optional[Dict]:
+        """Calcula menor caminho entre dois IDs. Retorna dict com IDs e distância (ou None)."""
+        origem = self.indice_por_id.get(id_origem)
+        destino = self.indice_por_id.get(id_destino)
+        if origem is None or destino is None or origem == destino:
+            return None
+
+        distancias, anteriores, nos_visitados = self._dijkstra(origem, destino, modo)
+        if destino not in distancias:
+            return None  # Destino não alcançável
+
+        # Reconstrói caminho do destino até a origem e inverte
+        caminho = []
+        atual = destino
+        while atual != -1:
+            caminho.append(self.ids[atual])
+            atual = anteriores[atual]
+        caminho.reverse()
+
+        return {
+            'sequencia_ids': caminho,
+            'num_ids': len(caminho),
+            'distancia_total': distancias[destino],
+            'nos_visitados': nos_visitados
+        }
+
+    def calcular_arvore_caminhos(self, id_origem: int) -> Optional[Tuple[List[int], List[int]]]:
+        """Distâncias e predecessores (por ID) de todos os vértices, na ordem de self.ids.
+        Mesmo contrato de calcular_arvore_caminhos no C: -1 para inalcançável/sem predecessor."""
+        origem = self.indice_por_id.get(id_origem)
+        if origem is None:
+            return None
+
+        distancias, anteriores, _ = self._dijkstra(origem)
+        ids = self.ids
+        dist_out = [distancias.get(i, -1) for i in range(self.num_vertices)]
+        ant_out = [ids[anteriores[i]] if anteriores.get(i, -1) != -1 else -1
+                   for i in range(self.num_vertices)]
+        return dist_out, ant_out
+
+    def obter_coordenadas_vertice(self, id_vertice: int) -> Optional[Tuple[int, int]]:
+        """Retorna (x, y) de um vértice pelo ID"""
+        i = self.indice_por_id.get(id_vertice)
+        if i is None:
+            return None
+        return (self.xs[i], self.ys[i])
+
+    def obter_rua_vertice(self, id_vertice: int) -> Optional[str]:
+        """Retorna nome da rua de um vértice (None para esquinas sem nome)"""
+        i = self.indice_por_id.get(id_vertice)
+        if i is None:
+            return None
+        rua = self.ruas[i]
+        return rua if rua and rua != "N/A" else None
+
+    def exportar_vertices(self) -> List[Dict]:
+        """Lista de vértices no mesmo formato de RouterLib._exportar_vertices"""
+        return [{
+            'id': self.ids[i],
+            'nome': self.nomes[i],
+            'categoria': self.categorias[i],
+            'rua': self.ruas[i],
+            'tipo': self.tipos[i],
+            'x': self.xs[i],
+            'y': self.ys[i],
+        } for i in range(self.num_vertices)]
@@ -0,0 +1,255 @@
+"""
+Pirâmide de blocos (tiles) do mapa para desenho por viewport
+
+Em vez de redimensionar a imagem inteira a cada zoom, o mapa é recortado em blocos de
+256 px em níveis de potência de dois (nível z = escala 2^z, de 1/8x a 8x):
+- Cada bloco é gerado uma única vez (recorte da imagem original + LANCZOS) e gravado em
+  disco; as próximas execuções só leem o PNG. Os blocos mais usados ficam num cache LRU
+  em memória.
+- Para uma escala qualquer usa-se o menor nível com resolução >= escala; o canvas
+  desenha só os blocos que cruzam o viewport, reduzidos pelo fator escala / 2^z (<= 1).
+- Durante a interação a interface pede prévias rápidas (bloco_exibicao com previa=True) e,
+  com a entrada ociosa, troca-as pelas versões LANCZOS calculadas em segundo plano (refinar).
+Memória e tempo de zoom passam a depender do tamanho da janela, não do tamanho do mapa.
+
+Pré-geração de todos os níveis (opcional, p. ex. depois de trocar o mapa):
+    python piramide_mapa.py [perimetro-mapa.png]
+"""
+import hashlib
+import math
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Iterator, Optional, Tuple
+
+from PIL import Image
+
+TAMANHO_BLOCO = 256
+NIVEL_MIN = -3  # 1/8x (zoom mínimo do app: 0.1)
+NIVEL_MAX = 3   # 8x (zoom máximo do app: 5.0)
+CAPACIDADE_MEMORIA = 192  # Blocos mantidos em memória (~48 MB em RGBA)
+
+
+def pasta_cache_padrao() -> str:
+    """Pasta de cache do usuário (fora do diretório do executável, que pode ser somente leitura)"""
+    base = os.environ.get('LOCALAPPDATA') or os.environ.get('XDG_CACHE_HOME') or \
+        os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'sistema_navegacao', 'blocos')
+
+
+class PiramideMapa:
+    """Blocos do mapa por nível de zoom, gerados sob demanda e cacheados em disco e memória"""
+
+    def __init__(self, imagem: Image.Image, caminho_imagem: Optional[str] = None,
+                 pasta_cache: Optional[str] = None, tamanho_bloco: int = TAMANHO_BLOCO,
+                 capacidade_memoria: int = CAPACIDADE_MEMORIA):
+        self.imagem = imagem
+        self.largura, self.altura = imagem.size
+        self.tamanho_bloco = tamanho_bloco
+        self.capacidade_memoria = capacidade_memoria
+        self._memoria: 'OrderedDict[tuple, Image.Image]' = OrderedDict()  # (z, bx, by) → bloco
+        self._lock = threading.Lock()  # Blocos podem ser pedidos fora da thread da interface
+        self.gerados = 0  # Blocos recortados da imagem original nesta execução
+        self.lidos_disco = 0
+
+        # Pasta por conteúdo da imagem: trocar o mapa invalida os blocos antigos automaticamente
+        self.pasta = None
+        try:
+            pasta_base = pasta_cache or pasta_cache_padrao()
+            self.pasta = os.path.join(pasta_base, self._assinatura(caminho_imagem))
+            os.makedirs(self.pasta, exist_ok=True)
+        except OSError:
+            self.pasta = None  # Sem disco gravável: só o cache em memória
+
+    def _assinatura(self, caminho_imagem: Optional[str]) -> str:
+        h = hashlib.sha1()
+        if caminho_imagem and os.path.exists(caminho_imagem):
+            with open(caminho_imagem, 'rb') as f:
+                for parte in iter(lambda: f.read(1 << 20), b''):
+                    h.update(parte)
+        else:
+            h.update(self.imagem.tobytes())
+        h.update(f"{self.largura}x{self.altura}:{self.imagem.mode}:{self.tamanho_bloco}".encode())
+        return h.hexdigest()[:16]
+
+    @staticmethod
+    def nivel_para_escala(escala: float) -> int:
+        """Menor nível com resolução >= escala (o bloco só é reduzido na exibição)"""
+        nivel = math.ceil(math.log2(max(escala, 1e-6)) - 1e-9)
+        return min(max(nivel, NIVEL_MIN), NIVEL_MAX)
+
+    def dimensoes_nivel(self, z: int) -> Tuple[int, int]:
+        """Tamanho em pixels da imagem inteira no nível z"""
+        fator = 2.0 ** z
+        return max(1, int(self.largura * fator)), max(1, int(self.altura * fator))
+
+    def blocos_visiveis(self, escala: float, x0: int, y0: int, largura_canvas: int,
+                        altura_canvas: int) -> Tuple[int, Iterator[Tuple[int, int, int, int, int, int]]]:
+        """Nível e blocos que cruzam o viewport: (bx, by, esquerda, topo, largura, altura) em pixels
+        de exibição relativos à origem da imagem (x0, y0 = canto da imagem no canvas)"""
+        z = self.nivel_para_escala(escala)
+        disp_w, disp_h = int(self.largura * escala), int(self.altura * escala)
+        passo = self.tamanho_bloco * escala / (2.0 ** z)  # Tamanho de um bloco na tela
+
+        # Faixa visível da imagem (coordenadas de exibição)
+        vx0, vy0 = max(0, -x0), max(0, -y0)
+        vx1, vy1 = min(disp_w, largura_canvas - x0), min(disp_h, altura_canvas - y0)
+
+        def gerar():
+            if vx1 <= vx0 or vy1 <= vy0:
+                return
+            for by in range(int(vy0 // passo), int((vy1 - 1) // passo) + 1):
+                topo = int(round(by * passo))
+                base = min(disp_h, int(round((by + 1) * passo)))
+                for bx in range(int(vx0 // passo), int((vx1 - 1) // passo) + 1):
+                    esquerda = int(round(bx * passo))
+                    direita = min(disp_w, int(round((bx + 1) * passo)))
+                    if direita > esquerda and base > topo:
+                        yield bx, by, esquerda, topo, direita - esquerda, base - topo
+        return z, gerar()
+
+    def bloco(self, z: int, bx: int, by: int) -> Optional[Image.Image]:
+        """Bloco (bx, by) do nível z: memória → disco → recorte da imagem original"""
+        imagem = self._em_memoria(z, bx, by)
+        if imagem is None:
+            imagem = self._ler_disco(z, bx, by)
+        if imagem is not None:
+            return imagem
+
+        imagem = self._gerar_bloco(z, bx, by)
+        if imagem is None:
+            return None
+        caminho = self._caminho(z, bx, by)
+        if caminho:
+            try:
+                os.makedirs(os.path.dirname(caminho), exist_ok=True)
+                temporario = f"{caminho}.{os.getpid()}.{threading.get_ident()}.tmp"
+                imagem.save(temporario, format='PNG', compress_level=1)
+                os.replace(temporario, caminho)  # Escrita atômica (várias instâncias do app)
+            except OSError:
+                pass
+        self._guardar((z, bx, by), imagem)
+        return imagem
+
+    def bloco_exibicao(self, z: int, bx: int, by: int, tamanho: Tuple[int, int],
+                       previa: bool = False) -> Tuple[Optional[Image.Image], bool]:
+        """Bloco reamostrado para o tamanho de exibição; retorna (imagem, refinado).
+
+        A prévia roda na thread da interface: não lê disco nem gera com LANCZOS. Usa o bloco
+        em memória com BILINEAR ou, se ele não estiver lá, a região da imagem original com
+        NEAREST. refinado=False indica que a versão LANCZOS ainda precisa ser calculada (o
+        refinamento, fora da interface, é quem lê o disco ou gera o bloco)."""
+        if previa:
+            base = self._em_memoria(z, bx, by)
+            if base is None:
+                caixa = self._caixa_original(z, bx, by)
+                if caixa is None:
+                    return None, True
+                # NEAREST: ~40x mais rápido que BILINEAR na região original; dura só até o refinamento
+                return self.imagem.resize(tamanho, Image.Resampling.NEAREST, box=caixa), False
+        else:
+            base = self.bloco(z, bx, by)
+            if base is None:
+                return None, True
+
+        if base.size == tuple(tamanho):
+            return base, True
+        if previa:
+            return base.resize(tamanho, Image.Resampling.BILINEAR), False
+        return base.resize(tamanho, Image.Resampling.LANCZOS), True
+
+    def refinar(self, pedidos):
+        """Versões LANCZOS de vários blocos (roda fora da thread da interface):
+        pedidos [(chave, (z, bx, by), tamanho)] → [(chave, imagem)]"""
+        resultado = []
+        for chave, (z, bx, by), tamanho in pedidos:
+            imagem, _ = self.bloco_exibicao(z, bx, by, tamanho)
+            if imagem is not None:
+                resultado.append((chave, imagem))
+        return resultado
+
+    def _caminho(self, z: int, bx: int, by: int) -> Optional[str]:
+        return os.path.join(self.pasta, str(z), f"{bx}_{by}.png") if self.pasta else None
+
+    def _em_memoria(self, z: int, bx: int, by: int) -> Optional[Image.Image]:
+        """Bloco do cache em memória (marcado como usado recentemente) ou None"""
+        chave = (z, bx, by)
+        with self._lock:
+            imagem = self._memoria.get(chave)
+            if imagem is not None:
+                self._memoria.move_to_end(chave)
+            return imagem
+
+    def _ler_disco(self, z: int, bx: int, by: int) -> Optional[Image.Image]:
+        """Bloco já gerado em execuções anteriores (PNG em disco), guardado também em memória"""
+        caminho = self._caminho(z, bx, by)
+        if not caminho or not os.path.exists(caminho):
+            return None
+        try:
+            with Image.open(caminho) as arquivo:
+                imagem = arquivo.copy()
+        except OSError:
+            return None  # Arquivo corrompido: será gerado de novo
+        with self._lock:
+            self.lidos_disco += 1
+        self._guardar((z, bx, by), imagem)
+        return imagem
+
+    def _guardar(self, chave: tuple, imagem: Image.Image):
+        with self._lock:
+            self._memoria[chave] = imagem
+            self._memoria.move_to_end(chave)
+            while len(self._memoria) > self.capacidade_memoria:
+                self._memoria.popitem(last=False)
+
+    def _caixa_original(self, z: int, bx: int, by: int) -> Optional[Tuple[float, float, float, float]]:
+        """Região da imagem original coberta pelo bloco (None se o bloco está fora da imagem)"""
+        lado_original = self.tamanho_bloco / (2.0 ** z)  # Pixels originais cobertos por um bloco
+        esquerda, topo = bx * lado_original, by * lado_original
+        if esquerda >= self.largura or topo >= self.altura or bx < 0 or by < 0:
+            return None
+        return (esquerda, topo, min(self.largura, esquerda + lado_original),
+                min(self.altura, topo + lado_original))
+
+    def _gerar_bloco(self, z: int, bx: int, by: int) -> Optional[Image.Image]:
+        """Recorta a região do bloco na imagem original e reamostra para o nível z"""
+        caixa = self._caixa_original(z, bx, by)
+        if caixa is None:
+            return None
+
+        nivel_w, nivel_h = self.dimensoes_nivel(z)
+        saida_w = min(self.tamanho_bloco, nivel_w - bx * self.tamanho_bloco)
+        saida_h = min(self.tamanho_bloco, nivel_h - by * self.tamanho_bloco)
+        if saida_w <= 0 or saida_h <= 0:
+            return None
+
+        with self._lock:
+            self.gerados += 1
+        return self.imagem.resize((saida_w, saida_h), Image.Resampling.LANCZOS, box=caixa)
+
+    def gerar_todos(self) -> int:
+        """Gera (ou confere) todos os blocos de todos os níveis; retorna a quantidade"""
+        total = 0
+        for z in range(NIVEL_MIN, NIVEL_MAX + 1):
+            nivel_w, nivel_h = self.dimensoes_nivel(z)
+            for by in range(math.ceil(nivel_h / self.tamanho_bloco)):
+                for bx in range(math.ceil(nivel_w / self.tamanho_bloco)):
+                    if self.bloco(z, bx, by) is not None:
+                        total += 1
+        return total
+
+
+def main():
+    caminho = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                                                                 'perimetro-mapa.png')
+    imagem = Image.open(caminho)
+    imagem.load()
+    piramide = PiramideMapa(imagem, caminho)
+    total = piramide.gerar_todos()
+    print(f"🧱 {total} blocos ({piramide.gerados} gerados, {piramide.lidos_disco} já em cache) → "
+          f"{piramide.pasta or 'somente memória'}")
+
+
+if __name__ == '__main__':
+    main()
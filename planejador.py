@@ -0,0 +1,189 @@
+"""
+Planejador de roteiros com múltiplas paradas (modo "múltiplos destinos")
+
+1. Matriz de distâncias entre as paradas (RouterLib.matriz_distancias): com a hierarquia
+   carregada, busca muitos-para-muitos no C; sem ela, uma busca um-para-muitos por parada
+   que para ao fixar todas as paradas. Nenhuma ArvoreCaminhos com todos os vértices é montada.
+2. Ordem das paradas por vizinho mais próximo, refinada com 2-opt e Or-opt.
+   O grafo é dirigido (matriz assimétrica): o custo de um trecho invertido pelo
+   2-opt é obtido em O(1) com somas de prefixo nos dois sentidos.
+3. Caminhos reconstruídos só para os trechos do roteiro escolhido (uma busca ponto a
+   ponto por trecho, CH ou bidirecional, com o cache de rotas do RouterLib).
+"""
+import time
+from typing import Optional, Dict, List
+
+INFINITO = 10 ** 9  # Custo de pares sem caminho (a heurística evita esses trechos)
+
+
+def montar_matriz_distancias(router, paradas: List[int]) -> List[List[int]]:
+    """matriz[i][j] = distância da parada i até a j (INFINITO se sem caminho)"""
+    return [[0 if i == j else (INFINITO if d is None else d) for j, d in enumerate(linha)]
+            for i, linha in enumerate(router.matriz_distancias(paradas))]
+
+
+def custo_ordem(matriz: List[List[int]], ordem: List[int]) -> int:
+    """Soma dos trechos consecutivos de uma ordem (lista de índices da matriz)"""
+    return sum(matriz[ordem[k]][ordem[k + 1]] for k in range(len(ordem) - 1))
+
+
+def _vizinho_mais_proximo(matriz: List[List[int]], inicio: int, fim: Optional[int]) -> List[int]:
+    """Ordem inicial gulosa: sempre segue para a parada mais próxima ainda não visitada"""
+    restantes = set(range(len(matriz)))
+    restantes.discard(inicio)
+    if fim is not None:
+        restantes.discard(fim)
+
+    ordem = [inicio]
+    while restantes:
+        atual = matriz[ordem[-1]]
+        proxima = min(restantes, key=lambda j: atual[j])
+        ordem.append(proxima)
+        restantes.remove(proxima)
+
+    if fim is not None:
+        ordem.append(fim)
+    return ordem
+
+
+def _melhorar_2opt(matriz: List[List[int]], ordem: List[int], ultimo_fixo: bool) -> bool:
+    """Aplica a primeira inversão de trecho que reduz o custo. Retorna True se melhorou."""
+    n = len(ordem)
+    # Somas de prefixo do custo no sentido da ordem (ida) e no sentido inverso (volta)
+    ida = [0] * n
+    volta = [0] * n
+    for k in range(1, n):
+        ida[k] = ida[k - 1] + matriz[ordem[k - 1]][ordem[k]]
+        volta[k] = volta[k - 1] + matriz[ordem[k]][ordem[k - 1]]
+
+    limite = n - 1 if ultimo_fixo else n
+    for i in range(1, limite - 1):
+        a = ordem[i - 1]
+        b = ordem[i]
+        for j in range(i + 1, limite):
+            c = ordem[j]
+            antes = matriz[a][b] + ida[j] - ida[i]
+            depois = matriz[a][c] + volta[j] - volta[i]
+            if j + 1 < n:
+                d = ordem[j + 1]
+                antes += matriz[c][d]
+                depois += matriz[b][d]
+            if depois < antes:
+                ordem[i:j + 1] = ordem[i:j + 1][::-1]
+                return True
+    return False
+
+
+def _melhorar_or_opt(matriz: List[List[int]], ordem: List[int], ultimo_fixo: bool) -> bool:
+    """Move o primeiro bloco de 1 a 3 paradas consecutivas que reduz o custo. Retorna True se melhorou."""
+    n = len(ordem)
+    limite = n - 1 if ultimo_fixo else n  # Posições móveis: 1 .. limite-1
+
+    for tamanho in (1, 2, 3):
+        for i in range(1, limite - tamanho + 1):
+            j = i + tamanho - 1  # Bloco ordem[i..j]
+            prev, primeiro, ultimo = ordem[i - 1], ordem[i], ordem[j]
+            prox = ordem[j + 1] if j + 1 < n else None
+
+            ganho_remocao = matriz[prev][primeiro]
+            if prox is not None:
+                ganho_remocao += matriz[ultimo][prox] - matriz[prev][prox]
+
+            # Reinsere o bloco entre ordem[p] e ordem[p + 1] (fora do próprio bloco)
+            for p in range(0, limite):
+                if i - 1 <= p <= j:
+                    continue
+                a = ordem[p]
+                b = ordem[p + 1] if p + 1 < n else None
+                custo_insercao = matriz[a][primeiro]
+                if b is not None:
+                    custo_insercao += matriz[ultimo][b] - matriz[a][b]
+                if custo_insercao < ganho_remocao:
+                    bloco = ordem[i:j + 1]
+                    del ordem[i:j + 1]
+                    pos = p + 1 if p < i else p + 1 - tamanho
+                    ordem[pos:pos] = bloco
+                    return True
+    return False
+
+
+def ordenar_paradas(matriz: List[List[int]], retornar_origem: bool = False,
+                    max_iteracoes: int = 10000) -> List[int]:
+    """Ordem de visita (índices da matriz) começando na parada 0.
+    Com retornar_origem, o roteiro termina de volta na parada 0 (o índice 0 aparece no fim)."""
+    n = len(matriz)
+    if n <= 1:
+        return list(range(n))
+
+    if retornar_origem:
+        # Cópia da origem como último ponto fixo: o ciclo vira um caminho com extremos fixos
+        matriz = [linha + [linha[0]] for linha in matriz]
+        matriz.append(list(matriz[0]))
+        fim = n
+    else:
+        fim = None
+
+    ordem = _vizinho_mais_proximo(matriz, 0, fim)
+    ultimo_fixo = fim is not None
+    for _ in range(max_iteracoes):
+        if _melhorar_2opt(matriz, ordem, ultimo_fixo):
+            continue
+        if _melhorar_or_opt(matriz, ordem, ultimo_fixo):
+            continue
+        break  # Ótimo local para as duas vizinhanças
+
+    if retornar_origem:
+        ordem[-1] = 0
+    return ordem
+
+
+def planejar_roteiro(router, paradas: List[int], retornar_origem: bool = False) -> Optional[Dict]:
+    """Planeja roteiro partindo de paradas[0] e visitando as demais na melhor ordem encontrada.
+    Retorna dict com 'ordem' (IDs), 'trechos', 'sequencia_ids', 'distancia_total', 'pontos' e 'ruas'."""
+    paradas = list(dict.fromkeys(paradas))  # Remove repetidas mantendo a origem na frente
+    if len(paradas) < 2:
+        print("❌ Roteiro requer ao menos duas paradas distintas")
+        return None
+
+    inicio = time.perf_counter()
+    matriz = montar_matriz_distancias(router, paradas)
+
+    ordem = ordenar_paradas(matriz, retornar_origem)
+    if custo_ordem(matriz, ordem) >= INFINITO:
+        print("❌ Não existe roteiro que visite todas as paradas (grafo desconexo)")
+        return None
+
+    # Caminhos só dos trechos escolhidos (k buscas ponto a ponto em vez de k árvores completas)
+    modo_trechos = router.MODO_CH if getattr(router, 'ch', None) else router.MODO_BIDIRECIONAL
+    trechos = []
+    sequencia = [paradas[ordem[0]]]
+    for k in range(len(ordem) - 1):
+        origem, destino = paradas[ordem[k]], paradas[ordem[k + 1]]
+        rota = router.calcular_rota_dijkstra(origem, destino, modo_trechos)
+        if rota is None:
+            print(f"❌ Trecho {origem} → {destino} sem caminho")
+            return None
+        caminho = list(rota['sequencia_ids'])
+        trechos.append({
+            'origem': origem,
+            'destino': destino,
+            'distancia': rota['distancia_total'],
+            'sequencia_ids': caminho
+        })
+        sequencia.extend(caminho[1:])
+
+    pontos, ruas = router.resolver_geometria(sequencia)
+    duracao_ms = (time.perf_counter() - inicio) * 1000
+    distancia_total = sum(t['distancia'] for t in trechos)
+    print(f"🧭 Roteiro com {len(paradas)} paradas: {distancia_total} metros em {duracao_ms:.2f} ms")
+
+    return {
+        'ordem': [paradas[i] for i in ordem],
+        'trechos': trechos,
+        'sequencia_ids': sequencia,
+        'num_ids': len(sequencia),
+        'distancia_total': distancia_total,
+        'pontos': pontos,
+        'ruas': ruas,
+        'tempo_ms': duracao_ms
+    }
@@ -0,0 +1,232 @@
+"""
+Roteamento em lote, sem interface: python main.py lote ENTRADA SAIDA [opções]
+
+Lê pares origem → destino de um CSV ou JSONL em fluxo e grava as distâncias
+incrementalmente (JSONL ou CSV), sem manter o arquivo inteiro em memória:
+- A entrada é processada em blocos de --bloco pares; a saída preserva a ordem da entrada.
+- Dentro de cada bloco, pares da mesma origem são agrupados: origens com pelo menos
+  --min-destinos destinos usam uma única busca um-para-muitos (distancias_um_para_muitos,
+  que para quando todos os destinos do grupo foram fixados); as demais vão para
+  calcular_distancias_lote (buscas ponto a ponto reentrantes).
+- Grupos e buscas rodam num pool de threads; o bloco seguinte é lido enquanto o atual é resolvido.
+
+Formatos de entrada (detectados pela extensão, ou --formato-entrada):
+    CSV:   cabeçalho com colunas origem,destino (ou as duas primeiras colunas sem cabeçalho)
+    JSONL: {"origem": 1, "destino": 50} ou [1, 50] por linha
+Saída: origem, destino, distancia (vazio/null quando não há caminho). "-" usa stdin/stdout.
+Linhas malformadas são puladas (aviso arquivo:linha no stderr) e contadas no resumo final.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Iterator, List, Optional, Tuple
+
+TAMANHO_BLOCO = 50000
+MIN_DESTINOS_ARVORE = 8  # Abaixo disso, buscas ponto a ponto saem mais baratas que a busca agrupada
+MAX_AVISOS_LINHAS = 20  # Linhas malformadas listadas no stderr (as demais só entram na contagem)
+
+
+def _formato(caminho: str, informado: Optional[str]) -> str:
+    if informado:
+        return informado
+    return 'csv' if caminho.lower().endswith('.csv') else 'jsonl'
+
+
+def ler_pares(arquivo, formato: str, ao_ignorar=None) -> Iterator[Tuple[int, int]]:
+    """Gera (origem, destino) linha a linha; linhas vazias são ignoradas. Uma linha malformada
+    não interrompe o lote: é pulada e informada a ao_ignorar(numero_linha, erro)."""
+    if formato == 'csv':
+        leitor = csv.reader(arquivo)
+        colunas = (0, 1)
+        for numero, linha in enumerate(leitor, 1):
+            if not linha or not ''.join(linha).strip():
+                continue
+            if numero == 1 and not linha[0].strip().lstrip('-').isdigit():
+                nomes = [c.strip().lower() for c in linha]
+                if 'origem' in nomes and 'destino' in nomes:
+                    colunas = (nomes.index('origem'), nomes.index('destino'))
+                continue  # Cabeçalho
+            try:
+                par = int(linha[colunas[0]]), int(linha[colunas[1]])
+            except (ValueError, IndexError) as e:
+                if ao_ignorar:
+                    ao_ignorar(leitor.line_num, e)
+                continue
+            yield par
+    else:
+        for numero, linha in enumerate(arquivo, 1):
+            linha = linha.strip()
+            if not linha:
+                continue
+            try:
+                registro = json.loads(linha)
+                if isinstance(registro, dict):
+                    par = int(registro['origem']), int(registro['destino'])
+                else:
+                    par = int(registro[0]), int(registro[1])
+            except (ValueError, KeyError, IndexError, TypeError) as e:  # JSONDecodeError é ValueError
+                if ao_ignorar:
+                    ao_ignorar(numero, e)
+                continue
+            yield par
+
+
+class EscritorResultados:
+    """Grava (origem, destino, distância) em JSONL ou CSV à medida que os blocos ficam prontos"""
+
+    def __init__(self, arquivo, formato: str):
+        self.arquivo = arquivo
+        self.formato = formato
+        if formato == 'csv':
+            self._csv = csv.writer(arquivo, lineterminator='\n')
+            self._csv.writerow(('origem', 'destino', 'distancia'))
+
+    def escrever(self, pares: List[Tuple[int, int]], distancias: List[Optional[int]]):
+        if self.formato == 'csv':
+            self._csv.writerows((o, d, '' if dist is None else dist)
+                                for (o, d), dist in zip(pares, distancias))
+        else:
+            self.arquivo.write(''.join(
+                f'{{"origem":{o},"destino":{d},"distancia":{"null" if dist is None else dist}}}\n'
+                for (o, d), dist in zip(pares, distancias)))
+        self.arquivo.flush()
+
+
+class ProcessadorLote:
+    """Resolve blocos de pares com agrupamento por origem sobre um RouterLib compartilhado"""
+
+    def __init__(self, router, modo: int, trabalhadores: Optional[int] = None,
+                 min_destinos: int = MIN_DESTINOS_ARVORE):
+        self.router = router
+        self.modo = modo
+        self.trabalhadores = trabalhadores or os.cpu_count() or 1
+        self.min_destinos = max(1, min_destinos)
+        self.executor = ThreadPoolExecutor(max_workers=self.trabalhadores, thread_name_prefix='RoteamentoLote')
+        # Coordenador separado do pool de buscas: ele espera as buscas agrupadas que submete (evita deadlock)
+        self._coordenador = ThreadPoolExecutor(max_workers=1, thread_name_prefix='RoteamentoLoteBloco')
+        self.buscas_arvore = 0  # Buscas um-para-muitos executadas
+        self.pares_arvore = 0  # Pares resolvidos por essas buscas
+        self.pares_ponto_a_ponto = 0
+
+    def resolver_bloco(self, pares: List[Tuple[int, int]]) -> List[Optional[int]]:
+        """Distâncias na mesma ordem de pares"""
+        grupos = OrderedDict()  # origem -> posições dos pares no bloco
+        for posicao, (origem, _) in enumerate(pares):
+            grupos.setdefault(origem, []).append(posicao)
+
+        distancias: List[Optional[int]] = [None] * len(pares)
+        avulsos = []
+        tarefas = []
+        for origem, posicoes in grupos.items():
+            if len(posicoes) >= self.min_destinos:
+                destinos = [pares[p][1] for p in posicoes]
+                tarefas.append((posicoes, self.executor.submit(
+                    self.router.distancias_um_para_muitos, origem, destinos)))
+                self.buscas_arvore += 1
+                self.pares_arvore += len(posicoes)
+            else:
+                avulsos.extend(posicoes)
+
+        if avulsos:
+            # calcular_distancias_lote já divide o trabalho entre threads (pool próprio do RouterLib)
+            resultado = self.router.calcular_distancias_lote([pares[p] for p in avulsos], self.modo,
+                                                             trabalhadores=self.trabalhadores)
+            for posicao, dist in zip(avulsos, resultado):
+                distancias[posicao] = dist
+            self.pares_ponto_a_ponto += len(avulsos)
+
+        for posicoes, futuro in tarefas:
+            for posicao, dist in zip(posicoes, futuro.result()):
+                distancias[posicao] = dist
+        return distancias
+
+    def processar(self, pares: Iterator[Tuple[int, int]], escritor: EscritorResultados,
+                  tamanho_bloco: int = TAMANHO_BLOCO) -> int:
+        """Lê, resolve e grava bloco a bloco (no máximo dois blocos em memória). Retorna pares processados."""
+        total = 0
+        pendente = None  # (pares, futuro) do bloco em resolução
+        while True:
+            bloco = list(islice(pares, tamanho_bloco))
+            if pendente is not None:
+                escritor.escrever(pendente[0], pendente[1].result())
+                total += len(pendente[0])
+                pendente = None
+            if not bloco:
+                return total
+            # O bloco é resolvido no coordenador enquanto esta thread lê o próximo
+            pendente = (bloco, self._coordenador.submit(self.resolver_bloco, bloco))
+
+    def fechar(self):
+        self._coordenador.shutdown(wait=True)
+        self.executor.shutdown(wait=True)
+
+
+def main(argv: Optional[List[str]] = None, classe_router=None):
+    if classe_router is None:
+        from main import RouterLib as classe_router  # Import tardio: main.py importa este módulo no modo lote
+
+    parser = argparse.ArgumentParser(prog='main.py lote', description="Roteamento em lote de pares origem/destino")
+    parser.add_argument('entrada', help="CSV ou JSONL com pares origem/destino ('-' = stdin)")
+    parser.add_argument('saida', help="Arquivo .jsonl ou .csv de resultados ('-' = stdout)")
+    parser.add_argument('--formato-entrada', choices=('csv', 'jsonl'))
+    parser.add_argument('--formato-saida', choices=('csv', 'jsonl'))
+    parser.add_argument('--modo', type=int, default=2, help="Buscas ponto a ponto: 0 Dijkstra, 1 A*, "
+                                                            "2 bidirecional, 3 CH")
+    parser.add_argument('--trabalhadores', type=int, help="Threads de busca (padrão: núcleos da máquina)")
+    parser.add_argument('--bloco', type=int, default=TAMANHO_BLOCO, help="Pares lidos por bloco")
+    parser.add_argument('--min-destinos', type=int, default=MIN_DESTINOS_ARVORE,
+                        help="Destinos por origem (no bloco) para usar uma busca um-para-muitos")
+    parser.add_argument('--grafo', help="Grafo binário (padrão: mapa.grafo, se existir)")
+    args = parser.parse_args(argv)
+
+    # Mensagens de carga vão para stderr quando os resultados saem no stdout
+    stdout = sys.stdout
+    if args.saida == '-':
+        sys.stdout = sys.stderr
+    router = classe_router(capacidade_cache=0, caminho_grafo=args.grafo)
+    router.verboso = False
+    if args.modo == router.MODO_CH:
+        router.carregar_ch()
+
+    entrada = sys.stdin if args.entrada == '-' else open(args.entrada, 'r', encoding='utf-8', newline='')
+    saida = stdout if args.saida == '-' else open(args.saida, 'w', encoding='utf-8', newline='')
+    processador = ProcessadorLote(router, args.modo, args.trabalhadores, args.min_destinos)
+    ignoradas = 0
+
+    def _ao_ignorar(numero: int, erro: Exception):
+        nonlocal ignoradas
+        ignoradas += 1
+        if ignoradas <= MAX_AVISOS_LINHAS:
+            print(f"⚠️ {args.entrada}:{numero}: linha ignorada ({type(erro).__name__}: {erro})", file=sys.stderr)
+
+    try:
+        inicio = time.perf_counter()
+        escritor = EscritorResultados(saida, _formato(args.saida, args.formato_saida))
+        total = processador.processar(ler_pares(entrada, _formato(args.entrada, args.formato_entrada),
+                                                _ao_ignorar),
+                                      escritor, max(1, args.bloco))
+        duracao = time.perf_counter() - inicio
+        print(f"✅ {total} pares em {duracao:.2f}s ({total / duracao if duracao else 0:.0f} pares/s, "
+              f"{processador.trabalhadores} threads)", file=sys.stderr)
+        print(f"   {processador.pares_arvore} pares via {processador.buscas_arvore} buscas um-para-muitos, "
+              f"{processador.pares_ponto_a_ponto} ponto a ponto", file=sys.stderr)
+        if ignoradas:
+            print(f"⚠️ {ignoradas} linhas malformadas ignoradas", file=sys.stderr)
+    finally:
+        processador.fechar()
+        router.fechar()
+        if entrada is not sys.stdin:
+            entrada.close()
+        if saida is not stdout:
+            saida.close()
+        sys.stdout = stdout
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,315 @@
+"""
+Serviço HTTP/JSON local do roteador (sem interface Tk): python main.py serve [opções]
+
+Um único RouterLib compartilhado atende todas as conexões:
+- Servidor asyncio (somente biblioteca padrão) com conexões keep-alive (HTTP/1.1).
+- As buscas rodam num pool de threads (o C libera o GIL e cada thread tem sua área
+  de trabalho), sem bloquear o loop de eventos.
+- Requisições idênticas em andamento são agrupadas: a segunda espera o resultado
+  da primeira em vez de repetir a busca.
+- Histogramas de latência por rota e, por busca, tempos de cada fase e contadores
+  (metricas.py) em /metricas (formato texto do Prometheus).
+
+Rotas:
+    GET  /saude
+    GET  /rota?origem=ID&destino=ID[&modo=2]      caminho, coordenadas e ruas
+    GET  /distancia?origem=ID&destino=ID[&modo=2]
+    GET  /pontos[?categoria=Hotel]                pontos turísticos
+    POST /lote   {"pares": [[origem, destino], ...], "modo": 2}
+    GET  /metricas
+"""
+import argparse
+import asyncio
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit, parse_qs
+
+from metricas import ColetorMetricas, HistogramaLatencia
+
+TEMPO_OCIOSO_S = 30  # Conexão keep-alive sem requisição por mais tempo é encerrada
+MAX_CABECALHO = 16 * 1024
+MAX_CORPO = 8 * 1024 * 1024
+MAX_PARES_LOTE = 200000
+MOTIVOS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed',
+           413: 'Payload Too Large', 431: 'Request Header Fields Too Large', 500: 'Internal Server Error'}
+
+
+class ErroRequisicao(Exception):
+    """Erro do cliente: vira uma resposta JSON {"erro": ...} com o status indicado"""
+
+    def __init__(self, status: int, mensagem: str):
+        super().__init__(mensagem)
+        self.status = status
+
+
+class ServicoRotas:
+    """Atende as requisições HTTP sobre um RouterLib compartilhado"""
+
+    ROTAS = ('/saude', '/rota', '/distancia', '/pontos', '/lote', '/metricas')
+
+    def __init__(self, router, trabalhadores: Optional[int] = None):
+        self.router = router
+        self.router.verboso = False  # Sem print por consulta
+        self.coletor = ColetorMetricas()  # Fases e contadores de cada busca (RouterLib.gancho_metricas)
+        self.router.definir_gancho_metricas(self.coletor.registrar)
+        self.executor = ThreadPoolExecutor(max_workers=trabalhadores or os.cpu_count() or 1,
+                                           thread_name_prefix='ServicoRotas')
+        self._em_andamento: Dict[tuple, asyncio.Future] = {}  # Chave da consulta → resultado pendente
+        self.histogramas = {rota: HistogramaLatencia() for rota in self.ROTAS}
+        self.respostas = {}  # (rota, status) → quantidade
+        self.agrupadas = 0  # Requisições atendidas por uma busca já em andamento
+        self.conexoes_abertas = 0
+        self._pontos = self._montar_pontos()
+
+    def _montar_pontos(self) -> List[Dict]:
+        """Pontos turísticos (tipo 1) com coordenadas visuais dos pinos, quando disponíveis"""
+        pinos = self.router.obter_pinos() or {}
+        pontos = []
+        for v in self.router._exportar_vertices() or []:
+            if v['tipo'] != 1:
+                continue
+            x, y = pinos.get(v['id'], (v['x'], v['y']))
+            pontos.append({'id': v['id'], 'nome': v['nome'], 'categoria': v['categoria'],
+                           'rua': v['rua'], 'x': x, 'y': y})
+        return pontos
+
+    # ------------------------------------------------------------------ HTTP
+
+    async def tratar_conexao(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Loop de uma conexão: várias requisições em sequência enquanto houver keep-alive"""
+        self.conexoes_abertas += 1
+        try:
+            while True:
+                try:
+                    cabecalho = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), TEMPO_OCIOSO_S)
+                except asyncio.LimitOverrunError:
+                    await self._responder(writer, 431, {'erro': 'cabeçalho muito grande'}, False)
+                    break
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+
+                inicio = time.perf_counter()
+                linhas = cabecalho.decode('latin-1').split('\r\n')
+                partes = linhas[0].split(' ')
+                if len(partes) != 3 or not partes[2].startswith('HTTP/'):
+                    await self._responder(writer, 400, {'erro': 'linha de requisição inválida'}, False)
+                    break
+                metodo, alvo, versao = partes
+
+                cabecalhos = {}
+                for linha in linhas[1:]:
+                    nome, separador, valor = linha.partition(':')
+                    if separador:
+                        cabecalhos[nome.strip().lower()] = valor.strip()
+
+                conexao = cabecalhos.get('connection', '').lower()
+                manter = conexao != 'close' if versao == 'HTTP/1.1' else conexao == 'keep-alive'
+
+                try:
+                    tamanho = int(cabecalhos.get('content-length', '0') or 0)
+                except ValueError:
+                    tamanho = -1
+                if tamanho < 0 or tamanho > MAX_CORPO:
+                    await self._responder(writer, 413 if tamanho > 0 else 400,
+                                          {'erro': 'corpo inválido ou muito grande'}, False)
+                    break
+                try:
+                    corpo = await reader.readexactly(tamanho) if tamanho else b''
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+
+                url = urlsplit(alvo)
+                status, resposta = await self._despachar(metodo, url.path, parse_qs(url.query), corpo)
+                await self._responder(writer, status, resposta, manter)
+
+                rota = url.path if url.path in self.histogramas else None
+                if rota is not None:
+                    self.histogramas[rota].observar(time.perf_counter() - inicio)
+                chave = (rota or 'outras', status)
+                self.respostas[chave] = self.respostas.get(chave, 0) + 1
+
+                if not manter:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            self.conexoes_abertas -= 1
+            writer.close()
+
+    async def _responder(self, writer: asyncio.StreamWriter, status: int, resposta, manter: bool):
+        """Envia resposta JSON (dict/list) ou texto (str) com Content-Length"""
+        if isinstance(resposta, str):
+            dados = resposta.encode('utf-8')
+            tipo = 'text/plain; version=0.0.4; charset=utf-8'
+        else:
+            dados = json.dumps(resposta, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+            tipo = 'application/json; charset=utf-8'
+        cabecalho = (f"HTTP/1.1 {status} {MOTIVOS.get(status, '')}\r\n"
+                     f"Content-Type: {tipo}\r\n"
+                     f"Content-Length: {len(dados)}\r\n"
+                     + (f"Connection: keep-alive\r\nKeep-Alive: timeout={TEMPO_OCIOSO_S}\r\n" if manter
+                        else "Connection: close\r\n")
+                     + "\r\n")
+        writer.write(cabecalho.encode('latin-1') + dados)
+        await writer.drain()
+
+    async def _despachar(self, metodo: str, caminho: str, consulta: Dict[str, List[str]],
+                         corpo: bytes) -> Tuple[int, object]:
+        try:
+            if caminho not in self.ROTAS:
+                raise ErroRequisicao(404, f"rota desconhecida: {caminho}")
+            esperado = 'POST' if caminho == '/lote' else 'GET'
+            if metodo != esperado:
+                raise ErroRequisicao(405, f"use {esperado} em {caminho}")
+
+            if caminho == '/rota':
+                return 200, await self._rota(consulta)
+            if caminho == '/distancia':
+                return 200, await self._distancia(consulta)
+            if caminho == '/pontos':
+                categoria = consulta.get('categoria', [None])[0]
+                return 200, [p for p in self._pontos if categoria is None or p['categoria'] == categoria]
+            if caminho == '/lote':
+                return 200, await self._lote(corpo)
+            if caminho == '/metricas':
+                return 200, self.metricas_prometheus()
+            return 200, {'status': 'ok', 'versao_grafo': self.router.versao_grafo(),
+                         'pontos': len(self._pontos)}
+        except ErroRequisicao as e:
+            return e.status, {'erro': str(e)}
+        except Exception as e:
+            return 500, {'erro': f"erro interno: {e}"}
+
+    # ------------------------------------------------------------------ Consultas
+
+    async def _agrupar(self, chave: tuple, funcao, *args):
+        """Executa funcao(*args) no pool; requisições com a mesma chave aguardam a mesma execução"""
+        futuro = self._em_andamento.get(chave)
+        if futuro is not None:
+            self.agrupadas += 1
+        else:
+            futuro = asyncio.get_running_loop().run_in_executor(self.executor, funcao, *args)
+            self._em_andamento[chave] = futuro
+            futuro.add_done_callback(lambda _: self._em_andamento.pop(chave, None))
+        return await asyncio.shield(futuro)  # Cliente que desconecta não cancela a busca dos demais
+
+    def _parametros_rota(self, consulta: Dict[str, List[str]]) -> Tuple[int, int, int]:
+        try:
+            origem = int(consulta['origem'][0])
+            destino = int(consulta['destino'][0])
+            modo = int(consulta.get('modo', [self.router.MODO_BIDIRECIONAL])[0])
+        except (KeyError, ValueError):
+            raise ErroRequisicao(400, "informe origem e destino (IDs inteiros) e opcionalmente modo")
+        if modo not in self.router.NOMES_MODOS:
+            raise ErroRequisicao(400, f"modo inválido: {modo}")
+        if origem == destino:
+            raise ErroRequisicao(400, "origem e destino são iguais")
+        return origem, destino, self.router.modo_efetivo(modo)  # Agrupa pedidos pelo algoritmo que roda
+
+    async def _rota(self, consulta):
+        origem, destino, modo = self._parametros_rota(consulta)
+        rota = await self._agrupar(('rota', origem, destino, modo),
+                                   self.router.calcular_rota_dijkstra, origem, destino, modo)
+        if rota is None:
+            raise ErroRequisicao(404, f"sem rota de {origem} para {destino}")
+        return {'origem': origem, 'destino': destino, 'modo': rota['modo'],
+                'distancia': rota['distancia_total'], 'ids': rota['sequencia_ids'],
+                'pontos': rota['pontos'], 'ruas': rota['ruas'], 'nos_visitados': rota['nos_visitados'],
+                'estatisticas': rota['estatisticas']}
+
+    async def _distancia(self, consulta):
+        origem, destino, modo = self._parametros_rota(consulta)
+        # Mesma chave de /rota: as duas rotas aproveitam a mesma busca e o mesmo cache
+        rota = await self._agrupar(('rota', origem, destino, modo),
+                                   self.router.calcular_rota_dijkstra, origem, destino, modo)
+        if rota is None:
+            raise ErroRequisicao(404, f"sem rota de {origem} para {destino}")
+        return {'origem': origem, 'destino': destino, 'modo': rota['modo'], 'distancia': rota['distancia_total']}
+
+    async def _lote(self, corpo: bytes):
+        try:
+            pedido = json.loads(corpo or b'{}')
+            pares = [(int(o), int(d)) for o, d in pedido['pares']]
+            modo = int(pedido.get('modo', self.router.MODO_BIDIRECIONAL))
+        except (ValueError, KeyError, TypeError):
+            raise ErroRequisicao(400, 'corpo esperado: {"pares": [[origem, destino], ...], "modo": 2}')
+        if len(pares) > MAX_PARES_LOTE:
+            raise ErroRequisicao(413, f"no máximo {MAX_PARES_LOTE} pares por lote")
+        if modo not in self.router.NOMES_MODOS:
+            raise ErroRequisicao(400, f"modo inválido: {modo}")
+
+        distancias = await asyncio.get_running_loop().run_in_executor(
+            self.executor, self.router.calcular_distancias_lote, pares, modo)
+        return {'modo': self.router.modo_efetivo(modo), 'distancias': distancias}
+
+    # ------------------------------------------------------------------ Métricas
+
+    def metricas_prometheus(self) -> str:
+        linhas = ['# HELP roteador_requisicao_segundos Latência das requisições por rota',
+                  '# TYPE roteador_requisicao_segundos histogram']
+        for rota, histograma in self.histogramas.items():
+            if histograma.total:
+                linhas += histograma.linhas_prometheus('roteador_requisicao_segundos', f'rota="{rota}"')
+
+        linhas += ['# HELP roteador_respostas_total Respostas enviadas por rota e status',
+                   '# TYPE roteador_respostas_total counter']
+        for (rota, status), quantidade in sorted(self.respostas.items()):
+            linhas.append(f'roteador_respostas_total{{rota="{rota}",status="{status}"}} {quantidade}')
+
+        cache = self.router.estatisticas_cache()
+        linhas += ['# HELP roteador_requisicoes_agrupadas_total Requisições atendidas por busca já em andamento',
+                   '# TYPE roteador_requisicoes_agrupadas_total counter',
+                   f'roteador_requisicoes_agrupadas_total {self.agrupadas}',
+                   '# HELP roteador_conexoes_abertas Conexões HTTP abertas',
+                   '# TYPE roteador_conexoes_abertas gauge',
+                   f'roteador_conexoes_abertas {self.conexoes_abertas}',
+                   '# HELP roteador_cache_acertos_total Acertos do cache LRU de rotas',
+                   '# TYPE roteador_cache_acertos_total counter',
+                   f'roteador_cache_acertos_total {cache.get("acertos", 0)}',
+                   '# HELP roteador_cache_falhas_total Falhas do cache LRU de rotas',
+                   '# TYPE roteador_cache_falhas_total counter',
+                   f'roteador_cache_falhas_total {cache.get("falhas", 0)}']
+        return '\n'.join(linhas) + '\n' + self.coletor.texto_prometheus()
+
+    def fechar(self):
+        self.executor.shutdown(wait=True)
+
+
+async def servir(servico: ServicoRotas, host: str, porta: int):
+    servidor = await asyncio.start_server(servico.tratar_conexao, host, porta, limit=MAX_CABECALHO)
+    print(f"🌐 Serviço de rotas em http://{host}:{porta} ({servico.executor._max_workers} threads de busca)")
+    async with servidor:
+        await servidor.serve_forever()
+
+
+def main(argv: Optional[List[str]] = None, classe_router=None):
+    if classe_router is None:
+        from main import RouterLib as classe_router  # Import tardio: main.py importa este módulo no modo serve
+
+    parser = argparse.ArgumentParser(prog='main.py serve', description="Serviço HTTP/JSON local do roteador")
+    parser.add_argument('--host', default='127.0.0.1', help="Endereço (padrão: apenas localhost)")
+    parser.add_argument('--porta', type=int, default=8080)
+    parser.add_argument('--trabalhadores', type=int, help="Threads de busca (padrão: núcleos da máquina)")
+    parser.add_argument('--grafo', help="Grafo binário (padrão: mapa.grafo, se existir)")
+    parser.add_argument('--ch', action='store_true', help="Carrega/constrói a hierarquia para MODO_CH")
+    parser.add_argument('--cache', type=int, default=4096, help="Capacidade do cache LRU de rotas")
+    args = parser.parse_args(argv)
+
+    router = classe_router(capacidade_cache=args.cache, caminho_grafo=args.grafo)
+    if args.ch:
+        router.carregar_ch()
+    servico = ServicoRotas(router, args.trabalhadores)
+    try:
+        asyncio.run(servir(servico, args.host, args.porta))
+    except KeyboardInterrupt:
+        print("\n👋 Serviço encerrado")
+    finally:
+        servico.fechar()
+        router.fechar()
+
+
+if __name__ == '__main__':
+    main()